@@ -9,9 +9,16 @@ from ai_assistant.services.ai.adk.session_factory import ADKSessionService
 from ai_assistant.services.ai.adk.session_factory import (
     get_session_service as _get_session_service,
 )
+from ai_assistant.services.ai.jobs import ChatJobManager
+from ai_assistant.services.ai.jobs import get_chat_job_manager as _get_chat_job_manager
 from ai_assistant.services.ai.processors import AgentProcessorRegistry
 from ai_assistant.services.ai.runner import AgentRunner
+from ai_assistant.services.ai.runs import StreamRunRegistry
+from ai_assistant.services.ai.runs import get_stream_run_registry as _get_stream_run_registry
 from ai_assistant.services.ai.service import AIService
+from ai_assistant.services.session.bulk import BulkSessionService
+from ai_assistant.services.session.transcript import TranscriptStore
+from ai_assistant.services.session.transcript import get_transcript_store as _get_transcript_store
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +33,36 @@ def get_session_service() -> ADKSessionService:
     return _get_session_service()
 
 
+def get_transcript_store() -> TranscriptStore:
+    """
+    Get the singleton transcript store instance.
+
+    Returns:
+        TranscriptStore: The singleton transcript store instance.
+    """
+    return _get_transcript_store()
+
+
+def get_stream_run_registry() -> StreamRunRegistry:
+    """
+    Get the singleton registry of replayable agent runs.
+
+    Returns:
+        StreamRunRegistry: The singleton run registry instance.
+    """
+    return _get_stream_run_registry()
+
+
+def get_chat_job_manager() -> ChatJobManager:
+    """
+    Get the singleton manager of asynchronous chat jobs.
+
+    Returns:
+        ChatJobManager: The singleton chat job manager instance.
+    """
+    return _get_chat_job_manager()
+
+
 def get_ai_service(
     session_service: Annotated[ADKSessionService, Depends(get_session_service)],
 ) -> AIService:
@@ -44,3 +81,18 @@ def get_ai_service(
     agent_runner = AgentRunner(session_service=session_service, processor_registry=registry)
 
     return AIService(session_service=session_service, agent_runner=agent_runner)
+
+
+def get_bulk_session_service(
+    session_service: Annotated[ADKSessionService, Depends(get_session_service)],
+) -> BulkSessionService:
+    """
+    FastAPI dependency to get a bulk session service.
+
+    Args:
+        session_service: The injected ADK session service.
+
+    Returns:
+        BulkSessionService: The bulk session service bound to the session service.
+    """
+    return BulkSessionService(session_service=session_service)
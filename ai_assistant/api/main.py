@@ -10,15 +10,28 @@ from fastapi import status
 from fastapi.responses import JSONResponse
 from openinference.instrumentation.google_adk import GoogleADKInstrumentor
 
+from ai_assistant.api.middleware import QueryTrackingMiddleware
 from ai_assistant.api.routes.health import router as health_router
 from ai_assistant.api.v1.routers import V1_API_PREFIX
 from ai_assistant.api.v1.routers import v1_api_router
 from ai_assistant.common.clients.langfuse import get_langfuse_client
 from ai_assistant.common.settings import settings
+from ai_assistant.db.database import dispose_engines
+from ai_assistant.db.database import warm_up_engine
 from ai_assistant.exceptions import AppException
 from ai_assistant.exceptions import AuthorizationException
 from ai_assistant.exceptions import NotFoundException
+from ai_assistant.exceptions import TooManyRequestsException
+from ai_assistant.rpc.server import create_grpc_server
 from ai_assistant.services.ai.adk.session_factory import initialize_session_service
+from ai_assistant.services.ai.adk.session_service import shutdown_session_listeners
+from ai_assistant.services.ai.adk.tools.offload import shutdown_tool_pools
+from ai_assistant.services.ai.jobs import shutdown_chat_job_manager
+from ai_assistant.services.ai.runs import shutdown_stream_run_registry
+from ai_assistant.services.recipes.ingredients import get_ingredient_index
+from ai_assistant.services.session.retention import get_retention_sweeper
+from ai_assistant.services.session.retention import shutdown_retention_sweeper
+from ai_assistant.services.session.snapshot import shutdown_session_snapshots
 
 logging.config.fileConfig(
     Path(__file__).parent / '../../logging.conf', disable_existing_loggers=False
@@ -58,15 +71,79 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     langfuse.flush()
     logger.info('Initialised langfuse client')
 
+    # Open database connections ahead of the first requests
+    logger.info('Warming up the database connection pool...')
+    try:
+        await warm_up_engine()
+        logger.info('Database connection pool warmed up')
+    except Exception as e:
+        # Not fatal: connections are also opened on demand
+        logger.warning(f'Could not warm up the database connection pool: {e}')
+
+    # Index the ingredients of the recipe corpus ahead of the first requests
+    if settings.RECIPE_CORPUS_PATH is not None:
+        logger.info('Building the ingredient index of the recipe corpus...')
+        get_ingredient_index()
+        logger.info('Ingredient index built')
+
+    # Serve the gRPC interface from the same process, sharing the session service
+    grpc_server = None
+    if settings.GRPC_ENABLED:
+        logger.info('Starting gRPC server...')
+        grpc_server = create_grpc_server()
+        await grpc_server.start()
+        logger.info('gRPC server started')
+
+    # Create the upcoming partitions and remove the expired sessions and transcripts
+    if settings.RETENTION_SWEEP_ENABLED:
+        logger.info('Starting retention sweeper...')
+        get_retention_sweeper().start()
+
     logger.info('Application startup complete')
 
     yield
 
+    if grpc_server is not None:
+        logger.info('Stopping gRPC server...')
+        await grpc_server.stop(settings.GRPC_SHUTDOWN_GRACE_SECONDS)
+
+    # Stop the background chat job workers
+    logger.info('Stopping chat job workers...')
+    await shutdown_chat_job_manager()
+
+    # Cancel the replayable runs still going, before their connections are closed
+    logger.info('Cancelling stream runs...')
+    await shutdown_stream_run_registry()
+
+    # Report the session listener retries still pending, before their connections are closed
+    logger.info('Cancelling session listener retries...')
+    await shutdown_session_listeners()
+
+    # Cancel the session snapshots being taken, before their connections are closed
+    logger.info('Cancelling session snapshots...')
+    await shutdown_session_snapshots()
+
+    # Stop the workers of the synchronous tools
+    logger.info('Stopping tool pools...')
+    shutdown_tool_pools()
+
+    # Stop the retention sweeper, before its connections are closed
+    logger.info('Stopping retention sweeper...')
+    await shutdown_retention_sweeper()
+
+    # Close the pooled database connections
+    logger.info('Closing database connections...')
+    await dispose_engines()
+
     logger.info('Application shutdown complete')
 
 
 app = FastAPI(title='AI Assistant', lifespan=lifespan)
 
+# Count the SQL statements of every request, per route
+if settings.DATABASE_INSTRUMENTATION_ENABLED:
+    app.add_middleware(QueryTrackingMiddleware)
+
 # Health endpoint at root level
 # k8s expects a health endpoint at the root level
 app.include_router(health_router)
@@ -82,6 +159,8 @@ async def app_exception_handler(request: Request, exc: AppException) -> JSONResp
             status_code = status.HTTP_404_NOT_FOUND
         case AuthorizationException():
             status_code = status.HTTP_401_UNAUTHORIZED
+        case TooManyRequestsException():
+            status_code = status.HTTP_429_TOO_MANY_REQUESTS
         case _:
             status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
 
@@ -0,0 +1,41 @@
+from starlette.types import ASGIApp
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from ai_assistant.db.instrumentation import track_queries
+
+# Requests that matched no route are aggregated together, to keep the number of names bounded
+_UNMATCHED_ROUTE = '<unmatched>'
+
+
+class QueryTrackingMiddleware:
+    """
+    Counts the SQL statements of every HTTP request, per route.
+
+    Implemented as a plain ASGI middleware, so that the statements run while a streaming
+    response is being sent are counted too.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The ASGI application to wrap
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # WebSocket connections carry many turns, their statements are not one request's
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as tracker:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                # Set by the router on the shared scope once the request is routed
+                route = getattr(scope.get('route'), 'path', _UNMATCHED_ROUTE)
+                tracker.name = f'{scope["method"]} {route}'
@@ -1,5 +1,17 @@
+from dataclasses import asdict
+from typing import Any
+
 from fastapi import APIRouter
 
+from ai_assistant.db.database import get_pool_metrics
+from ai_assistant.db.database import get_routing_metrics
+from ai_assistant.db.instrumentation import get_statement_metrics
+from ai_assistant.db.instrumentation import get_tracked_metrics
+from ai_assistant.services.ai.adk.session_service import get_session_listener_metrics
+from ai_assistant.services.ai.adk.tools.cache import get_tool_cache_metrics
+from ai_assistant.services.ai.adk.tools.offload import get_tool_pool_metrics
+from ai_assistant.services.session.compression import get_compression_metrics
+
 router = APIRouter()
 
 
@@ -12,3 +24,88 @@ async def health() -> dict[str, str]:
         dict[str, str]: A dictionary with the status of the application.
     """
     return {'status': 'OK'}
+
+
+@router.get('/health/db-pool')
+async def db_pool() -> dict[str, list[dict[str, Any]]]:
+    """
+    Database connection pool metrics.
+
+    Returns:
+        dict[str, list[dict[str, Any]]]: The size, checked in, checked out and overflow
+            connections of the pool of every database engine.
+    """
+    return {'pools': [asdict(metrics) for metrics in get_pool_metrics()]}
+
+
+@router.get('/health/db-routing')
+async def db_routing() -> dict[str, Any]:
+    """
+    Read replica routing metrics.
+
+    Returns:
+        dict[str, Any]: The number of read-only sessions routed to the primary or to a
+            replica, by reason, and the last measured lag of every replica.
+    """
+    return get_routing_metrics()
+
+
+@router.get('/health/db-queries')
+async def db_queries() -> dict[str, list[dict[str, Any]]]:
+    """
+    SQL statement metrics.
+
+    Returns:
+        dict[str, list[dict[str, Any]]]: The latency histograms of the statements that took
+            the most database time, and the number of statements and database time of the
+            requests to every route.
+    """
+    return {'statements': get_statement_metrics(), 'routes': get_tracked_metrics()}
+
+
+@router.get('/health/session-compression')
+async def session_compression() -> dict[str, Any]:
+    """
+    Session event payload compression metrics.
+
+    Returns:
+        dict[str, Any]: The number of compressed event parts, their size before and after
+            compression and the compression ratio, and the decode time of the parts read.
+    """
+    return get_compression_metrics()
+
+
+@router.get('/health/session-listeners')
+async def session_listeners() -> dict[str, dict[str, int]]:
+    """
+    Session listener metrics.
+
+    Returns:
+        dict[str, dict[str, int]]: The notifications retried and failed on every attempt of
+            every session listener, e.g. events missing from the transcripts.
+    """
+    return get_session_listener_metrics()
+
+
+@router.get('/health/tool-cache')
+async def tool_cache() -> dict[str, dict[str, Any]]:
+    """
+    Tool result cache metrics.
+
+    Returns:
+        dict[str, dict[str, Any]]: The cache hits, misses and calls coalesced with an
+            identical call in flight, and the hit ratio, of every cached tool.
+    """
+    return get_tool_cache_metrics()
+
+
+@router.get('/health/tool-pools')
+async def tool_pools() -> dict[str, dict[str, Any]]:
+    """
+    Synchronous tool pool metrics.
+
+    Returns:
+        dict[str, dict[str, Any]]: The pool, calls, calls in flight and time waited for a
+            worker, mean and max, of every tool run off the event loop.
+    """
+    return get_tool_pool_metrics()
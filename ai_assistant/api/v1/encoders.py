@@ -0,0 +1,220 @@
+"""
+Wire formats of the chat stream, negotiated from the `Accept` header.
+
+Every format is produced by a stream encoder from the same `Content` stream:
+
+- `text/event-stream` (default): SSE frames of `ContentResponse` JSON, for browsers.
+- `application/x-ndjson`: one JSON object per line,
+  `{"event_id": "...", "content": {<ContentResponse>}}`.
+- `application/vnd.msgpack`: the same objects as MessagePack maps, each prefixed with its
+  length as a 4-byte big-endian unsigned integer.
+
+Stream errors are sent as a final `{"error": "...", "session_id": "..."}` object in the
+format of the stream. More formats can be plugged in with `register_stream_encoder`.
+"""
+
+import struct
+import uuid
+from typing import Any
+from typing import ClassVar
+from typing import Protocol
+
+import msgpack
+from pydantic_core import to_json
+from pydantic_core import to_jsonable_python
+
+from ai_assistant.api.v1.sse import SSEEncoder
+from ai_assistant.domain import Content
+
+_NEWLINE = b'\n'
+_LENGTH_PREFIX = struct.Struct('>I')
+
+
+class StreamEncoder(Protocol):
+    """
+    Encodes the contents of one chat stream as frames of a wire format.
+    """
+
+    media_type: ClassVar[str]
+
+    def __init__(self, session_id: uuid.UUID | str) -> None: ...
+
+    def encode(self, content: Content, event_id: str | None = None) -> bytes:
+        """
+        Encode a content as one frame.
+
+        Args:
+            content: The domain content to encode
+            event_id: The ID of the frame, echoed by clients in `Last-Event-ID` to resume
+
+        Returns:
+            bytes: The frame
+        """
+        ...
+
+    def encode_error(self, error: str) -> bytes:
+        """
+        Encode a stream error as one frame.
+
+        Args:
+            error: The error message
+
+        Returns:
+            bytes: The frame
+        """
+        ...
+
+
+class NDJSONEncoder:
+    """
+    Encodes the contents of one chat stream as newline-delimited JSON.
+    """
+
+    media_type: ClassVar[str] = 'application/x-ndjson'
+
+    def __init__(self, session_id: uuid.UUID | str) -> None:
+        """
+        Initialize the encoder.
+
+        Args:
+            session_id: The ID of the streamed session
+        """
+        self.session_id = str(session_id)
+        # Reuses the cached content JSON of the SSE encoder, only the framing differs
+        self._json = SSEEncoder(session_id)
+
+    def encode(self, content: Content, event_id: str | None = None) -> bytes:
+        return b''.join(
+            (
+                b'{"event_id":',
+                to_json(event_id),
+                b',"content":',
+                self._json.encode_json(content),
+                b'}\n',
+            )
+        )
+
+    def encode_error(self, error: str) -> bytes:
+        return to_json({'error': error, 'session_id': self.session_id}) + _NEWLINE
+
+
+class MessagePackEncoder:
+    """
+    Encodes the contents of one chat stream as length-prefixed MessagePack.
+    """
+
+    media_type: ClassVar[str] = 'application/vnd.msgpack'
+
+    def __init__(self, session_id: uuid.UUID | str) -> None:
+        """
+        Initialize the encoder.
+
+        Args:
+            session_id: The ID of the streamed session
+        """
+        self.session_id = str(session_id)
+        # Values MessagePack has no type for (e.g. UUIDs) are packed as their JSON form
+        self._packer = msgpack.Packer(default=to_jsonable_python)
+
+        self._content_id: uuid.UUID | None = None
+        self._content_id_str = ''
+
+    def encode(self, content: Content, event_id: str | None = None) -> bytes:
+        # Chunks of the same message share their ID, so only the last one is formatted
+        if content.id != self._content_id:
+            self._content_id = content.id
+            self._content_id_str = str(content.id)
+
+        return self._frame(
+            {
+                'event_id': event_id,
+                'content': {
+                    'id': self._content_id_str,
+                    'type': content.type,
+                    'data': content.data,
+                    'role': content.role,
+                    'metadata': content.metadata,
+                },
+            }
+        )
+
+    def encode_error(self, error: str) -> bytes:
+        return self._frame({'error': error, 'session_id': self.session_id})
+
+    def _frame(self, payload: dict[str, Any]) -> bytes:
+        packed = self._packer.pack(payload)
+        return _LENGTH_PREFIX.pack(len(packed)) + packed
+
+
+# Media types accepted in `Accept`, in order of preference when equally acceptable
+_STREAM_ENCODERS: dict[str, type[StreamEncoder]] = {}
+
+
+def register_stream_encoder(encoder: type[StreamEncoder], *aliases: str) -> None:
+    """
+    Make a wire format available to the chat stream.
+
+    Formats registered first are preferred when a client accepts several equally.
+
+    Args:
+        encoder: The stream encoder class, served under its `media_type`
+        aliases: Other media types that select the encoder
+    """
+    for media_type in (encoder.media_type, *aliases):
+        _STREAM_ENCODERS[media_type] = encoder
+
+
+register_stream_encoder(SSEEncoder)
+register_stream_encoder(NDJSONEncoder)
+register_stream_encoder(MessagePackEncoder, 'application/msgpack', 'application/x-msgpack')
+
+
+def negotiate_stream_encoder(accept: str | None) -> type[StreamEncoder]:
+    """
+    Pick the wire format of a stream from an `Accept` header.
+
+    Args:
+        accept: The `Accept` header of the request
+
+    Returns:
+        type[StreamEncoder]: The encoder of the most acceptable format, SSE if none of the
+            supported formats is acceptable
+    """
+    if not accept:
+        return SSEEncoder
+
+    ranges = _parse_accept(accept)
+
+    best: type[StreamEncoder] = SSEEncoder
+    best_quality = 0.0
+    for media_type, encoder in _STREAM_ENCODERS.items():
+        quality = _get_quality(media_type, ranges)
+        if quality > best_quality:
+            best, best_quality = encoder, quality
+
+    return best
+
+
+def _parse_accept(accept: str) -> dict[str, float]:
+    ranges = {}
+    for value in accept.split(','):
+        media_range, *params = value.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, param_value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(param_value)
+                except ValueError:
+                    quality = 0.0
+        ranges[media_range.strip().lower()] = quality
+    return ranges
+
+
+def _get_quality(media_type: str, ranges: dict[str, float]) -> float:
+    # The most specific matching range applies
+    main_type = media_type.partition('/')[0]
+    for media_range in (media_type, f'{main_type}/*', '*/*'):
+        if media_range in ranges:
+            return ranges[media_range]
+    return 0.0
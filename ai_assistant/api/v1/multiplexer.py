@@ -0,0 +1,200 @@
+"""
+Multiplexing of concurrent chat streams over a single WebSocket connection.
+
+Protocol (JSON text frames):
+
+Client to server:
+    {"type": "chat", "stream_id": "s1", "session_id": "...", "user_id": "...", "message": "..."}
+    {"type": "credit", "stream_id": "s1", "frames": 32}
+    {"type": "cancel", "stream_id": "s1"}
+
+Server to client:
+    {"stream_id": "s1", "event": "content", "content": {<ContentResponse>}}
+    {"stream_id": "s1", "event": "end"}
+    {"stream_id": "s1", "event": "cancelled"}
+    {"stream_id": "s1", "event": "error", "error": "..."}
+
+Flow control is per stream and credit based: a stream starts with
+`WS_STREAM_INITIAL_CREDIT` content frames and the client grants more with `credit` messages.
+A stream without credit stops pulling from the agent until it gets some, so a slow consumer
+of one stream never holds back the others. `end`, `cancelled` and `error` frames do not
+consume credit.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from fastapi import WebSocket
+from fastapi import WebSocketDisconnect
+from pydantic import TypeAdapter
+from pydantic import ValidationError
+from pydantic_core import to_json
+
+from ai_assistant.api.v1.schemas.chat import ChatStreamCancel
+from ai_assistant.api.v1.schemas.chat import ChatStreamClientMessage
+from ai_assistant.api.v1.schemas.chat import ChatStreamCredit
+from ai_assistant.api.v1.schemas.chat import ChatStreamStart
+from ai_assistant.api.v1.sse import SSEEncoder
+from ai_assistant.common.settings import settings
+from ai_assistant.services.ai.service import AIService
+
+logger = logging.getLogger(__name__)
+
+_client_message_adapter: TypeAdapter[ChatStreamClientMessage] = TypeAdapter(
+    ChatStreamClientMessage
+)
+
+
+@dataclass
+class _Stream:
+    credit: int
+    task: asyncio.Task[None] | None = None
+    credit_granted: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class ChatStreamMultiplexer:
+    """
+    Runs the chat streams requested over one WebSocket connection.
+
+    Example:
+        await ChatStreamMultiplexer(websocket, ai_service).run()
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        ai_service: AIService,
+        max_streams: int = settings.WS_MAX_STREAMS_PER_CONNECTION,
+        initial_credit: int = settings.WS_STREAM_INITIAL_CREDIT,
+    ) -> None:
+        """
+        Initialize the multiplexer.
+
+        Args:
+            websocket: The accepted WebSocket connection
+            ai_service: The AI service to run the chat streams with
+            max_streams: The maximum number of concurrent streams on the connection
+            initial_credit: The number of content frames a stream may send before any credit
+        """
+        self.websocket = websocket
+        self.ai_service = ai_service
+        self.max_streams = max_streams
+        self.initial_credit = initial_credit
+
+        self._streams: dict[str, _Stream] = {}
+        self._send_lock = asyncio.Lock()
+        self._closed = False
+
+    async def run(self) -> None:
+        """
+        Serve the connection until the client disconnects, then cancel its running streams.
+        """
+        try:
+            while True:
+                raw = await self.websocket.receive_text()
+                try:
+                    message = _client_message_adapter.validate_json(raw)
+                except ValidationError as e:
+                    await self._send_event(None, 'error', error=f'Invalid message: {e}')
+                    continue
+
+                match message:
+                    case ChatStreamStart():
+                        await self._start(message)
+                    case ChatStreamCredit():
+                        self._grant(message)
+                    case ChatStreamCancel():
+                        self._cancel(message.stream_id)
+
+        except WebSocketDisconnect:
+            logger.debug('WebSocket client disconnected')
+
+        finally:
+            self._closed = True
+            tasks = [stream.task for stream in self._streams.values() if stream.task]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _start(self, message: ChatStreamStart) -> None:
+        if message.stream_id in self._streams:
+            await self._send_event(message.stream_id, 'error', error='Stream is already running')
+            return
+
+        if len(self._streams) >= self.max_streams:
+            await self._send_event(
+                message.stream_id,
+                'error',
+                error=f'Too many concurrent streams (limit is {self.max_streams})',
+            )
+            return
+
+        logger.info(f'New chat stream {message.stream_id} for session {message.session_id}')
+        stream = _Stream(credit=self.initial_credit)
+        self._streams[message.stream_id] = stream
+        stream.task = asyncio.create_task(self._run_stream(message, stream))
+
+    def _grant(self, message: ChatStreamCredit) -> None:
+        stream = self._streams.get(message.stream_id)
+        if stream is None:
+            # The stream may have just ended, credit for it is simply dropped
+            return
+
+        stream.credit += message.frames
+        stream.credit_granted.set()
+
+    def _cancel(self, stream_id: str) -> None:
+        stream = self._streams.get(stream_id)
+        if stream is not None and stream.task is not None:
+            stream.task.cancel()
+
+    async def _run_stream(self, message: ChatStreamStart, stream: _Stream) -> None:
+        stream_id = message.stream_id
+        encoder = SSEEncoder(message.session_id)
+        prefix = b'{"stream_id":%s,"event":"content","content":' % to_json(stream_id)
+
+        try:
+            async for content in self.ai_service.run_stream(
+                session_id=message.session_id,
+                user_message=message.message,
+                user_id=message.user_id,
+            ):
+                while stream.credit <= 0:
+                    stream.credit_granted.clear()
+                    await stream.credit_granted.wait()
+
+                stream.credit -= 1
+                await self._send(prefix + encoder.encode_json(content) + b'}')
+
+            await self._send_event(stream_id, 'end')
+            logger.info(f'Chat stream {stream_id} completed for session {message.session_id}')
+
+        except asyncio.CancelledError:
+            if not self._closed:
+                logger.info(f'Chat stream {stream_id} cancelled by the client')
+                await self._send_event(stream_id, 'cancelled')
+            raise
+
+        except Exception as e:
+            logger.error(f'Error during chat stream {stream_id}: {e}')
+            await self._send_event(stream_id, 'error', error=str(e))
+
+        finally:
+            self._streams.pop(stream_id, None)
+
+    async def _send_event(self, stream_id: str | None, event: str, **fields: Any) -> None:
+        await self._send(to_json({'stream_id': stream_id, 'event': event, **fields}))
+
+    async def _send(self, frame: bytes) -> None:
+        if self._closed:
+            return
+
+        async with self._send_lock:
+            try:
+                await self.websocket.send_text(frame.decode())
+            except (WebSocketDisconnect, RuntimeError):
+                # The client went away, `run` cancels the remaining streams
+                self._closed = True
@@ -1,15 +1,35 @@
-import json
 import logging
+import uuid
+from collections.abc import AsyncIterator
 from typing import Annotated
 
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Header
+from fastapi import Query
 from fastapi import status
 from fastapi.responses import StreamingResponse
 
 from ai_assistant.api.dependencies import get_ai_service
+from ai_assistant.api.dependencies import get_chat_job_manager
+from ai_assistant.api.dependencies import get_stream_run_registry
+from ai_assistant.api.v1.encoders import negotiate_stream_encoder
+from ai_assistant.api.v1.schemas.chat import ChatBatchItem
+from ai_assistant.api.v1.schemas.chat import ChatBatchRequest
+from ai_assistant.api.v1.schemas.chat import ChatJobResponse
 from ai_assistant.api.v1.schemas.chat import ChatRequest
 from ai_assistant.api.v1.schemas.chat import ContentResponse
+from ai_assistant.api.v1.sse import compress_stream
+from ai_assistant.api.v1.sse import negotiate_stream_encoding
+from ai_assistant.common.settings import settings
+from ai_assistant.domain import ChatTurn
+from ai_assistant.exceptions import NotFoundException
+from ai_assistant.services.ai.jobs import ChatJob
+from ai_assistant.services.ai.jobs import ChatJobManager
+from ai_assistant.services.ai.runs import StreamRun
+from ai_assistant.services.ai.runs import StreamRunRegistry
+from ai_assistant.services.ai.runs import format_event_id
+from ai_assistant.services.ai.runs import parse_event_id
 from ai_assistant.services.ai.service import AIService
 
 logger = logging.getLogger(__name__)
@@ -48,47 +68,88 @@ async def chat(
 
 @router.post(
     '/chat/stream',
-    summary='Chat with the AI assistant and stream the response using Server-Sent Events (SSE)',
+    summary='Chat with the AI assistant and stream the response (SSE, NDJSON or MessagePack)',
     status_code=status.HTTP_200_OK,
 )
 async def chat_stream(
     request: ChatRequest,
     ai_service: Annotated[AIService, Depends(get_ai_service)],
+    run_registry: Annotated[StreamRunRegistry, Depends(get_stream_run_registry)],
+    last_event_id: Annotated[str | None, Header()] = None,
+    accept: Annotated[str | None, Header()] = None,
+    accept_encoding: Annotated[str | None, Header()] = None,
 ) -> StreamingResponse:
     """
-    Process a chat request and stream the AI response using Server-Sent Events.
+    Process a chat request and stream the AI response.
 
-    The response is streamed as SSE events in the format:
+    By default the response is streamed as SSE events in the format:
     ```
+    id: 3f0c...9a.1
     data: {"id": "...", "type": "message", "data": {"text": "chunk"}, ...}
 
+    id: 3f0c...9a.2
     data: {"id": "...", "type": "loader", "data": {"message": "...", "show_spinner": true}, ...}
 
+    id: 3f0c...9a.3
     data: {"id": "...", "type": "metadata", "data": {}, "metadata": {"session_id": "..."}}
     ```
 
+    Clients that accept `application/x-ndjson` or `application/vnd.msgpack` (e.g. internal
+    services) get the same frames as NDJSON (`{"event_id": "...", "content": {...}}` per
+    line) or as length-prefixed MessagePack maps instead, which are cheaper to parse.
+
+    The stream is compressed with gzip or deflate when the client accepts it. The compressor
+    is flushed after every chunk, so compression does not delay frames.
+
+    The agent turn runs independently of the connection. A client whose connection drops can
+    send the same request again with a `Last-Event-ID` header to reattach to the running (or
+    just finished) turn and receive only the frames it missed, instead of rerunning the turn.
+    A 404 is returned if the run is unknown or has expired, or if the frames missed are no
+    longer buffered.
+
     Args:
         request: The chat request containing the session ID and message
         ai_service: The AI service to use to generate the response
+        run_registry: The registry of replayable agent runs
+        last_event_id: The ID of the last frame received before a reconnect
+        accept: The media types accepted by the client
+        accept_encoding: The content encodings accepted by the client
 
     Returns:
-        StreamingResponse: SSE stream of Content objects
+        StreamingResponse: Stream of Content objects in the negotiated format
     """
-    logger.info(f'New chat stream request for session {request.session_id}')
-
-    async def event_generator():
-        """Generate Server-Sent Events from domain Content objects."""
-        try:
-            async for content in ai_service.run_stream(
+    if last_event_id:
+        run, after = _resume_run(run_registry, request, last_event_id)
+        logger.info(f'Resuming run {run.run_id} of session {request.session_id} after {after}')
+    else:
+        logger.info(f'New chat stream request for session {request.session_id}')
+        run = run_registry.start(
+            session_id=request.session_id,
+            user_id=request.user_id,
+            stream=ai_service.run_stream(
                 session_id=request.session_id,
                 user_message=request.message,
                 user_id=request.user_id,
-            ):
-                # Convert to response schema
-                content_response = ContentResponse.from_domain_model(content)
+            ),
+        )
+        after = 0
 
-                # Format as SSE: "data: {json}\n\n"
-                yield f'data: {content_response.model_dump_json()}\n\n'
+    encoder = negotiate_stream_encoder(accept)(request.session_id)
+
+    async def event_generator() -> AsyncIterator[bytes]:
+        """Generate the encoded frames of the run."""
+        try:
+            # Frames already available are coalesced into one chunk (and one flush)
+            async for batch in run.subscribe_batches(after):
+                # e.g. as SSE: b'id: {run}.{seq}\ndata: {json}\n\n', same JSON as ContentResponse
+                yield b''.join(
+                    encoder.encode(content, event_id=format_event_id(run.run_id, seq))
+                    for seq, content in batch
+                )
+
+            if run.error is not None:
+                yield encoder.encode_error(run.error)
+                return
 
             logger.info(f'Stream completed for session {request.session_id}')
 
@@ -96,14 +157,218 @@ async def chat_stream(
             logger.error(f'Error during streaming for session {request.session_id}: {e}')
 
             # Send error event
-            error_event = {
-                'error': str(e),
-                'session_id': str(request.session_id),
-            }
+            yield encoder.encode_error(str(e))
 
-            yield f'data: {json.dumps(error_event)}\n\n'
+    encoding = (
+        negotiate_stream_encoding(accept_encoding) if settings.STREAM_COMPRESSION_ENABLED else None
+    )
+    if encoding is None:
+        return StreamingResponse(
+            event_generator(),
+            media_type=encoder.media_type,
+            headers={'Vary': 'Accept'},
+        )
 
     return StreamingResponse(
-        event_generator(),
-        media_type='text/event-stream',
+        compress_stream(event_generator(), encoding, settings.STREAM_COMPRESSION_LEVEL),
+        media_type=encoder.media_type,
+        headers={'Content-Encoding': encoding, 'Vary': 'Accept, Accept-Encoding'},
+    )
+
+
+def _resume_run(
+    run_registry: StreamRunRegistry,
+    request: ChatRequest,
+    last_event_id: str,
+) -> tuple[StreamRun, int]:
+    parsed = parse_event_id(last_event_id)
+    run = run_registry.get(parsed[0]) if parsed else None
+
+    # A run can only be resumed by the owner of its session
+    if (
+        parsed is None
+        or run is None
+        or run.session_id != request.session_id
+        or run.user_id != request.user_id
+    ):
+        raise NotFoundException(f'No resumable stream found for event {last_event_id}')
+
+    # Checked before the response starts, as an error raised while streaming would follow a 200
+    after = parsed[1]
+    if not run.is_buffered(after):
+        raise NotFoundException(
+            f'Frames after {after} of run {run.run_id} are no longer available'
+        )
+
+    return run, after
+
+
+@router.post(
+    '/chat/batch',
+    summary='Run many independent chat turns and stream the responses as NDJSON',
+    status_code=status.HTTP_200_OK,
+)
+async def chat_batch(
+    request: ChatBatchRequest,
+    ai_service: Annotated[AIService, Depends(get_ai_service)],
+) -> StreamingResponse:
+    """
+    Process many chat turns concurrently, under a bounded concurrency.
+
+    Each turn's result is streamed as one JSON line as soon as it completes, so results come
+    in completion order and carry the `index` of their turn. A failing turn yields a line
+    with an `error` and does not affect the other turns:
+    ```
+    {"index": 1, "session_id": "...", "user_id": "...", "content": {...}, "error": null}
+    {"index": 0, "session_id": "...", "user_id": "...", "content": null, "error": "..."}
+    ```
+
+    Args:
+        request: The chat turns to run
+        ai_service: The AI service to use to generate the responses
+
+    Returns:
+        StreamingResponse: NDJSON stream of ChatBatchItem objects
+    """
+    logger.info(f'New chat batch request with {len(request.turns)} turns')
+
+    turns = [
+        ChatTurn(session_id=turn.session_id, user_id=turn.user_id, message=turn.message)
+        for turn in request.turns
+    ]
+
+    async def result_generator() -> AsyncIterator[bytes]:
+        async for result in ai_service.run_batch(turns):
+            turn = turns[result.index]
+            item = ChatBatchItem(
+                index=result.index,
+                session_id=turn.session_id,
+                user_id=turn.user_id,
+                content=ContentResponse.from_domain_model(result.value) if result.value else None,
+                error=result.error,
+            )
+            yield item.model_dump_json().encode() + b'\n'
+
+    return StreamingResponse(result_generator(), media_type='application/x-ndjson')
+
+
+@router.post(
+    '/chat/jobs',
+    summary='Submit a chat turn to run in the background',
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_chat_job(
+    request: ChatRequest,
+    ai_service: Annotated[AIService, Depends(get_ai_service)],
+    job_manager: Annotated[ChatJobManager, Depends(get_chat_job_manager)],
+) -> ChatJobResponse:
+    """
+    Submit a chat turn as an asynchronous job and return its ID at once.
+
+    The turn runs in a background executor and completes even if the client disconnects.
+    Its outcome is available from `GET /chat/jobs/{job_id}` (poll, or long-poll with `wait`)
+    and `GET /chat/jobs/{job_id}/events` (SSE) until the job's retention expires.
+
+    Args:
+        request: The chat request containing the session ID and message
+        ai_service: The AI service to use to generate the response
+        job_manager: The chat job manager
+
+    Returns:
+        ChatJobResponse: The queued job
+    """
+    logger.info(f'New chat job request for session {request.session_id}')
+
+    job = job_manager.submit(
+        ai_service,
+        ChatTurn(session_id=request.session_id, user_id=request.user_id, message=request.message),
+    )
+
+    return _to_job_response(job)
+
+
+@router.get(
+    '/chat/jobs/{job_id}',
+    summary='Get the state of a chat job, optionally waiting for it to complete',
+    status_code=status.HTTP_200_OK,
+)
+async def get_chat_job(
+    job_id: uuid.UUID,
+    user_id: uuid.UUID,
+    job_manager: Annotated[ChatJobManager, Depends(get_chat_job_manager)],
+    wait: Annotated[float, Query(ge=0, le=settings.CHAT_JOB_MAX_WAIT_SECONDS)] = 0,
+) -> ChatJobResponse:
+    """
+    Get the state of a chat job.
+
+    With `wait`, the request is held until the job completes or `wait` seconds have passed
+    (long polling), whichever comes first.
+
+    Args:
+        job_id: The ID of the job
+        user_id: The ID of the user who submitted the job
+        job_manager: The chat job manager
+        wait: The maximum time to wait for the job to complete, in seconds
+
+    Returns:
+        ChatJobResponse: The state of the job
+    """
+    job = _get_job(job_manager, job_id, user_id)
+
+    if wait and not job.done:
+        await job.wait(timeout=wait)
+
+    return _to_job_response(job)
+
+
+@router.get(
+    '/chat/jobs/{job_id}/events',
+    summary='Subscribe to the state changes of a chat job using Server-Sent Events (SSE)',
+    status_code=status.HTTP_200_OK,
+)
+async def get_chat_job_events(
+    job_id: uuid.UUID,
+    user_id: uuid.UUID,
+    job_manager: Annotated[ChatJobManager, Depends(get_chat_job_manager)],
+) -> StreamingResponse:
+    """
+    Stream the state of a chat job on every status change, until the job completes.
+
+    Args:
+        job_id: The ID of the job
+        user_id: The ID of the user who submitted the job
+        job_manager: The chat job manager
+
+    Returns:
+        StreamingResponse: SSE stream of ChatJobResponse objects
+    """
+    job = _get_job(job_manager, job_id, user_id)
+
+    async def event_generator() -> AsyncIterator[bytes]:
+        async for _ in job.watch():
+            yield b'data: ' + _to_job_response(job).model_dump_json().encode() + b'\n\n'
+
+    return StreamingResponse(event_generator(), media_type='text/event-stream')
+
+
+def _get_job(job_manager: ChatJobManager, job_id: uuid.UUID, user_id: uuid.UUID) -> ChatJob:
+    job = job_manager.get(job_id)
+
+    # Jobs of other users are reported as missing rather than forbidden
+    if job is None or job.turn.user_id != user_id:
+        raise NotFoundException(f'Chat job {job_id} not found for user {user_id}')
+
+    return job
+
+
+def _to_job_response(job: ChatJob) -> ChatJobResponse:
+    return ChatJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        session_id=job.turn.session_id,
+        user_id=job.turn.user_id,
+        content=ContentResponse.from_domain_model(job.result) if job.result else None,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
     )
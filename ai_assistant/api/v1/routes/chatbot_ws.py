@@ -0,0 +1,37 @@
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import WebSocket
+
+from ai_assistant.api.dependencies import get_ai_service
+from ai_assistant.api.v1.multiplexer import ChatStreamMultiplexer
+from ai_assistant.services.ai.service import AIService
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.websocket('/chat/ws')
+async def chat_ws(
+    websocket: WebSocket,
+    ai_service: Annotated[AIService, Depends(get_ai_service)],
+) -> None:
+    """
+    Chat with the AI assistant over a long-lived WebSocket connection.
+
+    Many chat streams, for any of the client's sessions, can run concurrently over the same
+    connection. Each stream is identified by a client-chosen `stream_id` and sends the same
+    `Content` frames as `/chat/stream`, with per-stream credit based flow control and
+    cancellation. See `ai_assistant.api.v1.multiplexer` for the message protocol.
+
+    Args:
+        websocket: The WebSocket connection
+        ai_service: The AI service to use to generate the responses, resolved once per
+            connection rather than once per turn
+    """
+    await websocket.accept()
+    logger.info('New chat WebSocket connection')
+
+    await ChatStreamMultiplexer(websocket, ai_service).run()
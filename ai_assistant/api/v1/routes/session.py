@@ -1,26 +1,54 @@
 import logging
+import time
 import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime
 from typing import Annotated
 
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Query
 from fastapi import status
+from fastapi.responses import StreamingResponse
+from google.adk.sessions.base_session_service import GetSessionConfig
 
+from ai_assistant.api.dependencies import get_bulk_session_service
 from ai_assistant.api.dependencies import get_session_service
+from ai_assistant.api.dependencies import get_transcript_store
 from ai_assistant.api.v1.schemas.chat import ContentResponse
+from ai_assistant.api.v1.schemas.session import BulkSessionCreateItem
+from ai_assistant.api.v1.schemas.session import BulkSessionCreateRequest
+from ai_assistant.api.v1.schemas.session import BulkSessionCreateResponse
+from ai_assistant.api.v1.schemas.session import BulkSessionDeleteItem
+from ai_assistant.api.v1.schemas.session import BulkSessionDeleteResponse
+from ai_assistant.api.v1.schemas.session import BulkSessionGetItem
+from ai_assistant.api.v1.schemas.session import BulkSessionGetResponse
+from ai_assistant.api.v1.schemas.session import BulkSessionKeysRequest
 from ai_assistant.api.v1.schemas.session import SessionDetailResponse
 from ai_assistant.api.v1.schemas.session import SessionListItem
 from ai_assistant.api.v1.schemas.session import SessionListResponse
 from ai_assistant.api.v1.schemas.session import SessionRequest
 from ai_assistant.api.v1.schemas.session import SessionResponse
+from ai_assistant.api.v1.schemas.session import SessionSearchHit
+from ai_assistant.api.v1.schemas.session import SessionSearchResponse
 from ai_assistant.common.settings import settings
 from ai_assistant.exceptions import NotFoundException
 from ai_assistant.services.ai.adk.session_factory import ADKSessionService
+from ai_assistant.services.session.bulk import BulkSessionService
+from ai_assistant.services.session.export import SessionExporter
+from ai_assistant.services.session.export import encode_ndjson
+from ai_assistant.services.session.export import ensure_export_capacity
+from ai_assistant.services.session.export import export_slot
+from ai_assistant.services.session.state import requested_state_keys
+from ai_assistant.services.session.state import select_keys
+from ai_assistant.services.session.transcript import TranscriptStore
 
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
+INTRO_MESSAGE = 'Hello, how can I help you today?'
+
 
 @router.post(
     '/session',
@@ -46,10 +74,129 @@ async def create_session(
         user_id=str(body.user_id),
         app_name=settings.APP_NAME,
     )
-    intro_message = 'Hello, how can I help you today?'
 
     logger.debug(f'Session {session.id} created successfully for user {body.user_id}')
-    return SessionResponse(session_id=uuid.UUID(session.id), intro_message=intro_message)
+    return SessionResponse(session_id=uuid.UUID(session.id), intro_message=INTRO_MESSAGE)
+
+
+@router.post(
+    '/sessions/batch',
+    status_code=status.HTTP_200_OK,
+    summary='Create many sessions in a single request',
+)
+async def create_sessions_batch(
+    body: BulkSessionCreateRequest,
+    bulk_session_service: Annotated[BulkSessionService, Depends(get_bulk_session_service)],
+) -> BulkSessionCreateResponse:
+    """
+    Create one session per user ID, with a result per item.
+
+    Args:
+        body (BulkSessionCreateRequest): The users to create sessions for.
+        bulk_session_service (BulkSessionService): The injected bulk session service.
+
+    Returns:
+        (BulkSessionCreateResponse): The created session (or error) of each item.
+    """
+    logger.debug(f'Creating {len(body.user_ids)} sessions in bulk')
+    results = await bulk_session_service.create_sessions([str(u) for u in body.user_ids])
+
+    return BulkSessionCreateResponse(
+        results=[
+            BulkSessionCreateItem(
+                index=result.index,
+                user_id=body.user_ids[result.index],
+                session_id=uuid.UUID(result.value.id) if result.value else None,
+                intro_message=INTRO_MESSAGE if result.value else None,
+                error=result.error,
+            )
+            for result in results
+        ]
+    )
+
+
+@router.post(
+    '/sessions/batch/get',
+    status_code=status.HTTP_200_OK,
+    summary='Get many sessions by ID in a single request',
+)
+async def get_sessions_batch(
+    body: BulkSessionKeysRequest,
+    bulk_session_service: Annotated[BulkSessionService, Depends(get_bulk_session_service)],
+) -> BulkSessionGetResponse:
+    """
+    Get sessions by ID (without their messages), with a result per item.
+
+    Args:
+        body (BulkSessionKeysRequest): The sessions to get.
+        bulk_session_service (BulkSessionService): The injected bulk session service.
+
+    Returns:
+        (BulkSessionGetResponse): The session (or error) of each item.
+    """
+    logger.debug(f'Retrieving {len(body.sessions)} sessions in bulk')
+    results = await bulk_session_service.get_sessions(
+        [(key.user_id, key.session_id) for key in body.sessions]
+    )
+
+    return BulkSessionGetResponse(
+        results=[
+            BulkSessionGetItem(
+                index=result.index,
+                session_id=body.sessions[result.index].session_id,
+                user_id=body.sessions[result.index].user_id,
+                session=SessionListItem(
+                    session_id=result.value.id,
+                    user_id=result.value.user_id,
+                    app_name=result.value.app_name,
+                    state=result.value.state,
+                    last_update_time=result.value.last_update_time,
+                )
+                if result.value
+                else None,
+                error=result.error,
+            )
+            for result in results
+        ]
+    )
+
+
+@router.post(
+    '/sessions/batch/delete',
+    status_code=status.HTTP_200_OK,
+    summary='Delete many sessions in a single request',
+)
+async def delete_sessions_batch(
+    body: BulkSessionKeysRequest,
+    bulk_session_service: Annotated[BulkSessionService, Depends(get_bulk_session_service)],
+) -> BulkSessionDeleteResponse:
+    """
+    Delete sessions by ID, with a result per item.
+
+    Args:
+        body (BulkSessionKeysRequest): The sessions to delete.
+        bulk_session_service (BulkSessionService): The injected bulk session service.
+
+    Returns:
+        (BulkSessionDeleteResponse): The outcome of each deletion.
+    """
+    logger.debug(f'Deleting {len(body.sessions)} sessions in bulk')
+    results = await bulk_session_service.delete_sessions(
+        [(key.user_id, key.session_id) for key in body.sessions]
+    )
+
+    return BulkSessionDeleteResponse(
+        results=[
+            BulkSessionDeleteItem(
+                index=result.index,
+                session_id=body.sessions[result.index].session_id,
+                user_id=body.sessions[result.index].user_id,
+                deleted=result.ok,
+                error=result.error,
+            )
+            for result in results
+        ]
+    )
 
 
 @router.get(
@@ -60,6 +207,7 @@ async def create_session(
 async def get_user_sessions(
     user_id: uuid.UUID,
     session_service: Annotated[ADKSessionService, Depends(get_session_service)],
+    keys: Annotated[list[str] | None, Query(alias='key')] = None,
 ) -> SessionListResponse:
     """
     Get all sessions for a specific user.
@@ -67,21 +215,23 @@ async def get_user_sessions(
     Args:
         user_id (uuid.UUID): The ID of the user.
         session_service (ADKSessionService): The injected session service.
+        keys (list[str] | None): Only return these keys of the state of the sessions.
 
     Returns:
         (SessionListResponse): List of all sessions for the user.
     """
-    sessions_response = await session_service.list_sessions(
-        app_name=settings.APP_NAME,
-        user_id=str(user_id),
-    )
+    with requested_state_keys(keys):
+        sessions_response = await session_service.list_sessions(
+            app_name=settings.APP_NAME,
+            user_id=str(user_id),
+        )
 
     session_items = [
         SessionListItem(
             session_id=session.id,
             user_id=session.user_id,
             app_name=session.app_name,
-            state=session.state,
+            state=select_keys(session.state, keys),
             last_update_time=session.last_update_time,
         )
         for session in sessions_response.sessions
@@ -90,6 +240,61 @@ async def get_user_sessions(
     return SessionListResponse(sessions=session_items)
 
 
+@router.get(
+    '/sessions/{user_id}/search',
+    status_code=status.HTTP_200_OK,
+    summary="Search the messages of all of a user's sessions",
+)
+async def search_user_sessions(
+    user_id: uuid.UUID,
+    transcript_store: Annotated[TranscriptStore, Depends(get_transcript_store)],
+    q: Annotated[str, Query(min_length=1, max_length=256)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
+) -> SessionSearchResponse:
+    """
+    Full-text search over the conversation history of a user, most relevant messages first.
+
+    Args:
+        user_id (uuid.UUID): The ID of the user.
+        transcript_store (TranscriptStore): The injected transcript store.
+        q (str): The search query; every term must match.
+        limit (int): The maximum number of results to return.
+        offset (int): The number of results to skip.
+
+    Returns:
+        (SessionSearchResponse): The matching messages and the offset of the next page.
+    """
+    # One extra hit tells whether there is a next page, without counting every match
+    hits = await transcript_store.search(
+        app_name=settings.APP_NAME,
+        user_id=str(user_id),
+        query=q,
+        limit=limit + 1,
+        offset=offset,
+    )
+
+    results = [
+        SessionSearchHit(
+            session_id=hit.session_id,
+            content=ContentResponse(
+                id=hit.message.id,
+                type='message',
+                data={'text': hit.message.text},
+                role=hit.message.role,
+                metadata={'session_id': hit.session_id, 'timestamp': hit.message.timestamp},
+            ),
+            score=hit.score,
+        )
+        for hit in hits[:limit]
+    ]
+
+    return SessionSearchResponse(
+        results=results,
+        next_offset=offset + limit if len(hits) > limit else None,
+    )
+
+
 @router.get(
     '/session/{session_id}',
     status_code=status.HTTP_200_OK,
@@ -99,48 +304,55 @@ async def get_session(
     session_id: str,
     user_id: str,
     session_service: Annotated[ADKSessionService, Depends(get_session_service)],
+    transcript_store: Annotated[TranscriptStore, Depends(get_transcript_store)],
+    keys: Annotated[list[str] | None, Query(alias='key')] = None,
 ) -> SessionDetailResponse:
     """
     Get a specific session with all its details including messages.
 
+    Messages are read from the materialized transcript rather than replayed from the raw
+    ADK events, so only the session header is loaded from the session service.
+
     Args:
         session_id (str): The ID of the session.
         user_id (str): The ID of the user.
         session_service (ADKSessionService): The injected session service.
+        transcript_store (TranscriptStore): The injected transcript store.
+        keys (list[str] | None): Only return these keys of the state of the session.
 
     Returns:
         (SessionDetailResponse): The session details including all messages.
     """
     logger.debug(f'Retrieving session {session_id} for user {user_id}')
 
-    session = await session_service.get_session(
+    # Only events newer than now would be returned, i.e. none: the header is all we need
+    with requested_state_keys(keys):
+        session = await session_service.get_session(
+            app_name=settings.APP_NAME,
+            user_id=user_id,
+            session_id=session_id,
+            config=GetSessionConfig(after_timestamp=time.time()),
+        )
+
+    if not session:
+        raise NotFoundException(f'Session {session_id} not found for user {user_id}')
+
+    messages = await transcript_store.list_messages(
         app_name=settings.APP_NAME,
         user_id=user_id,
         session_id=session_id,
     )
 
-    if not session:
-        raise NotFoundException(f'Session {session_id} not found for user {user_id}')
-
-    # Convert events to ContentResponse objects
-    contents = []
-    for event in session.events:
-        if hasattr(event, 'content') and event.content:
-            # Extract role from ADK event content (e.g., 'user', 'model')
-            role = getattr(event.content, 'role', None)
-
-            if hasattr(event.content, 'parts') and event.content.parts:
-                for part in event.content.parts:
-                    if hasattr(part, 'text') and part.text:
-                        contents.append(
-                            ContentResponse(
-                                id=uuid.uuid4(),
-                                type='message',
-                                data={'text': part.text},
-                                role=role,
-                                metadata={'session_id': session_id},
-                            )
-                        )
+    contents = [
+        ContentResponse(
+            id=message.id,
+            type='message',
+            data={'text': message.text},
+            role=message.role,
+            metadata={'session_id': session_id},
+        )
+        for message in messages
+    ]
 
     logger.debug(f'Retrieved session {session_id} with {len(contents)} contents')
 
@@ -148,7 +360,51 @@ async def get_session(
         session_id=session.id,
         user_id=session.user_id,
         app_name=session.app_name,
-        state=session.state,
+        state=select_keys(session.state, keys),
         contents=contents,
         last_update_time=session.last_update_time,
     )
+
+
+@router.get(
+    '/export/sessions',
+    status_code=status.HTTP_200_OK,
+    summary='Export sessions and their events as NDJSON',
+)
+async def export_sessions(
+    session_service: Annotated[ADKSessionService, Depends(get_session_service)],
+    user_id: uuid.UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> StreamingResponse:
+    """
+    Stream the sessions and events of a user and/or a time range, one event per line.
+
+    Exports run under their own concurrency limit; requests beyond it are rejected with 429.
+    For very large exports use `python -m ai_assistant.cli.export_sessions` instead.
+
+    Args:
+        session_service (ADKSessionService): The injected session service.
+        user_id (uuid.UUID | None): Only export the sessions of this user.
+        start (datetime | None): Only export events at or after this time.
+        end (datetime | None): Only export events before this time.
+
+    Returns:
+        (StreamingResponse): NDJSON stream of export rows.
+    """
+    ensure_export_capacity()
+
+    logger.info(f'Exporting sessions for user={user_id} start={start} end={end}')
+    exporter = SessionExporter(session_service)
+
+    async def stream() -> AsyncIterator[bytes]:
+        async with export_slot():
+            rows = exporter.iter_rows(
+                user_id=str(user_id) if user_id else None,
+                start=start,
+                end=end,
+            )
+            async for chunk in encode_ndjson(rows):
+                yield chunk
+
+    return StreamingResponse(stream(), media_type='application/x-ndjson')
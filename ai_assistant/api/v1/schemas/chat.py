@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing import Annotated
 from typing import Any
 from typing import Literal
 from uuid import UUID
@@ -5,6 +7,7 @@ from uuid import UUID
 from pydantic import BaseModel
 from pydantic import Field
 
+from ai_assistant.common.settings import settings
 from ai_assistant.domain import Content as DomainContent
 
 
@@ -51,3 +54,75 @@ class ContentResponse(BaseModel):
             role=content.role,
             metadata=content.metadata,
         )
+
+
+class ChatBatchRequest(BaseModel):
+    turns: list[ChatRequest] = Field(min_length=1, max_length=settings.CHAT_BATCH_MAX_ITEMS)
+
+
+class ChatBatchItem(BaseModel):
+    """
+    Result of one turn of a batch, streamed as one NDJSON line in completion order.
+
+    `index` is the position of the turn in the request. Exactly one of `content` and `error`
+    is set.
+    """
+
+    index: int
+    session_id: UUID
+    user_id: UUID
+    content: ContentResponse | None = None
+    error: str | None = None
+
+
+class ChatJobResponse(BaseModel):
+    """
+    State of an asynchronous chat job. `content` is set once the job has succeeded and
+    `error` once it has failed.
+    """
+
+    job_id: UUID
+    status: Literal['queued', 'running', 'succeeded', 'failed']
+    session_id: UUID
+    user_id: UUID
+    content: ContentResponse | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
+class ChatStreamStart(BaseModel):
+    """
+    WebSocket message starting a chat stream, multiplexed under `stream_id`.
+    """
+
+    type: Literal['chat']
+    stream_id: str = Field(min_length=1, max_length=64)
+    message: str
+    session_id: UUID
+    user_id: UUID
+
+
+class ChatStreamCancel(BaseModel):
+    """
+    WebSocket message cancelling a running chat stream.
+    """
+
+    type: Literal['cancel']
+    stream_id: str
+
+
+class ChatStreamCredit(BaseModel):
+    """
+    WebSocket message allowing the server to send `frames` more content frames of a stream.
+    """
+
+    type: Literal['credit']
+    stream_id: str
+    frames: int = Field(gt=0)
+
+
+ChatStreamClientMessage = Annotated[
+    ChatStreamStart | ChatStreamCancel | ChatStreamCredit,
+    Field(discriminator='type'),
+]
@@ -2,8 +2,10 @@ import uuid
 from typing import Any
 
 from pydantic import BaseModel
+from pydantic import Field
 
 from ai_assistant.api.v1.schemas.chat import ContentResponse
+from ai_assistant.common.settings import settings
 
 
 class SessionRequest(BaseModel):
@@ -34,3 +36,63 @@ class SessionListItem(BaseModel):
 
 class SessionListResponse(BaseModel):
     sessions: list[SessionListItem]
+
+
+class SessionKey(BaseModel):
+    session_id: str
+    user_id: str
+
+
+class BulkSessionCreateRequest(BaseModel):
+    user_ids: list[uuid.UUID] = Field(min_length=1, max_length=settings.SESSION_BULK_MAX_ITEMS)
+
+
+class BulkSessionCreateItem(BaseModel):
+    index: int
+    user_id: uuid.UUID
+    session_id: uuid.UUID | None = None
+    intro_message: str | None = None
+    error: str | None = None
+
+
+class BulkSessionCreateResponse(BaseModel):
+    results: list[BulkSessionCreateItem]
+
+
+class BulkSessionKeysRequest(BaseModel):
+    sessions: list[SessionKey] = Field(min_length=1, max_length=settings.SESSION_BULK_MAX_ITEMS)
+
+
+class BulkSessionGetItem(BaseModel):
+    index: int
+    session_id: str
+    user_id: str
+    session: SessionListItem | None = None
+    error: str | None = None
+
+
+class BulkSessionGetResponse(BaseModel):
+    results: list[BulkSessionGetItem]
+
+
+class BulkSessionDeleteItem(BaseModel):
+    index: int
+    session_id: str
+    user_id: str
+    deleted: bool
+    error: str | None = None
+
+
+class BulkSessionDeleteResponse(BaseModel):
+    results: list[BulkSessionDeleteItem]
+
+
+class SessionSearchHit(BaseModel):
+    session_id: str
+    content: ContentResponse
+    score: float
+
+
+class SessionSearchResponse(BaseModel):
+    results: list[SessionSearchHit]
+    next_offset: int | None = None
@@ -0,0 +1,194 @@
+"""
+Server-Sent Events framing for the chat stream.
+
+`SSEEncoder` turns domain `Content` straight into framed `bytes`. It produces exactly what
+`ContentResponse.from_domain_model(content).model_dump_json()` would, but does not build or
+validate a response model per chunk and never goes through `str`. The JSON fragments that
+repeat across a stream (the header of the message being streamed, and the trailing role and
+session metadata) are encoded once and reused for every chunk.
+
+`compress_stream` optionally compresses a stream of frames with gzip or deflate. The
+compressor is sync-flushed after every chunk written, so each frame reaches the client as
+soon as it is produced, while the frames still share one compression window: the keys and
+values repeated in every frame compress down to a few bytes.
+"""
+
+import uuid
+import zlib
+from collections.abc import AsyncIterator
+from typing import Any
+from typing import ClassVar
+
+from pydantic_core import to_json
+
+from ai_assistant.domain import Content
+
+_ID_PREFIX = b'id: '
+_DATA_PREFIX = b'data: '
+_EVENT_END = b'\n\n'
+
+# zlib `wbits` of each supported content encoding, in order of preference
+_STREAM_ENCODINGS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+
+class SSEEncoder:
+    """
+    Encodes the contents of one chat stream as SSE frames.
+
+    An encoder keeps per-stream caches, so create one per stream.
+
+    Example:
+        encoder = SSEEncoder(session_id)
+        async for content in ai_service.run_stream(...):
+            yield encoder.encode(content)
+    """
+
+    media_type: ClassVar[str] = 'text/event-stream'
+
+    def __init__(self, session_id: uuid.UUID | str) -> None:
+        """
+        Initialize the encoder.
+
+        Args:
+            session_id: The ID of the streamed session
+        """
+        self.session_id = str(session_id)
+        self._session_metadata = {'session_id': self.session_id}
+
+        self._header_key: tuple[uuid.UUID, str] | None = None
+        self._header = b''
+        self._session_trailers: dict[str | None, bytes] = {}
+
+    def encode(self, content: Content, event_id: str | None = None) -> bytes:
+        """
+        Encode a content as an SSE `data:` frame.
+
+        Args:
+            content: The domain content to encode
+            event_id: The SSE `id:` of the frame, echoed by clients in `Last-Event-ID`
+
+        Returns:
+            bytes: The frame, including the terminating blank line
+        """
+        if event_id is None:
+            return b''.join((_DATA_PREFIX, self.encode_json(content), _EVENT_END))
+
+        return b''.join(
+            (
+                _ID_PREFIX,
+                event_id.encode(),
+                b'\n',
+                _DATA_PREFIX,
+                self.encode_json(content),
+                _EVENT_END,
+            )
+        )
+
+    def encode_json(self, content: Content) -> bytes:
+        """
+        Encode a content as the JSON payload of a frame, without any framing.
+
+        Args:
+            content: The domain content to encode
+
+        Returns:
+            bytes: The same JSON as `ContentResponse.model_dump_json()`
+        """
+        return b''.join(
+            (
+                self._get_header(content.id, content.type),
+                to_json(content.data),
+                self._get_trailer(content.role, content.metadata),
+            )
+        )
+
+    def encode_error(self, error: str) -> bytes:
+        """
+        Encode a stream error as an SSE `data:` frame.
+
+        Args:
+            error: The error message
+
+        Returns:
+            bytes: The frame, including the terminating blank line
+        """
+        payload = to_json({'error': error, 'session_id': self.session_id})
+        return _DATA_PREFIX + payload + _EVENT_END
+
+    def _get_header(self, content_id: uuid.UUID, content_type: str) -> bytes:
+        # Chunks of the same message share their ID, so only the last header is kept
+        if self._header_key != (content_id, content_type):
+            self._header_key = (content_id, content_type)
+            self._header = b'{"id":"%s","type":%s,"data":' % (
+                str(content_id).encode(),
+                to_json(content_type),
+            )
+        return self._header
+
+    def _get_trailer(self, role: str | None, metadata: dict[str, Any] | None) -> bytes:
+        if metadata != self._session_metadata:
+            return _encode_trailer(role, metadata)
+
+        trailer = self._session_trailers.get(role)
+        if trailer is None:
+            trailer = self._session_trailers[role] = _encode_trailer(role, metadata)
+        return trailer
+
+
+def _encode_trailer(role: str | None, metadata: dict[str, Any] | None) -> bytes:
+    return b',"role":%s,"metadata":%s}' % (to_json(role), to_json(metadata))
+
+
+def negotiate_stream_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Pick the content encoding of a stream from an `Accept-Encoding` header.
+
+    Args:
+        accept_encoding: The `Accept-Encoding` header of the request
+
+    Returns:
+        str | None: `gzip` or `deflate`, or None to send the stream uncompressed
+    """
+    if not accept_encoding:
+        return None
+
+    accepted = set()
+    for value in accept_encoding.split(','):
+        coding, _, params = value.strip().partition(';')
+        quality = params.strip().removeprefix('q=')
+        try:
+            if params and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+
+    return next((encoding for encoding in _STREAM_ENCODINGS if encoding in accepted), None)
+
+
+async def compress_stream(
+    chunks: AsyncIterator[bytes],
+    encoding: str,
+    level: int,
+) -> AsyncIterator[bytes]:
+    """
+    Compress a stream of SSE frames, flushing the compressor after every chunk.
+
+    A `Z_SYNC_FLUSH` after each chunk makes every chunk decodable on arrival at the cost of a
+    few bytes, so compression does not delay frames. Write coalesced frames as one chunk to
+    pay for a single flush.
+
+    Args:
+        chunks: The uncompressed chunks, e.g. encoded SSE frames
+        encoding: The content encoding, as returned by `negotiate_stream_encoding`
+        level: The zlib compression level, from 1 (fastest) to 9 (smallest)
+
+    Yields:
+        bytes: The compressed stream
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _STREAM_ENCODINGS[encoding])
+
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    yield compressor.flush(zlib.Z_FINISH)
@@ -0,0 +1 @@
+"""Command line entry points, runnable with `python -m ai_assistant.cli.<command>`."""
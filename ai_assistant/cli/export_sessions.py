@@ -0,0 +1,116 @@
+"""
+Export sessions and their events to NDJSON or Parquet files.
+
+Usage:
+    python -m ai_assistant.cli.export_sessions --output sessions.parquet --format parquet \
+        [--user-id <user_id>] [--start 2026-01-01T00:00:00] [--end 2026-02-01T00:00:00]
+
+Unlike the HTTP export endpoint, the CLI is not bound by request timeouts, so it is the
+preferred way to pull full histories into the analytics warehouse.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from collections.abc import AsyncIterator
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO
+
+from ai_assistant.common.settings import settings
+from ai_assistant.services.ai.adk.session_factory import create_session_service
+from ai_assistant.services.session.export import ExportRow
+from ai_assistant.services.session.export import SessionExporter
+from ai_assistant.services.session.export import encode_ndjson
+from ai_assistant.services.session.export import write_parquet
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Export sessions and their events to NDJSON or Parquet files.'
+    )
+    parser.add_argument('--user-id', help='Only export the sessions of this user')
+    parser.add_argument(
+        '--start',
+        type=datetime.fromisoformat,
+        help='Only export events at or after this ISO-8601 time',
+    )
+    parser.add_argument(
+        '--end',
+        type=datetime.fromisoformat,
+        help='Only export events before this ISO-8601 time',
+    )
+    parser.add_argument('--format', choices=['ndjson', 'parquet'], default='ndjson')
+    parser.add_argument(
+        '--output',
+        default='-',
+        help='The output file, or `-` for stdout (NDJSON only)',
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=settings.EXPORT_BATCH_SIZE,
+        help='The number of rows per Parquet row group',
+    )
+    return parser.parse_args(argv)
+
+
+def _iter_rows(args: argparse.Namespace) -> AsyncIterator[ExportRow]:
+    exporter = SessionExporter(create_session_service())
+    return exporter.iter_rows(user_id=args.user_id, start=args.start, end=args.end)
+
+
+async def export_ndjson(args: argparse.Namespace, output: BinaryIO) -> int:
+    """
+    Export to an NDJSON sink.
+
+    Args:
+        args: The parsed command line arguments
+        output: The binary sink to write the lines to
+
+    Returns:
+        int: The number of exported rows
+    """
+    written = 0
+    async for line in encode_ndjson(_iter_rows(args)):
+        output.write(line)
+        written += 1
+
+    return written
+
+
+async def export_parquet(args: argparse.Namespace) -> int:
+    """
+    Export to the Parquet file given by `--output`.
+
+    Args:
+        args: The parsed command line arguments
+
+    Returns:
+        int: The number of exported rows
+    """
+    return await write_parquet(_iter_rows(args), Path(args.output), batch_size=args.batch_size)
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=settings.LOGGING_LEVEL, stream=sys.stderr)
+    args = parse_args(argv)
+
+    if args.format == 'parquet':
+        if args.output == '-':
+            raise SystemExit('Parquet exports need an --output file')
+        count = asyncio.run(export_parquet(args))
+    elif args.output == '-':
+        count = asyncio.run(export_ndjson(args, sys.stdout.buffer))
+    else:
+        with open(args.output, 'wb') as output:
+            count = asyncio.run(export_ndjson(args, output))
+
+    logger.info(f'Exported {count} rows')
+
+
+if __name__ == '__main__':
+    main()
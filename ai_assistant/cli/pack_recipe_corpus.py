@@ -0,0 +1,74 @@
+"""
+Pack a recipe corpus for `get_recipe`.
+
+Usage:
+    python -m ai_assistant.cli.pack_recipe_corpus --input recipes.jsonl \
+        --output data/recipes.corpus
+
+Reads one recipe per line, as a JSON object with its dish name under `dish`, and writes the
+memory-mapped corpus file read by `get_recipe` once `RECIPE_CORPUS_PATH` is set to it. The
+corpus is written next to the output and then moved over it, so that the API workers reading
+the previous corpus keep reading it until they restart.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from ai_assistant.common.settings import settings
+from ai_assistant.services.recipes.corpus import pack_recipe_corpus
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Pack a recipe corpus for get_recipe.')
+    parser.add_argument(
+        '--input',
+        type=Path,
+        required=True,
+        help='The recipes, as JSON Lines',
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        required=True,
+        help='The corpus file to write',
+    )
+    return parser.parse_args(argv)
+
+
+def read_recipes(path: Path) -> Iterator[dict[str, Any]]:
+    """
+    Read the recipes of a JSON Lines file.
+
+    Args:
+        path: The JSON Lines file
+
+    Yields:
+        dict[str, Any]: The recipes, skipping blank lines
+    """
+    with path.open(encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=settings.LOGGING_LEVEL, stream=sys.stderr)
+    args = parse_args(argv)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    packing = args.output.with_name(f'{args.output.name}.tmp')
+    count = pack_recipe_corpus(read_recipes(args.input), packing)
+    packing.replace(args.output)
+
+    logger.info(f'Wrote {count} recipes to {args.output}, set RECIPE_CORPUS_PATH to use it')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Rebuild materialized transcripts from the raw ADK session events.
+
+Usage:
+    python -m ai_assistant.cli.rebuild_transcripts --user-id <user_id> [--session-id <id> ...]
+    python -m ai_assistant.cli.rebuild_transcripts --incomplete
+
+When no session ID is given, the transcripts of all the sessions of the user are rebuilt. With
+`--incomplete`, the transcripts missing events that could not be appended to them are rebuilt.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from ai_assistant.common.settings import settings
+from ai_assistant.services.ai.adk.session_factory import create_session_service
+from ai_assistant.services.session.transcript import get_transcript_store
+from ai_assistant.services.session.transcript import rebuild_transcript
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Rebuild materialized transcripts from the raw ADK session events.'
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--user-id', help='The user whose sessions to rebuild')
+    target.add_argument(
+        '--incomplete',
+        action='store_true',
+        help='Rebuild the transcripts missing events, of every user.',
+    )
+    parser.add_argument(
+        '--session-id',
+        action='append',
+        default=[],
+        help='A session to rebuild (can be repeated). Defaults to all the user sessions.',
+    )
+    return parser.parse_args(argv)
+
+
+async def rebuild_transcripts(user_id: str, session_ids: list[str]) -> int:
+    """
+    Rebuild the transcripts of the given sessions.
+
+    Args:
+        user_id: The owner of the sessions
+        session_ids: The sessions to rebuild, or an empty list for all the user sessions
+
+    Returns:
+        int: The number of rebuilt transcripts
+    """
+    session_service = create_session_service()
+    store = get_transcript_store()
+
+    if not session_ids:
+        response = await session_service.list_sessions(app_name=settings.APP_NAME, user_id=user_id)
+        session_ids = [session.id for session in response.sessions]
+
+    for session_id in session_ids:
+        await rebuild_transcript(
+            session_service,
+            store,
+            app_name=settings.APP_NAME,
+            user_id=user_id,
+            session_id=session_id,
+        )
+
+    return len(session_ids)
+
+
+async def rebuild_incomplete_transcripts() -> int:
+    """
+    Rebuild the transcripts with events recorded as missing.
+
+    Returns:
+        int: The number of rebuilt transcripts
+    """
+    session_service = create_session_service()
+    store = get_transcript_store()
+
+    sessions = await store.list_incomplete()
+    for app_name, user_id, session_id in sessions:
+        try:
+            await rebuild_transcript(
+                session_service,
+                store,
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+            )
+        except ValueError:
+            # The session was deleted since, along with its transcript
+            await store.clear_missing_events(app_name, user_id, session_id)
+
+    return len(sessions)
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=settings.LOGGING_LEVEL)
+    args = parse_args(argv)
+
+    if args.incomplete:
+        count = asyncio.run(rebuild_incomplete_transcripts())
+        logger.info(f'Rebuilt {count} incomplete transcripts')
+        return
+
+    count = asyncio.run(rebuild_transcripts(args.user_id, args.session_id))
+    logger.info(f'Rebuilt {count} transcripts for user {args.user_id}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Create the upcoming partitions and remove the expired sessions and transcripts, once.
+
+Usage:
+    python -m ai_assistant.cli.sweep_retention
+
+The retention of sessions is configured with `RETENTION_SESSION_DAYS`, as for the sweeps run
+periodically by the API with `RETENTION_SWEEP_ENABLED`. Without either, run this at least every
+`RETENTION_PARTITIONS_AHEAD` months, so that inserts never miss a partition.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from ai_assistant.common.settings import settings
+from ai_assistant.db.database import dispose_engines
+from ai_assistant.services.ai.adk.session_factory import create_session_service
+from ai_assistant.services.ai.adk.session_service import shutdown_session_listeners
+from ai_assistant.services.session.retention import RetentionSweeper
+from ai_assistant.services.session.retention import SweepReport
+from ai_assistant.services.session.retention import default_retention_policies
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Create the upcoming partitions and remove the expired sessions and '
+        'transcripts.'
+    )
+    return parser.parse_args(argv)
+
+
+async def sweep_retention() -> SweepReport:
+    """
+    Sweep the session and transcript tables once.
+
+    Returns:
+        SweepReport: The outcome of the sweep
+    """
+    try:
+        return await RetentionSweeper(
+            default_retention_policies(), session_service=create_session_service()
+        ).sweep()
+    finally:
+        await shutdown_session_listeners()
+        await dispose_engines()
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=settings.LOGGING_LEVEL)
+    parse_args(argv)
+
+    report = asyncio.run(sweep_retention())
+    if report.failed_sessions:
+        raise SystemExit(f'Could not delete {report.failed_sessions} expired sessions')
+    if report.failed_tables:
+        raise SystemExit(f'Could not sweep {", ".join(report.failed_tables)}')
+
+
+if __name__ == '__main__':
+    main()
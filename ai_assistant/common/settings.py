@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from dotenv import load_dotenv
 from pydantic import PostgresDsn
 from pydantic import SecretStr
@@ -24,6 +26,119 @@ class AppSettings(BaseSettings):
     DATABASE_USER: str = 'postgres'
     DATABASE_PASSWORD: SecretStr = SecretStr('postgres')
     DATABASE_PORT: int = 5432
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_POOL_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 30
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_POOL_WARMUP_CONNECTIONS: int = 2
+    # Set when connecting through PgBouncer in transaction pooling mode
+    DATABASE_PGBOUNCER_MODE: bool = False
+    # Read replicas for read-only sessions, as a JSON list of URLs
+    DATABASE_REPLICA_URLS: list[PostgresDsn] = []
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5
+    DATABASE_REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 5
+    # Statement latency histograms, slow-query log and per-request query counts
+    DATABASE_INSTRUMENTATION_ENABLED: bool = True
+    DATABASE_SLOW_QUERY_SECONDS: float = 0.5
+    DATABASE_SLOW_QUERY_SAMPLE_RATE: float = 1.0
+    DATABASE_N_PLUS_ONE_THRESHOLD: int = 10
+    DATABASE_MAX_TRACKED_STATEMENTS: int = 500
+
+    # Timeouts of every migration, and defaults of the online migration helpers
+    MIGRATION_LOCK_TIMEOUT_SECONDS: float = 10
+    MIGRATION_STATEMENT_TIMEOUT_SECONDS: float = 15
+    MIGRATION_INDEX_STATEMENT_TIMEOUT_SECONDS: float | None = None
+    MIGRATION_BACKFILL_BATCH_SIZE: int = 1000
+    MIGRATION_BACKFILL_PAUSE_SECONDS: float = 0.1
+    MIGRATION_BACKFILL_MAX_RETRIES: int = 5
+
+    # Monthly partitions of the session and transcript tables, and the sweeper creating them
+    # and deleting the sessions not updated within the retention, which deployments enable or
+    # run on a schedule. A retention of None keeps the sessions forever.
+    RETENTION_SWEEP_ENABLED: bool = False
+    RETENTION_SWEEP_INTERVAL_SECONDS: float = 3600
+    RETENTION_PARTITIONS_AHEAD: int = 3
+    RETENTION_SESSION_DAYS: int | None = None
+    RETENTION_DELETE_BATCH_SIZE: int = 1000
+    RETENTION_DELETE_ROWS_PER_SECOND: float = 5000
+    RETENTION_LOCK_TIMEOUT_SECONDS: float = 5
+    # Direct url of the database for the sweeper, required with DATABASE_PGBOUNCER_MODE: the
+    # advisory lock and lock timeout of a sweep are held by one server connection
+    RETENTION_DATABASE_URL: PostgresDsn | None = None
+
+    # Url of the database of an ADK `DatabaseSessionService` storing the sessions, instead of
+    # the session service of the environment, and the compression of its large event payloads
+    SESSION_DATABASE_URL: str | None = None
+    SESSION_COMPRESSION_ENABLED: bool = True
+    SESSION_COMPRESSION_MIN_BYTES: int = 1024
+    SESSION_COMPRESSION_LEVEL: int = 6
+    SESSION_COMPRESSION_DICTIONARY_PATH: Path | None = None
+    # Session state of the database store kept as a log of deltas, checkpointed every N deltas
+    SESSION_STATE_DELTAS_ENABLED: bool = True
+    SESSION_STATE_CHECKPOINT_INTERVAL: int = 50
+    # The agent reads a snapshot of older events (a summary) and the last events, snapshotted
+    # again once N events follow the retained ones
+    SESSION_SNAPSHOTS_ENABLED: bool = True
+    SESSION_SNAPSHOT_INTERVAL: int = 100
+    SESSION_SNAPSHOT_RETAINED_EVENTS: int = 20
+    # Attempts of a session listener (e.g. the transcript projection) to handle a change, and
+    # the delay before the first retry, doubled before each next one
+    SESSION_LISTENER_MAX_ATTEMPTS: int = 3
+    SESSION_LISTENER_RETRY_SECONDS: float = 0.1
+
+    SESSION_BULK_CONCURRENCY: int = 16
+    SESSION_BULK_MAX_ITEMS: int = 1000
+    SESSION_MIGRATION_CONCURRENCY: int = 8
+
+    EXPORT_MAX_CONCURRENCY: int = 2
+    EXPORT_BATCH_SIZE: int = 1000
+
+    CHAT_BATCH_CONCURRENCY: int = 8
+    CHAT_BATCH_MAX_CONCURRENCY: int = 16
+    CHAT_BATCH_MAX_ITEMS: int = 5000
+
+    CHAT_JOB_CONCURRENCY: int = 8
+    CHAT_JOB_MAX_QUEUED: int = 1000
+    CHAT_JOB_RETENTION_SECONDS: float = 3600
+    CHAT_JOB_MAX_WAIT_SECONDS: float = 60
+
+    # Results of tools kept per tool, for a time-to-live per tool
+    TOOL_CACHE_ENABLED: bool = True
+    TOOL_CACHE_MAX_ENTRIES: int = 1024
+    WEATHER_CACHE_TTL_SECONDS: float = 600
+    RECIPE_CACHE_TTL_SECONDS: float = 86400
+
+    # Workers running the synchronous tools off the event loop, per tool: in threads, in
+    # processes for CPU-bound tools, and by tool name
+    TOOL_THREAD_POOL_MAX_WORKERS: int = 8
+    TOOL_PROCESS_POOL_MAX_WORKERS: int = 2
+    TOOL_POOL_MAX_WORKERS: dict[str, int] = {}
+
+    # Packed recipe corpus read by `get_recipe`, see `make recipe-corpus`, the similarity of
+    # the dish names suggested and of the dish name taken for the requested one, and the
+    # postings read to find them
+    RECIPE_CORPUS_PATH: Path | None = None
+    RECIPE_CORPUS_MIN_SIMILARITY: float = 0.3
+    RECIPE_CORPUS_MATCH_SIMILARITY: float = 0.6
+    RECIPE_CORPUS_MAX_POSTINGS: int = 2000
+
+    # How long finished runs are kept for replay, how many frames each keeps, and how often
+    # the expired runs are evicted
+    STREAM_REPLAY_TTL_SECONDS: float = 120
+    STREAM_REPLAY_MAX_FRAMES: int = 10000
+    STREAM_REPLAY_EVICTION_INTERVAL_SECONDS: float = 30
+
+    STREAM_COMPRESSION_ENABLED: bool = True
+    STREAM_COMPRESSION_LEVEL: int = 6
+
+    WS_MAX_STREAMS_PER_CONNECTION: int = 8
+    WS_STREAM_INITIAL_CREDIT: int = 64
+
+    GRPC_ENABLED: bool = False
+    GRPC_ADDRESS: str = '[::]:50051'
+    GRPC_MAX_CONCURRENT_RPCS: int | None = 1000
+    GRPC_SHUTDOWN_GRACE_SECONDS: float = 10
 
     LANGFUSE_HOST: str = 'https://cloud.langfuse.com'
     LANGFUSE_SECRET_KEY: SecretStr = SecretStr('langfuse_secret_key')
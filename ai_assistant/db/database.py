@@ -1,7 +1,13 @@
+import asyncio
+import functools
 import json
+import logging
+import math
+import uuid
 from collections.abc import AsyncGenerator
 from collections.abc import Hashable
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from typing import Any
 from urllib.parse import parse_qsl
 from urllib.parse import urlencode
@@ -9,19 +15,48 @@ from urllib.parse import urlparse
 
 from pydantic import PostgresDsn
 from pydantic.json import pydantic_encoder
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import QueuePool
 
 from ai_assistant.common.settings import settings
+from ai_assistant.db.instrumentation import instrument_engine
+from ai_assistant.db.replicas import ReplicaRouter
+
+logger = logging.getLogger(__name__)
 
 DbEngineKey = tuple[str, frozenset[tuple[str, Hashable]]]
 
 _db_engines: dict[DbEngineKey, AsyncEngine] = {}
+_db_session_factories: dict[DbEngineKey, async_sessionmaker[AsyncSession]] = {}
+_replica_router: ReplicaRouter | None = None
+
+# 0 when the replica has replayed everything it received, even if the primary is idle
+_REPLICA_LAG_QUERY = text(
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+
+@dataclass(frozen=True)
+class PoolMetrics:
+    """
+    A snapshot of the connection pool of an engine.
+    """
 
+    url: str
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
 
+
+# The key only depends on the arguments, and parsing the uri on every session is wasteful
+@functools.lru_cache(maxsize=32)
 def _get_cache_key_from_uri(uri: str, /, **kwargs: Hashable) -> DbEngineKey:
     """
     Get a cache key from a uri. Used to cache the engine.
@@ -64,12 +99,39 @@ def _pydantic_json_serializer(*args: Any, **kwargs: Any) -> str:
     return json.dumps(*args, default=pydantic_encoder, **kwargs)
 
 
+def _get_pool_options() -> dict[str, Any]:
+    """
+    Get the connection pool options of an engine, from the settings.
+
+    Returns:
+        (dict[str, Any]): The keyword arguments of `create_async_engine` for the pool.
+    """
+    options: dict[str, Any] = {
+        'pool_size': settings.DATABASE_POOL_SIZE,
+        'max_overflow': settings.DATABASE_POOL_MAX_OVERFLOW,
+        'pool_timeout': settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE_SECONDS,
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+    }
+
+    if settings.DATABASE_PGBOUNCER_MODE:
+        # In transaction pooling mode consecutive statements may run on different server
+        # connections, so prepared statements can neither be cached nor share names
+        options['connect_args'] = {
+            'statement_cache_size': 0,
+            'prepared_statement_cache_size': 0,
+            'prepared_statement_name_func': lambda: f'__asyncpg_{uuid.uuid4()}__',
+        }
+
+    return options
+
+
 def get_or_create_engine(
     url: PostgresDsn = settings.DATABASE_URL,
     echo: bool = False,
 ) -> AsyncEngine:
     """
-    Get or create an async engine.
+    Get or create an async engine, with a connection pool configured from the settings.
 
     Args:
         url (PostgresDsn): The url of the database.
@@ -83,12 +145,18 @@ def get_or_create_engine(
         options = {
             'echo': echo,
             'future': True,
-            'poolclass': NullPool,
             'json_serializer': _pydantic_json_serializer,
+            **_get_pool_options(),
         }
 
         engine = create_async_engine(str(url), **options)
+        if settings.DATABASE_INSTRUMENTATION_ENABLED:
+            instrument_engine(engine)
+
         _db_engines[key] = engine
+        _db_session_factories[key] = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=True
+        )
 
     return _db_engines[key]
 
@@ -104,9 +172,133 @@ def get_session(url: PostgresDsn = settings.DATABASE_URL, echo: bool = False) ->
     Returns:
         (AsyncSession): The async session.
     """
-    engine = get_or_create_engine(url, echo)
-    async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=True)
-    return async_session()
+    key = _get_cache_key_from_uri(str(url), echo=echo)
+    if key not in _db_session_factories:
+        get_or_create_engine(url, echo)
+
+    return _db_session_factories[key]()
+
+
+async def warm_up_engine(
+    url: PostgresDsn = settings.DATABASE_URL,
+    connections: int = settings.DATABASE_POOL_WARMUP_CONNECTIONS,
+) -> None:
+    """
+    Create the engine and open connections ahead of the first requests.
+
+    Args:
+        url (PostgresDsn): The url of the database.
+        connections (int): The number of connections to open, at most the pool size.
+    """
+    engine = get_or_create_engine(url)
+
+    async def connect() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+
+    # Connections are checked out at the same time, so that each one is a new connection
+    await asyncio.gather(
+        *(connect() for _ in range(min(connections, settings.DATABASE_POOL_SIZE)))
+    )
+
+
+async def dispose_engines() -> None:
+    """
+    Close the connections of every engine, e.g. on shutdown.
+    """
+    for engine in _db_engines.values():
+        await engine.dispose()
+
+    _db_engines.clear()
+    _db_session_factories.clear()
+
+
+def get_routing_metrics() -> dict[str, Any]:
+    """
+    Get the routing decisions of read-only sessions and the lag of the read replicas.
+
+    Returns:
+        (dict[str, Any]): The number of reads per target and reason, and the last measured
+            lag of each replica.
+    """
+    router = get_replica_router()
+
+    return {
+        'decisions': [
+            {'target': target, 'reason': reason, 'count': count}
+            for (target, reason), count in sorted(router.decisions.items())
+        ],
+        'replicas': [
+            {
+                'url': make_url(str(replica.url)).render_as_string(hide_password=True),
+                'lag_seconds': replica.lag if math.isfinite(replica.lag) else None,
+            }
+            for replica in router.replicas
+        ],
+    }
+
+
+def get_pool_metrics() -> list[PoolMetrics]:
+    """
+    Get a snapshot of the connection pool of every engine.
+
+    Returns:
+        (list[PoolMetrics]): The metrics of each pooled engine.
+    """
+    metrics = []
+    for engine in _db_engines.values():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+
+        metrics.append(
+            PoolMetrics(
+                url=engine.url.render_as_string(hide_password=True),
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        )
+
+    return metrics
+
+
+async def _measure_replica_lag(url: PostgresDsn) -> float:
+    """
+    Measure the replication lag of a read replica.
+
+    Args:
+        url (PostgresDsn): The url of the replica.
+
+    Returns:
+        (float): The lag in seconds, 0 if the database is not a replica.
+    """
+    async with get_or_create_engine(url).connect() as connection:
+        lag = (await connection.execute(_REPLICA_LAG_QUERY)).scalar_one()
+
+    return float(lag or 0)
+
+
+def get_replica_router() -> ReplicaRouter:
+    """
+    Get the router of read-only sessions, initializing it lazily on first access.
+
+    Returns:
+        (ReplicaRouter): The singleton router over the configured read replicas.
+    """
+    global _replica_router
+
+    if _replica_router is None:
+        _replica_router = ReplicaRouter(
+            primary_url=settings.DATABASE_URL,
+            replica_urls=settings.DATABASE_REPLICA_URLS,
+            measure_lag=_measure_replica_lag,
+            max_lag=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+            lag_check_interval=settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+        )
+
+    return _replica_router
 
 
 @asynccontextmanager
@@ -114,23 +306,36 @@ async def db_session(
     url: PostgresDsn = settings.DATABASE_URL,
     echo: bool = False,
     autocommit: bool = True,
+    read_only: bool = False,
+    consistency_key: str | None = None,
 ) -> AsyncGenerator[AsyncSession, None]:
     """
     Get a session context manager.
 
+    Read-only sessions on the primary are routed to a read replica when one is configured
+    and not lagging. With a consistency key, they also see the writes committed under the
+    same key (e.g. to the same chat session) beforehand.
+
     Args:
         url (PostgresDsn): The url of the database.
         echo (bool): Whether to echo the sql statements.
         autocommit (bool): Whether to autocommit the session.
+        read_only (bool): Whether the session only reads, and may run on a replica.
+        consistency_key (str | None): The key that reads and writes must be consistent for.
 
     Returns:
         (AsyncSession): The async session.
     """
+    if read_only and url == settings.DATABASE_URL:
+        url = await get_replica_router().route_read(consistency_key)
+
     session = get_session(url, echo)
     try:
         yield session
         if autocommit:
             await session.commit()
+            if consistency_key is not None and not read_only:
+                get_replica_router().record_write(consistency_key)
     except Exception as e:
         await session.rollback()
         raise e
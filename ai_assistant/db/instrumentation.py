@@ -0,0 +1,309 @@
+"""
+Instrumentation of the SQL statements run by the database engines.
+
+Every engine created by `get_or_create_engine` reports its statements here, through
+SQLAlchemy cursor execution events:
+
+- A latency histogram is kept per normalized statement (literals and parameter lists
+  replaced with `?`), for the `DATABASE_MAX_TRACKED_STATEMENTS` first distinct statements.
+- Statements slower than `DATABASE_SLOW_QUERY_SECONDS` are logged with their normalized
+  SQL, for a `DATABASE_SLOW_QUERY_SAMPLE_RATE` fraction of them.
+- Within `track_queries`, e.g. for the duration of a request, statements are also counted
+  per normalized statement, and the totals are aggregated per name (e.g. per route). When
+  the same statement runs `DATABASE_N_PLUS_ONE_THRESHOLD` times or more, which is the
+  signature of an N+1 access pattern, a warning is logged.
+"""
+
+import bisect
+import functools
+import logging
+import random
+import re
+import time
+from collections import Counter
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ai_assistant.common.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statements beyond `DATABASE_MAX_TRACKED_STATEMENTS` are aggregated under this key
+OTHER_STATEMENTS = '<other>'
+
+_START_TIMES_KEY = 'ai_assistant.query_start_times'
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w$])\d+(?:\.\d+)?\b')
+# Bound parameters of the supported drivers, with an optional cast (e.g. `$1::VARCHAR`)
+_PARAMETER_PATTERN = r'(?:\?|\$\d+|%\(\w+\)s|(?<!:):\w+)(?:::\w+)?'
+_PARAMETER_LIST = re.compile(rf'\(\s*{_PARAMETER_PATTERN}(?:\s*,\s*{_PARAMETER_PATTERN})+\s*\)')
+_PARAMETER = re.compile(_PARAMETER_PATTERN)
+_WHITESPACE = re.compile(r'\s+')
+
+
+@dataclass
+class LatencyHistogram:
+    """
+    Latency distribution of a statement, over `LATENCY_BUCKETS` plus an overflow bucket.
+    """
+
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, duration: float) -> None:
+        """
+        Record the duration of one execution.
+
+        Args:
+            duration: The duration, in seconds
+        """
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in.
+
+        Args:
+            q: The quantile, between 0 and 1
+
+        Returns:
+            float: The estimated quantile, in seconds (the maximum for the overflow bucket)
+        """
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+        return 0.0
+
+
+@dataclass
+class QueryTracker:
+    """
+    Statements run within one `track_queries` block.
+    """
+
+    # What ran the statements, e.g. a route, set by the caller before the block ends
+    name: str | None = None
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Get the statements run at least `threshold` times, most repeated first.
+
+        Args:
+            threshold: The minimum number of executions
+
+        Returns:
+            list[tuple[str, int]]: The normalized statements and their number of executions
+        """
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+@dataclass
+class TrackedQueryStats:
+    """
+    Statements run by all the `track_queries` blocks of the same name.
+    """
+
+    blocks: int = 0
+    queries: int = 0
+    duration: float = 0.0
+    max_queries: int = 0
+    n_plus_one: int = 0
+
+
+_histograms: dict[str, LatencyHistogram] = {}
+_tracked_stats: dict[str, TrackedQueryStats] = {}
+_current_tracker: ContextVar[QueryTracker | None] = ContextVar('query_tracker', default=None)
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """
+    Normalize a SQL statement, so that executions differing only by values group together.
+
+    Args:
+        statement: The SQL statement
+
+    Returns:
+        str: The statement with literals and bound parameters replaced with `?`, parameter
+            lists collapsed to `(...)` and whitespace collapsed
+    """
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _PARAMETER_LIST.sub('(...)', normalized)
+    normalized = _PARAMETER.sub('?', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Report the statements of an engine to the instrumentation.
+
+    Args:
+        engine: The engine to instrument
+    """
+    event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine.sync_engine, 'handle_error', _handle_error)
+
+
+@contextmanager
+def track_queries() -> Generator[QueryTracker, None, None]:
+    """
+    Count the statements run in the current context, e.g. by one request.
+
+    On exit, the counts are added to the stats of the name of the tracker, if it was given
+    one, and a warning is logged when a statement ran `DATABASE_N_PLUS_ONE_THRESHOLD` times
+    or more.
+
+    Yields:
+        QueryTracker: The statements run so far
+    """
+    tracker = QueryTracker()
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+        repeated = tracker.repeated_statements(settings.DATABASE_N_PLUS_ONE_THRESHOLD)
+        for sql, count in repeated:
+            logger.warning(
+                f'Possible N+1 query in {tracker.name or "unnamed block"}: '
+                f'{count} executions of `{sql}`'
+            )
+
+        if tracker.name is not None:
+            stats = _tracked_stats.setdefault(tracker.name, TrackedQueryStats())
+            stats.blocks += 1
+            stats.queries += tracker.count
+            stats.duration += tracker.duration
+            stats.max_queries = max(stats.max_queries, tracker.count)
+            stats.n_plus_one += 1 if repeated else 0
+
+
+def get_statement_metrics(limit: int = 20) -> list[dict[str, Any]]:
+    """
+    Get the latency of the statements that took the most database time.
+
+    Args:
+        limit: The maximum number of statements to return
+
+    Returns:
+        list[dict[str, Any]]: The normalized SQL, execution count, total, mean, p50, p95, p99
+            and max latency (in seconds) and histogram of each statement, by total time
+    """
+    top = sorted(_histograms.items(), key=lambda item: item[1].total, reverse=True)[:limit]
+
+    return [
+        {
+            'sql': sql,
+            'count': histogram.count,
+            'total_seconds': histogram.total,
+            'mean_seconds': histogram.total / histogram.count,
+            'p50_seconds': histogram.quantile(0.5),
+            'p95_seconds': histogram.quantile(0.95),
+            'p99_seconds': histogram.quantile(0.99),
+            'max_seconds': histogram.max,
+            'buckets': dict(
+                zip([*map(str, LATENCY_BUCKETS), '+Inf'], histogram.counts, strict=True)
+            ),
+        }
+        for sql, histogram in top
+    ]
+
+
+def get_tracked_metrics() -> list[dict[str, Any]]:
+    """
+    Get the statements run by the `track_queries` blocks of every name, e.g. of every route.
+
+    Returns:
+        list[dict[str, Any]]: The number of blocks, the mean and max number of statements
+            per block, the total database time (in seconds) and the number of blocks with
+            a possible N+1 query of each name, by total time
+    """
+    stats = sorted(_tracked_stats.items(), key=lambda item: item[1].duration, reverse=True)
+
+    return [
+        {
+            'name': name,
+            'count': tracked.blocks,
+            'mean_queries': tracked.queries / tracked.blocks,
+            'max_queries': tracked.max_queries,
+            'total_seconds': tracked.duration,
+            'n_plus_one': tracked.n_plus_one,
+        }
+        for name, tracked in stats
+    ]
+
+
+def reset_query_metrics() -> None:
+    """
+    Forget the statements recorded so far.
+    """
+    _histograms.clear()
+    _tracked_stats.clear()
+
+
+def _before_cursor_execute(conn: Connection, *args: Any) -> None:
+    # A stack, as a statement can be run from the event handlers of another
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Connection, cursor: Any, statement: str, *args: Any) -> None:
+    _record(statement, time.perf_counter() - conn.info[_START_TIMES_KEY].pop())
+
+
+def _handle_error(context: Any) -> None:
+    # Failed statements are recorded too: a timeout is the slowest query of all
+    start_times = context.connection.info.get(_START_TIMES_KEY) if context.connection else None
+    if start_times and context.statement:
+        _record(context.statement, time.perf_counter() - start_times.pop())
+
+
+def _record(statement: str, duration: float) -> None:
+    sql = normalize_sql(statement)
+
+    histogram = _histograms.get(sql)
+    if histogram is None:
+        key = (
+            sql
+            if len(_histograms) < settings.DATABASE_MAX_TRACKED_STATEMENTS
+            else OTHER_STATEMENTS
+        )
+        histogram = _histograms.setdefault(key, LatencyHistogram())
+    histogram.observe(duration)
+
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.count += 1
+        tracker.duration += duration
+        tracker.statements[sql] += 1
+
+    if (
+        duration >= settings.DATABASE_SLOW_QUERY_SECONDS
+        and random.random() < settings.DATABASE_SLOW_QUERY_SAMPLE_RATE
+    ):
+        logger.warning(f'Slow query ({duration:.3f}s): {sql}')
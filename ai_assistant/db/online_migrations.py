@@ -0,0 +1,318 @@
+"""
+Helpers for Alembic migrations of large tables under live traffic.
+
+Every migration runs with the short `MIGRATION_LOCK_TIMEOUT_SECONDS` and
+`MIGRATION_STATEMENT_TIMEOUT_SECONDS` set in `migration/env.py`, so that a migration waiting
+on a lock never stalls the application behind it. Long steps are not a single statement:
+
+- `backfill_in_batches` updates a table in small keyset-paginated batches, each committed on
+  its own, with a pause between batches. A batch that times out is retried with half the
+  rows, a batch that cannot get its locks is retried after a backoff. The rows to update
+  are selected by a condition that backfilled rows no longer match, so an interrupted
+  backfill resumes where it stopped when the migration is run again.
+- `create_index_concurrently` and `drop_index_concurrently` build and drop indexes without
+  blocking writes, outside of the migration transaction. An invalid index left by an
+  interrupted build is dropped and built again.
+- `validate_constraint` validates a constraint added as `NOT VALID` without blocking writes.
+
+All run under their own statement timeout (`step_timeouts`). With `alembic -x dry_run=true`,
+the whole migration is rolled back and these steps only log an estimate of the rows they
+would affect.
+"""
+
+import logging
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any
+
+from alembic import op
+from alembic import util
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from ai_assistant.common.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_LOCK_NOT_AVAILABLE = '55P03'
+_QUERY_CANCELED = '57014'
+
+
+def is_dry_run() -> bool:
+    """
+    Tell whether the migrations run as a dry run, i.e. with `alembic -x dry_run=true`.
+
+    Returns:
+        bool: True for a dry run
+    """
+    return bool(op.get_context().opts.get('dry_run', False))
+
+
+def set_timeouts(
+    connection: Connection,
+    statement_timeout: float | None,
+    lock_timeout: float | None,
+) -> None:
+    """
+    Set the statement and lock timeouts of a connection, for the rest of its session.
+
+    Args:
+        connection: The connection
+        statement_timeout: The statement timeout, in seconds (None or 0 for no timeout)
+        lock_timeout: The lock timeout, in seconds (None or 0 for no timeout)
+    """
+    for statement in _timeout_statements(statement_timeout, lock_timeout):
+        connection.execute(text(statement))
+
+
+@contextmanager
+def step_timeouts(
+    statement_timeout: float | None,
+    lock_timeout: float | None = settings.MIGRATION_LOCK_TIMEOUT_SECONDS,
+) -> Generator[None, None, None]:
+    """
+    Run a step of a migration with its own timeouts, restoring the migration's afterwards.
+
+    Args:
+        statement_timeout: The statement timeout of the step, in seconds (None for none)
+        lock_timeout: The lock timeout of the step, in seconds (None for none)
+    """
+    # Through `op`, so that the timeouts are also part of the SQL of offline migrations
+    for statement in _timeout_statements(statement_timeout, lock_timeout):
+        op.execute(statement)
+    try:
+        yield
+    finally:
+        for statement in _timeout_statements(
+            settings.MIGRATION_STATEMENT_TIMEOUT_SECONDS,
+            settings.MIGRATION_LOCK_TIMEOUT_SECONDS,
+        ):
+            op.execute(statement)
+
+
+def estimate_rows(table: str, where: str | None = None) -> int:
+    """
+    Estimate the number of rows of a table matching a condition, from the planner statistics.
+
+    Args:
+        table: The table
+        where: The SQL condition (all rows if None)
+
+    Returns:
+        int: The estimated number of rows
+    """
+    query = f'SELECT 1 FROM {table}' + (f' WHERE {where}' if where else '')
+    plan = op.get_bind().execute(text(f'EXPLAIN (FORMAT JSON) {query}')).scalar_one()
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def backfill_in_batches(
+    table: str,
+    assignments: str,
+    where: str,
+    key: str = 'id',
+    batch_size: int = settings.MIGRATION_BACKFILL_BATCH_SIZE,
+    pause: float = settings.MIGRATION_BACKFILL_PAUSE_SECONDS,
+    statement_timeout: float = settings.MIGRATION_STATEMENT_TIMEOUT_SECONDS,
+    max_retries: int = settings.MIGRATION_BACKFILL_MAX_RETRIES,
+    params: dict[str, Any] | None = None,
+) -> int:
+    """
+    Update the rows of a table in batches, each committed on its own.
+
+    Commits the migration transaction first, like any Alembic autocommit block, so the
+    schema changes the backfill depends on must come before it in the migration.
+
+    Args:
+        table: The table to update
+        assignments: The SQL `SET` clause, e.g. `role = 'user'`
+        where: The SQL condition of the rows still to update, which updated rows must no
+            longer match, e.g. `role IS NULL`
+        key: A unique, indexed column to paginate on, usually the primary key
+        batch_size: The number of rows per batch
+        pause: The pause between batches, in seconds, to leave room for live traffic
+        statement_timeout: The statement timeout of each batch, in seconds
+        max_retries: The number of times a failing batch is retried
+        params: The bound parameters of `assignments` and `where`
+
+    Returns:
+        int: The number of updated rows (the estimated number of rows to update in a dry run)
+
+    Raises:
+        CommandError: If the migration runs offline (`--sql`)
+    """
+    if op.get_context().as_sql:
+        raise util.CommandError('Batched backfills cannot run as offline (--sql) migrations')
+
+    if is_dry_run():
+        estimate = estimate_rows(table, where)
+        logger.info(f'Dry run: would backfill about {estimate} rows of {table}')
+        return estimate
+
+    after: Any = None
+    updated = 0
+    retries = 0
+    started_at = time.perf_counter()
+
+    with op.get_context().autocommit_block(), step_timeouts(statement_timeout):
+        connection = op.get_bind()
+        while True:
+            keyset = '' if after is None else f' AND {key} > :after'
+            statement = text(
+                f'UPDATE {table} SET {assignments} WHERE {key} IN ('
+                f'SELECT {key} FROM {table} WHERE ({where}){keyset} '
+                f'ORDER BY {key} LIMIT :batch_size'
+                f') RETURNING {key}'
+            )
+            try:
+                keys = (
+                    connection.execute(
+                        statement, {**(params or {}), 'after': after, 'batch_size': batch_size}
+                    )
+                    .scalars()
+                    .all()
+                )
+            except DBAPIError as e:
+                retries += 1
+                if retries > max_retries:
+                    raise
+
+                pgcode = getattr(e.orig, 'pgcode', None)
+                if pgcode == _QUERY_CANCELED:
+                    batch_size = max(1, batch_size // 2)
+                    logger.warning(f'Backfill batch of {table} timed out, now {batch_size} rows')
+                elif pgcode == _LOCK_NOT_AVAILABLE:
+                    logger.warning(f'Backfill batch of {table} waited too long on locks')
+                else:
+                    raise
+
+                time.sleep(pause * 2**retries)
+                continue
+
+            if not keys:
+                break
+
+            retries = 0
+            updated += len(keys)
+            after = max(keys)
+            logger.info(f'Backfilled {updated} rows of {table}')
+            time.sleep(pause)
+
+    logger.info(f'Backfilled {updated} rows of {table} in {time.perf_counter() - started_at:.3f}s')
+    return updated
+
+
+def create_index_concurrently(
+    index_name: str,
+    table: str,
+    columns: list[str],
+    statement_timeout: float | None = settings.MIGRATION_INDEX_STATEMENT_TIMEOUT_SECONDS,
+    **kwargs: Any,
+) -> None:
+    """
+    Build an index without blocking writes to the table, outside of the migration transaction.
+
+    Commits the migration transaction first, like any Alembic autocommit block.
+
+    Args:
+        index_name: The name of the index
+        table: The table to index
+        columns: The indexed columns or expressions
+        statement_timeout: The statement timeout of the build, in seconds (None for none)
+        kwargs: Other arguments of `op.create_index`, e.g. `unique` or `postgresql_using`
+    """
+    if is_dry_run():
+        logger.info(
+            f'Dry run: would build index {index_name} over about {estimate_rows(table)} rows '
+            f'of {table}'
+        )
+        return
+
+    with op.get_context().autocommit_block(), step_timeouts(statement_timeout):
+        # A build that failed or was interrupted leaves an invalid index behind
+        valid = None
+        if not op.get_context().as_sql:
+            valid = (
+                op.get_bind()
+                .execute(
+                    text(
+                        'SELECT i.indisvalid FROM pg_index i '
+                        'JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :index_name'
+                    ),
+                    {'index_name': index_name},
+                )
+                .scalar_one_or_none()
+            )
+        if valid is False:
+            logger.warning(f'Dropping invalid index {index_name} before building it again')
+            op.drop_index(index_name, table_name=table, postgresql_concurrently=True)
+        elif valid:
+            logger.info(f'Index {index_name} already exists')
+            return
+
+        started_at = time.perf_counter()
+        op.create_index(index_name, table, columns, postgresql_concurrently=True, **kwargs)
+        logger.info(f'Built index {index_name} in {time.perf_counter() - started_at:.3f}s')
+
+
+def drop_index_concurrently(
+    index_name: str,
+    table: str,
+    statement_timeout: float | None = settings.MIGRATION_INDEX_STATEMENT_TIMEOUT_SECONDS,
+) -> None:
+    """
+    Drop an index without blocking the table, outside of the migration transaction.
+
+    Args:
+        index_name: The name of the index
+        table: The indexed table
+        statement_timeout: The statement timeout of the drop, in seconds (None for none)
+    """
+    if is_dry_run():
+        logger.info(f'Dry run: would drop index {index_name} of {table}')
+        return
+
+    with op.get_context().autocommit_block(), step_timeouts(statement_timeout):
+        op.drop_index(index_name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def validate_constraint(
+    table: str,
+    constraint_name: str,
+    statement_timeout: float | None = settings.MIGRATION_INDEX_STATEMENT_TIMEOUT_SECONDS,
+) -> None:
+    """
+    Validate a constraint added as `NOT VALID`, outside of the migration transaction.
+
+    Validating only takes a lock that lets reads and writes through while the table is
+    scanned, whereas adding a valid constraint blocks them for the whole scan. Commits the
+    migration transaction first, like any Alembic autocommit block.
+
+    Args:
+        table: The constrained table
+        constraint_name: The name of the constraint
+        statement_timeout: The statement timeout of the scan, in seconds (None for none)
+    """
+    if is_dry_run():
+        logger.info(f'Dry run: would validate constraint {constraint_name} of {table}')
+        return
+
+    with op.get_context().autocommit_block(), step_timeouts(statement_timeout):
+        started_at = time.perf_counter()
+        op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint_name}')
+        logger.info(
+            f'Validated constraint {constraint_name} in {time.perf_counter() - started_at:.3f}s'
+        )
+
+
+def _timeout_statements(statement_timeout: float | None, lock_timeout: float | None) -> list[str]:
+    return [
+        f'SET statement_timeout = {_to_milliseconds(statement_timeout)}',
+        f'SET lock_timeout = {_to_milliseconds(lock_timeout)}',
+    ]
+
+
+def _to_milliseconds(timeout: float | None) -> int:
+    return round(timeout * 1000) if timeout else 0
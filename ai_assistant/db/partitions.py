@@ -0,0 +1,279 @@
+"""
+Monthly range partitions of time-partitioned tables.
+
+A table declared with `postgresql_partition_by='RANGE (<column>)'` is split into one partition
+per calendar month (UTC) of the column, named `<table>_pYYYYMM`. The column is either a
+timestamp or a number of seconds since the epoch (e.g. an ADK event timestamp). Rows that
+existed before a table was partitioned live in a single `<table>_legacy` partition, bounded
+below by `MINVALUE`.
+
+Partitions must exist before rows are inserted in them: they are created ahead of time by the
+migration that partitions a table, then by the retention sweeper.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+
+from sqlalchemy import Table
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.types import DateTime
+
+_RANGE_PARTITION_BY = re.compile(r'^RANGE \((\w+)\)$', re.IGNORECASE)
+_RANGE_BOUND = re.compile(r'^FOR VALUES FROM \((.+)\) TO \((.+)\)$')
+_BOUND_CAST = re.compile(r'::[\w ]+$')
+_MONTHLY_PARTITION_NAME = r'p\d{6}'
+# Sort key of `MINVALUE`
+_MIN_BOUND = datetime.min.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class Partition:
+    """
+    A range partition of a table.
+    """
+
+    name: str
+    # None for `MINVALUE` / `MAXVALUE`
+    lower: datetime | None
+    upper: datetime | None
+    # Left by a `DETACH PARTITION CONCURRENTLY` that did not complete
+    detach_pending: bool = False
+
+
+class MonthlyPartitioning:
+    """
+    Monthly range partitions of a table.
+
+    Example:
+        partitioning = MonthlyPartitioning('transcript_message', 'event_timestamp', epoch=True)
+        partitions = await partitioning.list_partitions(connection)
+        for month in partitioning.missing_months(partitions, now, ahead=3):
+            await connection.execute(text(partitioning.create_partition_sql(month)))
+    """
+
+    def __init__(self, table: str, column: str, epoch: bool = False) -> None:
+        """
+        Initialize the partitioning.
+
+        Args:
+            table: The partitioned table
+            column: The column the table is partitioned by
+            epoch: Whether the column holds seconds since the epoch rather than timestamps
+        """
+        self.table = table
+        self.column = column
+        self.epoch = epoch
+
+    @classmethod
+    def from_table(cls, table: Table) -> 'MonthlyPartitioning':
+        """
+        Get the partitioning of a table declared with `postgresql_partition_by`.
+
+        Args:
+            table: The table
+
+        Returns:
+            MonthlyPartitioning: The partitioning of the table
+
+        Raises:
+            ValueError: If the table is not partitioned by range over one column
+        """
+        partition_by = table.dialect_options['postgresql'].get('partition_by') or ''
+        match = _RANGE_PARTITION_BY.match(partition_by)
+        if match is None:
+            raise ValueError(f'Table {table.name} is not partitioned by range over one column')
+
+        column = table.columns[match.group(1)]
+        return cls(table.name, column.name, epoch=not isinstance(column.type, DateTime))
+
+    @property
+    def legacy_partition(self) -> str:
+        return f'{self.table}_legacy'
+
+    def partition_name(self, month: datetime) -> str:
+        """
+        Get the name of the partition of a month.
+
+        Args:
+            month: Any time within the month
+
+        Returns:
+            str: The name of the partition
+        """
+        return f'{self.table}_p{month:%Y%m}'
+
+    def is_partition_name(self, name: str) -> bool:
+        """
+        Tell whether a table name is the name of a partition of the table.
+
+        Args:
+            name: The table name
+
+        Returns:
+            bool: True for a monthly or legacy partition of the table
+        """
+        return (
+            re.fullmatch(rf'{self.table}_(?:legacy|{_MONTHLY_PARTITION_NAME})', name) is not None
+        )
+
+    def bound(self, moment: datetime) -> str:
+        """
+        Render a moment as a partition bound of the column.
+
+        Args:
+            moment: The moment, timezone-aware
+
+        Returns:
+            str: The SQL literal of the bound
+        """
+        if self.epoch:
+            return repr(moment.timestamp())
+        return f"'{moment.astimezone(timezone.utc).isoformat()}'"
+
+    def create_partition_sql(self, month: datetime) -> str:
+        """
+        Get the statement creating the partition of a month, if it does not exist.
+
+        Args:
+            month: Any time within the month
+
+        Returns:
+            str: The SQL statement
+        """
+        start = month_start(month)
+        return (
+            f'CREATE TABLE IF NOT EXISTS {self.partition_name(start)} PARTITION OF {self.table} '
+            f'FOR VALUES FROM ({self.bound(start)}) TO ({self.bound(add_months(start, 1))})'
+        )
+
+    def missing_months(
+        self,
+        partitions: list[Partition],
+        now: datetime,
+        ahead: int,
+    ) -> list[datetime]:
+        """
+        Get the months to create partitions for, so that the current month and the `ahead`
+        following ones are covered.
+
+        Months are only added after the last partition, never in gaps between partitions,
+        which are left by partitions dropped on purpose.
+
+        Args:
+            partitions: The existing partitions
+            now: The current time
+            ahead: The number of months to cover after the current one
+
+        Returns:
+            list[datetime]: The first instant of each missing month, in order
+        """
+        if any(partition.upper is None for partition in partitions):
+            return []
+
+        horizon = add_months(month_start(now), ahead + 1)
+        uppers = [partition.upper for partition in partitions if partition.upper is not None]
+        month = max(uppers) if uppers else month_start(now)
+
+        months = []
+        while month < horizon:
+            months.append(month)
+            month = add_months(month, 1)
+        return months
+
+    async def list_partitions(self, connection: AsyncConnection) -> list[Partition]:
+        """
+        Get the range partitions of the table.
+
+        Args:
+            connection: A connection to the database
+
+        Returns:
+            list[Partition]: The partitions, by lower bound
+        """
+        rows = await connection.execute(
+            text(
+                'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), i.inhdetachpending '
+                'FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+                'WHERE i.inhparent = to_regclass(:table)'
+            ),
+            {'table': self.table},
+        )
+
+        partitions = []
+        for name, bound, detach_pending in rows:
+            match = _RANGE_BOUND.match(bound)
+            if match is None:
+                continue
+            lower, upper = (parse_bound(value) for value in match.groups())
+            partitions.append(Partition(name, lower, upper, detach_pending))
+
+        return sorted(partitions, key=lambda p: p.lower or _MIN_BOUND)
+
+
+def parse_bound(value: str) -> datetime | None:
+    """
+    Parse a range partition bound, as rendered by `pg_get_expr`.
+
+    Args:
+        value: The bound, e.g. `'2026-11-01 00:00:00+00'` or `MINVALUE`
+
+    Returns:
+        datetime | None: The bound as a UTC time (None for `MINVALUE` / `MAXVALUE`)
+    """
+    if value in ('MINVALUE', 'MAXVALUE'):
+        return None
+
+    value = _BOUND_CAST.sub('', value).strip("'")
+    try:
+        return datetime.fromtimestamp(float(value), timezone.utc)
+    except ValueError:
+        return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+def month_start(moment: datetime) -> datetime:
+    """
+    Get the first instant of the UTC month of a moment.
+
+    Args:
+        moment: The moment, timezone-aware
+
+    Returns:
+        datetime: The first instant of its month
+    """
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """
+    Get the first instant of the month a number of months after another.
+
+    Args:
+        month: The first instant of a month
+        months: The number of months to add
+
+    Returns:
+        datetime: The first instant of the later month
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partitioned_tables(tables: list[Table]) -> list[MonthlyPartitioning]:
+    """
+    Get the partitioning of every partitioned table.
+
+    Args:
+        tables: The tables, e.g. of the model metadata
+
+    Returns:
+        list[MonthlyPartitioning]: The partitioning of the tables declared as partitioned
+    """
+    return [
+        MonthlyPartitioning.from_table(table)
+        for table in tables
+        if table.dialect_options['postgresql'].get('partition_by')
+    ]
@@ -0,0 +1,163 @@
+"""
+Routing of read-only database sessions to read replicas.
+
+Reads go to a replica whose replication lag is within `DATABASE_REPLICA_MAX_LAG_SECONDS`,
+round-robin, and fall back to the primary when there is none. The lag of every replica is
+measured at most every `DATABASE_REPLICA_LAG_CHECK_INTERVAL_SECONDS`, on the read path.
+
+Reads can be tied to a consistency key (e.g. a session ID) to read their own writes: after a
+write under a key, reads under the same key only go to a replica known to have replayed it,
+i.e. one whose last lag measurement shows it was less far behind than the write is old. Until
+then they go to the primary.
+
+The writes are recorded in the memory of the process: reads only see the writes made by the
+same process. A write made by another worker or pod, e.g. a message sent through one worker
+and the session read through another, may be read from a replica up to
+`DATABASE_REPLICA_MAX_LAG_SECONDS` late.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import Counter
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Literal
+
+from pydantic import PostgresDsn
+
+logger = logging.getLogger(__name__)
+
+RoutingReason = Literal['replica', 'no_replica', 'replica_lagging', 'read_your_writes']
+
+
+@dataclass
+class ReplicaState:
+    """
+    The last known replication lag of a replica.
+    """
+
+    url: PostgresDsn
+    # Unknown until the first measurement
+    lag: float = math.inf
+    checked_at: float = -math.inf
+
+
+class ReplicaRouter:
+    """
+    Picks the database to run a read-only session against.
+
+    Example:
+        url = await router.route_read(consistency_key=session_id)
+        ...
+        router.record_write(session_id)
+    """
+
+    def __init__(
+        self,
+        primary_url: PostgresDsn,
+        replica_urls: list[PostgresDsn],
+        measure_lag: Callable[[PostgresDsn], Awaitable[float]],
+        max_lag: float,
+        lag_check_interval: float,
+    ) -> None:
+        """
+        Initialize the router.
+
+        Args:
+            primary_url: The url of the primary
+            replica_urls: The urls of the read replicas
+            measure_lag: Measures the replication lag of a replica, in seconds
+            max_lag: The maximum lag of a replica to read from, in seconds
+            lag_check_interval: How often the lag of the replicas is measured, in seconds
+        """
+        self.primary_url = primary_url
+        self.replicas = [ReplicaState(url) for url in replica_urls]
+        self.measure_lag = measure_lag
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+
+        self.decisions: Counter[tuple[str, RoutingReason]] = Counter()
+
+        self._writes: dict[str, float] = {}
+        self._next_replica = 0
+        self._refresh_lock = asyncio.Lock()
+
+    async def route_read(self, consistency_key: str | None = None) -> PostgresDsn:
+        """
+        Pick the database for a read-only session.
+
+        Args:
+            consistency_key: The key whose own writes the read must see, if any
+
+        Returns:
+            PostgresDsn: The url of a replica, or of the primary
+        """
+        if not self.replicas:
+            return self._route(self.primary_url, 'no_replica')
+
+        await self._refresh_lags()
+
+        candidates = [replica for replica in self.replicas if replica.lag <= self.max_lag]
+        if not candidates:
+            return self._route(self.primary_url, 'replica_lagging')
+
+        written_at = self._writes.get(consistency_key) if consistency_key else None
+        if written_at is not None:
+            # A replica that was `lag` behind when measured has every write older than that
+            candidates = [
+                replica for replica in candidates if written_at <= replica.checked_at - replica.lag
+            ]
+            if not candidates:
+                return self._route(self.primary_url, 'read_your_writes')
+
+        replica = candidates[self._next_replica % len(candidates)]
+        self._next_replica += 1
+        return self._route(replica.url, 'replica')
+
+    def record_write(self, consistency_key: str) -> None:
+        """
+        Record a committed write, for later reads under the same key in this process to see it.
+
+        Args:
+            consistency_key: The key of the write, e.g. a session ID
+        """
+        if self.replicas:
+            self._writes[consistency_key] = time.monotonic()
+
+    def _route(self, url: PostgresDsn, reason: RoutingReason) -> PostgresDsn:
+        target = 'primary' if url is self.primary_url else 'replica'
+        self.decisions[(target, reason)] += 1
+        return url
+
+    async def _refresh_lags(self) -> None:
+        if time.monotonic() - self.replicas[0].checked_at < self.lag_check_interval:
+            return
+
+        async with self._refresh_lock:
+            # Another read may have refreshed the lags while this one waited
+            checked_at = time.monotonic()
+            if checked_at - self.replicas[0].checked_at < self.lag_check_interval:
+                return
+
+            lags = await asyncio.gather(
+                *(self.measure_lag(replica.url) for replica in self.replicas),
+                return_exceptions=True,
+            )
+            for replica, lag in zip(self.replicas, lags, strict=True):
+                if isinstance(lag, BaseException):
+                    logger.warning(f'Could not measure the lag of a read replica: {lag}')
+                    replica.lag = math.inf
+                else:
+                    replica.lag = lag
+                replica.checked_at = checked_at
+
+            # Writes this old are on every replica that is not lagging
+            expires_before = checked_at - self.max_lag
+            self._writes = {
+                key: written_at
+                for key, written_at in self._writes.items()
+                if written_at >= expires_before
+            }
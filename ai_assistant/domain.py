@@ -43,3 +43,40 @@ class Content(BaseModel):
     metadata: dict[str, Any] | None = Field(
         default=None, description='Additional metadata (session_id, timestamps, etc.)'
     )
+
+
+class ChatTurn(BaseModel):
+    """
+    A single user message to run against a session, e.g. one item of a batch.
+    """
+
+    session_id: UUID
+    user_id: UUID
+    message: str
+
+
+class TranscriptMessage(BaseModel):
+    """
+    A renderable message of a conversation transcript.
+
+    Transcript messages are projected from persisted ADK events: only text parts are kept,
+    function calls and responses are dropped. The ID is derived from the source event so
+    that projecting the same event twice yields the same message.
+    """
+
+    id: UUID
+    role: str | None = Field(default=None, description="Role from ADK (e.g., 'user', 'model')")
+    text: str
+    event_id: str = Field(description='ID of the ADK event the message was projected from')
+    part_index: int = Field(description='Index of the text part within the source event')
+    timestamp: float = Field(description='Timestamp of the source event')
+
+
+class TranscriptSearchHit(BaseModel):
+    """
+    A transcript message matching a full-text search, with its relevance score.
+    """
+
+    session_id: str
+    message: TranscriptMessage
+    score: float = Field(description='Relevance of the message to the query, higher is better')
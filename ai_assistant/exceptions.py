@@ -10,6 +10,10 @@ class AuthorizationException(AppException):
     pass
 
 
+class TooManyRequestsException(AppException):
+    pass
+
+
 class InvalidJwt(AuthorizationException):
     def __init__(self, message: str | None = None) -> None:
         if message is None:
@@ -2,17 +2,25 @@ import asyncio
 from logging.config import fileConfig
 
 from alembic import context
+from alembic.runtime.environment import NameFilterParentNames
+from alembic.runtime.environment import NameFilterType
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
-from sqlalchemy import text
 from sqlalchemy.engine.base import Connection
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from ai_assistant.common.settings import settings
+from ai_assistant.db.online_migrations import set_timeouts
+from ai_assistant.db.partitions import partitioned_tables
 from ai_assistant.models.base import BaseModel
 
 # Import all models so Alembic can detect them
 from ai_assistant.models.session import Session  # noqa: F401
+from ai_assistant.models.session_snapshot import SessionSnapshot  # noqa: F401
+from ai_assistant.models.session_state import SessionStateCheckpoint  # noqa: F401
+from ai_assistant.models.session_state import SessionStateDelta  # noqa: F401
+from ai_assistant.models.transcript import TranscriptMessage  # noqa: F401
+from ai_assistant.models.transcript import TranscriptRepair  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -29,6 +37,9 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = BaseModel.metadata
 
+# Partitions are created at runtime, not declared as models
+partitionings = partitioned_tables(list(target_metadata.tables.values()))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -38,6 +49,14 @@ if config.get_main_option('sqlalchemy.url') is None:
     config.set_main_option('sqlalchemy.url', str(settings.DATABASE_URL))
 
 
+def include_name(
+    name: str | None, type_: NameFilterType, parent_names: NameFilterParentNames
+) -> bool:
+    if type_ == 'table' and name is not None:
+        return not any(partitioning.is_partition_name(name) for partitioning in partitionings)
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -54,6 +73,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={'paramstyle': 'named'},
     )
@@ -63,14 +83,36 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # With `-x dry_run=true`, the migrations are rolled back and long steps only estimated
+    dry_run = context.get_x_argument(as_dictionary=True).get('dry_run', '').lower() == 'true'
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        dry_run=dry_run,
+    )
+
+    if dry_run:
+        with connection.begin() as transaction:
+            _set_migration_timeouts(connection)
+            context.run_migrations()
+            transaction.rollback()
+        return
 
     with context.begin_transaction():
-        connection.execute(text('SET lock_timeout = 10000'))
-        connection.execute(text('SET statement_timeout = 15000'))
+        _set_migration_timeouts(connection)
         context.run_migrations()
 
 
+def _set_migration_timeouts(connection: Connection) -> None:
+    # Session-wide, so that they also apply to the autocommit blocks of the migrations
+    set_timeouts(
+        connection,
+        statement_timeout=settings.MIGRATION_STATEMENT_TIMEOUT_SECONDS,
+        lock_timeout=settings.MIGRATION_LOCK_TIMEOUT_SECONDS,
+    )
+
+
 async def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
@@ -0,0 +1,39 @@
+"""add session state delta landed
+
+Revision ID: 9c4e2a7b5d31
+Revises: 7d2e6b18f4a9
+Create Date: 2026-10-19 21:12:40.518342
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+from ai_assistant.db.online_migrations import create_index_concurrently
+from ai_assistant.db.online_migrations import drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '9c4e2a7b5d31'
+down_revision = '7d2e6b18f4a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The deltas written so far were written after their event
+    op.add_column(
+        'session_state_delta',
+        sa.Column('landed', sa.Boolean(), server_default=sa.true(), nullable=False),
+    )
+    # Built concurrently so that turns are not blocked while it builds
+    create_index_concurrently(
+        'ix_session_state_delta_event',
+        'session_state_delta',
+        ['app_name', 'user_id', 'session_id', 'event_id'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_session_state_delta_event', 'session_state_delta')
+    op.drop_column('session_state_delta', 'landed')
@@ -0,0 +1,45 @@
+"""add transcript message text search
+
+Revision ID: 7d2e5b1f9a36
+Revises: 4c81d3a9e5f2
+Create Date: 2026-10-19 14:03:27.904611
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from ai_assistant.db.online_migrations import create_index_concurrently
+from ai_assistant.db.online_migrations import drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '7d2e5b1f9a36'
+down_revision = '4c81d3a9e5f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'transcript_message',
+        sa.Column(
+            'text_search',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', text)", persisted=True),
+            nullable=False,
+        ),
+    )
+    # Built concurrently so that appends to transcripts are not blocked while it builds
+    create_index_concurrently(
+        'ix_transcript_message_text_search',
+        'transcript_message',
+        ['text_search'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_transcript_message_text_search', 'transcript_message')
+    op.drop_column('transcript_message', 'text_search')
@@ -0,0 +1,227 @@
+"""partition session and transcript tables
+
+Revision ID: b5f1c8d24a7e
+Revises: 7d2e5b1f9a36
+Create Date: 2026-10-19 16:41:08.226147
+
+"""
+
+import logging
+from datetime import datetime
+from datetime import timezone
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from ai_assistant.common.settings import settings
+from ai_assistant.db.online_migrations import create_index_concurrently
+from ai_assistant.db.online_migrations import estimate_rows
+from ai_assistant.db.online_migrations import is_dry_run
+from ai_assistant.db.online_migrations import validate_constraint
+from ai_assistant.db.partitions import MonthlyPartitioning
+from ai_assistant.db.partitions import Partition
+from ai_assistant.db.partitions import add_months
+from ai_assistant.db.partitions import month_start
+
+# revision identifiers, used by Alembic.
+revision = 'b5f1c8d24a7e'
+down_revision = '7d2e5b1f9a36'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger(__name__)
+
+_SESSION = MonthlyPartitioning('session', 'created_at')
+_TRANSCRIPT = MonthlyPartitioning('transcript_message', 'event_timestamp', epoch=True)
+
+
+def upgrade() -> None:
+    # The existing rows are not copied: each table becomes the legacy partition of a new
+    # partitioned table, covering everything up to the end of the current month
+    now = datetime.now(timezone.utc)
+    legacy_bound = add_months(month_start(now), 1)
+
+    if is_dry_run():
+        # The later steps depend on the index and constraint built outside of the transaction
+        for partitioning in (_SESSION, _TRANSCRIPT):
+            logger.info(
+                f'Dry run: would partition {partitioning.table}, keeping its about '
+                f'{estimate_rows(partitioning.table)} rows in {partitioning.legacy_partition}'
+            )
+        return
+
+    _prepare_legacy_partition(_SESSION, legacy_bound)
+    _prepare_legacy_partition(_TRANSCRIPT, legacy_bound)
+
+    op.rename_table('session', _SESSION.legacy_partition)
+    op.execute('ALTER INDEX ix_session_id RENAME TO ix_session_legacy_id')
+    op.create_table(
+        'session',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('ended_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    _attach_legacy_partition(_SESSION, legacy_bound)
+
+    op.rename_table('transcript_message', _TRANSCRIPT.legacy_partition)
+    op.execute(
+        'ALTER INDEX ix_transcript_message_session RENAME TO ix_transcript_message_legacy_session'
+    )
+    op.execute(
+        'ALTER INDEX ix_transcript_message_text_search '
+        'RENAME TO ix_transcript_message_legacy_text_search'
+    )
+    op.create_table(
+        'transcript_message',
+        *_transcript_message_columns(),
+        sa.PrimaryKeyConstraint('id', 'event_timestamp'),
+        postgresql_partition_by='RANGE (event_timestamp)',
+    )
+    _attach_legacy_partition(_TRANSCRIPT, legacy_bound)
+    # The matching indexes of the legacy partition are attached, not built again
+    _create_transcript_message_indexes()
+
+    for partitioning in (_SESSION, _TRANSCRIPT):
+        legacy = Partition(partitioning.legacy_partition, None, legacy_bound)
+        for month in partitioning.missing_months(
+            [legacy], now, settings.RETENTION_PARTITIONS_AHEAD
+        ):
+            op.execute(partitioning.create_partition_sql(month))
+
+
+def downgrade() -> None:
+    # Not an online migration: the rows of every partition are copied back to a plain table
+    op.rename_table('session', 'session_partitioned')
+    op.execute('ALTER INDEX session_pkey RENAME TO session_partitioned_pkey')
+    op.create_table(
+        'session',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('ended_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute(
+        'INSERT INTO session (id, user_id, ended_at, created_at, updated_at) '
+        'SELECT id, user_id, ended_at, created_at, updated_at FROM session_partitioned'
+    )
+    op.drop_table('session_partitioned')
+    op.create_index(op.f('ix_session_id'), 'session', ['id'], unique=True)
+
+    op.rename_table('transcript_message', 'transcript_message_partitioned')
+    op.execute('ALTER INDEX transcript_message_pkey RENAME TO transcript_message_partitioned_pkey')
+    op.execute(
+        'ALTER INDEX ix_transcript_message_session '
+        'RENAME TO ix_transcript_message_partitioned_session'
+    )
+    op.execute(
+        'ALTER INDEX ix_transcript_message_text_search '
+        'RENAME TO ix_transcript_message_partitioned_text_search'
+    )
+    op.create_table(
+        'transcript_message',
+        *_transcript_message_columns(),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    columns = (
+        'id, app_name, user_id, session_id, event_id, event_timestamp, part_index, role, text, '
+        'created_at, updated_at'
+    )
+    op.execute(
+        f'INSERT INTO transcript_message ({columns}) '
+        f'SELECT {columns} FROM transcript_message_partitioned'
+    )
+    op.drop_table('transcript_message_partitioned')
+    _create_transcript_message_indexes()
+
+
+def _prepare_legacy_partition(partitioning: MonthlyPartitioning, bound: datetime) -> None:
+    table = partitioning.table
+    column = partitioning.column
+
+    # The autocommit blocks commit every step before them, so the steps done by an earlier run
+    # that failed are skipped
+
+    # The primary key of a partitioned table must include the partition column
+    if not _has_constraint(table, f'{table}_legacy_pkey'):
+        create_index_concurrently(f'{table}_id_{column}_key', table, ['id', column], unique=True)
+        op.execute(
+            f'ALTER TABLE {table} DROP CONSTRAINT {table}_pkey, '
+            f'ADD CONSTRAINT {table}_legacy_pkey PRIMARY KEY USING INDEX {table}_id_{column}_key'
+        )
+
+    # A valid constraint implying the partition bound spares a scan when attaching the table
+    if not _has_constraint(table, f'{table}_legacy_bound'):
+        op.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {table}_legacy_bound '
+            f'CHECK ({column} < {partitioning.bound(bound)}) NOT VALID'
+        )
+    validate_constraint(table, f'{table}_legacy_bound')
+
+
+def _has_constraint(table: str, constraint_name: str) -> bool:
+    if op.get_context().as_sql:
+        return False
+    return bool(
+        op.get_bind()
+        .execute(
+            text(
+                'SELECT EXISTS (SELECT FROM pg_constraint '
+                'WHERE conrelid = CAST(:table AS regclass) AND conname = :constraint_name)'
+            ),
+            {'table': table, 'constraint_name': constraint_name},
+        )
+        .scalar_one()
+    )
+
+
+def _attach_legacy_partition(partitioning: MonthlyPartitioning, bound: datetime) -> None:
+    op.execute(
+        f'ALTER TABLE {partitioning.table} ATTACH PARTITION {partitioning.legacy_partition} '
+        f'FOR VALUES FROM (MINVALUE) TO ({partitioning.bound(bound)})'
+    )
+
+
+def _transcript_message_columns() -> list[sa.Column]:
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('app_name', sa.String(length=128), nullable=False),
+        sa.Column('user_id', sa.String(length=128), nullable=False),
+        sa.Column('session_id', sa.String(length=128), nullable=False),
+        sa.Column('event_id', sa.String(length=128), nullable=False),
+        sa.Column('event_timestamp', sa.Float(), nullable=False),
+        sa.Column('part_index', sa.Integer(), nullable=False),
+        sa.Column('role', sa.String(length=32), nullable=True),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            'text_search',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', text)", persisted=True),
+            nullable=False,
+        ),
+    ]
+
+
+def _create_transcript_message_indexes() -> None:
+    op.create_index(
+        'ix_transcript_message_session',
+        'transcript_message',
+        ['app_name', 'user_id', 'session_id', 'event_timestamp', 'part_index'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_transcript_message_text_search',
+        'transcript_message',
+        ['text_search'],
+        unique=False,
+        postgresql_using='gin',
+    )
@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime
 
+from sqlalchemy import PrimaryKeyConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
@@ -9,15 +10,15 @@ from sqlalchemy.types import DateTime
 from ai_assistant.models.base import BaseModel
 
 
+# Not written by the application, whose sessions are stored by the ADK session service
 class Session(BaseModel):
     __tablename__ = 'session'
-
-    id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
-        primary_key=True,
-        unique=True,
-        index=True,
-        default=uuid.uuid4,
+    # Monthly partitions, so that expired sessions are dropped a partition at a time
+    __table_args__ = (
+        PrimaryKeyConstraint('id', 'created_at'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
     )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True))
     ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
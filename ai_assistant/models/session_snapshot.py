@@ -0,0 +1,23 @@
+from typing import Any
+
+from sqlalchemy import Double
+from sqlalchemy import PrimaryKeyConstraint
+from sqlalchemy import String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from ai_assistant.models.base import BaseModel
+
+
+class SessionSnapshot(BaseModel):
+    __tablename__ = 'session_snapshot'
+    __table_args__ = (PrimaryKeyConstraint('app_name', 'user_id', 'session_id'),)
+
+    app_name: Mapped[str] = mapped_column(String(128))
+    user_id: Mapped[str] = mapped_column(String(128))
+    session_id: Mapped[str] = mapped_column(String(128))
+    # The timestamp of the last event summarized by the snapshot, in seconds since the epoch
+    end_timestamp: Mapped[float] = mapped_column(Double)
+    # The ADK compaction event holding the summary
+    event: Mapped[dict[str, Any]] = mapped_column(JSONB)
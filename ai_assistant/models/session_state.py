@@ -0,0 +1,52 @@
+from typing import Any
+
+from sqlalchemy import BigInteger
+from sqlalchemy import Boolean
+from sqlalchemy import Identity
+from sqlalchemy import Index
+from sqlalchemy import PrimaryKeyConstraint
+from sqlalchemy import String
+from sqlalchemy import true
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from ai_assistant.models.base import BaseModel
+
+
+class SessionStateDelta(BaseModel):
+    __tablename__ = 'session_state_delta'
+    # Append-only: the state of a session is its checkpoint followed by the later deltas
+    __table_args__ = (
+        Index('ix_session_state_delta_session', 'app_name', 'user_id', 'session_id', 'id'),
+        # A delta is written once per event, whether the write is retried or not
+        Index(
+            'ix_session_state_delta_event',
+            'app_name',
+            'user_id',
+            'session_id',
+            'event_id',
+            unique=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    app_name: Mapped[str] = mapped_column(String(128))
+    user_id: Mapped[str] = mapped_column(String(128))
+    session_id: Mapped[str] = mapped_column(String(128))
+    event_id: Mapped[str] = mapped_column(String(128))
+    delta: Mapped[dict[str, Any]] = mapped_column(JSONB)
+    # Deltas are written before their event, and only applied once the event is stored
+    landed: Mapped[bool] = mapped_column(Boolean, server_default=true())
+
+
+class SessionStateCheckpoint(BaseModel):
+    __tablename__ = 'session_state_checkpoint'
+    __table_args__ = (PrimaryKeyConstraint('app_name', 'user_id', 'session_id'),)
+
+    app_name: Mapped[str] = mapped_column(String(128))
+    user_id: Mapped[str] = mapped_column(String(128))
+    session_id: Mapped[str] = mapped_column(String(128))
+    # The ID of the last delta included in the state
+    delta_id: Mapped[int] = mapped_column(BigInteger)
+    state: Mapped[dict[str, Any]] = mapped_column(JSONB)
@@ -0,0 +1,61 @@
+import uuid
+
+from sqlalchemy import Computed
+from sqlalchemy import Index
+from sqlalchemy import PrimaryKeyConstraint
+from sqlalchemy import String
+from sqlalchemy import Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from ai_assistant.models.base import BaseModel
+
+# Text search configuration of the `text_search` column; queries must use the same one
+TEXT_SEARCH_CONFIG = 'english'
+
+
+class TranscriptMessage(BaseModel):
+    __tablename__ = 'transcript_message'
+    # Monthly partitions by event time, so that expired messages are dropped a partition at
+    # a time. The ID of a message is deterministic, and so is its event timestamp.
+    __table_args__ = (
+        PrimaryKeyConstraint('id', 'event_timestamp'),
+        Index(
+            'ix_transcript_message_session',
+            'app_name',
+            'user_id',
+            'session_id',
+            'event_timestamp',
+            'part_index',
+        ),
+        Index('ix_transcript_message_text_search', 'text_search', postgresql_using='gin'),
+        {'postgresql_partition_by': 'RANGE (event_timestamp)'},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True))
+    app_name: Mapped[str] = mapped_column(String(128))
+    user_id: Mapped[str] = mapped_column(String(128))
+    session_id: Mapped[str] = mapped_column(String(128))
+    event_id: Mapped[str] = mapped_column(String(128))
+    event_timestamp: Mapped[float]
+    part_index: Mapped[int]
+    role: Mapped[str | None] = mapped_column(String(32))
+    text: Mapped[str] = mapped_column(Text)
+    text_search: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{TEXT_SEARCH_CONFIG}', text)", persisted=True),
+        deferred=True,
+    )
+
+
+class TranscriptRepair(BaseModel):
+    __tablename__ = 'transcript_repair'
+    # The events of a session missing from its transcript, until the transcript is rebuilt
+    __table_args__ = (PrimaryKeyConstraint('app_name', 'user_id', 'session_id', 'event_id'),)
+
+    app_name: Mapped[str] = mapped_column(String(128))
+    user_id: Mapped[str] = mapped_column(String(128))
+    session_id: Mapped[str] = mapped_column(String(128))
+    event_id: Mapped[str] = mapped_column(String(128))
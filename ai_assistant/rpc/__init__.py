@@ -0,0 +1 @@
+"""gRPC interface of the assistant, served in-process or on its own by `rpc.server`."""
@@ -0,0 +1,87 @@
+"""
+gRPC server of the assistant.
+
+The server is started in-process by the FastAPI lifespan when `GRPC_ENABLED` is set, or on
+its own with:
+    python -m ai_assistant.rpc.server [--address [::]:50051]
+
+In both cases it serves the same `AssistantServicer`, backed by the session service singleton.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+import grpc
+
+from ai_assistant.common.clients.langfuse import get_langfuse_client
+from ai_assistant.common.settings import settings
+from ai_assistant.rpc.v1.assistant_pb2_grpc import add_AssistantServicer_to_server
+from ai_assistant.rpc.v1.servicer import AssistantServicer
+from ai_assistant.services.ai.adk.session_factory import get_session_service
+from ai_assistant.services.ai.adk.session_factory import initialize_session_service
+from ai_assistant.services.ai.adk.session_service import shutdown_session_listeners
+from ai_assistant.services.session.transcript import get_transcript_store
+
+logger = logging.getLogger(__name__)
+
+
+def create_grpc_server(
+    address: str = settings.GRPC_ADDRESS,
+    max_concurrent_rpcs: int | None = settings.GRPC_MAX_CONCURRENT_RPCS,
+) -> grpc.aio.Server:
+    """
+    Create the gRPC server. The session service must have been initialized.
+
+    Args:
+        address: The address to listen on, e.g. `[::]:50051`
+        max_concurrent_rpcs: The maximum number of RPCs served at once, further ones are
+            rejected with RESOURCE_EXHAUSTED; None for no limit
+
+    Returns:
+        grpc.aio.Server: The server, not started yet
+    """
+    server = grpc.aio.server(maximum_concurrent_rpcs=max_concurrent_rpcs)
+
+    servicer = AssistantServicer(get_session_service(), get_transcript_store())
+    add_AssistantServicer_to_server(servicer, server)
+    server.add_insecure_port(address)
+
+    logger.info(f'Created gRPC server listening on {address}')
+    return server
+
+
+async def serve(address: str) -> None:
+    """
+    Run a standalone gRPC server until it is terminated.
+
+    Args:
+        address: The address to listen on
+    """
+    initialize_session_service()
+    get_langfuse_client()
+
+    server = create_grpc_server(address)
+    await server.start()
+    logger.info('gRPC server started')
+
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(settings.GRPC_SHUTDOWN_GRACE_SECONDS)
+        await shutdown_session_listeners()
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=settings.LOGGING_LEVEL, stream=sys.stderr)
+
+    parser = argparse.ArgumentParser(description='Run the gRPC server of the assistant.')
+    parser.add_argument('--address', default=settings.GRPC_ADDRESS, help='Address to listen on')
+    args = parser.parse_args(argv)
+
+    asyncio.run(serve(args.address))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: ai_assistant/rpc/v1/assistant.proto
+# Protobuf Python Version: 6.31.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    6,
+    31,
+    1,
+    '',
+    'ai_assistant/rpc/v1/assistant.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import struct_pb2 as google_dot_protobuf_dot_struct__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n#ai_assistant/rpc/v1/assistant.proto\x12\x0f\x61i_assistant.v1\x1a\x1cgoogle/protobuf/struct.proto\"\xa3\x01\n\x07\x43ontent\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12%\n\x04\x64\x61ta\x18\x03 \x01(\x0b\x32\x17.google.protobuf.Struct\x12\x11\n\x04role\x18\x04 \x01(\tH\x00\x88\x01\x01\x12.\n\x08metadata\x18\x05 \x01(\x0b\x32\x17.google.protobuf.StructH\x01\x88\x01\x01\x42\x07\n\x05_roleB\x0b\n\t_metadata\"C\n\x0b\x43hatRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"?\n\x10\x43hatBatchRequest\x12+\n\x05turns\x18\x01 \x03(\x0b\x32\x1c.ai_assistant.v1.ChatRequest\"\x9d\x01\n\rChatBatchItem\x12\r\n\x05index\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x0f\n\x07user_id\x18\x03 \x01(\t\x12.\n\x07\x63ontent\x18\x04 \x01(\x0b\x32\x18.ai_assistant.v1.ContentH\x00\x88\x01\x01\x12\x12\n\x05\x65rror\x18\x05 \x01(\tH\x01\x88\x01\x01\x42\n\n\x08_contentB\x08\n\x06_error\"\'\n\x14\x43reateSessionRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\"B\n\x15\x43reateSessionResponse\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x15\n\rintro_message\x18\x02 \x01(\t\"\x82\x01\n\x07Session\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x10\n\x08\x61pp_name\x18\x03 \x01(\t\x12&\n\x05state\x18\x04 \x01(\x0b\x32\x17.google.protobuf.Struct\x12\x18\n\x10last_update_time\x18\x05 \x01(\x01\"&\n\x13ListSessionsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\"B\n\x14ListSessionsResponse\x12*\n\x08sessions\x18\x01 \x03(\x0b\x32\x18.ai_assistant.v1.Session\"8\n\x11GetSessionRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"f\n\rSessionDetail\x12)\n\x07session\x18\x01 \x01(\x0b\x32\x18.ai_assistant.v1.Session\x12*\n\x08\x63ontents\x18\x02 \x03(\x0b\x32\x18.ai_assistant.v1.Content\"V\n\x15SearchSessionsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05query\x18\x02 \x01(\t\x12\r\n\x05limit\x18\x03 \x01(\x05\x12\x0e\n\x06offset\x18\x04 \x01(\x05\"`\n\x10SessionSearchHit\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12)\n\x07\x63ontent\x18\x02 \x01(\x0b\x32\x18.ai_assistant.v1.Content\x12\r\n\x05score\x18\x03 \x01(\x01\"v\n\x16SearchSessionsResponse\x12\x32\n\x07results\x18\x01 \x03(\x0b\x32!.ai_assistant.v1.SessionSearchHit\x12\x18\n\x0bnext_offset\x18\x02 \x01(\x05H\x00\x88\x01\x01\x42\x0e\n\x0c_next_offset2\xd7\x04\n\tAssistant\x12>\n\x04\x43hat\x12\x1c.ai_assistant.v1.ChatRequest\x1a\x18.ai_assistant.v1.Content\x12\x46\n\nChatStream\x12\x1c.ai_assistant.v1.ChatRequest\x1a\x18.ai_assistant.v1.Content0\x01\x12P\n\tChatBatch\x12!.ai_assistant.v1.ChatBatchRequest\x1a\x1e.ai_assistant.v1.ChatBatchItem0\x01\x12^\n\rCreateSession\x12%.ai_assistant.v1.CreateSessionRequest\x1a&.ai_assistant.v1.CreateSessionResponse\x12[\n\x0cListSessions\x12$.ai_assistant.v1.ListSessionsRequest\x1a%.ai_assistant.v1.ListSessionsResponse\x12P\n\nGetSession\x12\".ai_assistant.v1.GetSessionRequest\x1a\x1e.ai_assistant.v1.SessionDetail\x12\x61\n\x0eSearchSessions\x12&.ai_assistant.v1.SearchSessionsRequest\x1a\'.ai_assistant.v1.SearchSessionsResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'ai_assistant.rpc.v1.assistant_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_CONTENT']._serialized_start=87
+  _globals['_CONTENT']._serialized_end=250
+  _globals['_CHATREQUEST']._serialized_start=252
+  _globals['_CHATREQUEST']._serialized_end=319
+  _globals['_CHATBATCHREQUEST']._serialized_start=321
+  _globals['_CHATBATCHREQUEST']._serialized_end=384
+  _globals['_CHATBATCHITEM']._serialized_start=387
+  _globals['_CHATBATCHITEM']._serialized_end=544
+  _globals['_CREATESESSIONREQUEST']._serialized_start=546
+  _globals['_CREATESESSIONREQUEST']._serialized_end=585
+  _globals['_CREATESESSIONRESPONSE']._serialized_start=587
+  _globals['_CREATESESSIONRESPONSE']._serialized_end=653
+  _globals['_SESSION']._serialized_start=656
+  _globals['_SESSION']._serialized_end=786
+  _globals['_LISTSESSIONSREQUEST']._serialized_start=788
+  _globals['_LISTSESSIONSREQUEST']._serialized_end=826
+  _globals['_LISTSESSIONSRESPONSE']._serialized_start=828
+  _globals['_LISTSESSIONSRESPONSE']._serialized_end=894
+  _globals['_GETSESSIONREQUEST']._serialized_start=896
+  _globals['_GETSESSIONREQUEST']._serialized_end=952
+  _globals['_SESSIONDETAIL']._serialized_start=954
+  _globals['_SESSIONDETAIL']._serialized_end=1056
+  _globals['_SEARCHSESSIONSREQUEST']._serialized_start=1058
+  _globals['_SEARCHSESSIONSREQUEST']._serialized_end=1144
+  _globals['_SESSIONSEARCHHIT']._serialized_start=1146
+  _globals['_SESSIONSEARCHHIT']._serialized_end=1242
+  _globals['_SEARCHSESSIONSRESPONSE']._serialized_start=1244
+  _globals['_SEARCHSESSIONSRESPONSE']._serialized_end=1362
+  _globals['_ASSISTANT']._serialized_start=1365
+  _globals['_ASSISTANT']._serialized_end=1964
+# @@protoc_insertion_point(module_scope)
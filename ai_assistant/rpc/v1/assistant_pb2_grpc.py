@@ -0,0 +1,362 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+from ai_assistant.rpc.v1 import assistant_pb2 as ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2
+
+GRPC_GENERATED_VERSION = '1.74.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + f' but the generated code in ai_assistant/rpc/v1/assistant_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class AssistantStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Chat = channel.unary_unary(
+                '/ai_assistant.v1.Assistant/Chat',
+                request_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatRequest.SerializeToString,
+                response_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.Content.FromString,
+                _registered_method=True)
+        self.ChatStream = channel.unary_stream(
+                '/ai_assistant.v1.Assistant/ChatStream',
+                request_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatRequest.SerializeToString,
+                response_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.Content.FromString,
+                _registered_method=True)
+        self.ChatBatch = channel.unary_stream(
+                '/ai_assistant.v1.Assistant/ChatBatch',
+                request_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatBatchRequest.SerializeToString,
+                response_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatBatchItem.FromString,
+                _registered_method=True)
+        self.CreateSession = channel.unary_unary(
+                '/ai_assistant.v1.Assistant/CreateSession',
+                request_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.CreateSessionRequest.SerializeToString,
+                response_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.CreateSessionResponse.FromString,
+                _registered_method=True)
+        self.ListSessions = channel.unary_unary(
+                '/ai_assistant.v1.Assistant/ListSessions',
+                request_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ListSessionsRequest.SerializeToString,
+                response_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ListSessionsResponse.FromString,
+                _registered_method=True)
+        self.GetSession = channel.unary_unary(
+                '/ai_assistant.v1.Assistant/GetSession',
+                request_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.GetSessionRequest.SerializeToString,
+                response_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.SessionDetail.FromString,
+                _registered_method=True)
+        self.SearchSessions = channel.unary_unary(
+                '/ai_assistant.v1.Assistant/SearchSessions',
+                request_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.SearchSessionsRequest.SerializeToString,
+                response_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.SearchSessionsResponse.FromString,
+                _registered_method=True)
+
+
+class AssistantServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def Chat(self, request, context):
+        """Chat with the AI assistant and get the full response
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ChatStream(self, request, context):
+        """Chat with the AI assistant and stream the response
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ChatBatch(self, request, context):
+        """Run many independent chat turns, streaming each result as soon as it completes
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CreateSession(self, request, context):
+        """Create a new session
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListSessions(self, request, context):
+        """Get all sessions for a user
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetSession(self, request, context):
+        """Get a specific session with all messages
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SearchSessions(self, request, context):
+        """Search the messages of all of a user's sessions
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_AssistantServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Chat': grpc.unary_unary_rpc_method_handler(
+                    servicer.Chat,
+                    request_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatRequest.FromString,
+                    response_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.Content.SerializeToString,
+            ),
+            'ChatStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.ChatStream,
+                    request_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatRequest.FromString,
+                    response_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.Content.SerializeToString,
+            ),
+            'ChatBatch': grpc.unary_stream_rpc_method_handler(
+                    servicer.ChatBatch,
+                    request_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatBatchRequest.FromString,
+                    response_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatBatchItem.SerializeToString,
+            ),
+            'CreateSession': grpc.unary_unary_rpc_method_handler(
+                    servicer.CreateSession,
+                    request_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.CreateSessionRequest.FromString,
+                    response_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.CreateSessionResponse.SerializeToString,
+            ),
+            'ListSessions': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListSessions,
+                    request_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ListSessionsRequest.FromString,
+                    response_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ListSessionsResponse.SerializeToString,
+            ),
+            'GetSession': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetSession,
+                    request_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.GetSessionRequest.FromString,
+                    response_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.SessionDetail.SerializeToString,
+            ),
+            'SearchSessions': grpc.unary_unary_rpc_method_handler(
+                    servicer.SearchSessions,
+                    request_deserializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.SearchSessionsRequest.FromString,
+                    response_serializer=ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.SearchSessionsResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'ai_assistant.v1.Assistant', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('ai_assistant.v1.Assistant', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Assistant(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def Chat(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ai_assistant.v1.Assistant/Chat',
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatRequest.SerializeToString,
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.Content.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ChatStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/ai_assistant.v1.Assistant/ChatStream',
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatRequest.SerializeToString,
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.Content.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ChatBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/ai_assistant.v1.Assistant/ChatBatch',
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatBatchRequest.SerializeToString,
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ChatBatchItem.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CreateSession(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ai_assistant.v1.Assistant/CreateSession',
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.CreateSessionRequest.SerializeToString,
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.CreateSessionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListSessions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ai_assistant.v1.Assistant/ListSessions',
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ListSessionsRequest.SerializeToString,
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.ListSessionsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetSession(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ai_assistant.v1.Assistant/GetSession',
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.GetSessionRequest.SerializeToString,
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.SessionDetail.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SearchSessions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ai_assistant.v1.Assistant/SearchSessions',
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.SearchSessionsRequest.SerializeToString,
+            ai__assistant_dot_rpc_dot_v1_dot_assistant__pb2.SearchSessionsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,322 @@
+"""
+gRPC implementation of the assistant, next to the FastAPI routes.
+
+The servicer exposes the chat and session operations of `api/v1/routes` over gRPC. It runs
+them with the same `AIService`, session service singleton and transcript store as the HTTP
+API, so both interfaces can be served from the same process. Application errors map to gRPC
+status codes the way `api/main.py` maps them to HTTP status codes.
+"""
+
+import logging
+import time
+import uuid
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import grpc
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.protobuf.struct_pb2 import Struct
+from pydantic_core import to_jsonable_python
+
+from ai_assistant.api.dependencies import get_ai_service
+from ai_assistant.api.v1.routes.session import INTRO_MESSAGE
+from ai_assistant.common.settings import settings
+from ai_assistant.domain import ChatTurn
+from ai_assistant.domain import Content
+from ai_assistant.exceptions import AppException
+from ai_assistant.exceptions import AuthorizationException
+from ai_assistant.exceptions import NotFoundException
+from ai_assistant.exceptions import TooManyRequestsException
+from ai_assistant.rpc.v1 import assistant_pb2
+from ai_assistant.rpc.v1 import assistant_pb2_grpc
+from ai_assistant.services.ai.adk.session_factory import ADKSessionService
+from ai_assistant.services.ai.service import AIService
+from ai_assistant.services.session.transcript import TranscriptStore
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_SEARCH_LIMIT = 20
+_MAX_SEARCH_LIMIT = 100
+
+
+class AssistantServicer(assistant_pb2_grpc.AssistantServicer):
+    """
+    Serves the `ai_assistant.v1.Assistant` gRPC service.
+
+    Example:
+        servicer = AssistantServicer(get_session_service(), get_transcript_store())
+        assistant_pb2_grpc.add_AssistantServicer_to_server(servicer, server)
+    """
+
+    def __init__(
+        self,
+        session_service: ADKSessionService,
+        transcript_store: TranscriptStore,
+        ai_service: AIService | None = None,
+    ) -> None:
+        """
+        Initialize the servicer.
+
+        Args:
+            session_service: The ADK session service
+            transcript_store: The store of materialized transcripts
+            ai_service: The AI service (optional, built like the HTTP API's if None)
+        """
+        self.session_service = session_service
+        self.transcript_store = transcript_store
+        # Unlike the HTTP API, one AI service (and ADK runner) is shared by all RPCs
+        self.ai_service = ai_service or get_ai_service(session_service)
+
+    async def Chat(  # noqa: N802
+        self,
+        request: assistant_pb2.ChatRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> assistant_pb2.Content:
+        turn = await _parse_turn(request, context)
+        logger.info(f'New gRPC chat request received for session {turn.session_id}')
+
+        async with _abort_on_error(context):
+            content = await self.ai_service.run(
+                session_id=turn.session_id,
+                user_message=turn.message,
+                user_id=turn.user_id,
+            )
+
+        return _to_content_message(content)
+
+    async def ChatStream(  # noqa: N802
+        self,
+        request: assistant_pb2.ChatRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> AsyncIterator[assistant_pb2.Content]:
+        turn = await _parse_turn(request, context)
+        logger.info(f'New gRPC chat stream request for session {turn.session_id}')
+
+        # HTTP/2 flow control applies: the agent is only pulled as fast as the client reads
+        async with _abort_on_error(context):
+            async for content in self.ai_service.run_stream(
+                session_id=turn.session_id,
+                user_message=turn.message,
+                user_id=turn.user_id,
+            ):
+                yield _to_content_message(content)
+
+        logger.info(f'gRPC stream completed for session {turn.session_id}')
+
+    async def ChatBatch(  # noqa: N802
+        self,
+        request: assistant_pb2.ChatBatchRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> AsyncIterator[assistant_pb2.ChatBatchItem]:
+        if not 1 <= len(request.turns) <= settings.CHAT_BATCH_MAX_ITEMS:
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f'A batch must have between 1 and {settings.CHAT_BATCH_MAX_ITEMS} turns',
+            )
+
+        turns = [await _parse_turn(turn, context) for turn in request.turns]
+        logger.info(f'New gRPC chat batch request with {len(turns)} turns')
+
+        async with _abort_on_error(context):
+            async for result in self.ai_service.run_batch(turns):
+                turn = turns[result.index]
+                yield assistant_pb2.ChatBatchItem(
+                    index=result.index,
+                    session_id=str(turn.session_id),
+                    user_id=str(turn.user_id),
+                    content=_to_content_message(result.value) if result.value else None,
+                    error=result.error,
+                )
+
+    async def CreateSession(  # noqa: N802
+        self,
+        request: assistant_pb2.CreateSessionRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> assistant_pb2.CreateSessionResponse:
+        user_id = await _parse_uuid(request.user_id, 'user_id', context)
+
+        async with _abort_on_error(context):
+            session = await self.session_service.create_session(
+                user_id=str(user_id),
+                app_name=settings.APP_NAME,
+            )
+
+        logger.debug(f'Session {session.id} created over gRPC for user {user_id}')
+        return assistant_pb2.CreateSessionResponse(
+            session_id=session.id,
+            intro_message=INTRO_MESSAGE,
+        )
+
+    async def ListSessions(  # noqa: N802
+        self,
+        request: assistant_pb2.ListSessionsRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> assistant_pb2.ListSessionsResponse:
+        user_id = await _parse_uuid(request.user_id, 'user_id', context)
+
+        async with _abort_on_error(context):
+            sessions_response = await self.session_service.list_sessions(
+                app_name=settings.APP_NAME,
+                user_id=str(user_id),
+            )
+
+        return assistant_pb2.ListSessionsResponse(
+            sessions=[_to_session_message(session) for session in sessions_response.sessions]
+        )
+
+    async def GetSession(  # noqa: N802
+        self,
+        request: assistant_pb2.GetSessionRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> assistant_pb2.SessionDetail:
+        logger.debug(f'Retrieving session {request.session_id} for user {request.user_id}')
+
+        async with _abort_on_error(context):
+            # Only the header is needed, the messages come from the transcript
+            session = await self.session_service.get_session(
+                app_name=settings.APP_NAME,
+                user_id=request.user_id,
+                session_id=request.session_id,
+                config=GetSessionConfig(after_timestamp=time.time()),
+            )
+
+            if not session:
+                raise NotFoundException(
+                    f'Session {request.session_id} not found for user {request.user_id}'
+                )
+
+            messages = await self.transcript_store.list_messages(
+                app_name=settings.APP_NAME,
+                user_id=request.user_id,
+                session_id=request.session_id,
+            )
+
+        return assistant_pb2.SessionDetail(
+            session=_to_session_message(session),
+            contents=[
+                _to_content_message(
+                    Content(
+                        id=message.id,
+                        type='message',
+                        data={'text': message.text},
+                        role=message.role,
+                        metadata={'session_id': request.session_id},
+                    )
+                )
+                for message in messages
+            ],
+        )
+
+    async def SearchSessions(  # noqa: N802
+        self,
+        request: assistant_pb2.SearchSessionsRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> assistant_pb2.SearchSessionsResponse:
+        user_id = await _parse_uuid(request.user_id, 'user_id', context)
+        limit = request.limit or _DEFAULT_SEARCH_LIMIT
+        if not request.query or not 1 <= limit <= _MAX_SEARCH_LIMIT or request.offset < 0:
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f'A query is required, with a limit of at most {_MAX_SEARCH_LIMIT}',
+            )
+
+        async with _abort_on_error(context):
+            # One extra hit tells whether there is a next page
+            hits = await self.transcript_store.search(
+                app_name=settings.APP_NAME,
+                user_id=str(user_id),
+                query=request.query,
+                limit=limit + 1,
+                offset=request.offset,
+            )
+
+        return assistant_pb2.SearchSessionsResponse(
+            results=[
+                assistant_pb2.SessionSearchHit(
+                    session_id=hit.session_id,
+                    content=_to_content_message(
+                        Content(
+                            id=hit.message.id,
+                            type='message',
+                            data={'text': hit.message.text},
+                            role=hit.message.role,
+                            metadata={
+                                'session_id': hit.session_id,
+                                'timestamp': hit.message.timestamp,
+                            },
+                        )
+                    ),
+                    score=hit.score,
+                )
+                for hit in hits[:limit]
+            ],
+            next_offset=request.offset + limit if len(hits) > limit else None,
+        )
+
+
+@asynccontextmanager
+async def _abort_on_error(context: grpc.aio.ServicerContext) -> AsyncGenerator[None, None]:
+    try:
+        yield
+    except AppException as e:
+        match e:
+            case NotFoundException():
+                code = grpc.StatusCode.NOT_FOUND
+            case AuthorizationException():
+                code = grpc.StatusCode.UNAUTHENTICATED
+            case TooManyRequestsException():
+                code = grpc.StatusCode.RESOURCE_EXHAUSTED
+            case _:
+                code = grpc.StatusCode.INTERNAL
+        await context.abort(code, str(e))
+
+
+async def _parse_uuid(value: str, field: str, context: grpc.aio.ServicerContext) -> uuid.UUID:
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f'{field} must be a UUID')
+        raise
+
+
+async def _parse_turn(
+    request: assistant_pb2.ChatRequest,
+    context: grpc.aio.ServicerContext,
+) -> ChatTurn:
+    if not request.message:
+        await context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'message is required')
+
+    return ChatTurn(
+        session_id=await _parse_uuid(request.session_id, 'session_id', context),
+        user_id=await _parse_uuid(request.user_id, 'user_id', context),
+        message=request.message,
+    )
+
+
+def _to_struct(value: dict[str, Any]) -> Struct:
+    struct = Struct()
+    struct.update(to_jsonable_python(value))
+    return struct
+
+
+def _to_content_message(content: Content) -> assistant_pb2.Content:
+    return assistant_pb2.Content(
+        id=str(content.id),
+        type=content.type,
+        data=_to_struct(content.data),
+        role=content.role,
+        metadata=_to_struct(content.metadata) if content.metadata is not None else None,
+    )
+
+
+def _to_session_message(session: Session) -> assistant_pb2.Session:
+    return assistant_pb2.Session(
+        session_id=session.id,
+        user_id=session.user_id,
+        app_name=session.app_name,
+        state=_to_struct(session.state),
+        last_update_time=session.last_update_time,
+    )
@@ -1,23 +1,66 @@
 import logging
+from typing import TypeAlias
 
+from google.adk.sessions import BaseSessionService
 from google.adk.sessions import DatabaseSessionService
 from google.adk.sessions import InMemorySessionService
 from google.adk.sessions import VertexAiSessionService
 
 from ai_assistant.common.settings import settings
+from ai_assistant.services.ai.adk.session_service import ObservedSessionService
+from ai_assistant.services.session.compression import CompressedSessionService
+from ai_assistant.services.session.compression import load_payload_codec
+from ai_assistant.services.session.snapshot import SessionSnapshotCleanup
+from ai_assistant.services.session.snapshot import get_session_snapshot_store
+from ai_assistant.services.session.state import DatabaseSessionStateStore
+from ai_assistant.services.session.state import DeltaStateSessionService
+from ai_assistant.services.session.transcript import TranscriptProjection
+from ai_assistant.services.session.transcript import get_transcript_store
 
 logger = logging.getLogger(__name__)
 
-ADKSessionService = InMemorySessionService | VertexAiSessionService | DatabaseSessionService
+ADKSessionService: TypeAlias = (
+    InMemorySessionService
+    | VertexAiSessionService
+    | DatabaseSessionService
+    | ObservedSessionService
+)
 
 
 _session_service: ADKSessionService | None = None
 
 
+def create_database_session_service(url: str) -> BaseSessionService:
+    """
+    Create the session service of a session database.
+
+    Large event payloads are stored compressed (`SESSION_COMPRESSION_ENABLED`) and the state
+    changes of events as deltas (`SESSION_STATE_DELTAS_ENABLED`).
+
+    Args:
+        url: The url of the database of the ADK `DatabaseSessionService`
+
+    Returns:
+        BaseSessionService: The session service
+    """
+    service: BaseSessionService = DatabaseSessionService(url)
+    if settings.SESSION_COMPRESSION_ENABLED:
+        service = CompressedSessionService(service, load_payload_codec())
+    if settings.SESSION_STATE_DELTAS_ENABLED:
+        service = DeltaStateSessionService(service, DatabaseSessionStateStore())
+    return service
+
+
 def create_session_service() -> ADKSessionService:
     """
     Create an ADK session service based on the application environment.
 
+    The backend is wrapped in an `ObservedSessionService` so that the transcript projection
+    is updated every time an event is appended to a session, and the transcript and snapshot
+    of a session are deleted with it. With `SESSION_DATABASE_URL`,
+    sessions are stored in that database, with their large event payloads compressed and
+    their state changes stored as deltas.
+
     Returns:
         ADKSessionService: The configured session service instance.
 
@@ -27,18 +70,30 @@ def create_session_service() -> ADKSessionService:
     environment = settings.ENVIRONMENT.lower()
     logger.info(f'Initialising Session Service for environment `{environment}`')
 
-    if environment in ['staging', 'production']:
+    backend: BaseSessionService
+    if settings.SESSION_DATABASE_URL is not None:
+        logger.info('Using DatabaseSessionService.')
+        backend = create_database_session_service(settings.SESSION_DATABASE_URL)
+    elif environment in ['staging', 'production']:
         logger.info(
             f'Using VertexAiSessionService for GCP project `{settings.GOOGLE_CLOUD_PROJECT}` '
             f'and location `{settings.GOOGLE_CLOUD_LOCATION}`.'
         )
-        return VertexAiSessionService(
+        backend = VertexAiSessionService(
             project=settings.GOOGLE_CLOUD_PROJECT,
             location=settings.GOOGLE_CLOUD_LOCATION,
         )
-
-    logger.info(f'Using InMemorySessionService for `{environment}` environment.')
-    return InMemorySessionService()
+    else:
+        logger.info(f'Using InMemorySessionService for `{environment}` environment.')
+        backend = InMemorySessionService()
+
+    return ObservedSessionService(
+        backend,
+        listeners=[
+            TranscriptProjection(get_transcript_store()),
+            SessionSnapshotCleanup(get_session_snapshot_store()),
+        ],
+    )
 
 
 def get_session_service() -> ADKSessionService:
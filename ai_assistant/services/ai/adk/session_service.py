@@ -0,0 +1,266 @@
+"""
+ADK session service wrapper that publishes session changes to listeners.
+
+Derived read models (e.g. conversation transcripts) subscribe to this wrapper so that they
+are maintained incrementally as events are appended, instead of being rebuilt from the raw
+ADK event log on every read.
+
+A listener failing to handle a change is retried in the background, so that the agent turn
+appending the event is never delayed, up to `SESSION_LISTENER_MAX_ATTEMPTS` times. The listener
+is then told about the failure, e.g. to record the event for the read model to be repaired.
+The retries still pending at shutdown are cancelled and reported as failures. The retries and
+failures of every listener are reported by `/health/session-listeners`.
+"""
+
+import asyncio
+import functools
+import logging
+from abc import ABC
+from abc import abstractmethod
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Any
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.base_session_service import ListSessionsResponse
+
+from ai_assistant.common.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ListenerMetrics:
+    """
+    Notifications of a session listener, since the start of the process.
+    """
+
+    # Notifications that failed and were tried again
+    retries: int = 0
+    # Notifications that failed on every attempt
+    failures: int = 0
+
+
+_listener_metrics: dict[str, ListenerMetrics] = {}
+
+# The notifications being retried in the background
+_retries: set[asyncio.Task[None]] = set()
+
+
+class SessionEventListener(ABC):
+    """
+    Listener notified by `ObservedSessionService` whenever a session changes.
+    """
+
+    @abstractmethod
+    async def on_event_appended(self, session: Session, event: Event) -> None:
+        """
+        Handle an event that has been persisted to a session.
+
+        Args:
+            session: The session the event was appended to
+            event: The persisted (non-partial) event
+        """
+
+    async def on_session_deleted(self, app_name: str, user_id: str, session_id: str) -> None:
+        """
+        Handle a session that has been deleted.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the deleted session
+        """
+        return None
+
+    async def on_event_failed(self, session: Session, event: Event) -> None:
+        """
+        Handle an event that `on_event_appended` failed to handle on every attempt.
+
+        Args:
+            session: The session the event was appended to
+            event: The persisted (non-partial) event
+        """
+        return None
+
+
+class ObservedSessionService(BaseSessionService):
+    """
+    Session service that delegates to an ADK session service and notifies listeners.
+
+    Listener failures are retried in the background, then logged and never propagated, so a
+    broken read model can neither fail nor delay an agent turn. Read models that fall behind
+    can be rebuilt from the underlying service.
+    """
+
+    def __init__(
+        self,
+        session_service: BaseSessionService,
+        listeners: list[SessionEventListener] | None = None,
+    ) -> None:
+        """
+        Initialize the observed session service.
+
+        Args:
+            session_service: The underlying ADK session service
+            listeners: Listeners to notify about session changes
+        """
+        self.session_service = session_service
+        self.listeners = listeners or []
+
+    def add_listener(self, listener: SessionEventListener) -> None:
+        """
+        Register an additional listener.
+
+        Args:
+            listener: The listener to notify about session changes
+        """
+        self.listeners.append(listener)
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: dict[str, Any] | None = None,
+        session_id: str | None = None,
+    ) -> Session:
+        return await self.session_service.create_session(
+            app_name=app_name,
+            user_id=user_id,
+            state=state,
+            session_id=session_id,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: GetSessionConfig | None = None,
+    ) -> Session | None:
+        return await self.session_service.get_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            config=config,
+        )
+
+    async def list_sessions(
+        self,
+        *,
+        app_name: str,
+        user_id: str | None = None,
+    ) -> ListSessionsResponse:
+        return await self.session_service.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.session_service.delete_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+
+        for listener in self.listeners:
+            await _notify(
+                listener,
+                functools.partial(listener.on_session_deleted, app_name, user_id, session_id),
+                functools.partial(_session_deletion_failed, listener, session_id),
+            )
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await self.session_service.append_event(session=session, event=event)
+
+        # Partial (streaming) events are never persisted by ADK, so they are not published
+        if event.partial:
+            return event
+
+        for listener in self.listeners:
+            await _notify(
+                listener,
+                functools.partial(listener.on_event_appended, session, event),
+                functools.partial(_event_failed, listener, session, event),
+            )
+
+        return event
+
+
+def get_session_listener_metrics() -> dict[str, dict[str, int]]:
+    """
+    Get the notifications of the session listeners since the start of the process.
+
+    Returns:
+        dict[str, dict[str, int]]: The retried and failed notifications of every listener
+            that failed at least once, by listener class name
+    """
+    return {name: asdict(metrics) for name, metrics in _listener_metrics.items()}
+
+
+async def shutdown_session_listeners() -> None:
+    """
+    Cancel the notifications being retried, reporting them as failed to their listeners.
+    """
+    # Retries scheduled but not started yet would be cancelled without reporting their failure
+    await asyncio.sleep(0)
+    tasks = list(_retries)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _notify(
+    listener: SessionEventListener,
+    notify: Callable[[], Awaitable[None]],
+    failed: Callable[[], Awaitable[None]],
+) -> None:
+    try:
+        await notify()
+    except Exception:
+        logger.exception(f'{type(listener).__name__} failed on attempt 1')
+        task = asyncio.create_task(_retry(listener, notify, failed))
+        _retries.add(task)
+        task.add_done_callback(_retries.discard)
+
+
+async def _retry(
+    listener: SessionEventListener,
+    notify: Callable[[], Awaitable[None]],
+    failed: Callable[[], Awaitable[None]],
+) -> None:
+    name = type(listener).__name__
+    metrics = _listener_metrics.setdefault(name, ListenerMetrics())
+    handled = False
+    try:
+        for attempt in range(1, settings.SESSION_LISTENER_MAX_ATTEMPTS):
+            metrics.retries += 1
+            await asyncio.sleep(settings.SESSION_LISTENER_RETRY_SECONDS * 2 ** (attempt - 1))
+            try:
+                await notify()
+                handled = True
+                return
+            except Exception:
+                logger.exception(f'{name} failed on attempt {attempt + 1}')
+    finally:
+        # Also when cancelled at shutdown, so that the change is reported rather than lost
+        if not handled:
+            metrics.failures += 1
+            await failed()
+
+
+async def _event_failed(listener: SessionEventListener, session: Session, event: Event) -> None:
+    name = type(listener).__name__
+    logger.error(f'{name} failed to handle event {event.id} of session {session.id}')
+    try:
+        await listener.on_event_failed(session, event)
+    except Exception:
+        logger.exception(f'{name} failed to record the failure of event {event.id}')
+
+
+async def _session_deletion_failed(listener: SessionEventListener, session_id: str) -> None:
+    logger.error(f'{type(listener).__name__} failed to handle deletion of session {session_id}')
@@ -0,0 +1,204 @@
+"""
+Result cache of tools.
+
+Tools answer the same questions for many sessions, e.g. the weather in the same city, so
+`cached_tool` keeps the result of a tool for a time-to-live, keyed by its arguments with
+strings normalized (case and whitespace). Concurrent identical calls are coalesced: the
+first runs the tool and the others wait for its result, so that a popular query costs one
+call to the tool per time-to-live rather than one per session.
+
+Each cache holds at most `TOOL_CACHE_MAX_ENTRIES` results, evicting the least recently used.
+Errors are not cached. Caches live in the memory of the process.
+"""
+
+import asyncio
+import copy
+import functools
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Any
+from typing import ParamSpec
+from typing import TypeVar
+
+from ai_assistant.common.settings import settings
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec('P')
+T = TypeVar('T')
+
+
+@dataclass
+class ToolCacheMetrics:
+    """
+    Calls to a cached tool, since the start of the process.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    # Calls that waited for an identical call in flight
+    coalesced: int = 0
+
+
+_metrics: dict[str, ToolCacheMetrics] = {}
+
+
+class ToolCache:
+    """
+    The results of a tool, by their normalized arguments.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            name: The name of the tool
+            ttl_seconds: The time-to-live of a result
+            max_entries: The maximum number of results kept
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.metrics = _metrics.setdefault(name, ToolCacheMetrics())
+        # The results and when they expire, least recently used first
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task[Any]] = {}
+
+    async def get_or_call(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Get the result of a call from the cache, or make the call.
+
+        Args:
+            key: The normalized arguments of the call
+            call: Makes the call
+
+        Returns:
+            T: A copy of the result, which callers are free to modify
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.metrics.hits += 1
+                return copy.deepcopy(result)
+            del self._entries[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.metrics.coalesced += 1
+        else:
+            self.metrics.misses += 1
+            task = asyncio.ensure_future(self._call(key, call))
+            self._in_flight[key] = task
+
+        # A cancelled caller does not cancel the call that others wait for
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def clear(self) -> None:
+        """
+        Drop the cached results.
+        """
+        self._entries.clear()
+
+    async def _call(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        try:
+            result = await call()
+        finally:
+            del self._in_flight[key]
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result
+
+
+def cached_tool(
+    *,
+    ttl_seconds: float,
+    max_entries: int = settings.TOOL_CACHE_MAX_ENTRIES,
+) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """
+    Cache the results of an async tool function.
+
+    The wrapper keeps the name, docstring and signature of the function, from which ADK
+    `FunctionTool`s declare the tool to the model. With `TOOL_CACHE_ENABLED` off, the
+    function is returned as it is.
+
+    Example:
+        @cached_tool(ttl_seconds=600)
+        async def get_weather(location: str) -> dict[str, Any]: ...
+
+    Args:
+        ttl_seconds: The time-to-live of a result
+        max_entries: The maximum number of results kept
+
+    Returns:
+        Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]: The decorator
+    """
+
+    def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        if not settings.TOOL_CACHE_ENABLED:
+            return func
+
+        cache = ToolCache(func.__name__, ttl_seconds, max_entries)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            key = json.dumps(
+                {name: _normalize(value) for name, value in arguments.arguments.items()},
+                sort_keys=True,
+                default=str,
+            )
+            return await cache.get_or_call(key, lambda: func(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+def get_tool_cache_metrics() -> dict[str, dict[str, Any]]:
+    """
+    Get the calls to the cached tools since the start of the process.
+
+    Returns:
+        dict[str, dict[str, Any]]: The hits, misses, coalesced calls and hit ratio of every
+            cached tool, by tool name
+    """
+    report = {}
+    for name, metrics in _metrics.items():
+        calls = metrics.hits + metrics.misses + metrics.coalesced
+        report[name] = asdict(metrics) | {
+            'hit_ratio': (metrics.hits + metrics.coalesced) / calls if calls else None
+        }
+    return report
+
+
+def reset_tool_cache_metrics() -> None:
+    """
+    Reset the calls to the cached tools.
+    """
+    for metrics in _metrics.values():
+        metrics.hits = metrics.misses = metrics.coalesced = 0
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return ' '.join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [_normalize(item) for item in value]
+    return value
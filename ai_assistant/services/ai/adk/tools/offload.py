@@ -0,0 +1,255 @@
+"""
+Offloading of synchronous tools.
+
+ADK `FunctionTool`s call synchronous functions on the event loop, which serves every
+conversation of the worker: a tool blocking on an SDK call, or parsing for a second, stalls
+all of them. `function_tool` declares a function as a tool, running it in a thread pool if it
+is synchronous, and `offloaded_tool(cpu_bound=True)` runs the tools whose work holds the GIL
+in a process pool instead.
+
+Every tool has a pool of its own, of `TOOL_THREAD_POOL_MAX_WORKERS` or
+`TOOL_PROCESS_POOL_MAX_WORKERS` workers unless sized in `TOOL_POOL_MAX_WORKERS`, so that a slow
+tool only queues its own calls. Pools start on the first call of their tool. The time calls
+wait for a worker is reported by `/health/tool-pools`.
+"""
+
+import asyncio
+import functools
+import importlib
+import inspect
+import logging
+import multiprocessing
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+from typing import ParamSpec
+from typing import TypeVar
+
+from google.adk.tools import FunctionTool
+
+from ai_assistant.common.settings import settings
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec('P')
+T = TypeVar('T')
+
+
+@dataclass
+class ToolPoolMetrics:
+    """
+    Calls to an offloaded tool, since the start of the process.
+    """
+
+    calls: int = 0
+    # Calls submitted and not yet returned
+    in_flight: int = 0
+    # The time calls waited for a worker
+    queue_seconds_total: float = 0
+    queue_seconds_max: float = 0
+
+
+class ToolPool:
+    """
+    The workers running the calls of a synchronous tool.
+    """
+
+    def __init__(self, name: str, cpu_bound: bool, max_workers: int) -> None:
+        """
+        Initialize the pool. Its workers start on the first call.
+
+        Args:
+            name: The name of the tool
+            cpu_bound: Whether to run the tool in worker processes rather than threads
+            max_workers: The maximum number of calls running at once
+        """
+        self.name = name
+        self.cpu_bound = cpu_bound
+        self.max_workers = max_workers
+        self.metrics = ToolPoolMetrics()
+        self._executor: Executor | None = None
+
+    async def run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """
+        Run a call of the tool in a worker.
+
+        Args:
+            func: The tool function, a module-level function if the pool is CPU-bound
+            *args: The positional arguments of the call
+            **kwargs: The keyword arguments of the call
+
+        Returns:
+            T: The result of the call
+        """
+        if self._executor is None:
+            self._executor = self._create_executor()
+
+        if self.cpu_bound:
+            # Worker processes import the function by name, as the decorated one is not
+            # picklable
+            call = functools.partial(_timed, _call_tool, func.__module__, func.__qualname__)
+        else:
+            call = functools.partial(_timed, func)
+
+        self.metrics.calls += 1
+        self.metrics.in_flight += 1
+        submitted_at = time.monotonic()
+        try:
+            timed: tuple[float, T] = await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(call, *args, **kwargs)
+            )
+        finally:
+            self.metrics.in_flight -= 1
+
+        started_at, result = timed
+        queue_seconds = max(started_at - submitted_at, 0)
+        self.metrics.queue_seconds_total += queue_seconds
+        self.metrics.queue_seconds_max = max(self.metrics.queue_seconds_max, queue_seconds)
+        return result
+
+    def shutdown(self) -> None:
+        """
+        Stop the workers, cancelling the calls not started.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _create_executor(self) -> Executor:
+        logger.info(
+            f'Starting {self.max_workers} {"process" if self.cpu_bound else "thread"} '
+            f'workers for tool {self.name}'
+        )
+        if self.cpu_bound:
+            # Spawned rather than forked, as forking a process running threads can deadlock
+            # the children
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+
+
+_pools: dict[str, ToolPool] = {}
+
+
+def offloaded_tool(
+    *,
+    cpu_bound: bool = False,
+    max_workers: int | None = None,
+) -> Callable[[Callable[P, T]], Callable[P, Awaitable[T]]]:
+    """
+    Run a synchronous tool function in a pool of its own, off the event loop.
+
+    The wrapper is a coroutine function keeping the name, docstring and signature of the
+    function, from which ADK `FunctionTool`s declare the tool to the model.
+
+    Example:
+        @offloaded_tool(cpu_bound=True)
+        def parse_menu(pdf_url: str) -> dict[str, Any]: ...
+
+    Args:
+        cpu_bound: Whether to run the tool in worker processes rather than threads, for
+            tools holding the GIL. The function must then be module-level
+        max_workers: The maximum number of calls running at once, by default the size in
+            `TOOL_POOL_MAX_WORKERS` or of every thread or process pool
+
+    Returns:
+        Callable[[Callable[P, T]], Callable[P, Awaitable[T]]]: The decorator
+
+    Raises:
+        TypeError: If the function is a coroutine function, or a CPU-bound tool is not
+            module-level
+    """
+
+    def decorator(func: Callable[P, T]) -> Callable[P, Awaitable[T]]:
+        if inspect.iscoroutinefunction(func):
+            raise TypeError(f'{func.__name__} is a coroutine function, it runs on the event loop')
+        if cpu_bound and '<locals>' in func.__qualname__:
+            raise TypeError(f'{func.__name__} is a CPU-bound tool, it must be module-level')
+
+        default_workers = (
+            settings.TOOL_PROCESS_POOL_MAX_WORKERS
+            if cpu_bound
+            else settings.TOOL_THREAD_POOL_MAX_WORKERS
+        )
+        pool = ToolPool(
+            func.__name__,
+            cpu_bound=cpu_bound,
+            max_workers=max_workers
+            or settings.TOOL_POOL_MAX_WORKERS.get(func.__name__, default_workers),
+        )
+        _pools[func.__name__] = pool
+
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            return await pool.run(func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def function_tool(func: Callable[..., Any]) -> FunctionTool:
+    """
+    Declare a function as an ADK tool, running it in a thread pool if it is synchronous.
+
+    Args:
+        func: The tool function
+
+    Returns:
+        FunctionTool: The tool
+    """
+    if not inspect.iscoroutinefunction(func):
+        func = offloaded_tool()(func)
+    return FunctionTool(func)
+
+
+def get_tool_pool_metrics() -> dict[str, dict[str, Any]]:
+    """
+    Get the calls to the offloaded tools since the start of the process.
+
+    Returns:
+        dict[str, dict[str, Any]]: The pool, calls, calls in flight and time waited for a
+            worker of every offloaded tool, by tool name
+    """
+    report = {}
+    for name, pool in _pools.items():
+        metrics = pool.metrics
+        report[name] = {
+            'executor': 'process' if pool.cpu_bound else 'thread',
+            'max_workers': pool.max_workers,
+            'calls': metrics.calls,
+            'in_flight': metrics.in_flight,
+            'queue_seconds_mean': (
+                metrics.queue_seconds_total / metrics.calls if metrics.calls else None
+            ),
+            'queue_seconds_max': metrics.queue_seconds_max,
+        }
+    return report
+
+
+def shutdown_tool_pools() -> None:
+    """
+    Stop the workers of the offloaded tools.
+    """
+    for pool in _pools.values():
+        pool.shutdown()
+
+
+def _timed(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> tuple[float, T]:
+    # When the call started, on the monotonic clock of the host, shared by its processes
+    started_at = time.monotonic()
+    return started_at, func(*args, **kwargs)
+
+
+def _call_tool(module: str, qualname: str, /, *args: Any, **kwargs: Any) -> Any:
+    # In a worker process: the tool function, unwrapped from the decorators of its module
+    tool: Any = importlib.import_module(module)
+    for name in qualname.split('.'):
+        tool = getattr(tool, name)
+    return inspect.unwrap(tool)(*args, **kwargs)
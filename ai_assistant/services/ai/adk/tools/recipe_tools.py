@@ -1,6 +1,70 @@
+from collections.abc import Callable
 from typing import Any
 
+from ai_assistant.common.settings import settings
+from ai_assistant.services.ai.adk.tools.cache import cached_tool
+from ai_assistant.services.recipes.corpus import get_recipe_corpus
+from ai_assistant.services.recipes.ingredients import IngredientIndex
+from ai_assistant.services.recipes.ingredients import get_ingredient_index
 
+# Mock data, when no recipe corpus is configured - implement real recipe API
+_MOCK_RECIPES: dict[str, dict[str, Any]] = {
+    'pasta carbonara': {
+        'dish': 'Pasta Carbonara',
+        'ingredients': [
+            '400g spaghetti',
+            '200g pancetta or guanciale',
+            '4 large eggs',
+            '100g Pecorino Romano cheese',
+            'Black pepper',
+            'Salt',
+        ],
+        'instructions': [
+            'Cook pasta in salted boiling water until al dente',
+            'Fry pancetta until crispy',
+            'Mix eggs and grated cheese in a bowl',
+            'Drain pasta, reserving pasta water',
+            'Mix hot pasta with pancetta, then add egg mixture off heat',
+            'Add pasta water to reach desired consistency',
+            'Season with black pepper',
+        ],
+        'prep_time': '10 minutes',
+        'cook_time': '15 minutes',
+        'servings': 4,
+        'note': 'Mock data - implement real recipe API',
+    },
+    'chocolate chip cookies': {
+        'dish': 'Chocolate Chip Cookies',
+        'ingredients': [
+            '2 1/4 cups all-purpose flour',
+            '1 tsp baking soda',
+            '1 tsp salt',
+            '1 cup butter, softened',
+            '3/4 cup sugar',
+            '3/4 cup brown sugar',
+            '2 eggs',
+            '2 tsp vanilla extract',
+            '2 cups chocolate chips',
+        ],
+        'instructions': [
+            'Preheat oven to 375°F (190°C)',
+            'Mix flour, baking soda, and salt',
+            'Cream butter and sugars',
+            'Beat in eggs and vanilla',
+            'Gradually blend in flour mixture',
+            'Stir in chocolate chips',
+            'Drop spoonfuls onto baking sheet',
+            'Bake 9-11 minutes',
+        ],
+        'prep_time': '15 minutes',
+        'cook_time': '10 minutes',
+        'servings': 48,
+        'note': 'Mock data - implement real recipe API',
+    },
+}
+
+
+@cached_tool(ttl_seconds=settings.RECIPE_CACHE_TTL_SECONDS)
 async def get_recipe(dish_name: str) -> dict[str, Any]:
     """
     Get a recipe for a specific dish.
@@ -11,65 +75,85 @@ async def get_recipe(dish_name: str) -> dict[str, Any]:
     Returns:
         A dictionary containing recipe information including ingredients and instructions
     """
-    # Mock data - replace with real recipe API integration
-    recipes = {
-        'pasta carbonara': {
-            'dish': 'Pasta Carbonara',
-            'ingredients': [
-                '400g spaghetti',
-                '200g pancetta or guanciale',
-                '4 large eggs',
-                '100g Pecorino Romano cheese',
-                'Black pepper',
-                'Salt',
-            ],
-            'instructions': [
-                'Cook pasta in salted boiling water until al dente',
-                'Fry pancetta until crispy',
-                'Mix eggs and grated cheese in a bowl',
-                'Drain pasta, reserving pasta water',
-                'Mix hot pasta with pancetta, then add egg mixture off heat',
-                'Add pasta water to reach desired consistency',
-                'Season with black pepper',
-            ],
-            'prep_time': '10 minutes',
-            'cook_time': '15 minutes',
-            'servings': 4,
-            'note': 'Mock data - implement real recipe API',
-        },
-        'chocolate chip cookies': {
-            'dish': 'Chocolate Chip Cookies',
-            'ingredients': [
-                '2 1/4 cups all-purpose flour',
-                '1 tsp baking soda',
-                '1 tsp salt',
-                '1 cup butter, softened',
-                '3/4 cup sugar',
-                '3/4 cup brown sugar',
-                '2 eggs',
-                '2 tsp vanilla extract',
-                '2 cups chocolate chips',
-            ],
-            'instructions': [
-                'Preheat oven to 375°F (190°C)',
-                'Mix flour, baking soda, and salt',
-                'Cream butter and sugars',
-                'Beat in eggs and vanilla',
-                'Gradually blend in flour mixture',
-                'Stir in chocolate chips',
-                'Drop spoonfuls onto baking sheet',
-                'Bake 9-11 minutes',
-            ],
-            'prep_time': '15 minutes',
-            'cook_time': '10 minutes',
-            'servings': 48,
-            'note': 'Mock data - implement real recipe API',
-        },
+    corpus = get_recipe_corpus()
+    if corpus is None:
+        return _get_mock_recipe(dish_name)
+
+    recipe = corpus.get(dish_name)
+    if recipe is not None:
+        return recipe
+
+    # Take the most similar dish for a misspelled or partial name
+    matches = corpus.search(dish_name)
+    if matches and matches[0].similarity >= settings.RECIPE_CORPUS_MATCH_SIMILARITY:
+        return corpus.recipe(matches[0].index)
+
+    return {
+        'dish': dish_name,
+        'error': f'Recipe for "{dish_name}" not found',
+        'suggestions': [match.dish for match in matches],
+    }
+
+
+@cached_tool(ttl_seconds=settings.RECIPE_CACHE_TTL_SECONDS)
+async def find_recipes_by_ingredients(ingredients: list[str]) -> dict[str, Any]:
+    """
+    Find recipes to cook with some ingredients, those using the most of them first.
+
+    Args:
+        ingredients: The ingredients at hand, e.g. ["eggs", "pancetta", "cheese"]
+
+    Returns:
+        A dictionary containing the dishes found, with the ingredients each uses and the
+        number of other ingredients each needs
+    """
+    corpus = get_recipe_corpus()
+    index = get_ingredient_index()
+    recipe: Callable[[int], dict[str, Any]]
+    if corpus is None or index is None:
+        index = _get_mock_ingredient_index()
+        recipe = list(_MOCK_RECIPES.values()).__getitem__
+    else:
+        recipe = corpus.recipe
+
+    matches = index.search(ingredients)
+    if not matches:
+        return {
+            'ingredients': ingredients,
+            'error': 'No recipe found with these ingredients',
+            'recipes': [],
+        }
+
+    return {
+        'ingredients': ingredients,
+        'recipes': [
+            {
+                'dish': recipe(match.index)['dish'],
+                'matched_ingredients': list(match.matched),
+                'missing_ingredients': match.missing,
+            }
+            for match in matches
+        ],
     }
 
+
+_mock_ingredient_index: IngredientIndex | None = None
+
+
+def _get_mock_ingredient_index() -> IngredientIndex:
+    global _mock_ingredient_index
+
+    if _mock_ingredient_index is None:
+        _mock_ingredient_index = IngredientIndex(
+            recipe['ingredients'] for recipe in _MOCK_RECIPES.values()
+        )
+
+    return _mock_ingredient_index
+
+
+def _get_mock_recipe(dish_name: str) -> dict[str, Any]:
     # Find matching recipe (case-insensitive)
-    dish_lower = dish_name.lower()
-    recipe = recipes.get(dish_lower)
+    recipe = _MOCK_RECIPES.get(dish_name.lower())
 
     if recipe:
         return recipe
@@ -79,5 +163,5 @@ async def get_recipe(dish_name: str) -> dict[str, Any]:
         'dish': dish_name,
         'error': f'Recipe for "{dish_name}" not found',
         'note': 'Mock data - implement real recipe API',
-        'suggestions': list(recipes.keys()),
+        'suggestions': list(_MOCK_RECIPES.keys()),
     }
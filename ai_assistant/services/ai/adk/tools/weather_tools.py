@@ -2,9 +2,13 @@ import asyncio
 import logging
 from typing import Any
 
+from ai_assistant.common.settings import settings
+from ai_assistant.services.ai.adk.tools.cache import cached_tool
+
 logger = logging.getLogger(__name__)
 
 
+@cached_tool(ttl_seconds=settings.WEATHER_CACHE_TTL_SECONDS)
 async def get_weather(location: str) -> dict[str, Any]:
     """
     Get weather information for a given location.
@@ -0,0 +1,261 @@
+"""
+Asynchronous chat jobs.
+
+A job runs a non-streaming chat turn in a managed background executor, independently of the
+request that submitted it: the client gets a job ID at once and can poll, long-poll or
+subscribe to the outcome, and the turn finishes even if the client disconnects. Finished jobs
+are kept for `CHAT_JOB_RETENTION_SECONDS`.
+
+At most `CHAT_JOB_CONCURRENCY` jobs run at once, and at most `CHAT_JOB_MAX_QUEUED` wait for a
+worker; further submissions are rejected rather than queued without bound. Jobs live in the
+memory of the process that accepted them.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timezone
+from typing import Literal
+
+from ai_assistant.common.settings import settings
+from ai_assistant.domain import ChatTurn
+from ai_assistant.domain import Content
+from ai_assistant.exceptions import TooManyRequestsException
+from ai_assistant.services.ai.service import AIService
+
+logger = logging.getLogger(__name__)
+
+ChatJobStatus = Literal['queued', 'running', 'succeeded', 'failed']
+
+
+@dataclass
+class ChatJob:
+    """
+    A chat turn submitted for background execution.
+    """
+
+    turn: ChatTurn
+    ai_service: AIService
+    job_id: uuid.UUID = field(default_factory=uuid.uuid4)
+    status: ChatJobStatus = 'queued'
+    result: Content | None = None
+    error: str | None = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: datetime | None = None
+
+    _finished_monotonic: float | None = field(default=None, repr=False)
+    _changed: asyncio.Condition = field(default_factory=asyncio.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('succeeded', 'failed')
+
+    async def wait(self, timeout: float) -> None:
+        """
+        Wait until the job is done, or until the timeout expires.
+
+        Args:
+            timeout: The maximum time to wait, in seconds
+        """
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait_for(lambda: self.done), timeout)
+            except TimeoutError:
+                pass
+
+    async def watch(self) -> AsyncGenerator[ChatJobStatus, None]:
+        """
+        Follow the status of the job, starting with the current one, until it is done.
+
+        Yields:
+            ChatJobStatus: Every status the job goes through
+        """
+        seen = self.status
+        yield seen
+
+        while not self.done:
+            async with self._changed:
+                while self.status == seen:
+                    await self._changed.wait()
+                seen = self.status
+            yield seen
+
+    async def _set_status(self, status: ChatJobStatus) -> None:
+        async with self._changed:
+            self.status = status
+            if self.done:
+                self.finished_at = datetime.now(timezone.utc)
+                self._finished_monotonic = time.monotonic()
+            self._changed.notify_all()
+
+
+class ChatJobManager:
+    """
+    Runs chat jobs on a fixed pool of background workers.
+
+    Example:
+        job = manager.submit(ai_service, turn)
+        ...
+        job = manager.get(job_id)
+        await job.wait(timeout=30)
+    """
+
+    def __init__(
+        self,
+        concurrency: int = settings.CHAT_JOB_CONCURRENCY,
+        max_queued: int = settings.CHAT_JOB_MAX_QUEUED,
+        retention: float = settings.CHAT_JOB_RETENTION_SECONDS,
+    ) -> None:
+        """
+        Initialize the job manager. Workers are started on the first submission.
+
+        Args:
+            concurrency: The number of jobs run at once
+            max_queued: The maximum number of jobs waiting for a worker
+            retention: How long finished jobs are kept, in seconds
+        """
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.retention = retention
+
+        self._jobs: dict[uuid.UUID, ChatJob] = {}
+        self._queue: asyncio.Queue[ChatJob] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+
+    def submit(self, ai_service: AIService, turn: ChatTurn) -> ChatJob:
+        """
+        Submit a chat turn for background execution.
+
+        Args:
+            ai_service: The AI service to run the turn with
+            turn: The chat turn to run
+
+        Returns:
+            ChatJob: The queued job
+
+        Raises:
+            TooManyRequestsException: If the queue of pending jobs is full
+        """
+        self._evict_expired()
+        queue = self._ensure_workers()
+
+        job = ChatJob(turn=turn, ai_service=ai_service)
+        try:
+            queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise TooManyRequestsException(
+                f'Too many pending chat jobs (limit is {self.max_queued})'
+            ) from None
+
+        self._jobs[job.job_id] = job
+        logger.info(f'Queued chat job {job.job_id} for session {turn.session_id}')
+        return job
+
+    def get(self, job_id: uuid.UUID) -> ChatJob | None:
+        """
+        Get a pending, running or retained job.
+
+        Args:
+            job_id: The ID of the job
+
+        Returns:
+            ChatJob | None: The job, or None if it is unknown or has expired
+        """
+        self._evict_expired()
+        return self._jobs.get(job_id)
+
+    async def shutdown(self) -> None:
+        """
+        Stop the workers. Jobs still running are cancelled and marked as failed.
+        """
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+        self._workers = []
+        self._queue = None
+
+        for job in self._jobs.values():
+            if not job.done:
+                job.error = 'The server shut down before the job completed'
+                await job._set_status('failed')
+
+    def _ensure_workers(self) -> asyncio.Queue[ChatJob]:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._workers = [
+                asyncio.create_task(self._work(self._queue)) for _ in range(self.concurrency)
+            ]
+            logger.info(f'Started {self.concurrency} chat job workers')
+
+        return self._queue
+
+    async def _work(self, queue: asyncio.Queue[ChatJob]) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                await self._run(job)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: ChatJob) -> None:
+        await job._set_status('running')
+        started_at = time.perf_counter()
+
+        try:
+            job.result = await job.ai_service.run(
+                session_id=job.turn.session_id,
+                user_message=job.turn.message,
+                user_id=job.turn.user_id,
+            )
+            await job._set_status('succeeded')
+
+        except Exception as e:
+            logger.error(f'Chat job {job.job_id} failed: {e}')
+            job.error = str(e) or type(e).__name__
+            await job._set_status('failed')
+
+        logger.info(
+            f'Chat job {job.job_id} {job.status} in {time.perf_counter() - started_at:.3f}s'
+        )
+
+    def _evict_expired(self) -> None:
+        expires_before = time.monotonic() - self.retention
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job._finished_monotonic is not None and job._finished_monotonic < expires_before
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+_chat_job_manager: ChatJobManager | None = None
+
+
+def get_chat_job_manager() -> ChatJobManager:
+    """
+    Get the chat job manager, initializing it lazily on first access.
+
+    Returns:
+        ChatJobManager: The singleton chat job manager instance.
+    """
+    global _chat_job_manager
+
+    if _chat_job_manager is None:
+        _chat_job_manager = ChatJobManager()
+
+    return _chat_job_manager
+
+
+async def shutdown_chat_job_manager() -> None:
+    """
+    Stop the chat job manager, if it was started.
+    """
+    if _chat_job_manager is not None:
+        await _chat_job_manager.shutdown()
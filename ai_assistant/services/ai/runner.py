@@ -5,6 +5,7 @@ This layer sits between AIService and ADK, responsible for:
     1. Running the ADK runner
     2. Processing raw ADK events through agent-specific processors
     3. Yielding processed Content objects
+    4. Snapshotting long sessions in the background after a turn (`SESSION_SNAPSHOTS_ENABLED`)
 """
 
 import logging
@@ -12,8 +13,10 @@ import uuid
 from collections.abc import AsyncGenerator
 
 from google.adk.agents.run_config import StreamingMode
+from google.adk.apps.llm_event_summarizer import LlmEventSummarizer
 from google.adk.runners import RunConfig
 from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService
 from google.genai.types import Content as ADKContent
 from google.genai.types import Part
 
@@ -22,6 +25,8 @@ from ai_assistant.domain import Content
 from ai_assistant.services.ai.adk.agents.orchestrator.agent import orchestrator_agent
 from ai_assistant.services.ai.adk.session_factory import ADKSessionService
 from ai_assistant.services.ai.processors.registry import AgentProcessorRegistry
+from ai_assistant.services.session.snapshot import SnapshotSessionService
+from ai_assistant.services.session.snapshot import get_session_snapshot_store
 
 logger = logging.getLogger(__name__)
 
@@ -57,20 +62,28 @@ class AgentRunner:
         self.session_service = session_service
         self.processor_registry = processor_registry or AgentProcessorRegistry()
         self._adk_runner: Runner | None = None
+        self._snapshot_service: SnapshotSessionService | None = None
 
     def _get_adk_runner(self) -> Runner:
         """
         Get or create the ADK Runner instance.
 
+        With `SESSION_SNAPSHOTS_ENABLED`, the runner reads sessions from their latest
+        snapshot rather than from their first event.
+
         Returns:
             Runner: Configured ADK Runner
         """
         if self._adk_runner is None:
             logger.debug('Initializing ADK Runner with orchestrator agent...')
+            session_service: BaseSessionService = self.session_service
+            if settings.SESSION_SNAPSHOTS_ENABLED:
+                self._snapshot_service = get_snapshot_session_service(self.session_service)
+                session_service = self._snapshot_service
             self._adk_runner = Runner(
                 agent=orchestrator_agent,
                 app_name=settings.APP_NAME,
-                session_service=self.session_service,
+                session_service=session_service,
             )
             logger.info(f'Initialized ADK Runner for app={settings.APP_NAME}')
 
@@ -126,6 +139,7 @@ class AgentRunner:
                     )
                     yield content
 
+        self._schedule_snapshot(session_id, user_id)
         logger.debug(f'Agent stream completed for session {session_id}')
 
     async def run(
@@ -169,5 +183,54 @@ class AgentRunner:
         if final_message is None:
             raise RuntimeError('No final response from agent')
 
+        self._schedule_snapshot(session_id, user_id)
         logger.debug(f'Agent run completed for session {session_id}')
         return final_message
+
+    def _schedule_snapshot(self, session_id: uuid.UUID, user_id: uuid.UUID) -> None:
+        """
+        Snapshot a session in the background after a turn, if the turn made it long enough.
+
+        The response is not held back by the summarization, and a failure is logged rather
+        than raised. The snapshots still running are cancelled at shutdown.
+
+        Args:
+            session_id: Conversation session ID
+            user_id: User ID
+        """
+        if self._snapshot_service is not None:
+            self._snapshot_service.schedule_snapshot(
+                app_name=settings.APP_NAME, user_id=str(user_id), session_id=str(session_id)
+            )
+
+
+_snapshot_session_service: SnapshotSessionService | None = None
+
+
+def get_snapshot_session_service(session_service: ADKSessionService) -> SnapshotSessionService:
+    """
+    Get the snapshot session service over a session service, initializing it lazily on first
+    access.
+
+    The runners of every request share it, so that the snapshots due after a turn are those
+    of the sessions loaded by the turn, whichever runner took it.
+
+    Args:
+        session_service: The ADK session service the snapshots are taken of
+
+    Returns:
+        SnapshotSessionService: The singleton snapshot session service instance.
+    """
+    global _snapshot_session_service
+
+    if (
+        _snapshot_session_service is None
+        or _snapshot_session_service.session_service is not session_service
+    ):
+        _snapshot_session_service = SnapshotSessionService(
+            session_service,
+            get_session_snapshot_store(),
+            LlmEventSummarizer(llm=orchestrator_agent.canonical_model),
+        )
+
+    return _snapshot_session_service
@@ -0,0 +1,344 @@
+"""
+Replayable agent runs, so that a dropped stream can be resumed instead of rerun.
+
+A run executes an agent stream in a background task that is independent of the client
+connection, and records every produced `Content` with a monotonically increasing sequence
+number in a bounded replay buffer. Any number of subscribers can follow a run from any
+sequence number that is still buffered. Finished runs are kept for `STREAM_REPLAY_TTL_SECONDS`
+so that a client reconnecting right after the end of a run still gets the missing frames.
+
+Runs live in the memory of the process that started them: resuming requires the reconnect to
+reach the same instance (e.g. session affinity on the load balancer). Expired runs are evicted
+every `STREAM_REPLAY_EVICTION_INTERVAL_SECONDS` while the registry holds any, and the runs
+still going when the application shuts down are cancelled.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
+
+from ai_assistant.common.settings import settings
+from ai_assistant.domain import Content
+from ai_assistant.exceptions import NotFoundException
+
+logger = logging.getLogger(__name__)
+
+
+def format_event_id(run_id: str, seq: int) -> str:
+    """
+    Format the SSE event ID of a frame of a run.
+
+    Args:
+        run_id: The ID of the run
+        seq: The sequence number of the frame within the run
+
+    Returns:
+        str: The event ID, `<run_id>.<seq>`
+    """
+    return f'{run_id}.{seq}'
+
+
+def parse_event_id(event_id: str) -> tuple[str, int] | None:
+    """
+    Parse an SSE event ID produced by `format_event_id`.
+
+    Args:
+        event_id: The event ID, e.g. from a `Last-Event-ID` header
+
+    Returns:
+        tuple[str, int] | None: The run ID and sequence number, or None if malformed
+    """
+    run_id, _, seq = event_id.strip().rpartition('.')
+    if not run_id or not seq.isdigit():
+        return None
+    return run_id, int(seq)
+
+
+class StreamRun:
+    """
+    An agent stream running in the background, with a replay buffer of its frames.
+    """
+
+    def __init__(
+        self,
+        session_id: uuid.UUID,
+        user_id: uuid.UUID,
+        max_frames: int = settings.STREAM_REPLAY_MAX_FRAMES,
+    ) -> None:
+        """
+        Initialize the run.
+
+        Args:
+            session_id: The ID of the session the run belongs to
+            user_id: The owner of the session
+            max_frames: The maximum number of frames kept for replay
+        """
+        self.run_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.user_id = user_id
+        self.done = False
+        self.error: str | None = None
+        self.finished_at: float | None = None
+
+        self._frames: deque[Content] = deque(maxlen=max_frames)
+        # Sequence number of the next frame, frames are numbered from 1
+        self._next_seq = 1
+        self._changed = asyncio.Condition()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def last_seq(self) -> int:
+        """The sequence number of the latest frame, 0 if there is none yet."""
+        return self._next_seq - 1
+
+    def is_buffered(self, after: int) -> bool:
+        """
+        Check whether the frames following a given frame are all still buffered.
+
+        Args:
+            after: The sequence number of the last frame already received
+
+        Returns:
+            bool: Whether the run can be followed from `after`
+        """
+        return after + 1 >= self._next_seq - len(self._frames)
+
+    def start(self, stream: AsyncIterator[Content]) -> None:
+        """
+        Start consuming the agent stream in the background.
+
+        Args:
+            stream: The agent stream to run
+        """
+        self._task = asyncio.create_task(self._consume(stream))
+
+    async def cancel(self) -> None:
+        """
+        Cancel the run if it is still going, ending it with an error for its subscribers.
+        """
+        if self._task is None or self._task.done():
+            return
+
+        self.error = 'The server shut down before the run completed'
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+        # A task cancelled before it started never ran the `finally` of `_consume`
+        async with self._changed:
+            if not self.done:
+                self.done = True
+                self.finished_at = time.monotonic()
+                self._changed.notify_all()
+
+    async def subscribe(self, after: int = 0) -> AsyncGenerator[tuple[int, Content], None]:
+        """
+        Follow the run from a given frame, replaying the buffered frames first.
+
+        The iteration ends when the run is done; check `error` afterwards.
+
+        Args:
+            after: The sequence number of the last frame already received
+
+        Yields:
+            tuple[int, Content]: The sequence number and content of each following frame
+
+        Raises:
+            NotFoundException: If the frames following `after` are no longer buffered
+        """
+        async for batch in self.subscribe_batches(after):
+            for frame in batch:
+                yield frame
+
+    async def subscribe_batches(
+        self,
+        after: int = 0,
+    ) -> AsyncGenerator[list[tuple[int, Content]], None]:
+        """
+        Like `subscribe`, but yields all the frames available at once together, so that a
+        subscriber can write (and flush) a burst of frames in one go.
+
+        Args:
+            after: The sequence number of the last frame already received
+
+        Yields:
+            list[tuple[int, Content]]: The next non-empty batch of consecutive frames
+
+        Raises:
+            NotFoundException: If the frames following `after` are no longer buffered
+        """
+        while True:
+            async with self._changed:
+                while after >= self.last_seq and not self.done:
+                    await self._changed.wait()
+
+                if not self.is_buffered(after):
+                    raise NotFoundException(
+                        f'Frames after {after} of run {self.run_id} are no longer available'
+                    )
+
+                first_seq = self._next_seq - len(self._frames)
+                start = after + 1 - first_seq
+                batch = [(first_seq + i, self._frames[i]) for i in range(start, len(self._frames))]
+                done = self.done
+
+            if batch:
+                after = batch[-1][0]
+                yield batch
+
+            if done and after >= self.last_seq:
+                return
+
+    async def _consume(self, stream: AsyncIterator[Content]) -> None:
+        try:
+            async for content in stream:
+                async with self._changed:
+                    self._frames.append(content)
+                    self._next_seq += 1
+                    self._changed.notify_all()
+
+        except Exception as e:
+            logger.error(f'Error during run {self.run_id} for session {self.session_id}: {e}')
+            self.error = str(e)
+
+        finally:
+            async with self._changed:
+                self.done = True
+                self.finished_at = time.monotonic()
+                self._changed.notify_all()
+
+            logger.info(f'Run {self.run_id} finished after {self.last_seq} frames')
+
+
+class StreamRunRegistry:
+    """
+    Registry of the replayable runs of this process.
+
+    Example:
+        run = registry.start(session_id, user_id, ai_service.run_stream(...))
+        async for seq, content in run.subscribe():
+            ...
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.STREAM_REPLAY_TTL_SECONDS,
+        max_frames: int = settings.STREAM_REPLAY_MAX_FRAMES,
+        eviction_interval: float = settings.STREAM_REPLAY_EVICTION_INTERVAL_SECONDS,
+    ) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            ttl: How long finished runs are kept for replay, in seconds
+            max_frames: The maximum number of frames kept for replay per run
+            eviction_interval: The time between evictions of the expired runs, in seconds
+        """
+        self.ttl = ttl
+        self.max_frames = max_frames
+        self.eviction_interval = eviction_interval
+        self._runs: dict[str, StreamRun] = {}
+        self._evictor: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def start(
+        self,
+        session_id: uuid.UUID,
+        user_id: uuid.UUID,
+        stream: AsyncIterator[Content],
+    ) -> StreamRun:
+        """
+        Start a replayable run of an agent stream.
+
+        Args:
+            session_id: The ID of the session the run belongs to
+            user_id: The owner of the session
+            stream: The agent stream to run
+
+        Returns:
+            StreamRun: The started run
+        """
+        self._evict_expired()
+
+        run = StreamRun(session_id, user_id, max_frames=self.max_frames)
+        self._runs[run.run_id] = run
+        run.start(stream)
+
+        # Without requests, expired runs would otherwise keep their frames until the next one
+        if self._evictor is None:
+            self._evictor = asyncio.create_task(self._evict_periodically())
+
+        logger.debug(f'Started run {run.run_id} for session {session_id}')
+        return run
+
+    def get(self, run_id: str) -> StreamRun | None:
+        """
+        Get a running or recently finished run.
+
+        Args:
+            run_id: The ID of the run
+
+        Returns:
+            StreamRun | None: The run, or None if it is unknown or has expired
+        """
+        self._evict_expired()
+        return self._runs.get(run_id)
+
+    async def shutdown(self) -> None:
+        """
+        Stop evicting the expired runs and cancel the runs still going.
+        """
+        if self._evictor is not None:
+            self._evictor.cancel()
+            await asyncio.gather(self._evictor, return_exceptions=True)
+            self._evictor = None
+
+        await asyncio.gather(*(run.cancel() for run in self._runs.values()))
+
+    async def _evict_periodically(self) -> None:
+        # Stops once no run is left, the next run starting it again
+        while self._runs:
+            await asyncio.sleep(self.eviction_interval)
+            self._evict_expired()
+        self._evictor = None
+
+    def _evict_expired(self) -> None:
+        expires_before = time.monotonic() - self.ttl
+        expired = [
+            run_id
+            for run_id, run in self._runs.items()
+            if run.finished_at is not None and run.finished_at < expires_before
+        ]
+        for run_id in expired:
+            del self._runs[run_id]
+
+
+_stream_run_registry: StreamRunRegistry | None = None
+
+
+def get_stream_run_registry() -> StreamRunRegistry:
+    """
+    Get the run registry, initializing it lazily on first access.
+
+    Returns:
+        StreamRunRegistry: The singleton run registry instance.
+    """
+    global _stream_run_registry
+
+    if _stream_run_registry is None:
+        _stream_run_registry = StreamRunRegistry()
+
+    return _stream_run_registry
+
+
+async def shutdown_stream_run_registry() -> None:
+    """
+    Cancel the runs still going, if the run registry was started.
+    """
+    if _stream_run_registry is not None:
+        await _stream_run_registry.shutdown()
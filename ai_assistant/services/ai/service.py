@@ -1,16 +1,33 @@
+import asyncio
 import logging
+import time
 import uuid
 from collections.abc import AsyncGenerator
 
 from langfuse import observe
 
 from ai_assistant.common.clients.langfuse import get_langfuse_client
+from ai_assistant.common.settings import settings
+from ai_assistant.domain import ChatTurn
 from ai_assistant.domain import Content
 from ai_assistant.services.ai.adk.session_factory import ADKSessionService
 from ai_assistant.services.ai.runner import AgentRunner
+from ai_assistant.services.session.bulk import BulkResult
+from ai_assistant.services.session.bulk import iter_bounded
 
 logger = logging.getLogger(__name__)
 
+_batch_semaphore: asyncio.Semaphore | None = None
+
+
+def _get_batch_semaphore() -> asyncio.Semaphore:
+    global _batch_semaphore
+
+    if _batch_semaphore is None:
+        _batch_semaphore = asyncio.Semaphore(settings.CHAT_BATCH_MAX_CONCURRENCY)
+
+    return _batch_semaphore
+
 
 class AIService:
     def __init__(
@@ -100,3 +117,44 @@ class AIService:
         )
 
         logger.debug(f'Stream completed for session {session_id}')
+
+    async def run_batch(
+        self,
+        turns: list[ChatTurn],
+        concurrency: int = settings.CHAT_BATCH_CONCURRENCY,
+    ) -> AsyncGenerator[BulkResult[Content], None]:
+        """
+        Generate AI responses (non-streaming) for many independent turns concurrently.
+
+        At most `concurrency` turns of the batch run at once, and at most
+        `CHAT_BATCH_MAX_CONCURRENCY` batch turns run at once in the whole process, however
+        many batches are running, so batches cannot starve the interactive endpoints.
+
+        Args:
+            turns: The turns to run
+            concurrency: The maximum number of concurrent turns of this batch
+
+        Yields:
+            BulkResult[Content]: The response (or error) of each turn, in completion order
+        """
+        logger.info(f'Processing batch of {len(turns)} turns')
+        semaphore = _get_batch_semaphore()
+        started_at = time.perf_counter()
+        failed = 0
+
+        async def run_turn(turn: ChatTurn) -> Content:
+            async with semaphore:
+                return await self.run(
+                    session_id=turn.session_id,
+                    user_message=turn.message,
+                    user_id=turn.user_id,
+                )
+
+        async for result in iter_bounded(turns, run_turn, concurrency):
+            failed += not result.ok
+            yield result
+
+        logger.info(
+            f'Batch of {len(turns)} turns completed in '
+            f'{time.perf_counter() - started_at:.3f}s ({failed} failed)'
+        )
@@ -0,0 +1,361 @@
+"""
+Memory-mapped recipe corpus.
+
+A corpus is a single packed file (see `pack_recipe_corpus`) holding the recipes, as JSON,
+and the indexes to find them by dish name. It is memory-mapped read-only, so the API
+workers of a host share one copy of it in the page cache, and a lookup only reads the pages
+it touches, whatever the size of the corpus.
+
+Dish names are normalized (case, punctuation and whitespace) and looked up by binary search
+over the names in sorted order. Names that do not match exactly are matched approximately,
+by the trigrams they share with the names of the corpus, like `pg_trgm`: the similarity of
+two names is the number of trigrams they share over the number of distinct trigrams of
+both. The candidates are the recipes in the rarest posting lists of the trigrams of a name,
+up to `RECIPE_CORPUS_MAX_POSTINGS` postings, and only those sharing the most trigrams with
+it are scored: the cost of a search is bounded whatever the size of the corpus, at the price
+of missing the names that only share common trigrams (e.g. of "chicken") with it.
+
+File layout, all integers little-endian and sections aligned on 8 bytes:
+
+    header            magic, recipe count, trigram count, start and end of every section
+    record_offsets    u64[n + 1], the start of every recipe in `records`
+    records           the recipes, as JSON
+    name_offsets      u64[n + 1], the start of every normalized name in `names`
+    names             the normalized names, as UTF-8
+    name_order        u32[n], the recipes by normalized name
+    trigram_keys      u64[m], the trigrams of the corpus, sorted
+    posting_offsets   u64[m + 1], the start of the postings of every trigram in `postings`
+    postings          u32[], the recipes of every trigram, sorted
+"""
+
+import bisect
+import heapq
+import json
+import logging
+import mmap
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ai_assistant.common.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'RCP\x01'
+
+_SECTIONS = (
+    'record_offsets',
+    'records',
+    'name_offsets',
+    'names',
+    'name_order',
+    'trigram_keys',
+    'posting_offsets',
+    'postings',
+)
+_HEADER = struct.Struct(f'<4sII{2 * len(_SECTIONS)}Q')
+
+_NON_ALPHANUMERIC = re.compile(r'[\W_]+')
+
+# Candidates scored per requested match, among those sharing the most trigrams with the name
+_CANDIDATES_PER_MATCH = 4
+
+
+@dataclass(frozen=True)
+class RecipeMatch:
+    """
+    A recipe of the corpus whose dish name is similar to a searched name.
+    """
+
+    index: int
+    dish: str
+    # The trigrams shared by the names over the distinct trigrams of both, from 0 to 1
+    similarity: float
+
+
+def normalize_dish_name(name: str) -> str:
+    """
+    Normalize a dish name: case-folded, with words separated by single spaces.
+
+    Args:
+        name: The dish name
+
+    Returns:
+        str: The normalized name
+    """
+    return ' '.join(_NON_ALPHANUMERIC.sub(' ', name).casefold().split())
+
+
+def trigrams(name: str) -> set[str]:
+    """
+    Get the distinct trigrams of a normalized name, padded so that short names have some.
+
+    Args:
+        name: The normalized name
+
+    Returns:
+        set[str]: The trigrams
+    """
+    if not name:
+        return set()
+
+    padded = f'  {name} '
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def pack_recipe_corpus(recipes: Iterable[dict[str, Any]], path: Path) -> int:
+    """
+    Pack recipes into a corpus file.
+
+    Args:
+        recipes: The recipes, each with its dish name under `dish`
+        path: The corpus file to write
+
+    Returns:
+        int: The number of recipes packed
+    """
+    records = bytearray()
+    record_offsets = array('Q', [0])
+    names = bytearray()
+    name_offsets = array('Q', [0])
+    postings_by_trigram: defaultdict[int, array[int]] = defaultdict(lambda: array('I'))
+
+    for index, recipe in enumerate(recipes):
+        name = normalize_dish_name(recipe['dish'])
+        records += json.dumps(recipe, ensure_ascii=False, separators=(',', ':')).encode()
+        record_offsets.append(len(records))
+        names += name.encode()
+        name_offsets.append(len(names))
+
+        for trigram in trigrams(name):
+            postings_by_trigram[_trigram_key(trigram)].append(index)
+
+    count = len(record_offsets) - 1
+    name_order = array(
+        'I',
+        sorted(range(count), key=lambda i: names[name_offsets[i] : name_offsets[i + 1]]),
+    )
+    trigram_keys = array('Q', sorted(postings_by_trigram))
+    posting_offsets = array('Q', [0])
+    postings = array('I')
+    for key in trigram_keys:
+        postings.extend(postings_by_trigram[key])
+        posting_offsets.append(len(postings))
+
+    sections: dict[str, bytes] = {
+        'record_offsets': _little_endian(record_offsets),
+        'records': bytes(records),
+        'name_offsets': _little_endian(name_offsets),
+        'names': bytes(names),
+        'name_order': _little_endian(name_order),
+        'trigram_keys': _little_endian(trigram_keys),
+        'posting_offsets': _little_endian(posting_offsets),
+        'postings': _little_endian(postings),
+    }
+
+    bounds = []
+    position = _HEADER.size
+    for section in _SECTIONS:
+        position = _align(position)
+        bounds += [position, position + len(sections[section])]
+        position += len(sections[section])
+
+    with path.open('wb') as file:
+        file.write(_HEADER.pack(MAGIC, count, len(trigram_keys), *bounds))
+        for section, start in zip(_SECTIONS, bounds[::2], strict=True):
+            file.write(b'\0' * (start - file.tell()))
+            file.write(sections[section])
+
+    logger.info(f'Packed {count} recipes and {len(trigram_keys)} trigrams into {path}')
+    return count
+
+
+class RecipeCorpus:
+    """
+    A packed recipe corpus, memory-mapped.
+
+    Example:
+        corpus = RecipeCorpus(Path('recipes.corpus'))
+        recipe = corpus.get('Pasta carbonara')
+        matches = corpus.search('carbonara')
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Open a corpus file.
+
+        Args:
+            path: The corpus file, written by `pack_recipe_corpus`
+
+        Raises:
+            ValueError: If the file is not a recipe corpus
+        """
+        if sys.byteorder != 'little':
+            raise ValueError('Recipe corpora are only read on little-endian hosts')
+
+        with path.open('rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._count, trigram_count, *bounds = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a recipe corpus')
+
+        view = memoryview(self._mmap)
+        section = {
+            name: view[start:end]
+            for name, start, end in zip(_SECTIONS, bounds[::2], bounds[1::2], strict=True)
+        }
+        self._records = section['records']
+        self._names = section['names']
+        self._record_offsets = section['record_offsets'].cast('Q')
+        self._name_offsets = section['name_offsets'].cast('Q')
+        self._name_order = section['name_order'].cast('I')
+        self._trigram_keys = section['trigram_keys'].cast('Q')
+        self._posting_offsets = section['posting_offsets'].cast('Q')
+        self._postings = section['postings'].cast('I')
+        logger.info(
+            f'Opened recipe corpus {path}: {self._count} recipes, {trigram_count} trigrams'
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def recipe(self, index: int) -> dict[str, Any]:
+        """
+        Get a recipe of the corpus.
+
+        Args:
+            index: The position of the recipe in the corpus
+
+        Returns:
+            dict[str, Any]: The recipe
+        """
+        start, end = self._record_offsets[index], self._record_offsets[index + 1]
+        recipe: dict[str, Any] = json.loads(bytes(self._records[start:end]))
+        return recipe
+
+    def get(self, dish_name: str) -> dict[str, Any] | None:
+        """
+        Get the recipe of a dish, by its normalized name.
+
+        Args:
+            dish_name: The name of the dish
+
+        Returns:
+            dict[str, Any] | None: The recipe, None if no dish has that name
+        """
+        name = normalize_dish_name(dish_name).encode()
+        position = bisect.bisect_left(self._name_order, name, key=self._name)
+        if position < self._count and self._name(self._name_order[position]) == name:
+            return self.recipe(self._name_order[position])
+        return None
+
+    def search(
+        self,
+        dish_name: str,
+        limit: int = 5,
+        min_similarity: float = settings.RECIPE_CORPUS_MIN_SIMILARITY,
+        max_postings: int = settings.RECIPE_CORPUS_MAX_POSTINGS,
+    ) -> list[RecipeMatch]:
+        """
+        Find the recipes whose dish names are the most similar to a name.
+
+        Args:
+            dish_name: The name of the dish
+            limit: The maximum number of matches
+            min_similarity: The minimum similarity of a match
+            max_postings: The number of postings read for candidates, beyond the rarest
+                trigram of the name
+
+        Returns:
+            list[RecipeMatch]: The matches, the most similar first
+        """
+        query = trigrams(normalize_dish_name(dish_name))
+        if not query:
+            return []
+
+        lists = sorted(
+            (postings for trigram in query if (postings := self._trigram_postings(trigram))),
+            key=len,
+        )
+        shared: Counter[int] = Counter()
+        read = 0
+        for postings in lists:
+            if shared and read + len(postings) > max_postings:
+                break
+            shared.update(postings)
+            read += len(postings)
+
+        scored = []
+        for index, _ in shared.most_common(_CANDIDATES_PER_MATCH * limit):
+            name = trigrams(self._name(index).decode())
+            similarity = len(query & name) / len(query | name)
+            if similarity >= min_similarity:
+                scored.append((similarity, -index))
+
+        return [
+            RecipeMatch(index=-index, dish=self.recipe(-index)['dish'], similarity=similarity)
+            for similarity, index in heapq.nlargest(limit, scored)
+        ]
+
+    def close(self) -> None:
+        """
+        Unmap the corpus file. The corpus can no longer be read.
+        """
+        for view in vars(self).values():
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def _name(self, index: int) -> bytes:
+        return bytes(self._names[self._name_offsets[index] : self._name_offsets[index + 1]])
+
+    def _trigram_postings(self, trigram: str) -> memoryview | None:
+        key = _trigram_key(trigram)
+        position = bisect.bisect_left(self._trigram_keys, key)
+        if position == len(self._trigram_keys) or self._trigram_keys[position] != key:
+            return None
+        start, end = self._posting_offsets[position], self._posting_offsets[position + 1]
+        return self._postings[start:end]
+
+
+_recipe_corpus: RecipeCorpus | None = None
+
+
+def get_recipe_corpus() -> RecipeCorpus | None:
+    """
+    Get the recipe corpus of `RECIPE_CORPUS_PATH`, opening it lazily on first access.
+
+    Returns:
+        RecipeCorpus | None: The singleton recipe corpus, None if no corpus is configured
+    """
+    global _recipe_corpus
+
+    if _recipe_corpus is None and settings.RECIPE_CORPUS_PATH is not None:
+        _recipe_corpus = RecipeCorpus(settings.RECIPE_CORPUS_PATH)
+
+    return _recipe_corpus
+
+
+def _trigram_key(trigram: str) -> int:
+    # The 3 code points of the trigram, packed into 63 bits
+    return ord(trigram[0]) << 42 | ord(trigram[1]) << 21 | ord(trigram[2])
+
+
+def _align(position: int) -> int:
+    return -(-position // 8) * 8
+
+
+def _little_endian(values: array[int]) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
@@ -0,0 +1,295 @@
+"""
+Ingredient index of the recipe corpus.
+
+Finds the recipes to cook with some ingredients: those using the most of them first, then
+those needing the fewest other ingredients. The index maps every ingredient term (e.g.
+"pancetta", "egg") to the recipes using it, as a bitset over the recipes: a Python int,
+whose `&`, `|` and `^` run over machine words, so a query costs a few operations over the
+bitsets of its ingredients rather than a scan of the recipes.
+
+The recipes matching each number of ingredients come from a bit-sliced counter of the
+bitsets of the ingredients, and the recipes by number of ingredients are bitsets too, so
+ranking never visits the recipes beyond those returned.
+
+Terms used by few recipes are kept as arrays of recipe indexes, turned into bitsets when
+queried, since a bitset takes as much memory whatever the number of its recipes. The index
+is built in memory when the application starts, from `RECIPE_CORPUS_PATH`.
+"""
+
+import functools
+import logging
+import re
+import time
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from ai_assistant.services.recipes.corpus import RecipeCorpus
+from ai_assistant.services.recipes.corpus import get_recipe_corpus
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'[^\W\d_]+')
+
+# Quantities, units and connectives of ingredient lists, e.g. "2 tbsp of olive oil"
+_IGNORED_WORDS = frozenset(
+    {
+        'a',
+        'an',
+        'and',
+        'can',
+        'clove',
+        'cup',
+        'diced',
+        'dl',
+        'fresh',
+        'g',
+        'grated',
+        'handful',
+        'kg',
+        'large',
+        'lb',
+        'mg',
+        'ml',
+        'of',
+        'or',
+        'oz',
+        'pinch',
+        'small',
+        'tablespoon',
+        'taste',
+        'tbsp',
+        'teaspoon',
+        'the',
+        'to',
+        'tsp',
+        'with',
+    }
+)
+
+# Terms of fewer than 1 in so many recipes are kept as arrays of recipe indexes
+_SPARSE_RATIO = 256
+
+
+@dataclass(frozen=True)
+class IngredientMatch:
+    """
+    A recipe to cook with some of the searched ingredients.
+    """
+
+    index: int
+    # The searched ingredients the recipe uses
+    matched: tuple[str, ...]
+    # The number of other ingredients of the recipe
+    missing: int
+
+
+# Ingredient lines and words repeat across recipes, e.g. "salt", "2 eggs"
+@functools.lru_cache(maxsize=65536)
+def ingredient_terms(ingredient: str) -> frozenset[str]:
+    """
+    Get the terms of an ingredient: its words in singular, without quantities and units.
+
+    Args:
+        ingredient: The ingredient, e.g. "4 large eggs"
+
+    Returns:
+        frozenset[str]: The terms, e.g. {"egg"}
+    """
+    words = (_singular(word) for word in _WORD.findall(ingredient.casefold()))
+    return frozenset(word for word in words if word not in _IGNORED_WORDS)
+
+
+class IngredientIndex:
+    """
+    The recipes of every ingredient term, as bitsets.
+
+    Example:
+        index = IngredientIndex([['400g spaghetti', '4 large eggs'], ['2 eggs', 'flour']])
+        matches = index.search(['eggs', 'spaghetti'])
+    """
+
+    def __init__(self, ingredients: Iterable[Iterable[str]]) -> None:
+        """
+        Build the index.
+
+        Args:
+            ingredients: The ingredients of every recipe, by recipe index
+        """
+        postings: defaultdict[str, array[int]] = defaultdict(lambda: array('I'))
+        sizes: defaultdict[int, array[int]] = defaultdict(lambda: array('I'))
+        count = 0
+        for index, lines in enumerate(ingredients):
+            lines = list(lines)
+            for term in set().union(*map(ingredient_terms, lines)):
+                postings[term].append(index)
+            sizes[len(lines)].append(index)
+            count += 1
+
+        self._count = count
+        self._all = (1 << count) - 1
+        self._dense: dict[str, int] = {}
+        self._sparse: dict[str, array[int]] = {}
+        for term, indexes in postings.items():
+            if len(indexes) * _SPARSE_RATIO < count:
+                self._sparse[term] = indexes
+            else:
+                self._dense[term] = self._bitset(indexes)
+
+        # The recipes by number of ingredients, fewest first
+        self._sizes = [(size, self._bitset(sizes[size])) for size in sorted(sizes)]
+
+    @classmethod
+    def from_corpus(cls, corpus: RecipeCorpus) -> 'IngredientIndex':
+        """
+        Build the index of the recipes of a corpus, from their `ingredients`.
+
+        Args:
+            corpus: The recipe corpus
+
+        Returns:
+            IngredientIndex: The index, by recipe index of the corpus
+        """
+        started_at = time.monotonic()
+        index = cls(corpus.recipe(i).get('ingredients', []) for i in range(len(corpus)))
+        logger.info(
+            f'Indexed the ingredients of {len(index)} recipes: {len(index._dense)} dense and '
+            f'{len(index._sparse)} sparse terms in {time.monotonic() - started_at:.1f}s'
+        )
+        return index
+
+    def __len__(self) -> int:
+        return self._count
+
+    def search(self, ingredients: list[str], limit: int = 5) -> list[IngredientMatch]:
+        """
+        Find the recipes using the most of some ingredients, then the fewest others.
+
+        An ingredient of several terms, e.g. "parmesan cheese", matches the recipes having
+        all of them.
+
+        Args:
+            ingredients: The ingredients, e.g. ["eggs", "pancetta", "cheese"]
+            limit: The maximum number of matches
+
+        Returns:
+            list[IngredientMatch]: The matches, the best first, recipes of equal rank in
+                corpus order
+        """
+        query: dict[frozenset[str], tuple[str, int]] = {}
+        for ingredient in ingredients:
+            terms = ingredient_terms(ingredient)
+            if terms and terms not in query:
+                query[terms] = (ingredient, self._recipes(terms))
+
+        levels = _count_bits(bitset for _, bitset in query.values())
+        matches: list[IngredientMatch] = []
+        for score in range(len(query), 0, -1):
+            if len(matches) == limit:
+                break
+            recipes = self._exactly(levels, score)
+            for size, bitset in self._sizes:
+                if not recipes or len(matches) == limit:
+                    break
+                found = recipes & bitset
+                recipes ^= found
+                for bit in _highest_bits(found, limit - len(matches)):
+                    index = self._count - 1 - bit
+                    matches.append(
+                        IngredientMatch(
+                            index=index,
+                            matched=tuple(
+                                ingredient
+                                for ingredient, recipes_of in query.values()
+                                if recipes_of >> bit & 1
+                            ),
+                            missing=max(size - score, 0),
+                        )
+                    )
+
+        return matches
+
+    def _recipes(self, terms: frozenset[str]) -> int:
+        recipes = self._all
+        for term in terms:
+            if term in self._dense:
+                recipes &= self._dense[term]
+            elif term in self._sparse:
+                recipes &= self._bitset(self._sparse[term])
+            else:
+                return 0
+        return recipes
+
+    def _exactly(self, levels: list[int], score: int) -> int:
+        # The recipes whose counter, sliced by bit into the levels, equals the score
+        if score >> len(levels):
+            return 0
+        recipes = self._all
+        for level, counter in enumerate(levels):
+            recipes &= counter if score >> level & 1 else self._all ^ counter
+        return recipes
+
+    def _bitset(self, indexes: array[int]) -> int:
+        # Recipe i is the bit `count - 1 - i`, so that the first recipes are the highest bits,
+        # found from the length of the int
+        bitmap = bytearray((self._count + 7) // 8)
+        for index in indexes:
+            bit = self._count - 1 - index
+            bitmap[bit >> 3] |= 1 << (bit & 7)
+        return int.from_bytes(bitmap, 'little')
+
+
+_ingredient_index: IngredientIndex | None = None
+
+
+def get_ingredient_index() -> IngredientIndex | None:
+    """
+    Get the ingredient index of the recipe corpus, building it on first access.
+
+    Returns:
+        IngredientIndex | None: The singleton ingredient index, None if no recipe corpus is
+            configured
+    """
+    global _ingredient_index
+
+    if _ingredient_index is None and (corpus := get_recipe_corpus()) is not None:
+        _ingredient_index = IngredientIndex.from_corpus(corpus)
+
+    return _ingredient_index
+
+
+def _count_bits(bitsets: Iterable[int]) -> list[int]:
+    # Add up the bitsets into a bit-sliced counter: bit i of level l is bit l of the count of
+    # recipe i
+    levels: list[int] = []
+    for bitset in bitsets:
+        carry = bitset
+        for level, counter in enumerate(levels):
+            if not carry:
+                break
+            levels[level], carry = counter ^ carry, counter & carry
+        if carry:
+            levels.append(carry)
+    return levels
+
+
+def _highest_bits(bitset: int, limit: int) -> Iterator[int]:
+    for _ in range(limit):
+        if not bitset:
+            return
+        bit = bitset.bit_length() - 1
+        yield bit
+        bitset ^= 1 << bit
+
+
+@functools.lru_cache(maxsize=65536)
+def _singular(word: str) -> str:
+    if word.endswith('ies') and len(word) > 4:
+        return f'{word[:-3]}y'
+    if word.endswith(('oes', 'ches', 'shes', 'xes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
@@ -0,0 +1,224 @@
+"""
+Bulk operations over ADK sessions, and the bounded fan-out helpers they are built on.
+
+ADK session services only expose single-session operations, so a bulk request is fanned
+out over the session service under a concurrency limit. Every item gets its own result:
+a failing item never fails the rest of the batch.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncGenerator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Generic
+from typing import TypeVar
+
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+from ai_assistant.common.settings import settings
+from ai_assistant.exceptions import NotFoundException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+@dataclass
+class BulkResult(Generic[R]):
+    """
+    Outcome of a single item of a bulk operation.
+
+    Exactly one of `value` and `error` is set.
+    """
+
+    index: int
+    value: R | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def run_bounded(
+    items: list[T],
+    operation: Callable[[T], Awaitable[R]],
+    concurrency: int,
+) -> list[BulkResult[R]]:
+    """
+    Run an operation over many items with at most `concurrency` in flight.
+
+    Args:
+        items: The items to process
+        operation: The coroutine function to apply to each item
+        concurrency: The maximum number of concurrent operations
+
+    Returns:
+        list[BulkResult[R]]: One result per item, in the order of `items`
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(index: int, item: T) -> BulkResult[R]:
+        async with semaphore:
+            return await _run_item(index, item, operation)
+
+    return list(await asyncio.gather(*(run_one(i, item) for i, item in enumerate(items))))
+
+
+async def iter_bounded(
+    items: list[T],
+    operation: Callable[[T], Awaitable[R]],
+    concurrency: int,
+) -> AsyncGenerator[BulkResult[R], None]:
+    """
+    Run an operation over many items with at most `concurrency` in flight, yielding each
+    result as soon as it completes.
+
+    Only `concurrency` worker tasks are created, however many items there are. Closing the
+    iterator early cancels the operations still in flight.
+
+    Args:
+        items: The items to process
+        operation: The coroutine function to apply to each item
+        concurrency: The maximum number of concurrent operations
+
+    Yields:
+        BulkResult[R]: One result per item, in completion order
+    """
+    results: asyncio.Queue[BulkResult[R]] = asyncio.Queue()
+    pending = enumerate(items)
+
+    async def worker() -> None:
+        # Workers share the iterator, so each item is picked up by exactly one of them
+        for index, item in pending:
+            results.put_nowait(await _run_item(index, item, operation))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(max(1, concurrency), len(items)))]
+    try:
+        for _ in range(len(items)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def _run_item(index: int, item: T, operation: Callable[[T], Awaitable[R]]) -> BulkResult[R]:
+    try:
+        return BulkResult(index=index, value=await operation(item))
+    except Exception as e:
+        logger.warning(f'Bulk operation failed for item {index}: {e}')
+        return BulkResult(index=index, error=str(e) or type(e).__name__)
+
+
+class BulkSessionService:
+    """
+    Create, fetch and delete many sessions in a single call.
+
+    Example:
+        bulk = BulkSessionService(session_service)
+        results = await bulk.delete_sessions([(user_id, session_id), ...])
+    """
+
+    def __init__(
+        self,
+        session_service: BaseSessionService,
+        concurrency: int = settings.SESSION_BULK_CONCURRENCY,
+    ) -> None:
+        """
+        Initialize the bulk session service.
+
+        Args:
+            session_service: The ADK session service to operate on
+            concurrency: The maximum number of concurrent session service calls
+        """
+        self.session_service = session_service
+        self.concurrency = concurrency
+
+    async def create_sessions(self, user_ids: list[str]) -> list[BulkResult[Session]]:
+        """
+        Create one session per user ID.
+
+        Args:
+            user_ids: The owners of the sessions to create
+
+        Returns:
+            list[BulkResult[Session]]: The created sessions, in the order of `user_ids`
+        """
+
+        async def create(user_id: str) -> Session:
+            return await self.session_service.create_session(
+                app_name=settings.APP_NAME,
+                user_id=user_id,
+            )
+
+        return await self._run(user_ids, create, 'create')
+
+    async def get_sessions(self, keys: list[tuple[str, str]]) -> list[BulkResult[Session]]:
+        """
+        Fetch sessions by ID, without their events.
+
+        Args:
+            keys: `(user_id, session_id)` pairs of the sessions to fetch
+
+        Returns:
+            list[BulkResult[Session]]: The sessions, in the order of `keys`
+        """
+
+        async def get(key: tuple[str, str]) -> Session:
+            user_id, session_id = key
+            # Only events newer than now would be returned, i.e. none
+            session = await self.session_service.get_session(
+                app_name=settings.APP_NAME,
+                user_id=user_id,
+                session_id=session_id,
+                config=GetSessionConfig(after_timestamp=time.time()),
+            )
+            if session is None:
+                raise NotFoundException(f'Session {session_id} not found for user {user_id}')
+            return session
+
+        return await self._run(keys, get, 'get')
+
+    async def delete_sessions(self, keys: list[tuple[str, str]]) -> list[BulkResult[None]]:
+        """
+        Delete sessions by ID.
+
+        Args:
+            keys: `(user_id, session_id)` pairs of the sessions to delete
+
+        Returns:
+            list[BulkResult[None]]: The outcome of each deletion, in the order of `keys`
+        """
+
+        async def delete(key: tuple[str, str]) -> None:
+            user_id, session_id = key
+            await self.session_service.delete_session(
+                app_name=settings.APP_NAME,
+                user_id=user_id,
+                session_id=session_id,
+            )
+
+        return await self._run(keys, delete, 'delete')
+
+    async def _run(
+        self,
+        items: list[T],
+        operation: Callable[[T], Awaitable[R]],
+        name: str,
+    ) -> list[BulkResult[R]]:
+        started_at = time.perf_counter()
+        results = await run_bounded(items, operation, self.concurrency)
+
+        failed = sum(1 for result in results if not result.ok)
+        logger.info(
+            f'Bulk {name} of {len(items)} sessions completed in '
+            f'{time.perf_counter() - started_at:.3f}s ({failed} failed)'
+        )
+        return results
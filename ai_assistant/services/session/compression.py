@@ -0,0 +1,467 @@
+"""
+Compression of the large payloads of session events.
+
+Tool results (e.g. the ingredients and instructions of a recipe) and long model answers are
+stored in every event of a session, and reloaded with the session on every turn. Before an
+event is stored by `CompressedSessionService`, each of its parts larger than
+`SESSION_COMPRESSION_MIN_BYTES` is replaced with a part holding the deflated JSON of the
+original, as an `inline_data` blob of type `COMPRESSED_PART_MIME_TYPE`. Parts that do not
+shrink are stored as they are.
+
+The caller never sees a compressed part: the events returned by the service are the
+original ones, and stored events are decompressed when a session is read, one compressed
+part at a time. Listing sessions and appending events never inflate anything.
+
+Deflate can be primed with a shared dictionary of the strings common to many payloads
+(e.g. JSON keys and cooking vocabulary), which makes even payloads of a few kilobytes
+compress well. A dictionary is trained from stored sessions with
+`python -m ai_assistant.cli.train_compression_dictionary` and set with
+`SESSION_COMPRESSION_DICTIONARY_PATH`. Payloads record the dictionary they were compressed
+with, so the other `*.zdict` dictionaries of the same directory are kept for decompression.
+"""
+
+import hashlib
+import logging
+import re
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.base_session_service import ListSessionsResponse
+from google.genai import types
+
+from ai_assistant.common.settings import settings
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED_PART_MIME_TYPE = 'application/x-ai-assistant-part+deflate'
+
+# Deflate only looks back this far, so a longer dictionary is never used
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+DICTIONARY_SUFFIX = '.zdict'
+
+# Raw deflate streams, without the zlib header and checksum
+_WBITS = -15
+
+# A word and the punctuation or whitespace after it, the unit of the dictionary strings
+_SEGMENT = re.compile(rb'[^\s"{}\[\],:]*[\s"{}\[\],:]+')
+
+
+@dataclass
+class CompressionMetrics:
+    """
+    Compression of event payloads, since the start of the process.
+    """
+
+    # Parts compressed, and their size before and after compression
+    compressed_parts: int = 0
+    raw_bytes: int = 0
+    stored_bytes: int = 0
+    # Parts over the size threshold that did not shrink
+    incompressible_parts: int = 0
+    decoded_parts: int = 0
+    decode_seconds: float = 0.0
+    max_decode_seconds: float = 0.0
+
+
+_metrics = CompressionMetrics()
+
+
+class PayloadCodec:
+    """
+    Compresses the large parts of events, and decompresses them.
+
+    Example:
+        codec = PayloadCodec(min_bytes=1024)
+        stored = codec.compress_event(event)
+        event = codec.decompress_event(stored)
+    """
+
+    def __init__(
+        self,
+        min_bytes: int = settings.SESSION_COMPRESSION_MIN_BYTES,
+        level: int = settings.SESSION_COMPRESSION_LEVEL,
+        dictionary: bytes | None = None,
+        previous_dictionaries: list[bytes] | None = None,
+    ) -> None:
+        """
+        Initialize the codec.
+
+        Args:
+            min_bytes: The size of the JSON of a part from which it is compressed
+            level: The deflate compression level, from 1 (fastest) to 9 (smallest)
+            dictionary: The shared dictionary to compress with, if any
+            previous_dictionaries: Other dictionaries that stored payloads may have been
+                compressed with
+        """
+        self.min_bytes = min_bytes
+        self.level = level
+        self.dictionary = dictionary
+        self.dictionary_id = dictionary_id(dictionary) if dictionary is not None else None
+
+        self._dictionaries = {
+            dictionary_id(previous): previous for previous in previous_dictionaries or []
+        }
+        if dictionary is not None:
+            self._dictionaries[dictionary_id(dictionary)] = dictionary
+
+    def compress_event(self, event: Event) -> Event:
+        """
+        Compress the parts of an event larger than `min_bytes`.
+
+        Args:
+            event: The event
+
+        Returns:
+            Event: A copy of the event with its large parts compressed, or the event itself
+                if none was compressed
+        """
+        if not event.content or not event.content.parts:
+            return event
+
+        parts = [self.compress_part(part) for part in event.content.parts]
+        if all(stored is part for stored, part in zip(parts, event.content.parts, strict=True)):
+            return event
+
+        return event.model_copy(
+            update={'content': event.content.model_copy(update={'parts': parts})}
+        )
+
+    def compress_part(self, part: types.Part) -> types.Part:
+        """
+        Compress a part if it is larger than `min_bytes` and shrinks.
+
+        Args:
+            part: The part
+
+        Returns:
+            types.Part: The compressed part, or the part itself
+        """
+        # Binary data is usually compressed already
+        if part.inline_data is not None or part.file_data is not None:
+            return part
+
+        payload = part_payload(part)
+        if len(payload) < self.min_bytes:
+            return part
+
+        if self.dictionary is not None:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS)
+        compressed = types.Part(
+            inline_data=types.Blob(
+                mime_type=COMPRESSED_PART_MIME_TYPE,
+                data=compressor.compress(payload) + compressor.flush(),
+                display_name=self.dictionary_id,
+            )
+        )
+
+        # Stored with the base64 of the compressed bytes and the blob fields around it
+        stored_bytes = len(part_payload(compressed))
+        if stored_bytes >= len(payload):
+            _metrics.incompressible_parts += 1
+            return part
+
+        _metrics.compressed_parts += 1
+        _metrics.raw_bytes += len(payload)
+        _metrics.stored_bytes += stored_bytes
+        return compressed
+
+    def decompress_event(self, event: Event) -> Event:
+        """
+        Decompress the compressed parts of an event.
+
+        Args:
+            event: The event, as stored
+
+        Returns:
+            Event: A copy of the event with its parts decompressed, or the event itself if
+                it had no compressed part
+
+        Raises:
+            ValueError: If a part was compressed with a dictionary the codec does not have
+        """
+        if not event.content or not event.content.parts:
+            return event
+
+        if not any(is_compressed(part) for part in event.content.parts):
+            return event
+
+        parts = [self.decompress_part(part) for part in event.content.parts]
+        return event.model_copy(
+            update={'content': event.content.model_copy(update={'parts': parts})}
+        )
+
+    def decompress_part(self, part: types.Part) -> types.Part:
+        """
+        Decompress a part if it is compressed.
+
+        Args:
+            part: The part, as stored
+
+        Returns:
+            types.Part: The original part
+
+        Raises:
+            ValueError: If the part was compressed with a dictionary the codec does not have
+        """
+        if not is_compressed(part):
+            return part
+
+        assert part.inline_data is not None and part.inline_data.data is not None
+        started_at = time.perf_counter()
+
+        name = part.inline_data.display_name
+        if name is None:
+            decompressor = zlib.decompressobj(_WBITS)
+        elif name in self._dictionaries:
+            decompressor = zlib.decompressobj(_WBITS, zdict=self._dictionaries[name])
+        else:
+            raise ValueError(f'Unknown compression dictionary {name!r}')
+        original = types.Part.model_validate_json(
+            decompressor.decompress(part.inline_data.data) + decompressor.flush()
+        )
+
+        duration = time.perf_counter() - started_at
+        _metrics.decoded_parts += 1
+        _metrics.decode_seconds += duration
+        _metrics.max_decode_seconds = max(_metrics.max_decode_seconds, duration)
+        return original
+
+
+class CompressedSessionService(BaseSessionService):
+    """
+    Session service that delegates to an ADK session service, storing large event payloads
+    compressed.
+    """
+
+    def __init__(self, session_service: BaseSessionService, codec: PayloadCodec) -> None:
+        """
+        Initialize the compressed session service.
+
+        Args:
+            session_service: The underlying ADK session service
+            codec: The codec of the event payloads
+        """
+        self.session_service = session_service
+        self.codec = codec
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: dict[str, Any] | None = None,
+        session_id: str | None = None,
+    ) -> Session:
+        return await self.session_service.create_session(
+            app_name=app_name,
+            user_id=user_id,
+            state=state,
+            session_id=session_id,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: GetSessionConfig | None = None,
+    ) -> Session | None:
+        session = await self.session_service.get_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            config=config,
+        )
+        if session is not None:
+            session.events = [self.codec.decompress_event(event) for event in session.events]
+        return session
+
+    async def list_sessions(
+        self,
+        *,
+        app_name: str,
+        user_id: str | None = None,
+    ) -> ListSessionsResponse:
+        return await self.session_service.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.session_service.delete_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return await self.session_service.append_event(session=session, event=event)
+
+        stored = self.codec.compress_event(event)
+        await self.session_service.append_event(session=session, event=stored)
+
+        # The session keeps the original event. A stale session is also reloaded from
+        # storage by some services, with compressed events.
+        session.events = [
+            event if appended is stored else self.codec.decompress_event(appended)
+            for appended in session.events
+        ]
+        return event
+
+
+def part_payload(part: types.Part) -> bytes:
+    """
+    Serialize a part the way it is stored.
+
+    Args:
+        part: The part
+
+    Returns:
+        bytes: The JSON of the part
+    """
+    return part.model_dump_json(exclude_none=True).encode()
+
+
+def is_compressed(part: types.Part) -> bool:
+    """
+    Tell whether a part is a compressed part.
+
+    Args:
+        part: The part
+
+    Returns:
+        bool: True if the part holds a compressed payload
+    """
+    return part.inline_data is not None and part.inline_data.mime_type == (
+        COMPRESSED_PART_MIME_TYPE
+    )
+
+
+def dictionary_id(dictionary: bytes) -> str:
+    """
+    Identify a dictionary by its content.
+
+    Args:
+        dictionary: The dictionary
+
+    Returns:
+        str: The ID recorded in the payloads compressed with the dictionary
+    """
+    return hashlib.sha256(dictionary).hexdigest()[:16]
+
+
+def train_dictionary(
+    samples: list[bytes],
+    size: int = MAX_DICTIONARY_SIZE,
+    max_words: int = 4,
+) -> bytes:
+    """
+    Build a compression dictionary from the strings shared by sample payloads.
+
+    Strings of up to `max_words` words found in at least two samples are ranked by the
+    bytes they would save (the number of samples they are found in times their length),
+    and the best ones are kept. Deflate encodes a match closer to the data in fewer bits, so
+    the best strings end the dictionary.
+
+    Args:
+        samples: Payloads representative of the ones to compress, e.g. `part_payload`s
+        size: The maximum size of the dictionary, in bytes
+        max_words: The maximum number of words of a string
+
+    Returns:
+        bytes: The dictionary (empty if the samples share nothing)
+    """
+    frequencies: Counter[bytes] = Counter()
+    for sample in samples:
+        words = _SEGMENT.findall(sample)
+        frequencies.update(
+            {
+                b''.join(words[start : start + length])
+                for length in range(1, max_words + 1)
+                for start in range(len(words) - length + 1)
+            }
+        )
+
+    candidates = sorted(
+        (string for string, count in frequencies.items() if count > 1 and len(string) > 3),
+        key=lambda string: frequencies[string] * len(string),
+        reverse=True,
+    )
+
+    strings: list[bytes] = []
+    selected = bytearray()
+    for string in candidates:
+        if len(selected) + len(string) > size or string in selected:
+            continue
+
+        strings.append(string)
+        selected += string
+
+    return b''.join(reversed(strings))
+
+
+def load_payload_codec(
+    path: Path | None = settings.SESSION_COMPRESSION_DICTIONARY_PATH,
+) -> PayloadCodec:
+    """
+    Create the codec of the configured dictionary.
+
+    Args:
+        path: The dictionary to compress with, if any. The other dictionaries of its
+            directory are loaded for decompression.
+
+    Returns:
+        PayloadCodec: The codec
+    """
+    if path is None:
+        return PayloadCodec()
+
+    previous = [
+        other.read_bytes()
+        for other in sorted(path.parent.glob(f'*{DICTIONARY_SUFFIX}'))
+        if other != path
+    ]
+    logger.info(f'Compressing event payloads with dictionary {path}')
+    return PayloadCodec(dictionary=path.read_bytes(), previous_dictionaries=previous)
+
+
+def get_compression_metrics() -> dict[str, Any]:
+    """
+    Get the compression of event payloads since the start of the process.
+
+    Returns:
+        dict[str, Any]: The number of compressed parts, their size before and after
+            compression and the compression ratio, the number of parts that did not shrink,
+            and the number of decompressed parts and their mean and max decode time (in
+            seconds)
+    """
+    return {
+        'compressed_parts': _metrics.compressed_parts,
+        'raw_bytes': _metrics.raw_bytes,
+        'stored_bytes': _metrics.stored_bytes,
+        'ratio': _metrics.raw_bytes / _metrics.stored_bytes if _metrics.stored_bytes else None,
+        'incompressible_parts': _metrics.incompressible_parts,
+        'decoded_parts': _metrics.decoded_parts,
+        'mean_decode_seconds': (
+            _metrics.decode_seconds / _metrics.decoded_parts if _metrics.decoded_parts else None
+        ),
+        'max_decode_seconds': _metrics.max_decode_seconds,
+    }
+
+
+def reset_compression_metrics() -> None:
+    """
+    Forget the payloads compressed and decompressed so far.
+    """
+    global _metrics
+    _metrics = CompressionMetrics()
@@ -0,0 +1,295 @@
+"""
+Streaming export of ADK sessions and their events.
+
+Sessions are walked one at a time: the session headers are listed first and then the events
+of each session are loaded and flattened into one row per event. Memory use is bounded by
+the largest single session, regardless of how many sessions are exported.
+
+Exports run under their own concurrency limit (`EXPORT_MAX_CONCURRENCY`), so analytics pulls
+cannot take over the workers that serve live chat traffic.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+from ai_assistant.common.settings import settings
+from ai_assistant.exceptions import TooManyRequestsException
+
+logger = logging.getLogger(__name__)
+
+ExportRow = dict[str, Any]
+
+# Flat schema of the exported rows, one row per event
+EXPORT_COLUMNS = [
+    'session_id',
+    'user_id',
+    'app_name',
+    'session_last_update_time',
+    'event_id',
+    'invocation_id',
+    'author',
+    'timestamp',
+    'role',
+    'text',
+    'content',
+]
+
+_export_semaphore: asyncio.Semaphore | None = None
+
+
+def _get_export_semaphore() -> asyncio.Semaphore:
+    global _export_semaphore
+
+    if _export_semaphore is None:
+        _export_semaphore = asyncio.Semaphore(settings.EXPORT_MAX_CONCURRENCY)
+
+    return _export_semaphore
+
+
+def ensure_export_capacity() -> None:
+    """
+    Check that an export slot is available, so that a request can be rejected up front.
+
+    Raises:
+        TooManyRequestsException: If all the export slots are taken.
+    """
+    if _get_export_semaphore().locked():
+        raise TooManyRequestsException(
+            f'Too many concurrent exports (limit is {settings.EXPORT_MAX_CONCURRENCY})'
+        )
+
+
+@asynccontextmanager
+async def export_slot() -> AsyncGenerator[None, None]:
+    """
+    Hold one of the `EXPORT_MAX_CONCURRENCY` export slots of this process.
+    """
+    async with _get_export_semaphore():
+        yield
+
+
+class SessionExporter:
+    """
+    Streams the sessions and events of a user or of a time range as flat rows.
+
+    Example:
+        exporter = SessionExporter(session_service)
+        async for row in exporter.iter_rows(user_id=user_id):
+            ...
+    """
+
+    def __init__(self, session_service: BaseSessionService, app_name: str = settings.APP_NAME):
+        """
+        Initialize the exporter.
+
+        Args:
+            session_service: The ADK session service to export from
+            app_name: The application whose sessions to export
+        """
+        self.session_service = session_service
+        self.app_name = app_name
+
+    async def iter_sessions(
+        self,
+        user_id: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> AsyncIterator[Session]:
+        """
+        Iterate over the sessions to export, loading the events of one session at a time.
+
+        Args:
+            user_id: Only export the sessions of this user (all users if None)
+            start: Only export events at or after this time
+            end: Only export events before this time
+
+        Yields:
+            Session: Sessions with their events in the requested time range
+        """
+        start_ts = start.timestamp() if start else None
+        end_ts = end.timestamp() if end else None
+
+        response = await self.session_service.list_sessions(
+            app_name=self.app_name,
+            user_id=user_id,
+        )
+
+        for header in response.sessions:
+            # A session last updated before the range cannot have events inside it
+            if start_ts is not None and header.last_update_time < start_ts:
+                continue
+
+            session = await self.session_service.get_session(
+                app_name=self.app_name,
+                user_id=header.user_id,
+                session_id=header.id,
+                config=GetSessionConfig(after_timestamp=start_ts) if start_ts else None,
+            )
+            if session is None:
+                # Deleted while the export was running
+                continue
+
+            if start_ts is not None or end_ts is not None:
+                session.events = [
+                    event
+                    for event in session.events
+                    if (start_ts is None or event.timestamp >= start_ts)
+                    and (end_ts is None or event.timestamp < end_ts)
+                ]
+                if not session.events:
+                    continue
+
+            yield session
+
+    async def iter_rows(
+        self,
+        user_id: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> AsyncIterator[ExportRow]:
+        """
+        Iterate over the export rows, one per event.
+
+        Sessions without events yield a single row with empty event columns.
+
+        Args:
+            user_id: Only export the sessions of this user (all users if None)
+            start: Only export events at or after this time
+            end: Only export events before this time
+
+        Yields:
+            ExportRow: A row following `EXPORT_COLUMNS`
+        """
+        sessions = 0
+        rows = 0
+
+        async for session in self.iter_sessions(user_id, start, end):
+            sessions += 1
+            events: list[Event | None] = list(session.events) or [None]
+            for event in events:
+                rows += 1
+                yield _to_row(session, event)
+
+            # Let live traffic run between sessions
+            await asyncio.sleep(0)
+
+        logger.info(f'Exported {rows} rows from {sessions} sessions')
+
+
+def _to_row(session: Session, event: Event | None) -> ExportRow:
+    row: ExportRow = {
+        'session_id': session.id,
+        'user_id': session.user_id,
+        'app_name': session.app_name,
+        'session_last_update_time': session.last_update_time,
+        'event_id': None,
+        'invocation_id': None,
+        'author': None,
+        'timestamp': None,
+        'role': None,
+        'text': None,
+        'content': None,
+    }
+
+    if event is not None:
+        row['event_id'] = event.id
+        row['invocation_id'] = event.invocation_id
+        row['author'] = event.author
+        row['timestamp'] = event.timestamp
+
+        if event.content:
+            texts = [part.text for part in event.content.parts or [] if part.text]
+            row['role'] = event.content.role
+            row['text'] = ''.join(texts) if texts else None
+            row['content'] = event.content.model_dump(mode='json', exclude_none=True)
+
+    return row
+
+
+async def encode_ndjson(rows: AsyncIterator[ExportRow]) -> AsyncIterator[bytes]:
+    """
+    Encode export rows as newline-delimited JSON.
+
+    Args:
+        rows: The rows to encode
+
+    Yields:
+        bytes: One JSON document per row, terminated by a newline
+    """
+    async for row in rows:
+        yield json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode() + b'\n'
+
+
+async def write_parquet(
+    rows: AsyncIterator[ExportRow],
+    path: Path,
+    batch_size: int = settings.EXPORT_BATCH_SIZE,
+) -> int:
+    """
+    Write export rows to a Parquet file, one row group per batch.
+
+    Only one batch is held in memory at a time. The `content` column is stored as a JSON
+    string.
+
+    Args:
+        rows: The rows to write
+        path: The destination file
+        batch_size: The number of rows per row group
+
+    Returns:
+        int: The number of rows written
+    """
+    # Imported lazily: only the export CLI writes Parquet, the API process never needs it
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ('session_id', pa.string()),
+            ('user_id', pa.string()),
+            ('app_name', pa.string()),
+            ('session_last_update_time', pa.float64()),
+            ('event_id', pa.string()),
+            ('invocation_id', pa.string()),
+            ('author', pa.string()),
+            ('timestamp', pa.float64()),
+            ('role', pa.string()),
+            ('text', pa.string()),
+            ('content', pa.string()),
+        ]
+    )
+
+    written = 0
+    batch: list[ExportRow] = []
+
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+
+        def flush() -> None:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            batch.clear()
+
+        async for row in rows:
+            if row['content'] is not None:
+                row = {**row, 'content': json.dumps(row['content'], ensure_ascii=False)}
+            batch.append(row)
+            written += 1
+
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+
+    return written
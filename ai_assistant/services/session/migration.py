@@ -0,0 +1,510 @@
+"""
+Bulk migration of ADK sessions and their events between session services.
+
+Sessions are read from a source session service one user at a time and written to a sink:
+
+- `SessionServiceSink` writes through any ADK session service, one call per session and
+  event. It works for every backend but costs a round trip per event.
+- `PostgresCopySink` bulk-loads the tables of an ADK `DatabaseSessionService` (v1 schema)
+  on Postgres with `COPY`, one transaction per user, optionally compressing the large event
+  payloads like a `CompressedSessionService`.
+
+Users are migrated in parallel, under `SESSION_MIGRATION_CONCURRENCY`. After each user, the
+number of sessions and events in the sink is checked against the source, and verified users
+are appended to a checkpoint file, so an interrupted migration resumes where it stopped.
+Migrating a user again replaces the sessions written by a previous attempt.
+
+Memory use is bounded by the sessions of the users in flight.
+"""
+
+import json
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from typing import Protocol
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import Session
+from google.adk.sessions.state import State
+from pydantic import PostgresDsn
+from sqlalchemy import text
+
+from ai_assistant.common.settings import settings
+from ai_assistant.db.database import get_or_create_engine
+from ai_assistant.services.session.bulk import iter_bounded
+from ai_assistant.services.session.compression import PayloadCodec
+
+logger = logging.getLogger(__name__)
+
+# Version of the `DatabaseSessionService` tables that `PostgresCopySink` writes
+_ADK_SCHEMA_VERSION = '1'
+
+_SESSION_COLUMNS = ['app_name', 'user_id', 'id', 'state', 'create_time', 'update_time']
+_EVENT_COLUMNS = [
+    'id',
+    'app_name',
+    'user_id',
+    'session_id',
+    'invocation_id',
+    'timestamp',
+    'event_data',
+]
+
+
+class SessionSink(Protocol):
+    """
+    Destination of a session migration.
+    """
+
+    async def prepare(self) -> None:
+        """
+        Get the destination ready to receive sessions, e.g. create its tables.
+        """
+        ...
+
+    async def write_app_state(self, app_name: str, state: dict[str, Any]) -> None:
+        """
+        Write the app-level state shared by all the sessions of an app.
+
+        Args:
+            app_name: The application
+            state: The app state, without the `app:` prefix
+        """
+        ...
+
+    async def write_user(self, user_id: str, sessions: list[Session]) -> None:
+        """
+        Write all the migrated sessions of a user, replacing any earlier copy of them.
+
+        Args:
+            user_id: The owner of the sessions
+            sessions: The sessions, with their events
+        """
+        ...
+
+    async def count(self, app_name: str, user_id: str, session_ids: list[str]) -> tuple[int, int]:
+        """
+        Count the sessions and events written for a user.
+
+        Args:
+            app_name: The application
+            user_id: The owner of the sessions
+            session_ids: The sessions to count
+
+        Returns:
+            tuple[int, int]: The number of sessions found and of their events
+        """
+        ...
+
+
+@dataclass
+class MigrationReport:
+    """
+    Outcome of a migration run.
+    """
+
+    users: int = 0
+    sessions: int = 0
+    events: int = 0
+    skipped_users: int = 0
+    failed_users: dict[str, str] = field(default_factory=dict)
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed_users
+
+
+class SessionMigrator:
+    """
+    Copies the sessions of an app from a session service to a sink, user by user.
+
+    Example:
+        migrator = SessionMigrator(source, PostgresCopySink(url), checkpoint=Path('ckpt'))
+        report = await migrator.migrate()
+    """
+
+    def __init__(
+        self,
+        source: BaseSessionService,
+        sink: SessionSink,
+        app_name: str = settings.APP_NAME,
+        concurrency: int = settings.SESSION_MIGRATION_CONCURRENCY,
+        checkpoint: Path | None = None,
+    ) -> None:
+        """
+        Initialize the migrator.
+
+        Args:
+            source: The ADK session service to read the sessions from
+            sink: The destination of the sessions
+            app_name: The application whose sessions to migrate
+            concurrency: The number of users migrated at once
+            checkpoint: The file recording the migrated users, to resume from (optional)
+        """
+        self.source = source
+        self.sink = sink
+        self.app_name = app_name
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+
+    async def migrate(self, user_ids: list[str] | None = None) -> MigrationReport:
+        """
+        Migrate the sessions of the given users, or of all users.
+
+        Users recorded in the checkpoint file are skipped. A failing user does not stop the
+        migration: it is reported and left out of the checkpoint, to be retried on resume.
+
+        Args:
+            user_ids: The users to migrate (all users if None)
+
+        Returns:
+            MigrationReport: The counts of migrated users, sessions and events, and the
+                failures
+        """
+        started_at = time.perf_counter()
+        report = MigrationReport()
+
+        await self.sink.prepare()
+
+        session_ids = await self._list_session_ids(user_ids)
+        completed = self._read_checkpoint()
+        pending = [user_id for user_id in session_ids if user_id not in completed]
+        report.skipped_users = len(session_ids) - len(pending)
+        logger.info(
+            f'Migrating the sessions of {len(pending)} users '
+            f'({report.skipped_users} already migrated)'
+        )
+
+        if pending:
+            await self._migrate_app_state(pending[0], session_ids[pending[0]])
+
+        async def migrate_user(user_id: str) -> tuple[int, int]:
+            return await self._migrate_user(user_id, session_ids[user_id])
+
+        async for result in iter_bounded(pending, migrate_user, self.concurrency):
+            user_id = pending[result.index]
+            if result.value is None:
+                report.failed_users[user_id] = result.error or 'unknown error'
+                continue
+
+            report.users += 1
+            report.sessions += result.value[0]
+            report.events += result.value[1]
+            self._write_checkpoint(user_id)
+
+        report.duration = time.perf_counter() - started_at
+        logger.info(
+            f'Migrated {report.sessions} sessions and {report.events} events of '
+            f'{report.users} users in {report.duration:.3f}s '
+            f'({len(report.failed_users)} users failed)'
+        )
+        return report
+
+    async def _list_session_ids(self, user_ids: list[str] | None) -> dict[str, list[str]]:
+        session_ids: dict[str, list[str]] = defaultdict(list)
+        users: list[str | None] = list(user_ids) if user_ids else [None]
+        for user_id in users:
+            response = await self.source.list_sessions(app_name=self.app_name, user_id=user_id)
+            for header in response.sessions:
+                session_ids[header.user_id].append(header.id)
+
+        return session_ids
+
+    async def _read_sessions(self, user_id: str, session_ids: list[str]) -> list[Session]:
+        sessions = []
+        for session_id in session_ids:
+            session = await self.source.get_session(
+                app_name=self.app_name,
+                user_id=user_id,
+                session_id=session_id,
+            )
+            # Deleted since it was listed
+            if session is not None:
+                sessions.append(session)
+
+        return sessions
+
+    async def _migrate_app_state(self, user_id: str, session_ids: list[str]) -> None:
+        # The app state is merged into every session, so any session carries it
+        sessions = await self._read_sessions(user_id, session_ids[:1])
+        if sessions:
+            app_state, _, _ = split_state(sessions[0].state)
+            await self.sink.write_app_state(self.app_name, app_state)
+
+    async def _migrate_user(self, user_id: str, session_ids: list[str]) -> tuple[int, int]:
+        sessions = await self._read_sessions(user_id, session_ids)
+        await self.sink.write_user(user_id, sessions)
+
+        expected = (len(sessions), sum(len(_stored_events(session)) for session in sessions))
+        actual = await self.sink.count(
+            self.app_name, user_id, [session.id for session in sessions]
+        )
+        if actual != expected:
+            raise ValueError(
+                f'Verification failed for user {user_id}: expected {expected[0]} sessions and '
+                f'{expected[1]} events, found {actual[0]} and {actual[1]}'
+            )
+
+        return expected
+
+    def _read_checkpoint(self) -> set[str]:
+        if self.checkpoint is None or not self.checkpoint.exists():
+            return set()
+
+        return set(self.checkpoint.read_text().split())
+
+    def _write_checkpoint(self, user_id: str) -> None:
+        # Appended, so that a checkpoint costs one line whatever the number of users
+        if self.checkpoint is not None:
+            with self.checkpoint.open('a') as file:
+                file.write(f'{user_id}\n')
+
+
+class SessionServiceSink:
+    """
+    Writes migrated sessions through an ADK session service, one call per session and event.
+    """
+
+    def __init__(self, session_service: BaseSessionService) -> None:
+        """
+        Initialize the sink.
+
+        Args:
+            session_service: The ADK session service to write to
+        """
+        self.session_service = session_service
+
+    async def prepare(self) -> None:
+        pass
+
+    async def write_app_state(self, app_name: str, state: dict[str, Any]) -> None:
+        # Written with the state of every session, see `write_user`
+        pass
+
+    async def write_user(self, user_id: str, sessions: list[Session]) -> None:
+        for session in sessions:
+            existing = await self.session_service.get_session(
+                app_name=session.app_name,
+                user_id=user_id,
+                session_id=session.id,
+            )
+            if existing is not None:
+                await self.session_service.delete_session(
+                    app_name=session.app_name,
+                    user_id=user_id,
+                    session_id=session.id,
+                )
+
+            # Created with the final state: replaying the state deltas of the events after
+            # it ends on the same values
+            target = await self.session_service.create_session(
+                app_name=session.app_name,
+                user_id=user_id,
+                state={
+                    k: v for k, v in session.state.items() if not k.startswith(State.TEMP_PREFIX)
+                },
+                session_id=session.id,
+            )
+            for event in _stored_events(session):
+                await self.session_service.append_event(target, event)
+
+    async def count(self, app_name: str, user_id: str, session_ids: list[str]) -> tuple[int, int]:
+        sessions = 0
+        events = 0
+        for session_id in session_ids:
+            session = await self.session_service.get_session(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+            )
+            if session is not None:
+                sessions += 1
+                events += len(session.events)
+
+        return sessions, events
+
+
+class PostgresCopySink:
+    """
+    Bulk-loads migrated sessions into the Postgres tables of an ADK `DatabaseSessionService`.
+
+    The sessions and events of a user are written with two `COPY`s in a single transaction,
+    after deleting any earlier copy of the sessions.
+    """
+
+    def __init__(self, url: PostgresDsn, codec: PayloadCodec | None = None) -> None:
+        """
+        Initialize the sink.
+
+        Args:
+            url: The `postgresql+asyncpg` url of the database of the target session service
+            codec: The codec compressing the event payloads, if they are stored compressed
+        """
+        self.url = url
+        self.codec = codec
+
+    async def prepare(self) -> None:
+        # The tables are created by the ADK service itself, on its first operation
+        async with DatabaseSessionService(str(self.url)) as service:
+            await service.list_sessions(app_name=settings.APP_NAME, user_id='')
+
+        async with get_or_create_engine(self.url).connect() as connection:
+            result = await connection.execute(
+                text("SELECT value FROM adk_internal_metadata WHERE key = 'schema_version'")
+            )
+            version = result.scalar_one_or_none()
+
+        if version != _ADK_SCHEMA_VERSION:
+            raise ValueError(
+                f'Unsupported ADK session schema version {version!r} '
+                f'(expected {_ADK_SCHEMA_VERSION!r}), migrate the target database first'
+            )
+
+    async def write_app_state(self, app_name: str, state: dict[str, Any]) -> None:
+        async with get_or_create_engine(self.url).begin() as connection:
+            await connection.execute(
+                text(
+                    'INSERT INTO app_states (app_name, state, update_time) '
+                    'VALUES (:app_name, CAST(:state AS JSONB), :update_time) '
+                    'ON CONFLICT (app_name) DO UPDATE '
+                    'SET state = EXCLUDED.state, update_time = EXCLUDED.update_time'
+                ),
+                {'app_name': app_name, 'state': json.dumps(state), 'update_time': datetime.now()},
+            )
+
+    async def write_user(self, user_id: str, sessions: list[Session]) -> None:
+        if not sessions:
+            return
+
+        app_name = sessions[0].app_name
+        session_records: list[tuple[Any, ...]] = []
+        event_records: list[tuple[Any, ...]] = []
+        user_state: dict[str, Any] = {}
+        for session in sessions:
+            _, user_state, session_state = split_state(session.state)
+            session_records.append(_to_session_record(session, session_state))
+            event_records.extend(
+                _to_event_record(
+                    session, self.codec.compress_event(event) if self.codec else event
+                )
+                for event in _stored_events(session)
+            )
+
+        async with get_or_create_engine(self.url).connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            assert driver_connection is not None
+
+            async with driver_connection.transaction():
+                # Events go with their sessions (ON DELETE CASCADE)
+                await driver_connection.execute(
+                    'DELETE FROM sessions WHERE app_name = $1 AND user_id = $2 AND id = ANY($3)',
+                    app_name,
+                    user_id,
+                    [session.id for session in sessions],
+                )
+                await driver_connection.copy_records_to_table(
+                    'sessions', records=session_records, columns=_SESSION_COLUMNS
+                )
+                await driver_connection.copy_records_to_table(
+                    'events', records=event_records, columns=_EVENT_COLUMNS
+                )
+                if user_state:
+                    await driver_connection.execute(
+                        'INSERT INTO user_states (app_name, user_id, state, update_time) '
+                        'VALUES ($1, $2, $3, $4) '
+                        'ON CONFLICT (app_name, user_id) DO UPDATE '
+                        'SET state = EXCLUDED.state, update_time = EXCLUDED.update_time',
+                        app_name,
+                        user_id,
+                        json.dumps(user_state),
+                        datetime.fromtimestamp(max(s.last_update_time for s in sessions)),
+                    )
+
+    async def count(self, app_name: str, user_id: str, session_ids: list[str]) -> tuple[int, int]:
+        params = {'app_name': app_name, 'user_id': user_id, 'session_ids': session_ids}
+        async with get_or_create_engine(self.url).connect() as connection:
+            sessions = await connection.scalar(
+                text(
+                    'SELECT count(*) FROM sessions WHERE app_name = :app_name '
+                    'AND user_id = :user_id AND id = ANY(:session_ids)'
+                ),
+                params,
+            )
+            events = await connection.scalar(
+                text(
+                    'SELECT count(*) FROM events WHERE app_name = :app_name '
+                    'AND user_id = :user_id AND session_id = ANY(:session_ids)'
+                ),
+                params,
+            )
+
+        return sessions or 0, events or 0
+
+
+def split_state(state: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+    """
+    Split the merged state of a session into the app, user and session states ADK stores.
+
+    Temporary (`temp:`) keys are dropped, as ADK never persists them.
+
+    Args:
+        state: The state of a session, as returned by a session service
+
+    Returns:
+        tuple[dict[str, Any], dict[str, Any], dict[str, Any]]: The app and user states
+            without their prefixes, and the session state
+    """
+    app_state = {}
+    user_state = {}
+    session_state = {}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+
+    return app_state, user_state, session_state
+
+
+def _stored_events(session: Session) -> list[Event]:
+    # Session services do not store partial (streamed) events
+    return [event for event in session.events if not event.partial]
+
+
+def _to_session_record(session: Session, state: dict[str, Any]) -> tuple[Any, ...]:
+    # ADK stores naive local times, see `StorageEvent.from_event`
+    update_time = datetime.fromtimestamp(session.last_update_time)
+    create_time = (
+        datetime.fromtimestamp(session.events[0].timestamp) if session.events else update_time
+    )
+    return (
+        session.app_name,
+        session.user_id,
+        session.id,
+        json.dumps(state),
+        min(create_time, update_time),
+        update_time,
+    )
+
+
+def _to_event_record(session: Session, event: Event) -> tuple[Any, ...]:
+    return (
+        event.id,
+        session.app_name,
+        session.user_id,
+        session.id,
+        event.invocation_id,
+        datetime.fromtimestamp(event.timestamp),
+        json.dumps(event.model_dump(exclude_none=True, mode='json')),
+    )
@@ -0,0 +1,428 @@
+"""
+Retention of sessions and transcripts.
+
+The session and transcript tables are partitioned by month (see `ai_assistant.db.partitions`).
+A sweep, run every `RETENTION_SWEEP_INTERVAL_SECONDS` by the API with `RETENTION_SWEEP_ENABLED`
+or on demand with `python -m ai_assistant.cli.sweep_retention`:
+
+1. Deletes the sessions not updated for `RETENTION_SESSION_DAYS`.
+2. Creates the partitions of the current month and of the `RETENTION_PARTITIONS_AHEAD`
+   following ones, so that inserts never miss a partition.
+3. Detaches and drops every partition whose rows have all expired. Dropping a partition is
+   far cheaper than deleting its rows, and leaves no dead tuples in the hot indexes.
+4. Deletes the expired rows of the partitions that also hold rows to keep, in batches of
+   `RETENTION_DELETE_BATCH_SIZE` rows, at most `RETENTION_DELETE_ROWS_PER_SECOND`.
+
+Expired sessions are deleted through the session service, which deletes their events along
+with them, and their transcript and snapshot through its listeners. The transcripts are read
+in place of the events of their sessions, so their rows are only deleted with their sessions,
+and the partitions this leaves empty are dropped.
+
+The ADK event log is stored by the session service (Vertex AI, or the `DatabaseSessionService`
+of `SESSION_DATABASE_URL`) in tables it owns, which are not partitioned. The `session` table is
+partitioned too, but is not written by the application, so only its partitions are created.
+
+Every statement waits at most `RETENTION_LOCK_TIMEOUT_SECONDS` for its locks, so a sweep
+gives way to live traffic. Sweeps of concurrent processes, e.g. of every API worker, are
+serialized by an advisory lock: one runs and the others are skipped.
+
+The lock and the lock timeout are held by the server connection of the sweep, for the whole
+sweep, as partitions cannot be detached concurrently within a transaction. Behind PgBouncer in
+transaction pooling mode, consecutive statements may run on different server connections, so
+the sweeper then connects directly to the database, with `RETENTION_DATABASE_URL`.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+
+from google.adk.sessions import BaseSessionService
+from pydantic import PostgresDsn
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ai_assistant.common.settings import settings
+from ai_assistant.db.database import get_or_create_engine
+from ai_assistant.db.partitions import MonthlyPartitioning
+from ai_assistant.db.partitions import Partition
+from ai_assistant.models.base import BaseModel
+from ai_assistant.models.session import Session as SessionModel
+from ai_assistant.models.transcript import TranscriptMessage as TranscriptMessageModel
+from ai_assistant.services.ai.adk.session_factory import get_session_service
+
+logger = logging.getLogger(__name__)
+
+# Name of the advisory lock held during a sweep
+_SWEEP_LOCK = 'ai_assistant.retention_sweep'
+
+
+def _days(days: int | None) -> timedelta | None:
+    return timedelta(days=days) if days is not None else None
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    How long the rows of a partitioned table are kept.
+    """
+
+    partitioning: MonthlyPartitioning
+    # None keeps the rows forever; partitions are still created ahead
+    retention: timedelta | None
+    # SQL condition of the expired rows `swept`, given the `:cutoff` of the retention. None if
+    # rows are deleted by others, e.g. with their sessions, and only expired partitions are
+    # dropped once empty
+    expired: str | None
+    # SQL condition of the rows kept even if their partition has expired, e.g. open sessions
+    retained: str | None = None
+
+
+@dataclass
+class SweepReport:
+    """
+    The outcome of a retention sweep.
+    """
+
+    created_partitions: list[str] = field(default_factory=list)
+    dropped_partitions: list[str] = field(default_factory=list)
+    deleted_rows: int = 0
+    deleted_sessions: int = 0
+    failed_sessions: int = 0
+    failed_tables: list[str] = field(default_factory=list)
+    # Another process was already sweeping
+    skipped: bool = False
+
+
+def default_retention_policies() -> list[RetentionPolicy]:
+    """
+    Get the retention policies of the session and transcript tables, from the settings.
+
+    Returns:
+        list[RetentionPolicy]: The policies of the partitioned tables
+    """
+    return [
+        # Not written by the application: only its partitions are created
+        RetentionPolicy(
+            partitioning=_partitioning(SessionModel),
+            retention=None,
+            expired=None,
+        ),
+        # Messages are deleted with their sessions, which expire after the same period
+        RetentionPolicy(
+            partitioning=_partitioning(TranscriptMessageModel),
+            retention=_days(settings.RETENTION_SESSION_DAYS),
+            expired=None,
+            retained='TRUE',
+        ),
+    ]
+
+
+class RetentionSweeper:
+    """
+    Deletes the expired sessions, creates the upcoming partitions of tables and removes their
+    expired rows.
+
+    Example:
+        sweeper = RetentionSweeper(default_retention_policies(), session_service)
+        report = await sweeper.sweep()
+    """
+
+    def __init__(
+        self,
+        policies: list[RetentionPolicy],
+        session_service: BaseSessionService | None = None,
+        session_retention: timedelta | None = _days(settings.RETENTION_SESSION_DAYS),
+        url: PostgresDsn | None = None,
+        partitions_ahead: int = settings.RETENTION_PARTITIONS_AHEAD,
+        batch_size: int = settings.RETENTION_DELETE_BATCH_SIZE,
+        rows_per_second: float = settings.RETENTION_DELETE_ROWS_PER_SECOND,
+        lock_timeout: float = settings.RETENTION_LOCK_TIMEOUT_SECONDS,
+    ) -> None:
+        """
+        Initialize the sweeper.
+
+        Args:
+            policies: The retention policies of the tables to sweep
+            session_service: The session service deleting the expired sessions, required
+                with a session retention
+            session_retention: How long sessions are kept after their last update, None to
+                keep them forever
+            url: The direct url of the database, by default `RETENTION_DATABASE_URL` or else
+                `DATABASE_URL`
+            partitions_ahead: The number of months to create partitions for, after the current
+            batch_size: The number of rows deleted per statement
+            rows_per_second: The maximum rate of deleted rows
+            lock_timeout: The maximum time a statement waits for its locks, in seconds
+
+        Raises:
+            ValueError: If the url is that of PgBouncer in transaction pooling mode, or
+                sessions expire without a session service
+        """
+        url = url or settings.RETENTION_DATABASE_URL or settings.DATABASE_URL
+        if settings.DATABASE_PGBOUNCER_MODE and url == settings.DATABASE_URL:
+            raise ValueError(
+                'The retention sweeper holds a lock across transactions, which PgBouncer '
+                'cannot keep on one server connection: set RETENTION_DATABASE_URL'
+            )
+
+        if session_service is None and session_retention is not None:
+            raise ValueError('Expiring sessions needs the session service deleting them')
+
+        self.policies = policies
+        self.session_service = session_service
+        self.session_retention = session_retention
+        self.url = url
+        self.partitions_ahead = partitions_ahead
+        self.batch_size = batch_size
+        self.rows_per_second = rows_per_second
+        self.lock_timeout = lock_timeout
+
+        self._task: asyncio.Task[None] | None = None
+
+    async def sweep(self, now: datetime | None = None) -> SweepReport:
+        """
+        Delete the expired sessions and sweep every table once.
+
+        A session that cannot be deleted is reported as failed and tried again by the next
+        sweep. A table that cannot be swept, e.g. because a lock timed out, is reported as
+        failed and the others are still swept.
+
+        Args:
+            now: The current time, for the partitions to create and the retention cutoffs
+
+        Returns:
+            SweepReport: The deleted sessions, the created and dropped partitions, and the
+                number of deleted rows
+        """
+        now = now or datetime.now(timezone.utc)
+        report = SweepReport()
+        started_at = time.perf_counter()
+
+        async with get_or_create_engine(self.url).connect() as connection:
+            # Every statement commits on its own, and concurrent detaches cannot run in a
+            # transaction
+            await connection.execution_options(isolation_level='AUTOCOMMIT')
+
+            locked = await connection.scalar(
+                text('SELECT pg_try_advisory_lock(hashtext(:lock))'), {'lock': _SWEEP_LOCK}
+            )
+            if not locked:
+                logger.info('Skipping the retention sweep, another one is running')
+                report.skipped = True
+                return report
+
+            try:
+                await connection.execute(
+                    text(f'SET lock_timeout = {round(self.lock_timeout * 1000)}')
+                )
+                if self.session_retention is not None:
+                    await self._expire_sessions(now - self.session_retention, report)
+                for policy in self.policies:
+                    try:
+                        await self._sweep_table(connection, policy, now, report)
+                    except DBAPIError as e:
+                        logger.error(f'Could not sweep {policy.partitioning.table}: {e}')
+                        report.failed_tables.append(policy.partitioning.table)
+            finally:
+                await connection.execute(text('RESET lock_timeout'))
+                await connection.execute(
+                    text('SELECT pg_advisory_unlock(hashtext(:lock))'), {'lock': _SWEEP_LOCK}
+                )
+
+        logger.info(
+            f'Retention sweep created {len(report.created_partitions)} partitions, dropped '
+            f'{len(report.dropped_partitions)}, deleted {report.deleted_sessions} sessions and '
+            f'{report.deleted_rows} rows in {time.perf_counter() - started_at:.3f}s'
+        )
+        return report
+
+    def start(self, interval: float = settings.RETENTION_SWEEP_INTERVAL_SECONDS) -> None:
+        """
+        Sweep periodically in the background, starting now.
+
+        Args:
+            interval: The time between the end of a sweep and the start of the next one,
+                in seconds
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep_periodically(interval))
+            logger.info(f'Started the retention sweeper, every {interval}s')
+
+    async def shutdown(self) -> None:
+        """
+        Stop sweeping periodically. A sweep in progress is cancelled.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _sweep_periodically(self, interval: float) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                # e.g. the database is unreachable: the next sweep tries again
+                logger.warning(f'Retention sweep failed: {e}')
+
+            await asyncio.sleep(interval)
+
+    async def _sweep_table(
+        self,
+        connection: AsyncConnection,
+        policy: RetentionPolicy,
+        now: datetime,
+        report: SweepReport,
+    ) -> None:
+        partitioning = policy.partitioning
+        partitions = await partitioning.list_partitions(connection)
+
+        for month in partitioning.missing_months(partitions, now, self.partitions_ahead):
+            await connection.execute(text(partitioning.create_partition_sql(month)))
+            report.created_partitions.append(partitioning.partition_name(month))
+            logger.info(f'Created partition {partitioning.partition_name(month)}')
+
+        if policy.retention is None:
+            return
+
+        cutoff = now - policy.retention
+        params = {'cutoff': cutoff.timestamp() if partitioning.epoch else cutoff}
+
+        for partition in partitions:
+            # Rows newer than the cutoff have not expired
+            if partition.lower is not None and partition.lower >= cutoff:
+                continue
+
+            if partition.detach_pending or (
+                partition.upper is not None
+                and partition.upper <= cutoff
+                and not await self._has_retained_rows(connection, policy, partition, params)
+            ):
+                await self._drop_partition(connection, partitioning.table, partition)
+                report.dropped_partitions.append(partition.name)
+            elif policy.expired is not None:
+                report.deleted_rows += await self._delete_expired_rows(
+                    connection, policy, partition, params
+                )
+
+    async def _expire_sessions(self, cutoff: datetime, report: SweepReport) -> None:
+        assert self.session_service is not None
+        response = await self.session_service.list_sessions(app_name=settings.APP_NAME)
+
+        for session in response.sessions:
+            if session.last_update_time >= cutoff.timestamp():
+                continue
+            try:
+                await self.session_service.delete_session(
+                    app_name=session.app_name, user_id=session.user_id, session_id=session.id
+                )
+                report.deleted_sessions += 1
+            except Exception as e:
+                logger.error(f'Could not delete expired session {session.id}: {e}')
+                report.failed_sessions += 1
+
+        if report.deleted_sessions:
+            logger.info(f'Deleted {report.deleted_sessions} expired sessions')
+
+    async def _has_retained_rows(
+        self,
+        connection: AsyncConnection,
+        policy: RetentionPolicy,
+        partition: Partition,
+        params: dict[str, Any],
+    ) -> bool:
+        if policy.retained is None:
+            return False
+
+        return bool(
+            await connection.scalar(
+                text(
+                    f'SELECT EXISTS (SELECT 1 FROM {partition.name} AS swept '
+                    f'WHERE {policy.retained})'
+                ),
+                params,
+            )
+        )
+
+    async def _drop_partition(
+        self,
+        connection: AsyncConnection,
+        table: str,
+        partition: Partition,
+    ) -> None:
+        # A concurrent detach only blocks the queries of the partition itself; one that was
+        # interrupted must be finalized instead
+        mode = 'FINALIZE' if partition.detach_pending else 'CONCURRENTLY'
+        await connection.execute(
+            text(f'ALTER TABLE {table} DETACH PARTITION {partition.name} {mode}')
+        )
+        await connection.execute(text(f'DROP TABLE {partition.name}'))
+        logger.info(f'Dropped expired partition {partition.name}')
+
+    async def _delete_expired_rows(
+        self,
+        connection: AsyncConnection,
+        policy: RetentionPolicy,
+        partition: Partition,
+        params: dict[str, Any],
+    ) -> int:
+        assert policy.expired is not None
+        statement = text(
+            f'DELETE FROM {partition.name} WHERE ctid = ANY(ARRAY('
+            f'SELECT ctid FROM {partition.name} AS swept WHERE {policy.expired} '
+            f'LIMIT :batch_size'
+            f'))'
+        )
+
+        deleted = 0
+        while True:
+            result = await connection.execute(statement, {**params, 'batch_size': self.batch_size})
+            deleted += result.rowcount
+            if result.rowcount < self.batch_size:
+                break
+
+            # Throttled, to leave room for live traffic and for vacuum to keep up
+            await asyncio.sleep(result.rowcount / self.rows_per_second)
+
+        if deleted:
+            logger.info(f'Deleted {deleted} expired rows of {partition.name}')
+        return deleted
+
+
+def _partitioning(model: type[BaseModel]) -> MonthlyPartitioning:
+    return MonthlyPartitioning.from_table(BaseModel.metadata.tables[model.__tablename__])
+
+
+_retention_sweeper: RetentionSweeper | None = None
+
+
+def get_retention_sweeper() -> RetentionSweeper:
+    """
+    Get the retention sweeper, initializing it lazily on first access.
+
+    Returns:
+        RetentionSweeper: The singleton retention sweeper instance.
+    """
+    global _retention_sweeper
+
+    if _retention_sweeper is None:
+        _retention_sweeper = RetentionSweeper(
+            default_retention_policies(), session_service=get_session_service()
+        )
+
+    return _retention_sweeper
+
+
+async def shutdown_retention_sweeper() -> None:
+    """
+    Stop the retention sweeper, if it was started.
+    """
+    if _retention_sweeper is not None:
+        await _retention_sweeper.shutdown()
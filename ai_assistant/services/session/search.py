@@ -0,0 +1,136 @@
+"""
+In-process full-text index over transcript messages.
+
+Used by the in-memory transcript store, for setups without Postgres. The index is updated
+incrementally as messages are appended, and is partitioned per user so that a search only
+ever touches the postings of the user being searched.
+
+Matching follows Postgres `websearch_to_tsquery` semantics closely enough for development:
+every query term must appear in a message (AND), case-insensitively. There is no stemming.
+"""
+
+import math
+import re
+import uuid
+from collections import Counter
+from collections import defaultdict
+from dataclasses import dataclass
+from dataclasses import field
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+UserKey = tuple[str, str]
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase word tokens.
+
+    Args:
+        text: The text to tokenize
+
+    Returns:
+        list[str]: The tokens, in order of appearance
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+@dataclass
+class _UserIndex:
+    # term -> message ID -> term frequency
+    postings: dict[str, dict[uuid.UUID, int]] = field(default_factory=lambda: defaultdict(dict))
+    # message ID -> distinct terms, to remove a message without scanning every posting list
+    terms: dict[uuid.UUID, list[str]] = field(default_factory=dict)
+
+
+class InvertedIndex:
+    """
+    Inverted index of message text, partitioned by `(app_name, user_id)`.
+
+    Results are ranked by TF-IDF, computed over the messages of the searched user.
+    """
+
+    def __init__(self) -> None:
+        self._users: dict[UserKey, _UserIndex] = defaultdict(_UserIndex)
+
+    def add(self, app_name: str, user_id: str, message_id: uuid.UUID, text: str) -> None:
+        """
+        Index a message. Adding a message that is already indexed is a no-op.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the message
+            message_id: The ID of the message
+            text: The text of the message
+        """
+        index = self._users[(app_name, user_id)]
+        if message_id in index.terms:
+            return
+
+        counts = Counter(tokenize(text))
+        for term, count in counts.items():
+            index.postings[term][message_id] = count
+        index.terms[message_id] = list(counts)
+
+    def remove(self, app_name: str, user_id: str, message_ids: list[uuid.UUID]) -> None:
+        """
+        Remove messages from the index.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the messages
+            message_ids: The IDs of the messages to remove
+        """
+        index = self._users.get((app_name, user_id))
+        if index is None:
+            return
+
+        for message_id in message_ids:
+            for term in index.terms.pop(message_id, []):
+                posting = index.postings[term]
+                posting.pop(message_id, None)
+                if not posting:
+                    del index.postings[term]
+
+    def search(self, app_name: str, user_id: str, query: str) -> list[tuple[uuid.UUID, float]]:
+        """
+        Find the messages of a user containing every term of the query.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the messages to search
+            query: The search query
+
+        Returns:
+            list[tuple[uuid.UUID, float]]: Matching message IDs and their scores, unsorted
+        """
+        index = self._users.get((app_name, user_id))
+        terms = set(tokenize(query))
+        if index is None or not terms:
+            return []
+
+        postings = [index.postings.get(term, {}) for term in terms]
+        if not all(postings):
+            return []
+
+        # Intersect starting from the rarest term, so the candidate set is as small as possible
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+
+        total = len(index.terms)
+        idfs = [math.log(1 + total / len(posting)) for posting in postings]
+
+        return [
+            (
+                message_id,
+                sum(
+                    (1 + math.log(posting[message_id])) * idf
+                    for posting, idf in zip(postings, idfs, strict=True)
+                ),
+            )
+            for message_id in candidates
+        ]
@@ -0,0 +1,491 @@
+"""
+Session snapshots.
+
+ADK runners read every event of a session before each turn, so the load time and memory of a
+turn grow with the length of the conversation. `SnapshotSessionService` instead periodically
+summarizes the older events of a session into a snapshot (an ADK compaction event), and reads
+a session as its state, its latest snapshot and the events since.
+
+A snapshot is taken once `SESSION_SNAPSHOT_INTERVAL` events follow the last
+`SESSION_SNAPSHOT_RETAINED_EVENTS`, which are kept as they are. Each snapshot summarizes the
+previous one along with the newer events, so that the latest snapshot holds the whole history
+the agent sees: ADK builds the model request from the summary and the events it does not
+cover, as it would from the full session.
+
+Whether a snapshot is due is decided from the events of the session the runner already
+loaded, as they are appended, and the snapshot is then taken in the background after the
+turn, so that a turn neither reads its session twice nor waits for the summarization.
+
+The events themselves are left in the session store, where they are still read by the other
+readers of the session, e.g. for audit. The snapshot of a session is deleted along with it by
+`SessionSnapshotCleanup`, a listener of the session service shared by every reader, so that a
+session recreated with the same ID is not read from the snapshot of the deleted one.
+"""
+
+import asyncio
+import functools
+import logging
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+
+from google.adk.apps.base_events_summarizer import BaseEventsSummarizer
+from google.adk.events import Event
+from google.adk.events.event_actions import EventCompaction
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.base_session_service import ListSessionsResponse
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from ai_assistant.common.settings import settings
+from ai_assistant.db.database import db_session
+from ai_assistant.models.session_snapshot import SessionSnapshot
+from ai_assistant.services.ai.adk.session_service import SessionEventListener
+
+logger = logging.getLogger(__name__)
+
+_SessionKey = tuple[str, str, str]
+
+# The snapshots being taken in the background, by session
+_snapshot_tasks: dict[_SessionKey, asyncio.Task[Event | None]] = {}
+
+
+class SessionSnapshotStore(ABC):
+    """
+    Storage for the latest snapshot of sessions.
+    """
+
+    @abstractmethod
+    async def get(self, app_name: str, user_id: str, session_id: str) -> Event | None:
+        """
+        Get the latest snapshot of a session.
+
+        Args:
+            app_name: The name of the app
+            user_id: The ID of the user
+            session_id: The ID of the session
+
+        Returns:
+            Event | None: The compaction event of the snapshot, None if there is none
+        """
+
+    @abstractmethod
+    async def put(self, app_name: str, user_id: str, session_id: str, event: Event) -> None:
+        """
+        Store a snapshot of a session, unless a snapshot of later events is stored already.
+
+        Args:
+            app_name: The name of the app
+            user_id: The ID of the user
+            session_id: The ID of the session
+            event: The compaction event of the snapshot
+        """
+
+    @abstractmethod
+    async def delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        """
+        Delete the snapshot of a session.
+
+        Args:
+            app_name: The name of the app
+            user_id: The ID of the user
+            session_id: The ID of the session
+        """
+
+
+class InMemorySessionSnapshotStore(SessionSnapshotStore):
+    """
+    In-memory session snapshot store, for development and testing.
+    """
+
+    def __init__(self) -> None:
+        self._snapshots: dict[tuple[str, str, str], Event] = {}
+
+    async def get(self, app_name: str, user_id: str, session_id: str) -> Event | None:
+        return self._snapshots.get((app_name, user_id, session_id))
+
+    async def put(self, app_name: str, user_id: str, session_id: str, event: Event) -> None:
+        key = (app_name, user_id, session_id)
+        current = self._snapshots.get(key)
+        if (
+            current is None
+            or _compaction(current).end_timestamp < _compaction(event).end_timestamp
+        ):
+            self._snapshots[key] = event
+
+    async def delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        self._snapshots.pop((app_name, user_id, session_id), None)
+
+
+class DatabaseSessionSnapshotStore(SessionSnapshotStore):
+    """
+    Postgres-backed session snapshot store.
+    """
+
+    async def get(self, app_name: str, user_id: str, session_id: str) -> Event | None:
+        async with db_session(
+            autocommit=False, read_only=True, consistency_key=session_id
+        ) as session:
+            event = await session.scalar(
+                select(SessionSnapshot.event).where(
+                    SessionSnapshot.app_name == app_name,
+                    SessionSnapshot.user_id == user_id,
+                    SessionSnapshot.session_id == session_id,
+                )
+            )
+        return Event.model_validate(event) if event is not None else None
+
+    async def put(self, app_name: str, user_id: str, session_id: str, event: Event) -> None:
+        stmt = insert(SessionSnapshot).values(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            end_timestamp=_compaction(event).end_timestamp,
+            event=event.model_dump(mode='json', exclude_none=True),
+        )
+        async with db_session(consistency_key=session_id) as session:
+            # Of concurrent snapshots, the one summarizing the latest events wins
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[
+                        SessionSnapshot.app_name,
+                        SessionSnapshot.user_id,
+                        SessionSnapshot.session_id,
+                    ],
+                    set_={
+                        'end_timestamp': stmt.excluded.end_timestamp,
+                        'event': stmt.excluded.event,
+                        'updated_at': func.now(),
+                    },
+                    where=SessionSnapshot.end_timestamp < stmt.excluded.end_timestamp,
+                )
+            )
+
+    async def delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        async with db_session(consistency_key=session_id) as session:
+            await session.execute(
+                delete(SessionSnapshot).where(
+                    SessionSnapshot.app_name == app_name,
+                    SessionSnapshot.user_id == user_id,
+                    SessionSnapshot.session_id == session_id,
+                )
+            )
+
+
+class SnapshotSessionService(BaseSessionService):
+    """
+    Session service that delegates to an ADK session service, reading sessions from their
+    latest snapshot in a `SessionSnapshotStore`.
+
+    Sessions are read from their snapshot unless a `GetSessionConfig` is given, which reads
+    the events it selects from the underlying service. Deleting a session leaves its snapshot
+    to the `SessionSnapshotCleanup` listener of the underlying service.
+    """
+
+    def __init__(
+        self,
+        session_service: BaseSessionService,
+        store: SessionSnapshotStore,
+        summarizer: BaseEventsSummarizer,
+        interval: int = settings.SESSION_SNAPSHOT_INTERVAL,
+        retained_events: int = settings.SESSION_SNAPSHOT_RETAINED_EVENTS,
+    ) -> None:
+        """
+        Initialize the snapshot session service.
+
+        Args:
+            session_service: The underlying ADK session service
+            store: The store of the snapshots
+            summarizer: The summarizer of the events of a snapshot
+            interval: The number of new events after which a snapshot is taken
+            retained_events: The number of latest events left out of a snapshot
+        """
+        self.session_service = session_service
+        self.store = store
+        self.summarizer = summarizer
+        self.interval = interval
+        self.retained_events = retained_events
+        # The sessions loaded by a turn that are due a snapshot, until the turn ends
+        self._due: dict[_SessionKey, Session] = {}
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: dict[str, Any] | None = None,
+        session_id: str | None = None,
+    ) -> Session:
+        return await self.session_service.create_session(
+            app_name=app_name,
+            user_id=user_id,
+            state=state,
+            session_id=session_id,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: GetSessionConfig | None = None,
+    ) -> Session | None:
+        snapshot = None
+        if config is None:
+            snapshot = await self.store.get(app_name, user_id, session_id)
+            if snapshot is not None:
+                config = GetSessionConfig(after_timestamp=_compaction(snapshot).end_timestamp)
+
+        session = await self.session_service.get_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            config=config,
+        )
+        if session is not None and snapshot is not None:
+            _start_at(session, snapshot)
+        return session
+
+    async def list_sessions(
+        self,
+        *,
+        app_name: str,
+        user_id: str | None = None,
+    ) -> ListSessionsResponse:
+        return await self.session_service.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.session_service.delete_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+        self._due.pop((app_name, user_id, session_id), None)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        events = session.events
+        appended = await self.session_service.append_event(session=session, event=event)
+        if event.partial:
+            return appended
+
+        if event.actions.compaction is not None:
+            await self.store.put(session.app_name, session.user_id, session.id, event)
+        # A stale session is reloaded from storage, with all its events, by some services
+        else:
+            if session.events is not events:
+                snapshot = await self.store.get(session.app_name, session.user_id, session.id)
+                if snapshot is not None:
+                    _start_at(session, snapshot)
+            if self.is_snapshot_due(session):
+                self._due[(session.app_name, session.user_id, session.id)] = session
+        return appended
+
+    def is_snapshot_due(self, session: Session) -> bool:
+        """
+        Check whether `interval` events of a loaded session follow its retained events.
+
+        Args:
+            session: The session, as read by `get_session`
+
+        Returns:
+            bool: Whether a snapshot of the session is due
+        """
+        _, events = _unsummarized(session)
+        return len(events) >= self.interval + self.retained_events
+
+    def schedule_snapshot(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> asyncio.Task[Event | None] | None:
+        """
+        Take a snapshot of a session in the background, if one became due during the turn.
+
+        The snapshot is taken from the session loaded by the turn, and at most one snapshot
+        of a session is taken at once. Failures are logged.
+
+        Args:
+            app_name: The name of the app
+            user_id: The ID of the user
+            session_id: The ID of the session
+
+        Returns:
+            asyncio.Task[Event | None] | None: The task taking the snapshot, None if none is due
+        """
+        key = (app_name, user_id, session_id)
+        session = self._due.pop(key, None)
+        if session is None or key in _snapshot_tasks:
+            return None
+
+        task = asyncio.create_task(self.snapshot_session(session))
+        _snapshot_tasks[key] = task
+        task.add_done_callback(functools.partial(_snapshot_done, key))
+        return task
+
+    async def snapshot(self, *, app_name: str, user_id: str, session_id: str) -> Event | None:
+        """
+        Take a snapshot of a session if `interval` events follow its retained events.
+
+        The snapshot summarizes the previous snapshot and the events since, up to the
+        retained events. These start at the first event of an invocation, so that function
+        calls and their responses are either both summarized or both retained.
+
+        Args:
+            app_name: The name of the app
+            user_id: The ID of the user
+            session_id: The ID of the session
+
+        Returns:
+            Event | None: The compaction event of the snapshot, None if none was taken
+        """
+        session = await self.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if session is None:
+            return None
+        return await self.snapshot_session(session)
+
+    async def snapshot_session(self, session: Session) -> Event | None:
+        """
+        Take a snapshot of a loaded session, see `snapshot`.
+
+        Args:
+            session: The session, as read by `get_session`
+
+        Returns:
+            Event | None: The compaction event of the snapshot, None if none was taken
+        """
+        previous, events = _unsummarized(session)
+        if len(events) < self.interval + self.retained_events:
+            return None
+
+        split = len(events) - self.retained_events
+        while (
+            0 < split < len(events)
+            and events[split].invocation_id == events[split - 1].invocation_id
+        ):
+            split -= 1
+        if split == 0:
+            return None
+
+        to_summarize = events[:split]
+        if previous is not None:
+            compaction = _compaction(previous)
+            to_summarize.insert(
+                0,
+                Event(
+                    timestamp=compaction.start_timestamp,
+                    author='model',
+                    content=compaction.compacted_content,
+                    branch=previous.branch,
+                    invocation_id=Event.new_id(),
+                ),
+            )
+
+        event = await self.summarizer.maybe_summarize_events(events=to_summarize)
+        if event is None:
+            return None
+
+        await self.append_event(session, event)
+        logger.info(f'Snapshotted {len(to_summarize)} events of session {session.id}')
+        return event
+
+
+class SessionSnapshotCleanup(SessionEventListener):
+    """
+    Deletes the snapshot of sessions as they are deleted.
+    """
+
+    def __init__(self, store: SessionSnapshotStore) -> None:
+        self.store = store
+
+    async def on_event_appended(self, session: Session, event: Event) -> None:
+        return None
+
+    async def on_session_deleted(self, app_name: str, user_id: str, session_id: str) -> None:
+        await self.store.delete(app_name, user_id, session_id)
+
+
+async def shutdown_session_snapshots() -> None:
+    """
+    Cancel the snapshots being taken in the background.
+    """
+    tasks = list(_snapshot_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _snapshot_done(key: _SessionKey, task: asyncio.Task[Event | None]) -> None:
+    _snapshot_tasks.pop(key, None)
+    if not task.cancelled() and (exception := task.exception()) is not None:
+        logger.error(f'Failed to snapshot session {key[2]}', exc_info=exception)
+
+
+def create_session_snapshot_store() -> SessionSnapshotStore:
+    """
+    Create a session snapshot store based on the application environment.
+
+    Returns:
+        SessionSnapshotStore: The configured session snapshot store instance.
+    """
+    environment = settings.ENVIRONMENT.lower()
+
+    if environment in ['staging', 'production']:
+        logger.info(f'Using DatabaseSessionSnapshotStore for `{environment}` environment.')
+        return DatabaseSessionSnapshotStore()
+
+    logger.info(f'Using InMemorySessionSnapshotStore for `{environment}` environment.')
+    return InMemorySessionSnapshotStore()
+
+
+_session_snapshot_store: SessionSnapshotStore | None = None
+
+
+def get_session_snapshot_store() -> SessionSnapshotStore:
+    """
+    Get the session snapshot store, initializing it lazily on first access.
+
+    Returns:
+        SessionSnapshotStore: The singleton session snapshot store instance.
+    """
+    global _session_snapshot_store
+
+    if _session_snapshot_store is None:
+        _session_snapshot_store = create_session_snapshot_store()
+
+    return _session_snapshot_store
+
+
+def _compaction(event: Event) -> EventCompaction:
+    assert event.actions.compaction is not None
+    return event.actions.compaction
+
+
+def _unsummarized(session: Session) -> tuple[Event | None, list[Event]]:
+    """
+    Get the latest snapshot of a loaded session and the events it does not summarize.
+    """
+    previous = next(
+        (event for event in reversed(session.events) if event.actions.compaction is not None),
+        None,
+    )
+    end_timestamp = _compaction(previous).end_timestamp if previous is not None else 0.0
+    return previous, [
+        event
+        for event in session.events
+        if event.actions.compaction is None and event.timestamp > end_timestamp
+    ]
+
+
+def _start_at(session: Session, snapshot: Event) -> None:
+    """
+    Keep the snapshot and the events following it of a session.
+    """
+    end_timestamp = _compaction(snapshot).end_timestamp
+    session.events = [snapshot] + [
+        event
+        for event in session.events
+        if event.id != snapshot.id and event.timestamp >= end_timestamp
+    ]
@@ -0,0 +1,794 @@
+"""
+Delta-encoded session state.
+
+ADK session services store the state of a session as a single document, rewritten in full
+every time an event changes any of its keys. `DeltaStateSessionService` instead stores the
+state changes of each event (its session-scoped `state_delta`) as a row of an append-only
+log, so that a write costs what changed rather than the size of the whole state.
+
+Every `SESSION_STATE_CHECKPOINT_INTERVAL` deltas, the state of the session is materialized
+into a checkpoint, and reading the state is a read of the checkpoint and of the deltas
+since. Within `requested_state_keys`, e.g. for an API request that only returns a few keys,
+only those keys are read.
+
+The delta of an event is written before the event, as pending, and confirmed once the event
+is stored: a delta is only applied once its event landed, and an event never lands without
+its delta. A delta left pending by a process stopped after storing its event is confirmed
+the next time the session is read with its events.
+
+App (`app:`) and user (`user:`) state are shared between sessions and still stored by the
+underlying session service, as is the initial state of a session, written once.
+"""
+
+import logging
+from abc import ABC
+from abc import abstractmethod
+from collections import defaultdict
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.base_session_service import ListSessionsResponse
+from google.adk.sessions.state import State
+from sqlalchemy import ColumnElement
+from sqlalchemy import and_
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ai_assistant.common.settings import settings
+from ai_assistant.db.database import db_session
+from ai_assistant.models.session_state import SessionStateCheckpoint
+from ai_assistant.models.session_state import SessionStateDelta
+
+logger = logging.getLogger(__name__)
+
+_SHARED_PREFIXES = (State.APP_PREFIX, State.USER_PREFIX, State.TEMP_PREFIX)
+
+_requested_keys: ContextVar[list[str] | None] = ContextVar('requested_state_keys', default=None)
+
+
+@contextmanager
+def requested_state_keys(keys: list[str] | None) -> Generator[None, None, None]:
+    """
+    Only read the given keys of the delta-encoded state of the sessions read in the context.
+
+    The other keys of the state of these sessions may be missing, so the sessions must not
+    be used for anything but returning the requested keys.
+
+    Args:
+        keys: The keys to read (all keys if None)
+    """
+    token = _requested_keys.set(keys)
+    try:
+        yield
+    finally:
+        _requested_keys.reset(token)
+
+
+def select_keys(state: dict[str, Any], keys: list[str] | None) -> dict[str, Any]:
+    """
+    Keep the given keys of a state.
+
+    Args:
+        state: The state
+        keys: The keys to keep (all keys if None)
+
+    Returns:
+        dict[str, Any]: The entries of the state whose key is requested
+    """
+    if keys is None:
+        return state
+
+    return {key: state[key] for key in keys if key in state}
+
+
+def session_state_delta(event: Event) -> dict[str, Any]:
+    """
+    Get the changes an event makes to the state of its session itself.
+
+    Args:
+        event: The event
+
+    Returns:
+        dict[str, Any]: The changed keys without an app, user or temporary prefix
+    """
+    if not event.actions or not event.actions.state_delta:
+        return {}
+
+    return {
+        key: value
+        for key, value in event.actions.state_delta.items()
+        if not key.startswith(_SHARED_PREFIXES)
+    }
+
+
+class SessionStateStore(ABC):
+    """
+    Storage for the state deltas of sessions.
+    """
+
+    def __init__(
+        self,
+        checkpoint_interval: int = settings.SESSION_STATE_CHECKPOINT_INTERVAL,
+    ) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            checkpoint_interval: The number of deltas after which a checkpoint is written
+        """
+        self.checkpoint_interval = checkpoint_interval
+
+    @abstractmethod
+    async def append(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_id: str,
+        delta: dict[str, Any],
+    ) -> None:
+        """
+        Write the state delta of an event, before the event is stored.
+
+        The delta is pending, and not applied, until it is confirmed. Writing the delta of an
+        event again has no effect.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+            event_id: The ID of the event changing the state
+            delta: The changed keys and their new values
+        """
+
+    @abstractmethod
+    async def confirm(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_id: str,
+        delta: dict[str, Any],
+    ) -> None:
+        """
+        Append the state delta of an event to the log of a session, once the event is stored.
+
+        Confirming the delta of an event again has no effect.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+            event_id: The ID of the stored event
+            delta: The changed keys and their new values, written again if it was discarded
+        """
+
+    @abstractmethod
+    async def discard(self, app_name: str, user_id: str, session_id: str, event_id: str) -> None:
+        """
+        Delete the pending state delta of an event that was not stored.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+            event_id: The ID of the event
+        """
+
+    @abstractmethod
+    async def get_pending(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Get the state deltas of a session written and not yet confirmed.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+
+        Returns:
+            dict[str, dict[str, Any]]: The pending delta of each event, by event ID
+        """
+
+    @abstractmethod
+    async def get_states(
+        self,
+        app_name: str,
+        user_id: str,
+        session_ids: list[str],
+        keys: list[str] | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Materialize the states of sessions.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the sessions
+            session_ids: The IDs of the sessions
+            keys: The keys to read (all keys if None)
+
+        Returns:
+            dict[str, dict[str, Any]]: The state of each session with at least one delta
+        """
+
+    @abstractmethod
+    async def get_deltas(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Get the state deltas of the events of a session.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+
+        Returns:
+            dict[str, dict[str, Any]]: The delta of each event, by event ID
+        """
+
+    @abstractmethod
+    async def delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        """
+        Delete the state log of a session.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+        """
+
+
+class InMemorySessionStateStore(SessionStateStore):
+    """
+    In-memory session state store, for development and testing.
+    """
+
+    def __init__(
+        self,
+        checkpoint_interval: int = settings.SESSION_STATE_CHECKPOINT_INTERVAL,
+    ) -> None:
+        super().__init__(checkpoint_interval)
+        self._deltas: dict[tuple[str, str, str], list[tuple[str, dict[str, Any]]]] = defaultdict(
+            list
+        )
+        self._checkpoints: dict[tuple[str, str, str], tuple[int, dict[str, Any]]] = {}
+        self._pending: dict[tuple[str, str, str], dict[str, dict[str, Any]]] = defaultdict(dict)
+
+    async def append(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_id: str,
+        delta: dict[str, Any],
+    ) -> None:
+        key = (app_name, user_id, session_id)
+        if all(landed != event_id for landed, _ in self._deltas.get(key, [])):
+            self._pending[key].setdefault(event_id, dict(delta))
+
+    async def confirm(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_id: str,
+        delta: dict[str, Any],
+    ) -> None:
+        key = (app_name, user_id, session_id)
+        self._pending[key].pop(event_id, None)
+        deltas = self._deltas[key]
+        if any(landed == event_id for landed, _ in deltas):
+            return
+        deltas.append((event_id, dict(delta)))
+
+        checkpointed, state = self._checkpoints.get(key, (0, {}))
+        if len(deltas) - checkpointed >= self.checkpoint_interval:
+            for _, pending in deltas[checkpointed:]:
+                state = state | pending
+            self._checkpoints[key] = (len(deltas), state)
+
+    async def discard(self, app_name: str, user_id: str, session_id: str, event_id: str) -> None:
+        self._pending[(app_name, user_id, session_id)].pop(event_id, None)
+
+    async def get_pending(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+    ) -> dict[str, dict[str, Any]]:
+        return dict(self._pending.get((app_name, user_id, session_id), {}))
+
+    async def get_states(
+        self,
+        app_name: str,
+        user_id: str,
+        session_ids: list[str],
+        keys: list[str] | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        states = {}
+        for session_id in session_ids:
+            key = (app_name, user_id, session_id)
+            if key not in self._deltas:
+                continue
+
+            checkpointed, state = self._checkpoints.get(key, (0, {}))
+            for _, delta in self._deltas[key][checkpointed:]:
+                state = state | delta
+            states[session_id] = select_keys(state, keys)
+
+        return states
+
+    async def get_deltas(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+    ) -> dict[str, dict[str, Any]]:
+        return dict(self._deltas.get((app_name, user_id, session_id), []))
+
+    async def delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        self._deltas.pop((app_name, user_id, session_id), None)
+        self._checkpoints.pop((app_name, user_id, session_id), None)
+        self._pending.pop((app_name, user_id, session_id), None)
+
+
+class DatabaseSessionStateStore(SessionStateStore):
+    """
+    Postgres-backed session state store.
+
+    The deltas of a session are read with a range scan over the
+    `(app_name, user_id, session_id, id)` index, starting after its checkpoint. With
+    requested keys, the entries of the other keys are left out by Postgres, and so are the
+    deltas that change none of the requested keys.
+
+    A pending delta is a row with `landed` false. Confirming it writes it again as landed, so
+    that the IDs of the landed deltas follow the order their events were stored in. Confirms
+    of a session are serialized by an advisory lock on the session, held until they commit, so
+    that no delta of a lower ID than a checkpoint commits after it.
+    """
+
+    async def append(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_id: str,
+        delta: dict[str, Any],
+    ) -> None:
+        async with db_session(consistency_key=session_id) as session:
+            await session.execute(
+                _insert_delta(app_name, user_id, session_id, event_id, delta, landed=False)
+            )
+
+    async def confirm(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_id: str,
+        delta: dict[str, Any],
+    ) -> None:
+        async with db_session(consistency_key=session_id) as session:
+            await session.execute(
+                text('SELECT pg_advisory_xact_lock(hashtext(:key))'),
+                {'key': f'{app_name}:{user_id}:{session_id}'},
+            )
+            await session.execute(
+                delete(SessionStateDelta).where(
+                    *_session_filter(app_name, user_id, [session_id]),
+                    SessionStateDelta.event_id == event_id,
+                    SessionStateDelta.landed.is_(False),
+                )
+            )
+            await session.execute(
+                _insert_delta(app_name, user_id, session_id, event_id, delta, landed=True)
+            )
+
+            pending = await session.scalar(
+                select(func.count())
+                .select_from(SessionStateDelta)
+                .outerjoin(SessionStateCheckpoint, _same_session())
+                .where(
+                    *_landed_filter(app_name, user_id, [session_id]),
+                    SessionStateDelta.id > func.coalesce(SessionStateCheckpoint.delta_id, 0),
+                )
+            )
+            if pending is not None and pending >= self.checkpoint_interval:
+                await self._checkpoint(session, app_name, user_id, session_id)
+
+    async def discard(self, app_name: str, user_id: str, session_id: str, event_id: str) -> None:
+        async with db_session(consistency_key=session_id) as session:
+            await session.execute(
+                delete(SessionStateDelta).where(
+                    *_session_filter(app_name, user_id, [session_id]),
+                    SessionStateDelta.event_id == event_id,
+                    SessionStateDelta.landed.is_(False),
+                )
+            )
+
+    async def get_pending(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+    ) -> dict[str, dict[str, Any]]:
+        stmt = (
+            select(SessionStateDelta.event_id, SessionStateDelta.delta)
+            .where(
+                *_session_filter(app_name, user_id, [session_id]),
+                SessionStateDelta.landed.is_(False),
+            )
+            .order_by(SessionStateDelta.id)
+        )
+
+        async with db_session(autocommit=False, consistency_key=session_id) as session:
+            rows = (await session.execute(stmt)).tuples().all()
+
+        return dict(rows)
+
+    async def get_states(
+        self,
+        app_name: str,
+        user_id: str,
+        session_ids: list[str],
+        keys: list[str] | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        if not session_ids:
+            return {}
+
+        async with db_session(
+            autocommit=False, read_only=True, consistency_key=_consistency_key(session_ids)
+        ) as session:
+            return await self._read_states(session, app_name, user_id, session_ids, keys)
+
+    async def get_deltas(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+    ) -> dict[str, dict[str, Any]]:
+        stmt = (
+            select(SessionStateDelta.event_id, SessionStateDelta.delta)
+            .where(*_landed_filter(app_name, user_id, [session_id]))
+            .order_by(SessionStateDelta.id)
+        )
+
+        async with db_session(
+            autocommit=False, read_only=True, consistency_key=session_id
+        ) as session:
+            rows = (await session.execute(stmt)).tuples().all()
+
+        return dict(rows)
+
+    async def delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        async with db_session(consistency_key=session_id) as session:
+            await session.execute(
+                delete(SessionStateDelta).where(*_session_filter(app_name, user_id, [session_id]))
+            )
+            await session.execute(
+                delete(SessionStateCheckpoint).where(
+                    SessionStateCheckpoint.app_name == app_name,
+                    SessionStateCheckpoint.user_id == user_id,
+                    SessionStateCheckpoint.session_id == session_id,
+                )
+            )
+
+    async def _checkpoint(
+        self,
+        session: AsyncSession,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+    ) -> None:
+        states = await self._read_states(session, app_name, user_id, [session_id], None)
+        delta_id = await session.scalar(
+            select(func.max(SessionStateDelta.id)).where(
+                *_landed_filter(app_name, user_id, [session_id])
+            )
+        )
+
+        stmt = insert(SessionStateCheckpoint).values(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            delta_id=delta_id,
+            state=states.get(session_id, {}),
+        )
+        # Of concurrent checkpoints, the one including the most deltas wins
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    SessionStateCheckpoint.app_name,
+                    SessionStateCheckpoint.user_id,
+                    SessionStateCheckpoint.session_id,
+                ],
+                set_={
+                    'delta_id': stmt.excluded.delta_id,
+                    'state': stmt.excluded.state,
+                    'updated_at': func.now(),
+                },
+                where=SessionStateCheckpoint.delta_id < stmt.excluded.delta_id,
+            )
+        )
+        logger.debug(f'Checkpointed the state of session {session_id} at delta {delta_id}')
+
+    async def _read_states(
+        self,
+        session: AsyncSession,
+        app_name: str,
+        user_id: str,
+        session_ids: list[str],
+        keys: list[str] | None,
+    ) -> dict[str, dict[str, Any]]:
+        checkpoints = await session.execute(
+            select(
+                SessionStateCheckpoint.session_id,
+                _project(SessionStateCheckpoint.state, keys),
+            ).where(
+                SessionStateCheckpoint.app_name == app_name,
+                SessionStateCheckpoint.user_id == user_id,
+                SessionStateCheckpoint.session_id.in_(session_ids),
+            )
+        )
+        states: dict[str, dict[str, Any]] = dict(checkpoints.tuples().all())
+
+        stmt = (
+            select(SessionStateDelta.session_id, _project(SessionStateDelta.delta, keys))
+            .outerjoin(SessionStateCheckpoint, _same_session())
+            .where(
+                *_landed_filter(app_name, user_id, session_ids),
+                SessionStateDelta.id > func.coalesce(SessionStateCheckpoint.delta_id, 0),
+            )
+            .order_by(SessionStateDelta.id)
+        )
+        if keys is not None:
+            stmt = stmt.where(SessionStateDelta.delta.has_any(array(keys)))
+
+        for session_id, delta in (await session.execute(stmt)).tuples():
+            states[session_id] = states.get(session_id, {}) | delta
+
+        return states
+
+
+class DeltaStateSessionService(BaseSessionService):
+    """
+    Session service that delegates to an ADK session service, storing the state changes of
+    events as deltas in a `SessionStateStore`.
+    """
+
+    def __init__(self, session_service: BaseSessionService, store: SessionStateStore) -> None:
+        """
+        Initialize the delta state session service.
+
+        Args:
+            session_service: The underlying ADK session service
+            store: The store of the state deltas
+        """
+        self.session_service = session_service
+        self.store = store
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: dict[str, Any] | None = None,
+        session_id: str | None = None,
+    ) -> Session:
+        return await self.session_service.create_session(
+            app_name=app_name,
+            user_id=user_id,
+            state=state,
+            session_id=session_id,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: GetSessionConfig | None = None,
+    ) -> Session | None:
+        session = await self.session_service.get_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            config=config,
+        )
+        if session is not None:
+            await self._materialize(session)
+        return session
+
+    async def list_sessions(
+        self,
+        *,
+        app_name: str,
+        user_id: str | None = None,
+    ) -> ListSessionsResponse:
+        response = await self.session_service.list_sessions(app_name=app_name, user_id=user_id)
+
+        sessions_by_user: dict[str, list[Session]] = defaultdict(list)
+        for session in response.sessions:
+            sessions_by_user[session.user_id].append(session)
+
+        for owner, sessions in sessions_by_user.items():
+            states = await self.store.get_states(
+                app_name, owner, [session.id for session in sessions], _requested_keys.get()
+            )
+            for session in sessions:
+                session.state.update(states.get(session.id, {}))
+
+        return response
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.session_service.delete_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+        await self.store.delete(app_name, user_id, session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        delta = session_state_delta(event)
+        if event.partial or not delta:
+            return await self.session_service.append_event(session=session, event=event)
+
+        assert event.actions is not None
+        shared_delta = {k: v for k, v in event.actions.state_delta.items() if k not in delta}
+        stored = event.model_copy(
+            update={'actions': event.actions.model_copy(update={'state_delta': shared_delta})}
+        )
+
+        state = session.state
+        key = (session.app_name, session.user_id, session.id)
+        await self.store.append(*key, event.id, delta)
+        try:
+            await self.session_service.append_event(session=session, event=stored)
+        except Exception:
+            await self._discard(session, event.id)
+            raise
+        await self.store.confirm(*key, event.id, delta)
+
+        session.events = [event if appended is stored else appended for appended in session.events]
+        # A stale session is reloaded from storage by some services
+        if session.state is not state:
+            await self._materialize(session)
+        session.state.update(delta)
+        return event
+
+    async def _discard(self, session: Session, event_id: str) -> None:
+        try:
+            await self.store.discard(session.app_name, session.user_id, session.id, event_id)
+        except Exception:
+            # Left pending, the delta is never applied
+            logger.exception(f'Failed to discard the state delta of event {event_id}')
+
+    async def _materialize(self, session: Session) -> None:
+        keys = _requested_keys.get()
+        if session.events and keys is None:
+            await self._confirm_landed(session)
+
+        states = await self.store.get_states(session.app_name, session.user_id, [session.id], keys)
+        session.state.update(states.get(session.id, {}))
+
+        if not session.events or keys is not None:
+            return
+
+        # The events were stored without their session state delta, which is in the log
+        deltas = await self.store.get_deltas(session.app_name, session.user_id, session.id)
+        for index, event in enumerate(session.events):
+            if event.id in deltas and event.actions is not None:
+                state_delta = event.actions.state_delta | deltas[event.id]
+                actions = event.actions.model_copy(update={'state_delta': state_delta})
+                session.events[index] = event.model_copy(update={'actions': actions})
+
+    async def _confirm_landed(self, session: Session) -> None:
+        # Deltas whose event was stored but which were left pending, e.g. by a process
+        # stopped in between
+        pending = await self.store.get_pending(session.app_name, session.user_id, session.id)
+        landed = {event.id for event in session.events} & pending.keys()
+        for event_id in landed:
+            await self.store.confirm(
+                session.app_name, session.user_id, session.id, event_id, pending[event_id]
+            )
+        if landed:
+            logger.info(f'Confirmed {len(landed)} pending state deltas of session {session.id}')
+
+
+def _session_filter(
+    app_name: str,
+    user_id: str,
+    session_ids: list[str],
+) -> list[ColumnElement[bool]]:
+    return [
+        SessionStateDelta.app_name == app_name,
+        SessionStateDelta.user_id == user_id,
+        SessionStateDelta.session_id.in_(session_ids),
+    ]
+
+
+def _landed_filter(
+    app_name: str,
+    user_id: str,
+    session_ids: list[str],
+) -> list[ColumnElement[bool]]:
+    return [*_session_filter(app_name, user_id, session_ids), SessionStateDelta.landed.is_(True)]
+
+
+def _insert_delta(
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    event_id: str,
+    delta: dict[str, Any],
+    landed: bool,
+) -> Any:
+    return (
+        insert(SessionStateDelta)
+        .values(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            event_id=event_id,
+            delta=delta,
+            landed=landed,
+        )
+        .on_conflict_do_nothing(
+            index_elements=[
+                SessionStateDelta.app_name,
+                SessionStateDelta.user_id,
+                SessionStateDelta.session_id,
+                SessionStateDelta.event_id,
+            ]
+        )
+    )
+
+
+def _same_session() -> ColumnElement[bool]:
+    return and_(
+        SessionStateCheckpoint.app_name == SessionStateDelta.app_name,
+        SessionStateCheckpoint.user_id == SessionStateDelta.user_id,
+        SessionStateCheckpoint.session_id == SessionStateDelta.session_id,
+    )
+
+
+def _project(column: Any, keys: list[str] | None) -> Any:
+    if keys is None:
+        return column
+
+    # The entries of the requested keys, `{}` when there are none
+    entries = func.jsonb_each(column).table_valued('key', 'value')
+    return (
+        select(
+            func.coalesce(
+                func.jsonb_object_agg(entries.c.key, entries.c.value),
+                func.jsonb_build_object(),
+            )
+        )
+        .where(entries.c.key.in_(keys))
+        .scalar_subquery()
+    )
+
+
+def _consistency_key(session_ids: list[str]) -> str | None:
+    return session_ids[0] if len(session_ids) == 1 else None
@@ -0,0 +1,671 @@
+"""
+Materialized conversation transcripts.
+
+A transcript is a projection of an ADK session's event log that only keeps the renderable
+messages (role and text). It is updated incrementally as events are appended to a session,
+so reading a conversation is a single range read instead of a replay of every raw event.
+
+Transcripts are also full-text indexed, so a user's conversation history can be searched
+without loading any of their sessions.
+
+An event that could not be added to a transcript, after retries, is recorded as missing from
+it, and `python -m ai_assistant.cli.rebuild_transcripts --incomplete` rebuilds the transcripts
+of the sessions with missing events.
+"""
+
+import logging
+import uuid
+from abc import ABC
+from abc import abstractmethod
+from collections import defaultdict
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import Session
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import Insert
+from sqlalchemy.dialects.postgresql import insert
+
+from ai_assistant.common.settings import settings
+from ai_assistant.db.database import db_session
+from ai_assistant.domain import TranscriptMessage
+from ai_assistant.domain import TranscriptSearchHit
+from ai_assistant.models.transcript import TEXT_SEARCH_CONFIG
+from ai_assistant.models.transcript import TranscriptMessage as TranscriptMessageModel
+from ai_assistant.models.transcript import TranscriptRepair
+from ai_assistant.services.ai.adk.session_service import SessionEventListener
+from ai_assistant.services.session.search import InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+# Namespace for deterministic transcript message IDs
+TRANSCRIPT_NAMESPACE = uuid.UUID('0f5c6a52-8d0e-4f43-9a57-2f1e7c6b3d11')
+
+SessionKey = tuple[str, str, str]
+
+
+def transcript_messages_from_event(session_id: str, event: Event) -> list[TranscriptMessage]:
+    """
+    Project an ADK event to the renderable transcript messages it contains.
+
+    Function calls, function responses and partial (streaming) events are skipped.
+
+    Args:
+        session_id: The ID of the session the event belongs to
+        event: The ADK event
+
+    Returns:
+        list[TranscriptMessage]: One message per non-empty text part of the event
+    """
+    if event.partial or not event.content or not event.content.parts:
+        return []
+
+    role = event.content.role
+    messages = []
+    for part_index, part in enumerate(event.content.parts):
+        if not part.text:
+            continue
+
+        messages.append(
+            TranscriptMessage(
+                id=uuid.uuid5(TRANSCRIPT_NAMESPACE, f'{session_id}:{event.id}:{part_index}'),
+                role=role,
+                text=part.text,
+                event_id=event.id,
+                part_index=part_index,
+                timestamp=event.timestamp,
+            )
+        )
+
+    return messages
+
+
+class TranscriptStore(ABC):
+    """
+    Storage for materialized transcripts.
+
+    Appends are idempotent: a message whose ID is already stored is ignored, so replaying
+    events (e.g. during a rebuild) never duplicates messages.
+    """
+
+    @abstractmethod
+    async def append(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        messages: list[TranscriptMessage],
+    ) -> None:
+        """
+        Append messages to the transcript of a session.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+            messages: The messages to append, in event order
+        """
+
+    @abstractmethod
+    async def list_messages(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+    ) -> list[TranscriptMessage]:
+        """
+        Get the transcript of a session.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+
+        Returns:
+            list[TranscriptMessage]: The messages of the session in conversation order
+        """
+
+    @abstractmethod
+    async def delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        """
+        Delete the transcript of a session.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+        """
+
+    @abstractmethod
+    async def replace(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        messages: list[TranscriptMessage],
+        up_to: float,
+    ) -> None:
+        """
+        Replace the transcript of a session up to a time, at once.
+
+        The messages are stored, updating those already stored, and the other messages up to
+        `up_to` are deleted. Later messages, e.g. of events appended since the session was
+        read, are kept.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+            messages: The messages of the transcript up to `up_to`
+            up_to: The timestamp up to which the messages replace the transcript
+        """
+
+    @abstractmethod
+    async def record_missing_event(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_id: str,
+    ) -> None:
+        """
+        Record an event missing from the transcript of a session, for it to be rebuilt.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+            event_id: The ID of the event that could not be appended
+        """
+
+    @abstractmethod
+    async def list_incomplete(self, limit: int = 1000) -> list[SessionKey]:
+        """
+        Get the sessions whose transcript has missing events.
+
+        Args:
+            limit: The maximum number of sessions
+
+        Returns:
+            list[SessionKey]: The application name, owner and ID of every session
+        """
+
+    @abstractmethod
+    async def clear_missing_events(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_ids: list[str] | None = None,
+    ) -> None:
+        """
+        Clear the record of events missing from the transcript of a session.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the session
+            session_id: The ID of the session
+            event_ids: The IDs of the events now in the transcript, None for every event
+        """
+
+    @abstractmethod
+    async def search(
+        self,
+        app_name: str,
+        user_id: str,
+        query: str,
+        limit: int,
+        offset: int = 0,
+    ) -> list[TranscriptSearchHit]:
+        """
+        Search the transcripts of all the sessions of a user.
+
+        Args:
+            app_name: The application name
+            user_id: The owner of the sessions to search
+            query: The search query; every term must match
+            limit: The maximum number of hits to return
+            offset: The number of hits to skip, for pagination
+
+        Returns:
+            list[TranscriptSearchHit]: The matching messages, most relevant first
+        """
+
+
+class InMemoryTranscriptStore(TranscriptStore):
+    """
+    In-memory transcript store, for development and testing.
+    """
+
+    def __init__(self) -> None:
+        self._transcripts: dict[SessionKey, dict[uuid.UUID, TranscriptMessage]] = defaultdict(dict)
+        self._message_sessions: dict[uuid.UUID, str] = {}
+        self._index = InvertedIndex()
+        self._missing_events: dict[SessionKey, set[str]] = defaultdict(set)
+
+    async def append(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        messages: list[TranscriptMessage],
+    ) -> None:
+        transcript = self._transcripts[(app_name, user_id, session_id)]
+        for message in messages:
+            if message.id in transcript:
+                continue
+
+            transcript[message.id] = message
+            self._message_sessions[message.id] = session_id
+            self._index.add(app_name, user_id, message.id, message.text)
+
+    async def list_messages(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+    ) -> list[TranscriptMessage]:
+        transcript = self._transcripts.get((app_name, user_id, session_id), {})
+        return sorted(transcript.values(), key=lambda m: (m.timestamp, m.part_index))
+
+    async def delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        transcript = self._transcripts.pop((app_name, user_id, session_id), {})
+        self._index.remove(app_name, user_id, list(transcript))
+        for message_id in transcript:
+            self._message_sessions.pop(message_id, None)
+
+    async def replace(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        messages: list[TranscriptMessage],
+        up_to: float,
+    ) -> None:
+        transcript = self._transcripts[(app_name, user_id, session_id)]
+        replaced = {message.id for message in messages}
+        stale = [
+            message.id
+            for message in transcript.values()
+            if message.id in replaced or message.timestamp <= up_to
+        ]
+        self._index.remove(app_name, user_id, stale)
+        for message_id in stale:
+            del transcript[message_id]
+            self._message_sessions.pop(message_id, None)
+
+        await self.append(app_name, user_id, session_id, messages)
+
+    async def record_missing_event(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_id: str,
+    ) -> None:
+        self._missing_events[(app_name, user_id, session_id)].add(event_id)
+
+    async def list_incomplete(self, limit: int = 1000) -> list[SessionKey]:
+        return [key for key, event_ids in self._missing_events.items() if event_ids][:limit]
+
+    async def clear_missing_events(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_ids: list[str] | None = None,
+    ) -> None:
+        key = (app_name, user_id, session_id)
+        if event_ids is not None:
+            self._missing_events[key].difference_update(event_ids)
+        if event_ids is None or not self._missing_events[key]:
+            self._missing_events.pop(key, None)
+
+    async def search(
+        self,
+        app_name: str,
+        user_id: str,
+        query: str,
+        limit: int,
+        offset: int = 0,
+    ) -> list[TranscriptSearchHit]:
+        hits = []
+        for message_id, score in self._index.search(app_name, user_id, query):
+            session_id = self._message_sessions[message_id]
+            message = self._transcripts[(app_name, user_id, session_id)][message_id]
+            hits.append(TranscriptSearchHit(session_id=session_id, message=message, score=score))
+
+        # Most relevant first, most recent first among equally relevant messages
+        hits.sort(key=lambda hit: (-hit.score, -hit.message.timestamp, hit.message.part_index))
+        return hits[offset : offset + limit]
+
+
+class DatabaseTranscriptStore(TranscriptStore):
+    """
+    Postgres-backed transcript store.
+
+    Messages are read with a single range scan over the
+    `(app_name, user_id, session_id, event_timestamp, part_index)` index. Searches use the
+    GIN index over the generated `text_search` column, which Postgres keeps up to date on
+    every insert.
+    """
+
+    async def append(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        messages: list[TranscriptMessage],
+    ) -> None:
+        if not messages:
+            return
+
+        stmt = _insert_messages(app_name, user_id, session_id, messages).on_conflict_do_nothing(
+            index_elements=[TranscriptMessageModel.id, TranscriptMessageModel.event_timestamp]
+        )
+
+        async with db_session(consistency_key=session_id) as session:
+            await session.execute(stmt)
+
+    async def list_messages(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+    ) -> list[TranscriptMessage]:
+        stmt = (
+            select(TranscriptMessageModel)
+            .where(
+                TranscriptMessageModel.app_name == app_name,
+                TranscriptMessageModel.user_id == user_id,
+                TranscriptMessageModel.session_id == session_id,
+            )
+            .order_by(TranscriptMessageModel.event_timestamp, TranscriptMessageModel.part_index)
+        )
+
+        # Served by a replica unless it may not have the latest messages of the session yet
+        async with db_session(
+            autocommit=False, read_only=True, consistency_key=session_id
+        ) as session:
+            rows = (await session.scalars(stmt)).all()
+
+        return [
+            TranscriptMessage(
+                id=row.id,
+                role=row.role,
+                text=row.text,
+                event_id=row.event_id,
+                part_index=row.part_index,
+                timestamp=row.event_timestamp,
+            )
+            for row in rows
+        ]
+
+    async def delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        stmt = delete(TranscriptMessageModel).where(
+            TranscriptMessageModel.app_name == app_name,
+            TranscriptMessageModel.user_id == user_id,
+            TranscriptMessageModel.session_id == session_id,
+        )
+
+        async with db_session(consistency_key=session_id) as session:
+            await session.execute(stmt)
+
+    async def replace(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        messages: list[TranscriptMessage],
+        up_to: float,
+    ) -> None:
+        stale = delete(TranscriptMessageModel).where(
+            TranscriptMessageModel.app_name == app_name,
+            TranscriptMessageModel.user_id == user_id,
+            TranscriptMessageModel.session_id == session_id,
+            TranscriptMessageModel.event_timestamp <= up_to,
+            TranscriptMessageModel.id.not_in([message.id for message in messages]),
+        )
+
+        async with db_session(consistency_key=session_id) as session:
+            if messages:
+                stmt = _insert_messages(app_name, user_id, session_id, messages)
+                await session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[
+                            TranscriptMessageModel.id,
+                            TranscriptMessageModel.event_timestamp,
+                        ],
+                        set_={
+                            'role': stmt.excluded.role,
+                            'text': stmt.excluded.text,
+                            'updated_at': func.now(),
+                        },
+                    )
+                )
+            await session.execute(stale)
+
+    async def record_missing_event(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_id: str,
+    ) -> None:
+        stmt = (
+            insert(TranscriptRepair)
+            .values(app_name=app_name, user_id=user_id, session_id=session_id, event_id=event_id)
+            .on_conflict_do_nothing()
+        )
+
+        async with db_session() as session:
+            await session.execute(stmt)
+
+    async def list_incomplete(self, limit: int = 1000) -> list[SessionKey]:
+        stmt = (
+            select(
+                TranscriptRepair.app_name, TranscriptRepair.user_id, TranscriptRepair.session_id
+            )
+            .distinct()
+            .limit(limit)
+        )
+
+        async with db_session(autocommit=False) as session:
+            return list((await session.execute(stmt)).tuples().all())
+
+    async def clear_missing_events(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        event_ids: list[str] | None = None,
+    ) -> None:
+        stmt = delete(TranscriptRepair).where(
+            TranscriptRepair.app_name == app_name,
+            TranscriptRepair.user_id == user_id,
+            TranscriptRepair.session_id == session_id,
+        )
+        if event_ids is not None:
+            stmt = stmt.where(TranscriptRepair.event_id.in_(event_ids))
+
+        async with db_session() as session:
+            await session.execute(stmt)
+
+    async def search(
+        self,
+        app_name: str,
+        user_id: str,
+        query: str,
+        limit: int,
+        offset: int = 0,
+    ) -> list[TranscriptSearchHit]:
+        ts_query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query)
+        rank = func.ts_rank_cd(TranscriptMessageModel.text_search, ts_query)
+
+        stmt = (
+            select(TranscriptMessageModel, rank.label('score'))
+            .where(
+                TranscriptMessageModel.app_name == app_name,
+                TranscriptMessageModel.user_id == user_id,
+                TranscriptMessageModel.text_search.bool_op('@@')(ts_query),
+            )
+            .order_by(
+                rank.desc(),
+                TranscriptMessageModel.event_timestamp.desc(),
+                TranscriptMessageModel.part_index,
+            )
+            .limit(limit)
+            .offset(offset)
+        )
+
+        async with db_session(autocommit=False, read_only=True) as session:
+            rows = (await session.execute(stmt)).all()
+
+        return [
+            TranscriptSearchHit(
+                session_id=row.session_id,
+                message=TranscriptMessage(
+                    id=row.id,
+                    role=row.role,
+                    text=row.text,
+                    event_id=row.event_id,
+                    part_index=row.part_index,
+                    timestamp=row.event_timestamp,
+                ),
+                score=score,
+            )
+            for row, score in rows
+        ]
+
+
+def _insert_messages(
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    messages: list[TranscriptMessage],
+) -> Insert:
+    return insert(TranscriptMessageModel).values(
+        [
+            {
+                'id': message.id,
+                'app_name': app_name,
+                'user_id': user_id,
+                'session_id': session_id,
+                'event_id': message.event_id,
+                'event_timestamp': message.timestamp,
+                'part_index': message.part_index,
+                'role': message.role,
+                'text': message.text,
+            }
+            for message in messages
+        ]
+    )
+
+
+class TranscriptProjection(SessionEventListener):
+    """
+    Keeps a transcript store up to date as events are appended to sessions.
+    """
+
+    def __init__(self, store: TranscriptStore) -> None:
+        self.store = store
+
+    async def on_event_appended(self, session: Session, event: Event) -> None:
+        messages = transcript_messages_from_event(session.id, event)
+        if messages:
+            await self.store.append(session.app_name, session.user_id, session.id, messages)
+
+    async def on_session_deleted(self, app_name: str, user_id: str, session_id: str) -> None:
+        await self.store.delete(app_name, user_id, session_id)
+        await self.store.clear_missing_events(app_name, user_id, session_id)
+
+    async def on_event_failed(self, session: Session, event: Event) -> None:
+        await self.store.record_missing_event(
+            session.app_name, session.user_id, session.id, event.id
+        )
+
+
+async def rebuild_transcript(
+    session_service: BaseSessionService,
+    store: TranscriptStore,
+    *,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+) -> int:
+    """
+    Rebuild the transcript of a session from its full ADK event log.
+
+    Args:
+        session_service: The ADK session service holding the raw events
+        store: The transcript store to rebuild
+        app_name: The application name
+        user_id: The owner of the session
+        session_id: The ID of the session
+
+    Returns:
+        int: The number of messages in the rebuilt transcript
+
+    Raises:
+        ValueError: If the session does not exist
+    """
+    session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    if session is None:
+        raise ValueError(f'Session {session_id} not found for user {user_id}')
+
+    messages = [
+        message
+        for event in session.events
+        for message in transcript_messages_from_event(session.id, event)
+    ]
+
+    # Messages of events appended since the session was read are kept
+    await store.replace(app_name, user_id, session_id, messages, up_to=session.last_update_time)
+    # Events missing when recorded after the session was read are still missing
+    await store.clear_missing_events(
+        app_name, user_id, session_id, [event.id for event in session.events]
+    )
+
+    logger.info(f'Rebuilt transcript of session {session_id} with {len(messages)} messages')
+    return len(messages)
+
+
+_transcript_store: TranscriptStore | None = None
+
+
+def create_transcript_store() -> TranscriptStore:
+    """
+    Create a transcript store based on the application environment.
+
+    Returns:
+        TranscriptStore: The configured transcript store instance.
+    """
+    environment = settings.ENVIRONMENT.lower()
+
+    if environment in ['staging', 'production']:
+        logger.info(f'Using DatabaseTranscriptStore for `{environment}` environment.')
+        return DatabaseTranscriptStore()
+
+    logger.info(f'Using InMemoryTranscriptStore for `{environment}` environment.')
+    return InMemoryTranscriptStore()
+
+
+def get_transcript_store() -> TranscriptStore:
+    """
+    Get the transcript store, initializing it lazily on first access.
+
+    Returns:
+        TranscriptStore: The singleton transcript store instance.
+    """
+    global _transcript_store
+
+    if _transcript_store is None:
+        _transcript_store = create_transcript_store()
+
+    return _transcript_store
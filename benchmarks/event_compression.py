@@ -0,0 +1,109 @@
+"""
+Benchmark of the session event payload compression: stored bytes and decode time per part.
+
+Builds recipe tool results like the ones of `get_recipe` (random ingredients and
+instructions drawn from a small vocabulary), and compresses them the way
+`CompressedSessionService` stores them, without a dictionary and with a dictionary trained on
+other results, for a few payload sizes.
+
+Usage:
+    PYTHONPATH=. python benchmarks/event_compression.py [--parts 500] [--repeat 5]
+"""
+
+import argparse
+import random
+import time
+
+from google.genai import types
+
+from ai_assistant.services.session.compression import PayloadCodec
+from ai_assistant.services.session.compression import part_payload
+from ai_assistant.services.session.compression import train_dictionary
+
+_INGREDIENTS = [
+    '400g spaghetti',
+    '200g pancetta or guanciale',
+    '4 large eggs',
+    '100g Pecorino Romano cheese',
+    '2 1/4 cups all-purpose flour',
+    '1 tsp baking soda',
+    '1 cup butter, softened',
+    '3/4 cup brown sugar',
+    '2 tsp vanilla extract',
+    '2 cloves garlic, minced',
+    '1 tbsp olive oil',
+    'Salt and black pepper',
+]
+_INSTRUCTIONS = [
+    'Cook pasta in salted boiling water until al dente',
+    'Fry pancetta until crispy',
+    'Mix eggs and grated cheese in a bowl',
+    'Preheat oven to 375°F (190°C)',
+    'Cream butter and sugars',
+    'Gradually blend in flour mixture',
+    'Season with black pepper',
+    'Simmer for 10 minutes, stirring occasionally',
+]
+
+
+def _make_parts(count: int, steps: int, seed: int) -> list[types.Part]:
+    rng = random.Random(seed)
+    return [
+        types.Part(
+            function_response=types.FunctionResponse(
+                id=f'call-{index}',
+                name='get_recipe',
+                response={
+                    'dish': f'Dish {rng.randrange(1000)}',
+                    'ingredients': rng.choices(_INGREDIENTS, k=steps),
+                    'instructions': rng.choices(_INSTRUCTIONS, k=steps),
+                    'prep_time': f'{rng.randrange(5, 60)} minutes',
+                    'cook_time': f'{rng.randrange(5, 120)} minutes',
+                    'servings': rng.randrange(1, 12),
+                },
+            )
+        )
+        for index in range(count)
+    ]
+
+
+def _measure(codec: PayloadCodec, parts: list[types.Part], repeat: int) -> tuple[int, float]:
+    stored = [codec.compress_part(part) for part in parts]
+    size = sum(len(part_payload(part)) for part in stored)
+
+    best = float('inf')
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for part in stored:
+            codec.decompress_part(part)
+        best = min(best, time.perf_counter() - started_at)
+    return size, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the event payload compression.')
+    parser.add_argument('--parts', type=int, default=500, help='Tool results per run')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions')
+    args = parser.parse_args()
+
+    for steps in [4, 16, 64]:
+        parts = _make_parts(args.parts, steps, seed=0)
+        dictionary = train_dictionary(
+            [part_payload(part) for part in _make_parts(args.parts, steps, seed=1)]
+        )
+        raw = sum(len(part_payload(part)) for part in parts)
+        print(f'{steps} steps, raw: {raw / args.parts:.0f} bytes/part')
+
+        for name, codec in [
+            ('deflate', PayloadCodec(min_bytes=0)),
+            ('deflate+dict', PayloadCodec(min_bytes=0, dictionary=dictionary)),
+        ]:
+            size, best = _measure(codec, parts, args.repeat)
+            print(
+                f'{name:>14}: {size / args.parts:.0f} bytes/part ({size / raw:.0%} of raw), '
+                f'{best / args.parts * 1e6:.1f} us/part to decode'
+            )
+
+
+if __name__ == '__main__':
+    main()
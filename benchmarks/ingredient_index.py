@@ -0,0 +1,92 @@
+"""
+Benchmark of the ingredient index: query latency and memory by number of recipes.
+
+Indexes generated recipes, whose ingredients are drawn from a vocabulary with a Zipf-like
+distribution (a few ingredients in most recipes, most in few), then times queries of 3
+ingredients against a scan of the recipes ranking them the same way.
+
+Usage:
+    PYTHONPATH=. python benchmarks/ingredient_index.py [--queries 200]
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import Any
+
+from ai_assistant.services.recipes.ingredients import IngredientIndex
+from ai_assistant.services.recipes.ingredients import ingredient_terms
+
+_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+_VOCABULARY = [f'ingredient{a}{b}{c}' for a in 'abc' for b in _LETTERS for c in _LETTERS]
+_WEIGHTS = [1 / (rank + 1) for rank in range(len(_VOCABULARY))]
+
+
+def _make_ingredients(count: int, rng: random.Random) -> list[list[str]]:
+    return [
+        [
+            f'100g {name}'
+            for name in set(rng.choices(_VOCABULARY, _WEIGHTS, k=rng.randrange(4, 14)))
+        ]
+        for _ in range(count)
+    ]
+
+
+def _scan(recipes: list[list[frozenset[str]]], query: list[str], limit: int = 5) -> list[int]:
+    terms = [ingredient_terms(ingredient) for ingredient in query]
+    ranked = []
+    for index, lines in enumerate(recipes):
+        recipe_terms = frozenset().union(*lines)
+        score = sum(1 for ingredient in terms if ingredient <= recipe_terms)
+        if score:
+            ranked.append((-score, len(lines) - score, index))
+    return [index for _, _, index in sorted(ranked)[:limit]]
+
+
+def _size_mb(index: IngredientIndex) -> float:
+    internals: Any = vars(index)
+    size = sum(sys.getsizeof(bitset) for bitset in internals['_dense'].values())
+    size += sum(sys.getsizeof(indexes) for indexes in internals['_sparse'].values())
+    size += sum(sys.getsizeof(bitset) for _, bitset in internals['_sizes'])
+    return size / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the ingredient index.')
+    parser.add_argument('--queries', type=int, default=200, help='Queries per run')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    queries = [rng.choices(_VOCABULARY[:200], k=3) for _ in range(args.queries)]
+    for count in [10_000, 100_000, 300_000]:
+        ingredients = _make_ingredients(count, rng)
+
+        started_at = time.perf_counter()
+        index = IngredientIndex(ingredients)
+        built = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        for query in queries:
+            index.search(query)
+        searched = (time.perf_counter() - started_at) / len(queries)
+
+        recipes = [[ingredient_terms(line) for line in lines] for lines in ingredients]
+        scans = queries[:5]
+        started_at = time.perf_counter()
+        for query in scans:
+            _scan(recipes, query)
+        scanned = (time.perf_counter() - started_at) / len(scans)
+
+        assert all(
+            [match.index for match in index.search(query)] == _scan(recipes, query)
+            for query in scans
+        )
+        print(
+            f'{count:>7} recipes: built in {built:.1f}s, {_size_mb(index):.1f} MiB, '
+            f'{searched * 1e6:.0f} us/query, {scanned * 1e6:.0f} us/scan'
+        )
+
+
+if __name__ == '__main__':
+    main()
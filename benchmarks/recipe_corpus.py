@@ -0,0 +1,95 @@
+"""
+Benchmark of the recipe corpus: lookup latency and resident memory by corpus size.
+
+Packs corpora of generated recipes (dish names combining a few words of a small vocabulary,
+so that names share many trigrams), then times exact lookups and fuzzy searches of
+misspelled names, and measures the resident memory of the process after the lookups: private
+memory, and the pages of the corpus file, shared with the other processes mapping it.
+
+Usage:
+    PYTHONPATH=. python benchmarks/recipe_corpus.py [--lookups 1000]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from ai_assistant.services.recipes.corpus import RecipeCorpus
+from ai_assistant.services.recipes.corpus import pack_recipe_corpus
+
+_STYLES = ['roasted', 'spicy', 'creamy', 'grilled', 'smoked', 'crispy', 'slow cooked', 'baked']
+_MAINS = ['chicken', 'salmon', 'tofu', 'lamb', 'mushroom', 'aubergine', 'prawn', 'chickpea']
+_DISHES = ['curry', 'pasta', 'risotto', 'tacos', 'stew', 'salad', 'pie', 'noodles', 'soup']
+
+
+def _make_recipes(count: int, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            'dish': (
+                f'{rng.choice(_STYLES)} {rng.choice(_MAINS)} {rng.choice(_DISHES)} '
+                f'{rng.choice(_MAINS)} {index}'
+            ),
+            'ingredients': rng.sample(_MAINS, k=4),
+            'instructions': ['Prepare the ingredients', 'Cook until done'],
+            'servings': rng.randrange(1, 12),
+        }
+        for index in range(count)
+    ]
+
+
+def _misspell(name: str, rng: random.Random) -> str:
+    position = rng.randrange(len(name))
+    return name[:position] + name[position + 1 :]
+
+
+def _rss_mb() -> dict[str, float]:
+    with open('/proc/self/status') as status:
+        fields = dict(line.split(':', 1) for line in status)
+    # e.g. `RssAnon:    1234 kB`
+    return {key: int(fields[key].split()[0]) / 2**10 for key in ('RssAnon', 'RssFile')}
+
+
+def _time(lookups: list[str], lookup: Any) -> float:
+    started_at = time.perf_counter()
+    for name in lookups:
+        lookup(name)
+    return (time.perf_counter() - started_at) / len(lookups)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the recipe corpus.')
+    parser.add_argument('--lookups', type=int, default=1000, help='Lookups per run')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for count in [10_000, 100_000, 300_000]:
+        recipes = _make_recipes(count, seed=count)
+        names = [recipe['dish'] for recipe in rng.sample(recipes, k=args.lookups)]
+        misspelled = [_misspell(name, rng) for name in names]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'recipes.corpus'
+            pack_recipe_corpus(recipes, path)
+            del recipes
+
+            rss_before = _rss_mb()
+            corpus = RecipeCorpus(path)
+            exact = _time(names, corpus.get)
+            fuzzy = _time(misspelled, corpus.search)
+            rss_after = _rss_mb()
+            corpus.close()
+
+            print(
+                f'{count:>7} recipes ({path.stat().st_size / 2**20:.0f} MiB): '
+                f'{exact * 1e6:.0f} us/exact lookup, {fuzzy * 1e6:.0f} us/fuzzy search, '
+                f'+{rss_after["RssAnon"] - rss_before["RssAnon"]:.1f} MiB private, '
+                f'+{rss_after["RssFile"] - rss_before["RssFile"]:.1f} MiB shared'
+            )
+
+
+if __name__ == '__main__':
+    main()
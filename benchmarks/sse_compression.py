@@ -0,0 +1,87 @@
+"""
+Benchmark of the chat stream compression: bytes and CPU per response.
+
+Encodes a typical streamed answer (one message split into many small text chunks, with SSE
+ids) and compresses it the way `compress_stream` does, with a sync flush after every frame,
+for a few compression levels.
+
+Usage:
+    PYTHONPATH=. python benchmarks/sse_compression.py [--chunks 150] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections.abc import AsyncIterator
+
+from ai_assistant.api.v1.sse import SSEEncoder
+from ai_assistant.api.v1.sse import compress_stream
+from ai_assistant.domain import Content
+
+_WORDS = (
+    'the weather in paris is mostly sunny today with a light breeze from the west and '
+    'temperatures around twenty degrees so a light jacket should be enough for the evening'
+).split()
+
+
+def _make_frames(chunks: int) -> list[bytes]:
+    rng = random.Random(0)
+    session_id = uuid.uuid4()
+    message_id = uuid.uuid4()
+    run_id = uuid.uuid4().hex
+    encoder = SSEEncoder(session_id)
+
+    return [
+        encoder.encode(
+            Content(
+                id=message_id,
+                type='message',
+                data={'text': ' ' + ' '.join(rng.choices(_WORDS, k=3))},
+                role='model',
+                metadata={'session_id': str(session_id)},
+            ),
+            event_id=f'{run_id}.{seq}',
+        )
+        for seq in range(1, chunks + 1)
+    ]
+
+
+async def _iterate(frames: list[bytes]) -> AsyncIterator[bytes]:
+    for frame in frames:
+        yield frame
+
+
+async def _compress(frames: list[bytes], level: int, repeat: int) -> tuple[int, float]:
+    best = float('inf')
+    for _ in range(repeat):
+        size = 0
+        started_at = time.perf_counter()
+        async for chunk in compress_stream(_iterate(frames), 'gzip', level):
+            size += len(chunk)
+        best = min(best, time.perf_counter() - started_at)
+    return size, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the chat stream compression.')
+    parser.add_argument('--chunks', type=int, default=150, help='Frames per response')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions')
+    args = parser.parse_args()
+
+    frames = _make_frames(args.chunks)
+    raw = sum(len(frame) for frame in frames)
+    print(f'{"raw":>8}: {raw} bytes/response ({raw / args.chunks:.0f} bytes/frame)')
+
+    for level in [1, 6, 9]:
+        size, best = asyncio.run(_compress(frames, level, args.repeat))
+        print(
+            f'{f"gzip -{level}":>8}: {size} bytes/response ({size / raw:.0%} of raw, '
+            f'{(raw - size) / args.chunks:.0f} bytes/frame saved), '
+            f'{best / args.chunks * 1e6:.1f} us/frame'
+        )
+
+
+if __name__ == '__main__':
+    main()
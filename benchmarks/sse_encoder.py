@@ -0,0 +1,76 @@
+"""
+Microbenchmark of the chat stream SSE serialization.
+
+Compares the previous per-chunk path (`ContentResponse.from_domain_model` + `model_dump_json`
++ f-string + `str.encode`) against `SSEEncoder.encode`, over a stream of text chunks of a
+single message, as produced for every streamed token.
+
+Usage:
+    PYTHONPATH=. python benchmarks/sse_encoder.py [--chunks 200] [--repeat 5]
+"""
+
+import argparse
+import timeit
+import uuid
+from collections.abc import Callable
+
+from ai_assistant.api.v1.schemas.chat import ContentResponse
+from ai_assistant.api.v1.sse import SSEEncoder
+from ai_assistant.domain import Content
+
+
+def _make_stream(chunks: int) -> tuple[uuid.UUID, list[Content]]:
+    session_id = uuid.uuid4()
+    message_id = uuid.uuid4()
+    contents = [
+        Content(
+            id=message_id,
+            type='message',
+            data={'text': f' token{i}'},
+            role='model',
+            metadata={'session_id': str(session_id)},
+        )
+        for i in range(chunks)
+    ]
+    return session_id, contents
+
+
+def _pydantic_path(session_id: uuid.UUID, contents: list[Content]) -> Callable[[], None]:
+    def run() -> None:
+        for content in contents:
+            response = ContentResponse.from_domain_model(content)
+            f'data: {response.model_dump_json()}\n\n'.encode()
+
+    return run
+
+
+def _encoder_path(session_id: uuid.UUID, contents: list[Content]) -> Callable[[], None]:
+    def run() -> None:
+        encoder = SSEEncoder(session_id)
+        for content in contents:
+            encoder.encode(content)
+
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the chat stream SSE serialization.')
+    parser.add_argument('--chunks', type=int, default=200, help='Chunks per stream')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions')
+    args = parser.parse_args()
+
+    session_id, contents = _make_stream(args.chunks)
+    number = max(1, 20_000 // args.chunks)
+
+    results = {}
+    for name, factory in [('pydantic', _pydantic_path), ('encoder', _encoder_path)]:
+        timer = timeit.Timer(factory(session_id, contents))
+        best = min(timer.repeat(repeat=args.repeat, number=number))
+        results[name] = best / (number * args.chunks) * 1e6
+        print(f'{name:>10}: {results[name]:.2f} us/chunk')
+
+    print(f'{"speedup":>10}: {results["pydantic"] / results["encoder"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark of the chat stream wire formats: encode cost, decode cost and payload size.
+
+Encodes a typical streamed answer (one message split into many small text chunks, with
+event ids) with every stream encoder, and decodes it the way a client would.
+
+Usage:
+    PYTHONPATH=. python benchmarks/stream_formats.py [--chunks 150] [--repeat 20]
+"""
+
+import argparse
+import json
+import random
+import struct
+import time
+import uuid
+from collections.abc import Callable
+
+import msgpack
+
+from ai_assistant.api.v1.encoders import MessagePackEncoder
+from ai_assistant.api.v1.encoders import NDJSONEncoder
+from ai_assistant.api.v1.encoders import StreamEncoder
+from ai_assistant.api.v1.sse import SSEEncoder
+from ai_assistant.domain import Content
+
+_WORDS = (
+    'the weather in paris is mostly sunny today with a light breeze from the west and '
+    'temperatures around twenty degrees so a light jacket should be enough for the evening'
+).split()
+
+
+def _make_contents(chunks: int, session_id: uuid.UUID) -> list[Content]:
+    rng = random.Random(0)
+    message_id = uuid.uuid4()
+
+    return [
+        Content(
+            id=message_id,
+            type='message',
+            data={'text': ' ' + ' '.join(rng.choices(_WORDS, k=3))},
+            role='model',
+            metadata={'session_id': str(session_id)},
+        )
+        for _ in range(chunks)
+    ]
+
+
+def _decode_sse(payload: bytes) -> list[dict]:
+    return [json.loads(line[6:]) for line in payload.split(b'\n') if line.startswith(b'data: ')]
+
+
+def _decode_ndjson(payload: bytes) -> list[dict]:
+    return [json.loads(line) for line in payload.splitlines()]
+
+
+def _decode_msgpack(payload: bytes) -> list[dict]:
+    frames = []
+    offset = 0
+    while offset < len(payload):
+        (length,) = struct.unpack_from('>I', payload, offset)
+        frames.append(msgpack.unpackb(payload[offset + 4 : offset + 4 + length]))
+        offset += 4 + length
+    return frames
+
+
+def _best_of(repeat: int, operation: Callable[[], object]) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+
+def _measure(
+    encoder_cls: type[StreamEncoder],
+    decode: Callable[[bytes], list[dict]],
+    contents: list[Content],
+    session_id: uuid.UUID,
+    repeat: int,
+) -> tuple[float, float, int]:
+    run_id = uuid.uuid4().hex
+
+    def encode() -> bytes:
+        encoder = encoder_cls(session_id)
+        return b''.join(
+            encoder.encode(content, event_id=f'{run_id}.{seq}')
+            for seq, content in enumerate(contents, start=1)
+        )
+
+    payload = encode()
+    return _best_of(repeat, encode), _best_of(repeat, lambda: decode(payload)), len(payload)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the chat stream wire formats.')
+    parser.add_argument('--chunks', type=int, default=150, help='Frames per response')
+    parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions')
+    args = parser.parse_args()
+
+    session_id = uuid.uuid4()
+    contents = _make_contents(args.chunks, session_id)
+
+    formats: list[tuple[type[StreamEncoder], Callable[[bytes], list[dict]]]] = [
+        (SSEEncoder, _decode_sse),
+        (NDJSONEncoder, _decode_ndjson),
+        (MessagePackEncoder, _decode_msgpack),
+    ]
+    for encoder_cls, decode in formats:
+        encoder_time, decode_time, size = _measure(
+            encoder_cls, decode, contents, session_id, args.repeat
+        )
+        print(
+            f'{encoder_cls.media_type:>24}: {size / args.chunks:.0f} bytes/frame, '
+            f'encode {encoder_time / args.chunks * 1e6:.1f} us/frame, '
+            f'decode {decode_time / args.chunks * 1e6:.1f} us/frame'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -4,8 +4,10 @@ import pytest
 from google.adk.sessions import InMemorySessionService
 
 from ai_assistant.api.dependencies import get_session_service
+from ai_assistant.api.dependencies import get_transcript_store
 from ai_assistant.api.main import app
 from ai_assistant.services.ai.adk import session_factory
+from ai_assistant.services.session.transcript import InMemoryTranscriptStore
 
 
 @pytest.fixture(scope='function', autouse=True)
@@ -18,3 +20,11 @@ def session_service() -> Generator[InMemorySessionService, None, None]:
 
     app.dependency_overrides.clear()
     session_factory._session_service = None
+
+
+@pytest.fixture(scope='function', autouse=True)
+def transcript_store() -> InMemoryTranscriptStore:
+    test_transcript_store = InMemoryTranscriptStore()
+    app.dependency_overrides[get_transcript_store] = lambda: test_transcript_store
+
+    return test_transcript_store
@@ -17,3 +17,67 @@ class TestHealthGet:
         # assert
         assert result.status_code == expected_status
         assert result.json() == expected_response
+
+
+class TestDbPoolGet:
+    def test_reports_pool_metrics(self) -> None:
+        # act
+        result = client.get('/health/db-pool')
+
+        # assert
+        assert result.status_code == 200
+        assert isinstance(result.json()['pools'], list)
+
+
+class TestDbRoutingGet:
+    def test_reports_routing_metrics(self) -> None:
+        # act
+        result = client.get('/health/db-routing')
+
+        # assert
+        assert result.status_code == 200
+        assert set(result.json()) == {'decisions', 'replicas'}
+
+
+class TestDbQueriesGet:
+    def test_reports_statement_and_route_metrics(self) -> None:
+        # arrange
+        client.get('/health')
+
+        # act
+        result = client.get('/health/db-queries')
+
+        # assert
+        assert result.status_code == 200
+        assert isinstance(result.json()['statements'], list)
+        assert 'GET /health' in [route['name'] for route in result.json()['routes']]
+
+
+class TestToolCacheGet:
+    def test_reports_tool_cache_metrics(self) -> None:
+        # act
+        result = client.get('/health/tool-cache')
+
+        # assert
+        assert result.status_code == 200
+        assert isinstance(result.json(), dict)
+
+
+class TestToolPoolsGet:
+    def test_reports_tool_pool_metrics(self) -> None:
+        # act
+        result = client.get('/health/tool-pools')
+
+        # assert
+        assert result.status_code == 200
+        assert isinstance(result.json(), dict)
+
+
+class TestSessionListenersGet:
+    def test_reports_session_listener_metrics(self) -> None:
+        # act
+        result = client.get('/health/session-listeners')
+
+        # assert
+        assert result.status_code == 200
+        assert isinstance(result.json(), dict)
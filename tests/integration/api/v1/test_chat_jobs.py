@@ -0,0 +1,99 @@
+import uuid
+from collections.abc import AsyncGenerator
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from ai_assistant.api.dependencies import get_ai_service
+from ai_assistant.api.dependencies import get_chat_job_manager
+from ai_assistant.api.main import app
+from ai_assistant.domain import Content
+from ai_assistant.services.ai.jobs import ChatJobManager
+from ai_assistant.services.ai.service import AIService
+
+
+@pytest.fixture
+async def client() -> AsyncGenerator[httpx.AsyncClient, None]:
+    # Jobs outlive the request that submits them, so every request must share one event loop
+    async def run(session_id, user_message, user_id) -> Content:
+        return Content(
+            id=uuid.uuid4(),
+            type='message',
+            data={'text': f'Re: {user_message}'},
+            metadata={'session_id': str(session_id)},
+        )
+
+    ai_service = AIService(session_service=MagicMock(), agent_runner=MagicMock())
+    ai_service.run = AsyncMock(side_effect=run)  # type: ignore[method-assign]
+    job_manager = ChatJobManager(concurrency=2, max_queued=10, retention=60)
+    app.dependency_overrides[get_ai_service] = lambda: ai_service
+    app.dependency_overrides[get_chat_job_manager] = lambda: job_manager
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        yield client
+
+    await job_manager.shutdown()
+    app.dependency_overrides.pop(get_ai_service)
+    app.dependency_overrides.pop(get_chat_job_manager)
+
+
+class TestChatJobs:
+    async def test_submit_and_long_poll_job(self, client: httpx.AsyncClient) -> None:
+        # arrange
+        user_id = str(uuid.uuid4())
+        request_payload = {'message': 'Hello', 'session_id': str(uuid.uuid4()), 'user_id': user_id}
+
+        # act
+        submitted = await client.post('/api/v1/chatbot/chat/jobs', json=request_payload)
+        job_id = submitted.json()['job_id']
+        result = await client.get(
+            f'/api/v1/chatbot/chat/jobs/{job_id}',
+            params={'user_id': user_id, 'wait': 5},
+        )
+
+        # assert
+        assert submitted.status_code == 202
+        assert submitted.json()['status'] == 'queued'
+        assert result.status_code == 200
+        response_data = result.json()
+        assert response_data['status'] == 'succeeded'
+        assert response_data['content']['data'] == {'text': 'Re: Hello'}
+        assert response_data['finished_at'] is not None
+
+    async def test_subscribe_to_job(self, client: httpx.AsyncClient) -> None:
+        # arrange
+        user_id = str(uuid.uuid4())
+        request_payload = {'message': 'Hello', 'session_id': str(uuid.uuid4()), 'user_id': user_id}
+        submitted = await client.post('/api/v1/chatbot/chat/jobs', json=request_payload)
+        job_id = submitted.json()['job_id']
+
+        # act
+        result = await client.get(
+            f'/api/v1/chatbot/chat/jobs/{job_id}/events', params={'user_id': user_id}
+        )
+
+        # assert
+        assert result.status_code == 200
+        events = [line for line in result.text.splitlines() if line.startswith('data: ')]
+        assert '"status":"succeeded"' in events[-1]
+
+    async def test_jobs_of_other_users_are_not_found(self, client: httpx.AsyncClient) -> None:
+        # arrange
+        request_payload = {
+            'message': 'Hello',
+            'session_id': str(uuid.uuid4()),
+            'user_id': str(uuid.uuid4()),
+        }
+        submitted = await client.post('/api/v1/chatbot/chat/jobs', json=request_payload)
+
+        # act
+        result = await client.get(
+            f'/api/v1/chatbot/chat/jobs/{submitted.json()["job_id"]}',
+            params={'user_id': str(uuid.uuid4())},
+        )
+
+        # assert
+        assert result.status_code == 404
@@ -1,13 +1,23 @@
+import asyncio
 import json
+import struct
 import uuid
+from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import msgpack
+import pytest
 from fastapi.testclient import TestClient
 from google.genai.types import Content
 from google.genai.types import Part
 
+from ai_assistant.api.dependencies import get_ai_service
+from ai_assistant.api.dependencies import get_stream_run_registry
 from ai_assistant.api.main import app
+from ai_assistant.domain import Content as DomainContent
+from ai_assistant.services.ai.runs import StreamRunRegistry
+from ai_assistant.services.ai.service import AIService
 
 client = TestClient(app)
 
@@ -211,3 +221,244 @@ class TestChatStreamPost:
 
         # assert
         assert result.status_code == expected_status
+
+
+class TestChatBatchPost:
+    def test_chat_batch_streams_results(self) -> None:
+        # arrange
+        async def run(session_id, user_message, user_id) -> DomainContent:
+            if user_message == 'Fail':
+                raise ValueError('Model error')
+            return DomainContent(
+                id=uuid.uuid4(),
+                type='message',
+                data={'text': f'Re: {user_message}'},
+                metadata={'session_id': str(session_id)},
+            )
+
+        ai_service = AIService(session_service=MagicMock(), agent_runner=MagicMock())
+        ai_service.run = AsyncMock(side_effect=run)  # type: ignore[method-assign]
+        app.dependency_overrides[get_ai_service] = lambda: ai_service
+
+        turns = [
+            {'message': message, 'session_id': str(uuid.uuid4()), 'user_id': str(uuid.uuid4())}
+            for message in ['Hi', 'Fail']
+        ]
+
+        # act
+        result = client.post('/api/v1/chatbot/chat/batch', json={'turns': turns})
+        app.dependency_overrides.pop(get_ai_service)
+
+        # assert
+        assert result.status_code == 200
+        assert result.headers['content-type'] == 'application/x-ndjson'
+        items = {item['index']: item for item in map(json.loads, result.text.splitlines())}
+        assert items[0]['content']['data'] == {'text': 'Re: Hi'}
+        assert items[0]['session_id'] == turns[0]['session_id']
+        assert items[0]['error'] is None
+        assert items[1]['content'] is None
+        assert items[1]['error'] == 'Model error'
+
+    def test_chat_batch_requires_turns(self) -> None:
+        # act
+        result = client.post('/api/v1/chatbot/chat/batch', json={'turns': []})
+
+        # assert
+        assert result.status_code == 422
+
+
+class TestChatStreamResume:
+    def test_reconnect_with_last_event_id_receives_missing_frames(self) -> None:
+        # arrange
+        async def run_stream(session_id, user_message, user_id):
+            message_id = uuid.uuid4()
+            for text in ['The ', 'weather ', 'is sunny.']:
+                yield DomainContent(id=message_id, type='message', data={'text': text})
+
+        ai_service = AIService(session_service=MagicMock(), agent_runner=MagicMock())
+        ai_service.run_stream = MagicMock(side_effect=run_stream)  # type: ignore[method-assign]
+        app.dependency_overrides[get_ai_service] = lambda: ai_service
+        registry = StreamRunRegistry()
+        app.dependency_overrides[get_stream_run_registry] = lambda: registry
+
+        request_payload = {
+            'message': 'What is the weather in Paris?',
+            'session_id': str(uuid.uuid4()),
+            'user_id': str(uuid.uuid4()),
+        }
+
+        # act
+        first = client.post('/api/v1/chatbot/chat/stream', json=request_payload)
+        event_ids = [
+            line.removeprefix('id: ')
+            for line in first.text.splitlines()
+            if line.startswith('id: ')
+        ]
+        resumed = client.post(
+            '/api/v1/chatbot/chat/stream',
+            json=request_payload,
+            headers={'Last-Event-ID': event_ids[0]},
+        )
+        unknown = client.post(
+            '/api/v1/chatbot/chat/stream',
+            json=request_payload,
+            headers={'Last-Event-ID': 'unknown.1'},
+        )
+        app.dependency_overrides.pop(get_ai_service)
+        app.dependency_overrides.pop(get_stream_run_registry)
+
+        # assert
+        assert len(event_ids) == 3
+        resumed_frames = [
+            json.loads(line.removeprefix('data: '))
+            for line in resumed.text.splitlines()
+            if line.startswith('data: ')
+        ]
+        assert [frame['data']['text'] for frame in resumed_frames] == ['weather ', 'is sunny.']
+        assert ai_service.run_stream.call_count == 1
+        assert unknown.status_code == 404
+
+    def test_reconnect_after_frames_left_the_buffer_is_not_found(self) -> None:
+        # arrange
+        async def run_stream(session_id, user_message, user_id):
+            message_id = uuid.uuid4()
+            for text in ['The ', 'weather ', 'is sunny.']:
+                # Slow enough for the first subscriber to keep up with the buffer
+                await asyncio.sleep(0.01)
+                yield DomainContent(id=message_id, type='message', data={'text': text})
+
+        ai_service = AIService(session_service=MagicMock(), agent_runner=MagicMock())
+        ai_service.run_stream = MagicMock(side_effect=run_stream)  # type: ignore[method-assign]
+        app.dependency_overrides[get_ai_service] = lambda: ai_service
+        registry = StreamRunRegistry(max_frames=2)
+        app.dependency_overrides[get_stream_run_registry] = lambda: registry
+
+        request_payload = {
+            'message': 'What is the weather in Paris?',
+            'session_id': str(uuid.uuid4()),
+            'user_id': str(uuid.uuid4()),
+        }
+        first = client.post('/api/v1/chatbot/chat/stream', json=request_payload)
+        run_id, _ = next(
+            line.removeprefix('id: ').split('.')
+            for line in first.text.splitlines()
+            if line.startswith('id: ')
+        )
+
+        # act
+        resumed = client.post(
+            '/api/v1/chatbot/chat/stream',
+            json=request_payload,
+            headers={'Last-Event-ID': f'{run_id}.0'},
+        )
+        app.dependency_overrides.pop(get_ai_service)
+        app.dependency_overrides.pop(get_stream_run_registry)
+
+        # assert
+        assert resumed.status_code == 404
+        assert 'no longer available' in resumed.json()['detail']
+
+
+class TestChatStreamCompression:
+    @pytest.mark.parametrize(
+        ('accept_encoding', 'content_encoding'),
+        [('gzip, deflate', 'gzip'), ('identity', None)],
+    )
+    def test_stream_is_compressed_when_accepted(
+        self,
+        accept_encoding: str,
+        content_encoding: str | None,
+    ) -> None:
+        # arrange
+        async def run_stream(session_id, user_message, user_id):
+            message_id = uuid.uuid4()
+            for text in ['The ', 'weather ', 'is sunny.']:
+                yield DomainContent(id=message_id, type='message', data={'text': text})
+
+        ai_service = AIService(session_service=MagicMock(), agent_runner=MagicMock())
+        ai_service.run_stream = MagicMock(side_effect=run_stream)  # type: ignore[method-assign]
+        app.dependency_overrides[get_ai_service] = lambda: ai_service
+
+        request_payload = {
+            'message': 'What is the weather in Paris?',
+            'session_id': str(uuid.uuid4()),
+            'user_id': str(uuid.uuid4()),
+        }
+
+        # act
+        result = client.post(
+            '/api/v1/chatbot/chat/stream',
+            json=request_payload,
+            headers={'Accept-Encoding': accept_encoding},
+        )
+        app.dependency_overrides.pop(get_ai_service)
+
+        # assert
+        assert result.status_code == 200
+        assert result.headers.get('content-encoding') == content_encoding
+        frames = [
+            json.loads(line.removeprefix('data: '))
+            for line in result.text.splitlines()
+            if line.startswith('data: ')
+        ]
+        assert [frame['data']['text'] for frame in frames] == ['The ', 'weather ', 'is sunny.']
+
+
+def _decode_msgpack_frames(payload: bytes) -> list[dict]:
+    frames = []
+    offset = 0
+    while offset < len(payload):
+        (length,) = struct.unpack_from('>I', payload, offset)
+        frames.append(msgpack.unpackb(payload[offset + 4 : offset + 4 + length]))
+        offset += 4 + length
+    return frames
+
+
+class TestChatStreamFormats:
+    @pytest.mark.parametrize(
+        ('accept', 'media_type'),
+        [
+            ('application/x-ndjson', 'application/x-ndjson'),
+            ('application/vnd.msgpack', 'application/vnd.msgpack'),
+            ('text/event-stream', 'text/event-stream'),
+        ],
+    )
+    def test_stream_format_is_negotiated(self, accept: str, media_type: str) -> None:
+        # arrange
+        async def run_stream(session_id, user_message, user_id):
+            message_id = uuid.uuid4()
+            for text in ['The ', 'weather ', 'is sunny.']:
+                yield DomainContent(id=message_id, type='message', data={'text': text})
+
+        ai_service = AIService(session_service=MagicMock(), agent_runner=MagicMock())
+        ai_service.run_stream = MagicMock(side_effect=run_stream)  # type: ignore[method-assign]
+        app.dependency_overrides[get_ai_service] = lambda: ai_service
+
+        request_payload = {
+            'message': 'What is the weather in Paris?',
+            'session_id': str(uuid.uuid4()),
+            'user_id': str(uuid.uuid4()),
+        }
+
+        # act
+        result = client.post(
+            '/api/v1/chatbot/chat/stream',
+            json=request_payload,
+            headers={'Accept': accept, 'Accept-Encoding': 'identity'},
+        )
+        app.dependency_overrides.pop(get_ai_service)
+
+        # assert
+        assert result.status_code == 200
+        assert result.headers['content-type'].startswith(media_type)
+        if media_type == 'application/x-ndjson':
+            frames = [json.loads(line)['content'] for line in result.text.splitlines()]
+        elif media_type == 'application/vnd.msgpack':
+            frames = [frame['content'] for frame in _decode_msgpack_frames(result.content)]
+        else:
+            frames = [
+                json.loads(line.removeprefix('data: '))
+                for line in result.text.splitlines()
+                if line.startswith('data: ')
+            ]
+        assert [frame['data']['text'] for frame in frames] == ['The ', 'weather ', 'is sunny.']
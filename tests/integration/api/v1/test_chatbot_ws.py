@@ -0,0 +1,61 @@
+import uuid
+from collections.abc import AsyncGenerator
+from collections.abc import Generator
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_assistant.api.dependencies import get_ai_service
+from ai_assistant.api.main import app
+from ai_assistant.domain import Content
+from ai_assistant.services.ai.service import AIService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def ai_service() -> Generator[AIService, None, None]:
+    async def run_stream(session_id, user_message, user_id) -> AsyncGenerator[Content, None]:
+        message_id = uuid.uuid4()
+        for text in ['The weather', ' is sunny.']:
+            yield Content(
+                id=message_id,
+                type='message',
+                data={'text': text},
+                role='model',
+                metadata={'session_id': str(session_id)},
+            )
+
+    ai_service = AsyncMock(spec=AIService)
+    ai_service.run_stream = run_stream
+    app.dependency_overrides[get_ai_service] = lambda: ai_service
+
+    yield ai_service
+
+    app.dependency_overrides.pop(get_ai_service, None)
+
+
+class TestChatWebSocket:
+    def test_chat_over_websocket(self, ai_service: AIService) -> None:
+        # arrange
+        session_id = str(uuid.uuid4())
+        request_payload = {
+            'type': 'chat',
+            'stream_id': 'turn-1',
+            'session_id': session_id,
+            'user_id': str(uuid.uuid4()),
+            'message': 'What is the weather in Paris?',
+        }
+
+        # act
+        with client.websocket_connect('/api/v1/chatbot/chat/ws') as websocket:
+            websocket.send_json(request_payload)
+            frames = [websocket.receive_json() for _ in range(3)]
+
+        # assert
+        assert [frame['event'] for frame in frames] == ['content', 'content', 'end']
+        assert all(frame['stream_id'] == 'turn-1' for frame in frames)
+        assert frames[0]['content']['type'] == 'message'
+        assert frames[0]['content']['data'] == {'text': 'The weather'}
+        assert frames[0]['content']['metadata'] == {'session_id': session_id}
@@ -1,8 +1,15 @@
+import json
 import uuid
 
 from fastapi.testclient import TestClient
+from google.adk.events import Event
+from google.genai.types import Content
+from google.genai.types import Part
 
 from ai_assistant.api.main import app
+from ai_assistant.common.settings import settings
+from ai_assistant.services.session.transcript import InMemoryTranscriptStore
+from ai_assistant.services.session.transcript import transcript_messages_from_event
 
 client = TestClient(app)
 
@@ -148,3 +155,126 @@ class TestSessionsList:
 
         # assert
         assert result.status_code == 422
+
+
+class TestSessionsBatch:
+    def test_create_sessions_batch(self) -> None:
+        # arrange
+        user_ids = [str(uuid.uuid4()) for _ in range(3)]
+
+        # act
+        result = client.post('/api/v1/chatbot/sessions/batch', json={'user_ids': user_ids})
+
+        # assert
+        assert result.status_code == 200
+        items = result.json()['results']
+        assert [item['user_id'] for item in items] == user_ids
+        assert all(item['session_id'] and item['error'] is None for item in items)
+
+    def test_create_sessions_batch_empty(self) -> None:
+        # act
+        result = client.post('/api/v1/chatbot/sessions/batch', json={'user_ids': []})
+
+        # assert
+        assert result.status_code == 422
+
+    def test_get_sessions_batch(self) -> None:
+        # arrange
+        user_id = str(uuid.uuid4())
+        session_id = client.post('/api/v1/chatbot/session', json={'user_id': user_id}).json()[
+            'session_id'
+        ]
+        missing_session_id = str(uuid.uuid4())
+
+        # act
+        result = client.post(
+            '/api/v1/chatbot/sessions/batch/get',
+            json={
+                'sessions': [
+                    {'user_id': user_id, 'session_id': session_id},
+                    {'user_id': user_id, 'session_id': missing_session_id},
+                ]
+            },
+        )
+
+        # assert
+        assert result.status_code == 200
+        found, missing = result.json()['results']
+        assert found['session']['session_id'] == session_id
+        assert found['error'] is None
+        assert missing['session'] is None
+        assert 'not found' in missing['error']
+
+    def test_delete_sessions_batch(self) -> None:
+        # arrange
+        user_id = str(uuid.uuid4())
+        session_ids = [
+            client.post('/api/v1/chatbot/session', json={'user_id': user_id}).json()['session_id']
+            for _ in range(2)
+        ]
+
+        # act
+        result = client.post(
+            '/api/v1/chatbot/sessions/batch/delete',
+            json={'sessions': [{'user_id': user_id, 'session_id': s} for s in session_ids]},
+        )
+
+        # assert
+        assert result.status_code == 200
+        assert all(item['deleted'] for item in result.json()['results'])
+        assert client.get(f'/api/v1/chatbot/sessions/{user_id}').json()['sessions'] == []
+
+
+class TestSessionsExport:
+    def test_export_user_sessions(self) -> None:
+        # arrange
+        user_id = str(uuid.uuid4())
+        session_ids = {
+            client.post('/api/v1/chatbot/session', json={'user_id': user_id}).json()['session_id']
+            for _ in range(2)
+        }
+
+        # act
+        result = client.get('/api/v1/chatbot/export/sessions', params={'user_id': user_id})
+
+        # assert
+        assert result.status_code == 200
+        assert result.headers['content-type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in result.text.splitlines()]
+        assert {row['session_id'] for row in rows} == session_ids
+        assert all(row['user_id'] == user_id for row in rows)
+
+
+class TestSessionsSearch:
+    async def test_search_user_sessions(self, transcript_store: InMemoryTranscriptStore) -> None:
+        # arrange
+        user_id = str(uuid.uuid4())
+        for session_id, text in [('s1', 'Carbonara recipe'), ('s2', 'Weather in Paris')]:
+            event = Event(author='user', content=Content(role='user', parts=[Part(text=text)]))
+            await transcript_store.append(
+                settings.APP_NAME,
+                user_id,
+                session_id,
+                transcript_messages_from_event(session_id, event),
+            )
+
+        # act
+        result = client.get(
+            f'/api/v1/chatbot/sessions/{user_id}/search',
+            params={'q': 'carbonara', 'limit': 1},
+        )
+
+        # assert
+        assert result.status_code == 200
+        response_data = result.json()
+        assert len(response_data['results']) == 1
+        assert response_data['results'][0]['session_id'] == 's1'
+        assert response_data['results'][0]['content']['data'] == {'text': 'Carbonara recipe'}
+        assert response_data['next_offset'] is None
+
+    def test_search_requires_a_query(self) -> None:
+        # act
+        result = client.get(f'/api/v1/chatbot/sessions/{uuid.uuid4()}/search')
+
+        # assert
+        assert result.status_code == 422
@@ -5,6 +5,7 @@ from httpx import ASGITransport
 from httpx import AsyncClient
 
 from ai_assistant.api.main import app
+from ai_assistant.db.database import dispose_engines
 from tests.fixtures import *  # noqa: F403
 
 
@@ -13,3 +14,13 @@ async def test_client() -> AsyncGenerator[AsyncClient, None]:
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url='http://test') as client:
         yield client
+
+
+@pytest.fixture(scope='function', autouse=True)
+async def dispose_db_engines() -> AsyncGenerator[None, None]:
+    """
+    Close the cached engines after each test: their pooled connections belong to the event
+    loop of the test that opened them.
+    """
+    yield
+    await dispose_engines()
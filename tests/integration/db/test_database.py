@@ -1,8 +1,20 @@
+from pydantic import PostgresDsn
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ai_assistant.db import database
+
 
 class TestDatabaseConnection:
     async def test_can_execute_queries(self, db_session: AsyncSession) -> None:
         result = await db_session.execute(select(1))
         assert 1 == result.scalar_one()
+
+
+class TestConnectionPool:
+    async def test_warm_up_opens_pooled_connections(self, db_url: PostgresDsn) -> None:
+        # act
+        await database.warm_up_engine(db_url, connections=2)
+
+        # assert
+        assert any(metrics.checked_in >= 2 for metrics in database.get_pool_metrics())
@@ -0,0 +1,144 @@
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from alembic.util import CommandError
+from pydantic import PostgresDsn
+from sqlalchemy import pool
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from ai_assistant.db.online_migrations import backfill_in_batches
+from ai_assistant.db.online_migrations import create_index_concurrently
+from ai_assistant.db.online_migrations import drop_index_concurrently
+
+_ROWS = 25
+
+
+@pytest.fixture
+async def engine(db_url: PostgresDsn) -> AsyncIterator[AsyncEngine]:
+    engine = create_async_engine(str(db_url), poolclass=pool.NullPool)
+    async with engine.begin() as connection:
+        await connection.execute(text('DROP TABLE IF EXISTS backfill_item'))
+        await connection.execute(
+            text('CREATE TABLE backfill_item (id INTEGER PRIMARY KEY, label TEXT)')
+        )
+        await connection.execute(
+            text(f'INSERT INTO backfill_item (id) SELECT generate_series(1, {_ROWS})')
+        )
+        await connection.execute(text('ANALYZE backfill_item'))
+
+    yield engine
+
+    async with engine.begin() as connection:
+        await connection.execute(text('DROP TABLE IF EXISTS backfill_item'))
+    await engine.dispose()
+
+
+async def _migrate(engine: AsyncEngine, step: Callable[[], Any], dry_run: bool = False) -> Any:
+    def run(connection: Connection) -> Any:
+        migration_context = MigrationContext.configure(connection, opts={'dry_run': dry_run})
+        with Operations.context(migration_context), migration_context.begin_transaction():
+            return step()
+
+    async with engine.connect() as connection:
+        return await connection.run_sync(run)
+
+
+async def _count(engine: AsyncEngine, query: str) -> int:
+    async with engine.connect() as connection:
+        return (await connection.execute(text(query))).scalar_one()
+
+
+class TestBackfillInBatches:
+    async def test_updates_all_matching_rows_in_batches(self, engine: AsyncEngine) -> None:
+        # act
+        updated = await _migrate(
+            engine,
+            lambda: backfill_in_batches(
+                'backfill_item', "label = 'item ' || id", 'label IS NULL', batch_size=10, pause=0
+            ),
+        )
+
+        # assert
+        assert updated == _ROWS
+        assert await _count(engine, 'SELECT count(*) FROM backfill_item WHERE label IS NULL') == 0
+
+    async def test_resumes_with_the_rows_left(self, engine: AsyncEngine) -> None:
+        # arrange
+        async with engine.begin() as connection:
+            await connection.execute(
+                text("UPDATE backfill_item SET label = 'done' WHERE id <= 20")
+            )
+
+        # act
+        updated = await _migrate(
+            engine,
+            lambda: backfill_in_batches(
+                'backfill_item', "label = 'item'", 'label IS NULL', batch_size=2, pause=0
+            ),
+        )
+
+        # assert
+        assert updated == _ROWS - 20
+
+    async def test_dry_run_only_estimates_the_rows(self, engine: AsyncEngine) -> None:
+        # act
+        estimate = await _migrate(
+            engine,
+            lambda: backfill_in_batches('backfill_item', "label = 'item'", 'label IS NULL'),
+            dry_run=True,
+        )
+
+        # assert
+        assert estimate > 0
+        assert await _count(engine, 'SELECT count(*) FROM backfill_item WHERE label IS NULL') == (
+            _ROWS
+        )
+
+    def test_rejects_offline_migrations(self) -> None:
+        # arrange
+        migration_context = MigrationContext.configure(
+            dialect_name='postgresql', opts={'as_sql': True}
+        )
+
+        # act / assert
+        with (
+            Operations.context(migration_context),
+            pytest.raises(CommandError, match='cannot run as offline'),
+        ):
+            backfill_in_batches('backfill_item', "label = 'item'", 'label IS NULL')
+
+
+class TestCreateIndexConcurrently:
+    async def test_builds_and_drops_the_index(self, engine: AsyncEngine) -> None:
+        # arrange
+        index_query = "SELECT count(*) FROM pg_indexes WHERE indexname = 'ix_backfill_item_label'"
+
+        # act
+        await _migrate(
+            engine,
+            lambda: create_index_concurrently(
+                'ix_backfill_item_label', 'backfill_item', ['label']
+            ),
+        )
+        # Building it again is a no-op
+        await _migrate(
+            engine,
+            lambda: create_index_concurrently(
+                'ix_backfill_item_label', 'backfill_item', ['label']
+            ),
+        )
+        built = await _count(engine, index_query)
+        await _migrate(
+            engine, lambda: drop_index_concurrently('ix_backfill_item_label', 'backfill_item')
+        )
+
+        # assert
+        assert built == 1
+        assert await _count(engine, index_query) == 0
@@ -0,0 +1,72 @@
+import asyncio
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import pool
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from ai_assistant.db.partitions import MonthlyPartitioning
+from ai_assistant.db.partitions import add_months
+from ai_assistant.db.partitions import month_start
+
+_DOWN_REVISION = '7d2e5b1f9a36'
+
+
+@pytest.fixture
+def downgraded(alembic_config: Config) -> Iterator[str]:
+    command.downgrade(alembic_config, _DOWN_REVISION)
+    yield str(alembic_config.get_main_option('sqlalchemy.url'))
+    command.upgrade(alembic_config, 'head')
+
+
+async def _execute(url: str, statements: list[str]) -> list[object]:
+    engine = create_async_engine(url, poolclass=pool.NullPool)
+    try:
+        async with engine.begin() as connection:
+            results = [await connection.execute(text(statement)) for statement in statements]
+            return [result.scalar() if result.returns_rows else None for result in results]
+    finally:
+        await engine.dispose()
+
+
+class TestPartitionSessionAndTranscriptTables:
+    def test_resumes_a_partially_applied_run(
+        self, alembic_config: Config, downgraded: str
+    ) -> None:
+        # arrange
+        bound = MonthlyPartitioning('transcript_message', 'event_timestamp', epoch=True).bound(
+            add_months(month_start(datetime.now(timezone.utc)), 1)
+        )
+        # The steps an earlier run committed before failing
+        asyncio.run(
+            _execute(
+                downgraded,
+                [
+                    'CREATE UNIQUE INDEX session_id_created_at_key ON session (id, created_at)',
+                    'ALTER TABLE session DROP CONSTRAINT session_pkey, ADD CONSTRAINT '
+                    'session_legacy_pkey PRIMARY KEY USING INDEX session_id_created_at_key',
+                    'ALTER TABLE transcript_message ADD CONSTRAINT '
+                    f'transcript_message_legacy_bound CHECK (event_timestamp < {bound}) NOT VALID',
+                ],
+            )
+        )
+
+        # act
+        command.upgrade(alembic_config, 'head')
+
+        # assert
+        kinds = asyncio.run(
+            _execute(
+                downgraded,
+                [
+                    f"SELECT relkind::text FROM pg_class WHERE relname = '{table}'"
+                    for table in ('session', 'transcript_message')
+                ],
+            )
+        )
+        assert kinds == ['p', 'p']
@@ -0,0 +1,176 @@
+import uuid
+from collections.abc import AsyncGenerator
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+import grpc
+import pytest
+from google.adk.sessions import InMemorySessionService
+
+from ai_assistant.domain import Content
+from ai_assistant.exceptions import TooManyRequestsException
+from ai_assistant.rpc.v1 import assistant_pb2
+from ai_assistant.rpc.v1.assistant_pb2_grpc import AssistantStub
+from ai_assistant.rpc.v1.assistant_pb2_grpc import add_AssistantServicer_to_server
+from ai_assistant.rpc.v1.servicer import AssistantServicer
+from ai_assistant.services.ai.service import AIService
+from ai_assistant.services.session.transcript import InMemoryTranscriptStore
+
+
+@pytest.fixture
+def ai_service() -> AIService:
+    async def run_stream(session_id, user_message, user_id):
+        message_id = uuid.uuid4()
+        for text in ['The ', 'weather ', 'is sunny.']:
+            yield Content(
+                id=message_id,
+                type='message',
+                data={'text': text},
+                role='model',
+                metadata={'session_id': str(session_id)},
+            )
+
+    ai_service = AIService(session_service=MagicMock(), agent_runner=MagicMock())
+    ai_service.run = AsyncMock(  # type: ignore[method-assign]
+        return_value=Content(id=uuid.uuid4(), type='message', data={'text': 'Sunny, 20°C.'})
+    )
+    ai_service.run_stream = MagicMock(side_effect=run_stream)  # type: ignore[method-assign]
+    return ai_service
+
+
+@pytest.fixture
+async def stub(
+    session_service: InMemorySessionService,
+    transcript_store: InMemoryTranscriptStore,
+    ai_service: AIService,
+) -> AsyncGenerator[AssistantStub, None]:
+    server = grpc.aio.server()
+    add_AssistantServicer_to_server(
+        AssistantServicer(session_service, transcript_store, ai_service=ai_service), server
+    )
+    port = server.add_insecure_port('localhost:0')
+    await server.start()
+
+    async with grpc.aio.insecure_channel(f'localhost:{port}') as channel:
+        yield AssistantStub(channel)
+
+    await server.stop(None)
+
+
+def _chat_request(message: str = 'What is the weather in Paris?') -> assistant_pb2.ChatRequest:
+    return assistant_pb2.ChatRequest(
+        session_id=str(uuid.uuid4()),
+        user_id=str(uuid.uuid4()),
+        message=message,
+    )
+
+
+class TestChat:
+    async def test_chat_success(self, stub: AssistantStub) -> None:
+        # act
+        response = await stub.Chat(_chat_request())
+
+        # assert
+        assert response.type == 'message'
+        assert response.data['text'] == 'Sunny, 20°C.'
+        assert not response.HasField('role')
+
+    async def test_chat_stream_success(self, stub: AssistantStub) -> None:
+        # arrange
+        request = _chat_request()
+
+        # act
+        responses = [response async for response in stub.ChatStream(request)]
+
+        # assert
+        assert [response.data['text'] for response in responses] == [
+            'The ',
+            'weather ',
+            'is sunny.',
+        ]
+        assert responses[0].role == 'model'
+        assert responses[0].metadata['session_id'] == request.session_id
+
+    async def test_chat_invalid_session_id(self, stub: AssistantStub) -> None:
+        # arrange
+        request = assistant_pb2.ChatRequest(
+            session_id='not-a-uuid', user_id=str(uuid.uuid4()), message='Hi'
+        )
+
+        # act
+        with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+            await stub.Chat(request)
+
+        # assert
+        assert exc_info.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
+    async def test_app_errors_map_to_status_codes(
+        self,
+        stub: AssistantStub,
+        ai_service: AIService,
+    ) -> None:
+        # arrange
+        ai_service.run.side_effect = TooManyRequestsException('Slow down')  # type: ignore[attr-defined]
+
+        # act
+        with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+            await stub.Chat(_chat_request())
+
+        # assert
+        assert exc_info.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+        assert exc_info.value.details() == 'Slow down'
+
+    async def test_chat_batch_success(self, stub: AssistantStub) -> None:
+        # arrange
+        request = assistant_pb2.ChatBatchRequest(turns=[_chat_request(), _chat_request()])
+
+        # act
+        items = [item async for item in stub.ChatBatch(request)]
+
+        # assert
+        assert sorted(item.index for item in items) == [0, 1]
+        assert all(item.content.data['text'] == 'Sunny, 20°C.' for item in items)
+        assert not any(item.HasField('error') for item in items)
+
+
+class TestSessions:
+    async def test_create_list_and_get_session(self, stub: AssistantStub) -> None:
+        # arrange
+        user_id = str(uuid.uuid4())
+
+        # act
+        created = await stub.CreateSession(assistant_pb2.CreateSessionRequest(user_id=user_id))
+        listed = await stub.ListSessions(assistant_pb2.ListSessionsRequest(user_id=user_id))
+        detail = await stub.GetSession(
+            assistant_pb2.GetSessionRequest(session_id=created.session_id, user_id=user_id)
+        )
+
+        # assert
+        assert created.intro_message
+        assert [session.session_id for session in listed.sessions] == [created.session_id]
+        assert detail.session.session_id == created.session_id
+        assert detail.session.user_id == user_id
+        assert list(detail.contents) == []
+
+    async def test_get_session_not_found(self, stub: AssistantStub) -> None:
+        # arrange
+        request = assistant_pb2.GetSessionRequest(
+            session_id=str(uuid.uuid4()), user_id=str(uuid.uuid4())
+        )
+
+        # act
+        with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+            await stub.GetSession(request)
+
+        # assert
+        assert exc_info.value.code() == grpc.StatusCode.NOT_FOUND
+
+    async def test_search_sessions_requires_a_query(self, stub: AssistantStub) -> None:
+        # act
+        with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+            await stub.SearchSessions(
+                assistant_pb2.SearchSessionsRequest(user_id=str(uuid.uuid4()))
+            )
+
+        # assert
+        assert exc_info.value.code() == grpc.StatusCode.INVALID_ARGUMENT
@@ -0,0 +1,60 @@
+from uuid import uuid4
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from pydantic import PostgresDsn
+
+from ai_assistant.common.settings import settings
+from ai_assistant.services.session.migration import PostgresCopySink
+from ai_assistant.services.session.migration import SessionMigrator
+
+
+class TestPostgresCopySink:
+    async def test_bulk_loads_sessions_readable_by_the_adk_service(
+        self, db_url: PostgresDsn
+    ) -> None:
+        # arrange
+        user_id = str(uuid4())
+        source = InMemorySessionService()
+        session = await source.create_session(
+            app_name=settings.APP_NAME,
+            user_id=user_id,
+            state={'app:theme': 'dark', 'user:name': 'Ada', 'topic': 'cooking'},
+        )
+        for text in ['hello', 'world']:
+            await source.append_event(
+                session,
+                Event(
+                    invocation_id=str(uuid4()),
+                    author='user',
+                    content=types.Content(role='user', parts=[types.Part(text=text)]),
+                    actions=EventActions(state_delta={'last': text}),
+                ),
+            )
+        migrator = SessionMigrator(source, PostgresCopySink(db_url))
+
+        # act
+        report = await migrator.migrate()
+        # Loading again replaces the first copy
+        await migrator.migrate()
+
+        # assert
+        assert (report.users, report.sessions, report.events) == (1, 1, 2)
+        async with DatabaseSessionService(str(db_url)) as target:
+            migrated = await target.get_session(
+                app_name=settings.APP_NAME, user_id=user_id, session_id=session.id
+            )
+        assert migrated is not None
+        assert [event.content.parts[0].text for event in migrated.events if event.content] == [
+            'hello',
+            'world',
+        ]
+        assert migrated.state == {
+            'app:theme': 'dark',
+            'user:name': 'Ada',
+            'topic': 'cooking',
+            'last': 'world',
+        }
@@ -0,0 +1,174 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import ListSessionsResponse
+from pydantic import PostgresDsn
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ai_assistant.common.settings import settings
+from ai_assistant.db.database import get_or_create_engine
+from ai_assistant.db.partitions import MonthlyPartitioning
+from ai_assistant.services.session.retention import RetentionPolicy
+from ai_assistant.services.session.retention import RetentionSweeper
+
+_NOW = datetime(2026, 3, 15, tzinfo=timezone.utc)
+_PARTITIONING = MonthlyPartitioning('retention_item', 'created_at')
+
+
+@pytest.fixture
+async def connection(db_url: PostgresDsn) -> AsyncIterator[AsyncConnection]:
+    async with get_or_create_engine(db_url).connect() as connection:
+        await connection.execution_options(isolation_level='AUTOCOMMIT')
+        await connection.execute(text('DROP TABLE IF EXISTS retention_item'))
+        await connection.execute(
+            text(
+                'CREATE TABLE retention_item (id INTEGER, created_at TIMESTAMPTZ NOT NULL, '
+                'ended_at TIMESTAMPTZ) PARTITION BY RANGE (created_at)'
+            )
+        )
+        for month in (datetime(2026, 1, 1, tzinfo=timezone.utc), _NOW):
+            await connection.execute(text(_PARTITIONING.create_partition_sql(month)))
+
+        yield connection
+
+        await connection.execute(text('DROP TABLE IF EXISTS retention_item'))
+
+
+async def _insert(connection: AsyncConnection, created_at: datetime, ended_at: datetime | None):
+    await connection.execute(
+        text('INSERT INTO retention_item VALUES (1, :created_at, :ended_at)'),
+        {'created_at': created_at, 'ended_at': ended_at},
+    )
+
+
+async def _partitions(connection: AsyncConnection) -> list[str]:
+    return [partition.name for partition in await _PARTITIONING.list_partitions(connection)]
+
+
+def _sweeper(db_url: PostgresDsn, retention: timedelta | None) -> RetentionSweeper:
+    policy = RetentionPolicy(
+        partitioning=_PARTITIONING,
+        retention=retention,
+        expired='ended_at < :cutoff',
+        retained='ended_at IS NULL OR ended_at >= :cutoff',
+    )
+    return RetentionSweeper([policy], url=db_url, partitions_ahead=2, batch_size=2)
+
+
+class TestRetentionSweeper:
+    async def test_creates_the_upcoming_partitions(
+        self, db_url: PostgresDsn, connection: AsyncConnection
+    ) -> None:
+        # act
+        report = await _sweeper(db_url, retention=None).sweep(now=_NOW)
+
+        # assert
+        assert report.created_partitions == ['retention_item_p202604', 'retention_item_p202605']
+        assert await _partitions(connection) == [
+            'retention_item_p202601',
+            'retention_item_p202603',
+            'retention_item_p202604',
+            'retention_item_p202605',
+        ]
+
+    async def test_drops_the_partitions_whose_rows_all_expired(
+        self, db_url: PostgresDsn, connection: AsyncConnection
+    ) -> None:
+        # arrange
+        january = datetime(2026, 1, 10, tzinfo=timezone.utc)
+        await _insert(connection, january, ended_at=january)
+        await _insert(connection, _NOW, ended_at=None)
+
+        # act
+        report = await _sweeper(db_url, retention=timedelta(days=30)).sweep(now=_NOW)
+
+        # assert
+        assert report.dropped_partitions == ['retention_item_p202601']
+        assert 'retention_item_p202601' not in await _partitions(connection)
+        count = await connection.scalar(text('SELECT count(*) FROM retention_item'))
+        assert count == 1
+
+    async def test_deletes_the_expired_rows_of_partitions_with_retained_rows(
+        self, db_url: PostgresDsn, connection: AsyncConnection
+    ) -> None:
+        # arrange
+        january = datetime(2026, 1, 10, tzinfo=timezone.utc)
+        for _ in range(5):
+            await _insert(connection, january, ended_at=january)
+        await _insert(connection, january, ended_at=None)
+
+        # act
+        report = await _sweeper(db_url, retention=timedelta(days=30)).sweep(now=_NOW)
+
+        # assert
+        assert report.dropped_partitions == []
+        assert report.deleted_rows == 5
+        count = await connection.scalar(text('SELECT count(*) FROM retention_item'))
+        assert count == 1
+
+    async def test_drops_the_emptied_partitions_of_rows_deleted_with_their_sessions(
+        self, db_url: PostgresDsn, connection: AsyncConnection
+    ) -> None:
+        # arrange
+        january = datetime(2026, 1, 10, tzinfo=timezone.utc)
+        await _insert(connection, january, ended_at=january)
+        policy = RetentionPolicy(
+            partitioning=_PARTITIONING, retention=timedelta(days=30), expired=None, retained='TRUE'
+        )
+        sweeper = RetentionSweeper([policy], url=db_url, partitions_ahead=0)
+
+        # act
+        kept = await sweeper.sweep(now=_NOW)
+        await connection.execute(text('DELETE FROM retention_item'))
+        emptied = await sweeper.sweep(now=_NOW)
+
+        # assert
+        assert kept.dropped_partitions == []
+        assert kept.deleted_rows == 0
+        assert emptied.dropped_partitions == ['retention_item_p202601']
+
+    async def test_expires_the_sessions_not_updated_within_the_retention(
+        self, db_url: PostgresDsn, connection: AsyncConnection
+    ) -> None:
+        # arrange
+        expired, active = str(uuid4()), str(uuid4())
+        session_service = AsyncMock(spec=BaseSessionService)
+        session_service.list_sessions.return_value = ListSessionsResponse(
+            sessions=[
+                Session(
+                    id=session_id,
+                    app_name=settings.APP_NAME,
+                    user_id='u',
+                    last_update_time=(_NOW - timedelta(days=days)).timestamp(),
+                )
+                for session_id, days in [(expired, 60), (active, 1)]
+            ]
+        )
+
+        # act
+        report = await RetentionSweeper(
+            [], session_service, session_retention=timedelta(days=30), url=db_url
+        ).sweep(now=_NOW)
+
+        # assert
+        session_service.delete_session.assert_awaited_once_with(
+            app_name=settings.APP_NAME, user_id='u', session_id=expired
+        )
+        assert report.deleted_sessions == 1
+        assert report.failed_sessions == 0
+
+    def test_requires_a_direct_url_behind_pgbouncer(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        # arrange
+        monkeypatch.setattr(settings, 'DATABASE_PGBOUNCER_MODE', True)
+
+        # act / assert
+        with pytest.raises(ValueError, match='RETENTION_DATABASE_URL'):
+            RetentionSweeper([])
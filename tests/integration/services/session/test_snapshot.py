@@ -0,0 +1,53 @@
+from uuid import uuid4
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.events.event_actions import EventCompaction
+from google.genai.types import Content
+from google.genai.types import Part
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ai_assistant.services.session.snapshot import DatabaseSessionSnapshotStore
+
+_APP_NAME = 'ai_assistant'
+
+
+def _snapshot(end_timestamp: float, summary: str) -> Event:
+    return Event(
+        author='user',
+        actions=EventActions(
+            compaction=EventCompaction(
+                start_timestamp=1.0,
+                end_timestamp=end_timestamp,
+                compacted_content=Content(role='model', parts=[Part(text=summary)]),
+            )
+        ),
+    )
+
+
+class TestDatabaseSessionSnapshotStore:
+    async def test_keeps_the_latest_snapshot(self, db_session: AsyncSession) -> None:
+        # arrange
+        store = DatabaseSessionSnapshotStore()
+        session_id = str(uuid4())
+        latest = _snapshot(20.0, 'Carbonara, then cookies')
+        await store.put(_APP_NAME, 'u', session_id, _snapshot(10.0, 'Carbonara'))
+        await store.put(_APP_NAME, 'u', session_id, latest)
+
+        # act
+        await store.put(_APP_NAME, 'u', session_id, _snapshot(15.0, 'Carbonara, then'))
+
+        # assert
+        assert await store.get(_APP_NAME, 'u', session_id) == latest
+
+    async def test_deletes_the_snapshot(self, db_session: AsyncSession) -> None:
+        # arrange
+        store = DatabaseSessionSnapshotStore()
+        session_id = str(uuid4())
+        await store.put(_APP_NAME, 'u', session_id, _snapshot(10.0, 'Carbonara'))
+
+        # act
+        await store.delete(_APP_NAME, 'u', session_id)
+
+        # assert
+        assert await store.get(_APP_NAME, 'u', session_id) is None
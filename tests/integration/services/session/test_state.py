@@ -0,0 +1,82 @@
+from uuid import uuid4
+
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ai_assistant.models.session_state import SessionStateCheckpoint
+from ai_assistant.services.session.state import DatabaseSessionStateStore
+
+_APP_NAME = 'ai_assistant'
+
+
+class TestDatabaseSessionStateStore:
+    async def test_materializes_the_checkpoint_and_later_deltas(
+        self, db_session: AsyncSession
+    ) -> None:
+        # arrange
+        store = DatabaseSessionStateStore(checkpoint_interval=2)
+        session_id = str(uuid4())
+        for step in range(5):
+            await store.confirm(
+                _APP_NAME, 'u', session_id, f'e{step}', {'step': step, str(step): 1}
+            )
+
+        # act
+        states = await store.get_states(_APP_NAME, 'u', [session_id])
+
+        # assert
+        assert states == {session_id: {'step': 4, '0': 1, '1': 1, '2': 1, '3': 1, '4': 1}}
+        checkpoints = await db_session.scalar(
+            select(func.count())
+            .select_from(SessionStateCheckpoint)
+            .where(SessionStateCheckpoint.session_id == session_id)
+        )
+        assert checkpoints == 1
+
+    async def test_reads_only_the_requested_keys(self, db_session: AsyncSession) -> None:
+        # arrange
+        store = DatabaseSessionStateStore(checkpoint_interval=2)
+        session_ids = [str(uuid4()), str(uuid4())]
+        for session_id in session_ids:
+            await store.confirm(_APP_NAME, 'u', session_id, 'e1', {'dish': 'curry', 'notes': 'x'})
+            await store.confirm(_APP_NAME, 'u', session_id, 'e2', {'notes': 'y'})
+            await store.confirm(_APP_NAME, 'u', session_id, 'e3', {'dish': 'dal'})
+
+        # act
+        states = await store.get_states(_APP_NAME, 'u', session_ids, keys=['dish', 'missing'])
+
+        # assert
+        assert states == {session_id: {'dish': 'dal'} for session_id in session_ids}
+
+    async def test_deletes_the_log_of_a_session(self, db_session: AsyncSession) -> None:
+        # arrange
+        store = DatabaseSessionStateStore(checkpoint_interval=1)
+        session_id = str(uuid4())
+        await store.confirm(_APP_NAME, 'u', session_id, 'e1', {'dish': 'curry'})
+
+        # act
+        await store.delete(_APP_NAME, 'u', session_id)
+
+        # assert
+        assert await store.get_states(_APP_NAME, 'u', [session_id]) == {}
+        assert await store.get_deltas(_APP_NAME, 'u', session_id) == {}
+
+    async def test_applies_only_the_confirmed_deltas(self, db_session: AsyncSession) -> None:
+        # arrange
+        store = DatabaseSessionStateStore(checkpoint_interval=2)
+        session_id = str(uuid4())
+        await store.append(_APP_NAME, 'u', session_id, 'e1', {'dish': 'curry'})
+        await store.append(_APP_NAME, 'u', session_id, 'e2', {'dish': 'dal'})
+        await store.append(_APP_NAME, 'u', session_id, 'e2', {'dish': 'dal'})
+
+        # act
+        await store.confirm(_APP_NAME, 'u', session_id, 'e1', {'dish': 'curry'})
+        await store.confirm(_APP_NAME, 'u', session_id, 'e1', {'dish': 'curry'})
+
+        # assert
+        assert await store.get_states(_APP_NAME, 'u', [session_id]) == {
+            session_id: {'dish': 'curry'}
+        }
+        assert await store.get_deltas(_APP_NAME, 'u', session_id) == {'e1': {'dish': 'curry'}}
+        assert await store.get_pending(_APP_NAME, 'u', session_id) == {'e2': {'dish': 'dal'}}
@@ -0,0 +1,56 @@
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ai_assistant.domain import TranscriptMessage
+from ai_assistant.services.session.transcript import DatabaseTranscriptStore
+
+_APP_NAME = 'ai_assistant'
+
+
+def _message(event_id: str, timestamp: float, text: str) -> TranscriptMessage:
+    return TranscriptMessage(
+        id=uuid4(), role='user', text=text, event_id=event_id, part_index=0, timestamp=timestamp
+    )
+
+
+class TestDatabaseTranscriptStore:
+    async def test_records_the_events_missing_from_a_transcript(
+        self, db_session: AsyncSession
+    ) -> None:
+        # arrange
+        store = DatabaseTranscriptStore()
+        session_id = str(uuid4())
+        await store.record_missing_event(_APP_NAME, 'u', session_id, 'e1')
+        await store.record_missing_event(_APP_NAME, 'u', session_id, 'e1')
+        await store.record_missing_event(_APP_NAME, 'u', session_id, 'e2')
+
+        # act
+        await store.clear_missing_events(_APP_NAME, 'u', session_id, ['e1'])
+
+        # assert
+        assert (_APP_NAME, 'u', session_id) in await store.list_incomplete()
+        await store.clear_missing_events(_APP_NAME, 'u', session_id)
+        assert (_APP_NAME, 'u', session_id) not in await store.list_incomplete()
+
+    async def test_replaces_a_transcript_up_to_a_time(self, db_session: AsyncSession) -> None:
+        # arrange
+        store = DatabaseTranscriptStore()
+        session_id = str(uuid4())
+        kept = _message('e1', 1.0, 'Hi')
+        stale = _message('e2', 2.0, 'Removed')
+        appended_since = _message('e3', 4.0, 'Hey')
+        await store.append(_APP_NAME, 'u', session_id, [kept, stale, appended_since])
+
+        # act
+        await store.replace(
+            _APP_NAME,
+            'u',
+            session_id,
+            [kept.model_copy(update={'text': 'Hello'}), _message('e4', 3.0, 'Rebuilt')],
+            up_to=3.0,
+        )
+
+        # assert
+        messages = await store.list_messages(_APP_NAME, 'u', session_id)
+        assert [m.text for m in messages] == ['Hello', 'Rebuilt', 'Hey']
@@ -0,0 +1,114 @@
+import json
+from uuid import uuid4
+
+import msgpack
+import pytest
+
+from ai_assistant.api.v1 import encoders
+from ai_assistant.api.v1.encoders import MessagePackEncoder
+from ai_assistant.api.v1.encoders import NDJSONEncoder
+from ai_assistant.api.v1.encoders import negotiate_stream_encoder
+from ai_assistant.api.v1.encoders import register_stream_encoder
+from ai_assistant.api.v1.schemas.chat import ContentResponse
+from ai_assistant.api.v1.sse import SSEEncoder
+from ai_assistant.domain import Content
+
+
+@pytest.fixture
+def content() -> Content:
+    return Content(
+        id=uuid4(),
+        type='metadata',
+        data={'text': 'Héllo "world" \n ✓'},
+        role='model',
+        metadata={'session_id': 'session', 'confidence': 0.95, 'ids': [uuid4()]},
+    )
+
+
+def _reference(content: Content) -> dict:
+    return ContentResponse.from_domain_model(content).model_dump(mode='json')
+
+
+class TestNDJSONEncoder:
+    def test_encodes_one_line_per_content(self, content: Content) -> None:
+        # arrange
+        encoder = NDJSONEncoder('session')
+
+        # act
+        frame = encoder.encode(content, event_id='run.1')
+
+        # assert
+        assert frame.endswith(b'\n')
+        assert frame.count(b'\n') == 1
+        assert json.loads(frame) == {'event_id': 'run.1', 'content': _reference(content)}
+
+    def test_encode_error(self) -> None:
+        # arrange
+        encoder = NDJSONEncoder('session')
+
+        # act
+        frame = encoder.encode_error('Model error')
+
+        # assert
+        assert json.loads(frame) == {'error': 'Model error', 'session_id': 'session'}
+
+
+class TestMessagePackEncoder:
+    def test_encodes_length_prefixed_maps(self, content: Content) -> None:
+        # arrange
+        encoder = MessagePackEncoder('session')
+
+        # act
+        frames = encoder.encode(content, event_id='run.1') + encoder.encode(content)
+
+        # assert
+        length = int.from_bytes(frames[:4], 'big')
+        first, second = frames[4 : 4 + length], frames[8 + length :]
+        assert msgpack.unpackb(first) == {'event_id': 'run.1', 'content': _reference(content)}
+        assert msgpack.unpackb(second) == {'event_id': None, 'content': _reference(content)}
+        assert int.from_bytes(frames[4 + length : 8 + length], 'big') == len(second)
+
+    def test_encode_error(self) -> None:
+        # arrange
+        encoder = MessagePackEncoder('session')
+
+        # act
+        frame = encoder.encode_error('Model error')
+
+        # assert
+        assert msgpack.unpackb(frame[4:]) == {'error': 'Model error', 'session_id': 'session'}
+
+
+class TestNegotiateStreamEncoder:
+    @pytest.mark.parametrize(
+        ('accept', 'expected'),
+        [
+            (None, SSEEncoder),
+            ('*/*', SSEEncoder),
+            ('text/html,application/xhtml+xml,*/*;q=0.8', SSEEncoder),
+            ('text/event-stream', SSEEncoder),
+            ('application/x-ndjson', NDJSONEncoder),
+            ('application/vnd.msgpack', MessagePackEncoder),
+            ('application/x-msgpack', MessagePackEncoder),
+            ('application/x-ndjson;q=0.5, application/vnd.msgpack', MessagePackEncoder),
+            ('application/*', NDJSONEncoder),
+            ('text/event-stream;q=0, */*', NDJSONEncoder),
+            ('image/png', SSEEncoder),
+        ],
+    )
+    def test_negotiation(self, accept: str | None, expected: type) -> None:
+        # act & assert
+        assert negotiate_stream_encoder(accept) is expected
+
+    def test_registered_encoders_are_negotiated(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        # arrange
+        monkeypatch.setattr(encoders, '_STREAM_ENCODERS', dict(encoders._STREAM_ENCODERS))
+
+        class CSVEncoder(NDJSONEncoder):
+            media_type = 'text/csv'
+
+        # act
+        register_stream_encoder(CSVEncoder)
+
+        # assert
+        assert negotiate_stream_encoder('text/csv') is CSVEncoder
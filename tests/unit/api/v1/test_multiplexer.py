@@ -0,0 +1,237 @@
+import asyncio
+import json
+from collections.abc import AsyncGenerator
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from ai_assistant.api.v1.multiplexer import ChatStreamMultiplexer
+from ai_assistant.domain import Content
+from ai_assistant.services.ai.service import AIService
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.incoming: asyncio.Queue[str | None] = asyncio.Queue()
+        self.sent: list[dict[str, Any]] = []
+
+    async def receive_text(self) -> str:
+        message = await self.incoming.get()
+        if message is None:
+            raise WebSocketDisconnect()
+        return message
+
+    async def send_text(self, data: str) -> None:
+        self.sent.append(json.loads(data))
+
+    def send_client(self, **message: Any) -> None:
+        self.incoming.put_nowait(json.dumps(message, default=str))
+
+    def events(self, stream_id: str) -> list[str]:
+        return [frame['event'] for frame in self.sent if frame['stream_id'] == stream_id]
+
+
+async def wait_until(condition: Callable[[], bool]) -> None:
+    for _ in range(1000):
+        if condition():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError('Condition not met')
+
+
+def _chat(stream_id: str) -> dict[str, Any]:
+    return {
+        'type': 'chat',
+        'stream_id': stream_id,
+        'session_id': uuid4(),
+        'user_id': uuid4(),
+        'message': 'Hi',
+    }
+
+
+@pytest.fixture
+def websocket() -> FakeWebSocket:
+    return FakeWebSocket()
+
+
+@pytest.fixture
+def produced() -> list[str]:
+    return []
+
+
+@pytest.fixture
+def release() -> asyncio.Event:
+    return asyncio.Event()
+
+
+@pytest.fixture
+def ai_service(produced: list[str], release: asyncio.Event) -> AIService:
+    async def run_stream(session_id, user_message, user_id) -> AsyncGenerator[Content, None]:
+        message_id = uuid4()
+        for text in ['The', ' weather', ' is sunny']:
+            if user_message == 'Wait' and text == ' is sunny':
+                await release.wait()
+            produced.append(text)
+            yield Content(
+                id=message_id,
+                type='message',
+                data={'text': text},
+                role='model',
+                metadata={'session_id': str(session_id)},
+            )
+
+    ai_service = AsyncMock(spec=AIService)
+    ai_service.run_stream = run_stream
+    return ai_service
+
+
+class TestChatStreamMultiplexer:
+    async def test_multiplexes_concurrent_streams(
+        self,
+        websocket: FakeWebSocket,
+        ai_service: AIService,
+    ) -> None:
+        # arrange
+        multiplexer = ChatStreamMultiplexer(websocket, ai_service)  # type: ignore[arg-type]
+        websocket.send_client(**_chat('a'))
+        websocket.send_client(**_chat('b'))
+
+        # act
+        task = asyncio.create_task(multiplexer.run())
+        await wait_until(lambda: 'end' in websocket.events('a') and 'end' in websocket.events('b'))
+        websocket.incoming.put_nowait(None)
+        await task
+
+        # assert
+        for stream_id in ['a', 'b']:
+            assert websocket.events(stream_id) == ['content', 'content', 'content', 'end']
+            texts = [
+                frame['content']['data']['text']
+                for frame in websocket.sent
+                if frame['stream_id'] == stream_id and frame['event'] == 'content'
+            ]
+            assert ''.join(texts) == 'The weather is sunny'
+
+    async def test_stream_waits_for_credit(
+        self,
+        websocket: FakeWebSocket,
+        ai_service: AIService,
+        produced: list[str],
+    ) -> None:
+        # arrange
+        multiplexer = ChatStreamMultiplexer(
+            websocket,  # type: ignore[arg-type]
+            ai_service,
+            initial_credit=1,
+        )
+        websocket.send_client(**_chat('a'))
+        task = asyncio.create_task(multiplexer.run())
+        await wait_until(lambda: websocket.events('a') == ['content'])
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        # act
+        blocked_events = websocket.events('a')
+        blocked_produced = len(produced)
+        websocket.send_client(type='credit', stream_id='a', frames=5)
+        await wait_until(lambda: 'end' in websocket.events('a'))
+        websocket.incoming.put_nowait(None)
+        await task
+
+        # assert
+        assert blocked_events == ['content']
+        assert blocked_produced == 2
+        assert websocket.events('a') == ['content', 'content', 'content', 'end']
+
+    async def test_cancel_stops_only_the_cancelled_stream(
+        self,
+        websocket: FakeWebSocket,
+        ai_service: AIService,
+    ) -> None:
+        # arrange
+        multiplexer = ChatStreamMultiplexer(websocket, ai_service)  # type: ignore[arg-type]
+        websocket.send_client(**{**_chat('a'), 'message': 'Wait'})
+        websocket.send_client(**_chat('b'))
+        task = asyncio.create_task(multiplexer.run())
+        await wait_until(lambda: websocket.events('a').count('content') == 2)
+
+        # act
+        websocket.send_client(type='cancel', stream_id='a')
+        await wait_until(lambda: 'cancelled' in websocket.events('a'))
+        await wait_until(lambda: 'end' in websocket.events('b'))
+        websocket.incoming.put_nowait(None)
+        await task
+
+        # assert
+        assert websocket.events('a') == ['content', 'content', 'cancelled']
+        assert websocket.events('b')[-1] == 'end'
+
+    async def test_rejects_streams_beyond_the_limit(
+        self,
+        websocket: FakeWebSocket,
+        ai_service: AIService,
+        release: asyncio.Event,
+    ) -> None:
+        # arrange
+        multiplexer = ChatStreamMultiplexer(
+            websocket,  # type: ignore[arg-type]
+            ai_service,
+            max_streams=1,
+        )
+        websocket.send_client(**{**_chat('a'), 'message': 'Wait'})
+        websocket.send_client(**_chat('b'))
+
+        # act
+        task = asyncio.create_task(multiplexer.run())
+        await wait_until(lambda: 'error' in websocket.events('b'))
+        release.set()
+        await wait_until(lambda: 'end' in websocket.events('a'))
+        websocket.incoming.put_nowait(None)
+        await task
+
+        # assert
+        assert websocket.events('b') == ['error']
+
+    async def test_invalid_messages_do_not_close_the_connection(
+        self,
+        websocket: FakeWebSocket,
+        ai_service: AIService,
+    ) -> None:
+        # arrange
+        multiplexer = ChatStreamMultiplexer(websocket, ai_service)  # type: ignore[arg-type]
+        websocket.incoming.put_nowait('{"type": "unknown"}')
+        websocket.send_client(**_chat('a'))
+
+        # act
+        task = asyncio.create_task(multiplexer.run())
+        await wait_until(lambda: 'end' in websocket.events('a'))
+        websocket.incoming.put_nowait(None)
+        await task
+
+        # assert
+        assert websocket.sent[0]['stream_id'] is None
+        assert websocket.sent[0]['event'] == 'error'
+
+    async def test_disconnect_cancels_running_streams(
+        self,
+        websocket: FakeWebSocket,
+        ai_service: AIService,
+        produced: list[str],
+    ) -> None:
+        # arrange
+        multiplexer = ChatStreamMultiplexer(websocket, ai_service)  # type: ignore[arg-type]
+        websocket.send_client(**{**_chat('a'), 'message': 'Wait'})
+        task = asyncio.create_task(multiplexer.run())
+        await wait_until(lambda: len(produced) == 2)
+
+        # act
+        websocket.incoming.put_nowait(None)
+        await task
+
+        # assert
+        assert 'cancelled' not in websocket.events('a')
+        assert multiplexer._streams == {}
@@ -12,8 +12,10 @@ from ai_assistant.api.v1.schemas.session import SessionDetailResponse
 from ai_assistant.api.v1.schemas.session import SessionListResponse
 from ai_assistant.api.v1.schemas.session import SessionRequest
 from ai_assistant.api.v1.schemas.session import SessionResponse
+from ai_assistant.domain import TranscriptMessage
 from ai_assistant.exceptions import NotFoundException
 from ai_assistant.services.ai.adk.session_factory import ADKSessionService
+from ai_assistant.services.session.transcript import InMemoryTranscriptStore
 
 
 class TestCreateSession:
@@ -56,7 +58,7 @@ class TestGetSession:
         session_service.get_session = AsyncMock(return_value=mock_session)
 
         # act
-        result = await get_session(session_id, user_id, session_service)
+        result = await get_session(session_id, user_id, session_service, InMemoryTranscriptStore())
 
         # assert
         assert isinstance(result, SessionDetailResponse)
@@ -65,6 +67,42 @@ class TestGetSession:
         assert result.contents == []
         session_service.get_session.assert_called_once()
 
+    async def test_get_session_reads_contents_from_transcript(self) -> None:
+        # arrange
+        session_service = AsyncMock(spec=ADKSessionService)
+        transcript_store = InMemoryTranscriptStore()
+        session_id = str(uuid4())
+        user_id = str(uuid4())
+
+        mock_session = MagicMock(spec=Session)
+        mock_session.id = session_id
+        mock_session.user_id = user_id
+        mock_session.app_name = 'ai_assistant'
+        mock_session.state = {}
+        mock_session.events = []
+        mock_session.last_update_time = 1234567890.0
+
+        session_service.get_session = AsyncMock(return_value=mock_session)
+
+        messages = [
+            TranscriptMessage(
+                id=uuid4(), role='user', text='Hello', event_id='e1', part_index=0, timestamp=1.0
+            ),
+            TranscriptMessage(
+                id=uuid4(), role='model', text='Hi!', event_id='e2', part_index=0, timestamp=2.0
+            ),
+        ]
+        await transcript_store.append('ai_assistant', user_id, session_id, messages)
+
+        # act
+        result = await get_session(session_id, user_id, session_service, transcript_store)
+
+        # assert
+        assert [c.data['text'] for c in result.contents] == ['Hello', 'Hi!']
+        assert [c.role for c in result.contents] == ['user', 'model']
+        assert [c.id for c in result.contents] == [m.id for m in messages]
+        assert all(c.metadata == {'session_id': session_id} for c in result.contents)
+
     async def test_get_session_not_found(self) -> None:
         # arrange
         session_service = AsyncMock(spec=ADKSessionService)
@@ -76,7 +114,7 @@ class TestGetSession:
 
         # act & assert
         with pytest.raises(NotFoundException) as exc_info:
-            await get_session(session_id, user_id, session_service)
+            await get_session(session_id, user_id, session_service, InMemoryTranscriptStore())
 
         assert f'Session {session_id} not found' in str(exc_info.value)
 
@@ -116,6 +154,29 @@ class TestGetUserSessions:
         assert result.sessions[1].session_id == mock_session_2.id
         session_service.list_sessions.assert_called_once()
 
+    async def test_get_user_sessions_returns_the_requested_state_keys(self) -> None:
+        # arrange
+        session_service = AsyncMock(spec=ADKSessionService)
+        user_id = uuid4()
+
+        mock_session = MagicMock()
+        mock_session.id = str(uuid4())
+        mock_session.user_id = str(user_id)
+        mock_session.app_name = 'test_app'
+        mock_session.state = {'dish': 'curry', 'notes': 'spicy'}
+        mock_session.last_update_time = 1234567890.0
+
+        mock_response = MagicMock()
+        mock_response.sessions = [mock_session]
+
+        session_service.list_sessions = AsyncMock(return_value=mock_response)
+
+        # act
+        result = await get_user_sessions(user_id, session_service, keys=['dish', 'diet'])
+
+        # assert
+        assert result.sessions[0].state == {'dish': 'curry'}
+
     async def test_get_user_sessions_empty(self) -> None:
         # arrange
         session_service = AsyncMock(spec=ADKSessionService)
@@ -0,0 +1,139 @@
+import json
+import zlib
+from collections.abc import AsyncIterator
+from uuid import uuid4
+
+import pytest
+
+from ai_assistant.api.v1.schemas.chat import ContentResponse
+from ai_assistant.api.v1.sse import SSEEncoder
+from ai_assistant.api.v1.sse import compress_stream
+from ai_assistant.api.v1.sse import negotiate_stream_encoding
+from ai_assistant.domain import Content
+
+
+def _reference_frame(content: Content) -> bytes:
+    return f'data: {ContentResponse.from_domain_model(content).model_dump_json()}\n\n'.encode()
+
+
+class TestSSEEncoder:
+    @pytest.mark.parametrize(
+        'content',
+        [
+            Content(
+                id=uuid4(),
+                type='message',
+                data={'text': 'Héllo "world" \n ✓'},
+                role='model',
+                metadata={'session_id': 'session'},
+            ),
+            Content(
+                id=uuid4(),
+                type='loader',
+                data={'message': 'Checking weather...', 'show_spinner': True},
+            ),
+            Content(
+                id=uuid4(),
+                type='metadata',
+                data={},
+                metadata={'session_id': 'other', 'confidence': 0.95, 'ids': [uuid4()]},
+            ),
+        ],
+    )
+    def test_matches_content_response_json(self, content: Content) -> None:
+        # arrange
+        encoder = SSEEncoder('session')
+
+        # act
+        frame = encoder.encode(content)
+
+        # assert
+        assert frame == _reference_frame(content)
+
+    def test_reuses_headers_and_trailers_across_chunks(self) -> None:
+        # arrange
+        session_id = uuid4()
+        encoder = SSEEncoder(session_id)
+        message_id = uuid4()
+        chunks = [
+            Content(
+                id=message_id,
+                type='message',
+                data={'text': text},
+                role='model',
+                metadata={'session_id': str(session_id)},
+            )
+            for text in ['The weather', ' is', ' sunny']
+        ]
+
+        # act
+        frames = [encoder.encode(chunk) for chunk in chunks]
+
+        # assert
+        assert frames == [_reference_frame(chunk) for chunk in chunks]
+        assert encoder._session_trailers.keys() == {'model'}
+
+    def test_encode_with_event_id(self) -> None:
+        # arrange
+        encoder = SSEEncoder('session')
+        content = Content(id=uuid4(), type='message', data={'text': 'Hi'})
+
+        # act
+        frame = encoder.encode(content, event_id='run.7')
+
+        # assert
+        assert frame == b'id: run.7\n' + _reference_frame(content)
+
+    def test_encode_error(self) -> None:
+        # arrange
+        encoder = SSEEncoder('session')
+
+        # act
+        frame = encoder.encode_error('Boom')
+
+        # assert
+        assert frame.startswith(b'data: ')
+        assert frame.endswith(b'\n\n')
+        assert json.loads(frame[len(b'data: ') :]) == {'error': 'Boom', 'session_id': 'session'}
+
+
+class TestNegotiateStreamEncoding:
+    @pytest.mark.parametrize(
+        ('accept_encoding', 'expected'),
+        [
+            (None, None),
+            ('', None),
+            ('br', None),
+            ('gzip, deflate, br', 'gzip'),
+            ('deflate', 'deflate'),
+            ('GZIP;q=0.5', 'gzip'),
+            ('gzip;q=0, deflate', 'deflate'),
+            ('gzip;q=0', None),
+            ('gzip;q=x', None),
+        ],
+    )
+    def test_negotiation(self, accept_encoding: str | None, expected: str | None) -> None:
+        # act & assert
+        assert negotiate_stream_encoding(accept_encoding) == expected
+
+
+class TestCompressStream:
+    @pytest.mark.parametrize(('encoding', 'wbits'), [('gzip', 31), ('deflate', 15)])
+    async def test_every_chunk_is_decodable_on_arrival(self, encoding: str, wbits: int) -> None:
+        # arrange
+        frames = [f'data: {{"text": "chunk {i}"}}\n\n'.encode() for i in range(5)]
+
+        async def chunks() -> AsyncIterator[bytes]:
+            for frame in frames:
+                yield frame
+
+        decompressor = zlib.decompressobj(wbits)
+
+        # act
+        compressed = [chunk async for chunk in compress_stream(chunks(), encoding, level=6)]
+
+        # assert
+        decoded = [decompressor.decompress(chunk) for chunk in compressed]
+        assert decoded[: len(frames)] == frames
+        assert decoded[-1] == b''
+        assert decompressor.eof
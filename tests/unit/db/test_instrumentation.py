@@ -0,0 +1,147 @@
+import logging
+from collections.abc import AsyncIterator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from ai_assistant.common.settings import settings
+from ai_assistant.db import instrumentation
+from ai_assistant.db.instrumentation import LatencyHistogram
+from ai_assistant.db.instrumentation import normalize_sql
+from ai_assistant.db.instrumentation import track_queries
+
+
+@pytest.fixture
+async def engine() -> AsyncIterator[AsyncEngine]:
+    instrumentation.reset_query_metrics()
+    engine = create_async_engine('sqlite+aiosqlite://')
+    instrumentation.instrument_engine(engine)
+    yield engine
+    await engine.dispose()
+    instrumentation.reset_query_metrics()
+
+
+class TestNormalizeSql:
+    @pytest.mark.parametrize(
+        ('statement', 'expected'),
+        [
+            ("SELECT * FROM t WHERE name = 'it''s'", 'SELECT * FROM t WHERE name = ?'),
+            ('SELECT * FROM t1 LIMIT 10 OFFSET 20', 'SELECT * FROM t1 LIMIT ? OFFSET ?'),
+            ('SELECT * FROM t WHERE id = $1::UUID', 'SELECT * FROM t WHERE id = ?'),
+            (
+                'SELECT * FROM t WHERE id IN ($1::VARCHAR, $2::VARCHAR)',
+                'SELECT * FROM t WHERE id IN (...)',
+            ),
+            ('SELECT * FROM t WHERE id IN (?, ?, ?)', 'SELECT * FROM t WHERE id IN (...)'),
+            ('SELECT *\n  FROM t\n WHERE a = :a', 'SELECT * FROM t WHERE a = ?'),
+            ('SELECT state::jsonb FROM t', 'SELECT state::jsonb FROM t'),
+        ],
+    )
+    def test_replaces_values_with_placeholders(self, statement: str, expected: str) -> None:
+        # act
+        result = normalize_sql(statement)
+
+        # assert
+        assert result == expected
+
+
+class TestLatencyHistogram:
+    def test_estimates_quantiles_from_buckets(self) -> None:
+        # arrange
+        histogram = LatencyHistogram()
+
+        # act
+        for duration in [0.002] * 90 + [0.3] * 9 + [20.0]:
+            histogram.observe(duration)
+
+        # assert
+        assert histogram.count == 100
+        assert histogram.quantile(0.5) == 0.0025
+        assert histogram.quantile(0.95) == 0.5
+        assert histogram.quantile(1.0) == 20.0
+
+
+class TestInstrumentEngine:
+    async def test_records_statement_latencies(self, engine: AsyncEngine) -> None:
+        # act
+        async with engine.connect() as connection:
+            for value in range(3):
+                await connection.execute(text(f'SELECT {value}'))
+
+        # assert
+        [metrics] = instrumentation.get_statement_metrics()
+        assert metrics['sql'] == 'SELECT ?'
+        assert metrics['count'] == 3
+        assert sum(metrics['buckets'].values()) == 3
+
+    async def test_records_failed_statements(self, engine: AsyncEngine) -> None:
+        # act
+        async with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                await connection.execute(text('SELECT * FROM missing'))
+
+        # assert
+        assert [m['sql'] for m in instrumentation.get_statement_metrics()] == [
+            'SELECT * FROM missing'
+        ]
+
+    async def test_logs_slow_queries(
+        self,
+        engine: AsyncEngine,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        # arrange
+        monkeypatch.setattr(settings, 'DATABASE_SLOW_QUERY_SECONDS', 0)
+
+        # act
+        with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 'secret'"))
+
+        # assert
+        assert 'Slow query' in caplog.text
+        assert 'SELECT ?' in caplog.text
+        assert 'secret' not in caplog.text
+
+
+class TestTrackQueries:
+    async def test_counts_the_statements_of_the_block(self, engine: AsyncEngine) -> None:
+        # act
+        async with engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+            with track_queries() as tracker:
+                tracker.name = 'GET /sessions'
+                await connection.execute(text('SELECT 2'))
+                await connection.execute(text('SELECT 3'))
+
+        # assert
+        assert tracker.count == 2
+        [metrics] = instrumentation.get_tracked_metrics()
+        assert metrics['name'] == 'GET /sessions'
+        assert (metrics['count'], metrics['max_queries'], metrics['n_plus_one']) == (1, 2, 0)
+
+    async def test_warns_about_repeated_statements(
+        self,
+        engine: AsyncEngine,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        # arrange
+        monkeypatch.setattr(settings, 'DATABASE_N_PLUS_ONE_THRESHOLD', 3)
+
+        # act
+        with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+            async with engine.connect() as connection:
+                with track_queries() as tracker:
+                    tracker.name = 'GET /sessions'
+                    for session_id in range(3):
+                        await connection.execute(text('SELECT :id'), {'id': session_id})
+
+        # assert
+        assert 'Possible N+1 query in GET /sessions: 3 executions of `SELECT ?`' in caplog.text
+        [metrics] = instrumentation.get_tracked_metrics()
+        assert metrics['n_plus_one'] == 1
@@ -0,0 +1,92 @@
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from ai_assistant.db.partitions import MonthlyPartitioning
+from ai_assistant.db.partitions import Partition
+from ai_assistant.db.partitions import add_months
+from ai_assistant.db.partitions import parse_bound
+from ai_assistant.models.base import BaseModel
+from ai_assistant.models.transcript import TranscriptMessage
+
+
+def _utc(year: int, month: int, day: int = 1) -> datetime:
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+class TestParseBound:
+    @pytest.mark.parametrize(
+        ('value', 'expected'),
+        [
+            ("'2026-11-01 00:00:00+00'", _utc(2026, 11)),
+            ("'2026-11-01 01:00:00+01'", _utc(2026, 11)),
+            ("'1793491200'", _utc(2026, 11)),
+            ("'1793491200'::double precision", _utc(2026, 11)),
+            ('MINVALUE', None),
+        ],
+    )
+    def test_parses_timestamps_and_epochs(self, value: str, expected: datetime | None) -> None:
+        # act
+        result = parse_bound(value)
+
+        # assert
+        assert result == expected
+
+
+class TestAddMonths:
+    def test_crosses_years(self) -> None:
+        # act
+        result = add_months(_utc(2026, 11), 3)
+
+        # assert
+        assert result == _utc(2027, 2)
+
+
+class TestMonthlyPartitioning:
+    def test_reads_the_partitioning_of_a_model(self) -> None:
+        # act
+        partitioning = MonthlyPartitioning.from_table(
+            BaseModel.metadata.tables[TranscriptMessage.__tablename__]
+        )
+
+        # assert
+        assert (partitioning.column, partitioning.epoch) == ('event_timestamp', True)
+
+    def test_renders_the_partition_of_a_month(self) -> None:
+        # arrange
+        partitioning = MonthlyPartitioning('session', 'created_at')
+
+        # act
+        sql = partitioning.create_partition_sql(_utc(2026, 12, 15))
+
+        # assert
+        assert sql == (
+            'CREATE TABLE IF NOT EXISTS session_p202612 PARTITION OF session FOR VALUES FROM '
+            "('2026-12-01T00:00:00+00:00') TO ('2027-01-01T00:00:00+00:00')"
+        )
+
+    def test_creates_the_months_after_the_last_partition(self) -> None:
+        # arrange
+        partitioning = MonthlyPartitioning('session', 'created_at')
+        partitions = [
+            Partition('session_legacy', None, _utc(2026, 11)),
+            Partition('session_p202611', _utc(2026, 11), _utc(2026, 12)),
+        ]
+
+        # act
+        months = partitioning.missing_months(partitions, now=_utc(2026, 11, 20), ahead=2)
+
+        # assert
+        assert months == [_utc(2026, 12), _utc(2027, 1)]
+
+    def test_recognizes_its_partitions(self) -> None:
+        # arrange
+        partitioning = MonthlyPartitioning('session', 'created_at')
+
+        # act
+        names = ['session', 'session_legacy', 'session_p202611', 'session_archive']
+        result = [partitioning.is_partition_name(name) for name in names]
+
+        # assert
+        assert result == [False, True, True, False]
@@ -0,0 +1,174 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content
+from google.genai.types import Part
+
+from ai_assistant.common.settings import settings
+from ai_assistant.services.ai.adk import session_service as session_service_module
+from ai_assistant.services.ai.adk.session_service import ObservedSessionService
+from ai_assistant.services.ai.adk.session_service import SessionEventListener
+from ai_assistant.services.ai.adk.session_service import get_session_listener_metrics
+from ai_assistant.services.ai.adk.session_service import shutdown_session_listeners
+
+
+@pytest.fixture
+def listener() -> AsyncMock:
+    return AsyncMock(spec=SessionEventListener)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'SESSION_LISTENER_RETRY_SECONDS', 0)
+
+
+@pytest.fixture
+def session_service(listener: AsyncMock) -> ObservedSessionService:
+    return ObservedSessionService(InMemorySessionService(), listeners=[listener])
+
+
+async def _wait_for_retries() -> None:
+    await asyncio.gather(*session_service_module._retries)
+
+
+class TestAppendEvent:
+    async def test_notifies_listeners_of_persisted_events(
+        self,
+        session_service: ObservedSessionService,
+        listener: AsyncMock,
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name='app', user_id='user')
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+
+        # act
+        await session_service.append_event(session, event)
+
+        # assert
+        listener.on_event_appended.assert_awaited_once_with(session, event)
+        stored = await session_service.get_session(
+            app_name='app', user_id='user', session_id=session.id
+        )
+        assert stored is not None
+        assert len(stored.events) == 1
+
+    async def test_skips_partial_events(
+        self,
+        session_service: ObservedSessionService,
+        listener: AsyncMock,
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name='app', user_id='user')
+        event = Event(
+            author='model',
+            partial=True,
+            content=Content(role='model', parts=[Part(text='Hel')]),
+        )
+
+        # act
+        await session_service.append_event(session, event)
+
+        # assert
+        listener.on_event_appended.assert_not_awaited()
+
+    async def test_listener_failure_does_not_fail_append(
+        self,
+        session_service: ObservedSessionService,
+        listener: AsyncMock,
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name='app', user_id='user')
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+        listener.on_event_appended.side_effect = RuntimeError('boom')
+
+        # act
+        result = await session_service.append_event(session, event)
+
+        # assert
+        assert result is event
+
+    async def test_retries_failed_listeners(
+        self,
+        session_service: ObservedSessionService,
+        listener: AsyncMock,
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name='app', user_id='user')
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+        listener.on_event_appended.side_effect = [TimeoutError('lock timeout'), None]
+
+        # act
+        await session_service.append_event(session, event)
+        attempts_before_retries = listener.on_event_appended.await_count
+        await _wait_for_retries()
+
+        # assert
+        # Retried in the background, not to delay the agent turn
+        assert attempts_before_retries == 1
+        assert listener.on_event_appended.await_count == 2
+        listener.on_event_failed.assert_not_awaited()
+
+    async def test_reports_events_failing_every_attempt(
+        self,
+        session_service: ObservedSessionService,
+        listener: AsyncMock,
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name='app', user_id='user')
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+        listener.on_event_appended.side_effect = TimeoutError('lock timeout')
+        failures = get_session_listener_metrics().get('AsyncMock', {}).get('failures', 0)
+
+        # act
+        await session_service.append_event(session, event)
+        await _wait_for_retries()
+
+        # assert
+        assert listener.on_event_appended.await_count == settings.SESSION_LISTENER_MAX_ATTEMPTS
+        listener.on_event_failed.assert_awaited_once_with(session, event)
+        assert get_session_listener_metrics()['AsyncMock']['failures'] == failures + 1
+
+    async def test_reports_the_retries_pending_at_shutdown(
+        self,
+        session_service: ObservedSessionService,
+        listener: AsyncMock,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        # arrange
+        monkeypatch.setattr(settings, 'SESSION_LISTENER_RETRY_SECONDS', 60)
+        session = await session_service.create_session(app_name='app', user_id='user')
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+        listener.on_event_appended.side_effect = TimeoutError('lock timeout')
+        await session_service.append_event(session, event)
+
+        # act
+        await shutdown_session_listeners()
+
+        # assert
+        listener.on_event_appended.assert_awaited_once()
+        listener.on_event_failed.assert_awaited_once_with(session, event)
+
+
+class TestDeleteSession:
+    async def test_notifies_listeners(
+        self,
+        session_service: ObservedSessionService,
+        listener: AsyncMock,
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name='app', user_id='user')
+
+        # act
+        await session_service.delete_session(app_name='app', user_id='user', session_id=session.id)
+
+        # assert
+        listener.on_session_deleted.assert_awaited_once_with('app', 'user', session.id)
+        assert (
+            await session_service.get_session(
+                app_name='app', user_id='user', session_id=session.id
+            )
+            is None
+        )
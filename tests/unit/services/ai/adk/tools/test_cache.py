@@ -0,0 +1,109 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from ai_assistant.services.ai.adk.tools.cache import cached_tool
+from ai_assistant.services.ai.adk.tools.cache import get_tool_cache_metrics
+
+
+class TestCachedTool:
+    async def test_reuses_the_result_of_normalized_arguments(self) -> None:
+        # arrange
+        calls: list[str] = []
+
+        @cached_tool(ttl_seconds=60)
+        async def lookup_city(location: str) -> dict[str, Any]:
+            calls.append(location)
+            return {'location': location}
+
+        await lookup_city('London')
+
+        # act
+        result = await lookup_city('  london ')
+
+        # assert
+        assert result == {'location': 'London'}
+        assert calls == ['London']
+        assert get_tool_cache_metrics()['lookup_city'] == {
+            'hits': 1,
+            'misses': 1,
+            'coalesced': 0,
+            'hit_ratio': 0.5,
+        }
+
+    async def test_coalesces_concurrent_identical_calls(self) -> None:
+        # arrange
+        calls = 0
+
+        @cached_tool(ttl_seconds=60)
+        async def slow_lookup(location: str) -> dict[str, Any]:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {'location': location}
+
+        # act
+        results = await asyncio.gather(*(slow_lookup('Paris') for _ in range(10)))
+
+        # assert
+        assert results == [{'location': 'Paris'}] * 10
+        assert calls == 1
+        assert get_tool_cache_metrics()['slow_lookup']['coalesced'] == 9
+
+    async def test_calls_again_once_the_result_expired(self) -> None:
+        # arrange
+        calls = 0
+
+        @cached_tool(ttl_seconds=0)
+        async def expiring_lookup(location: str) -> int:
+            nonlocal calls
+            calls += 1
+            return calls
+
+        await expiring_lookup('Rome')
+
+        # act
+        result = await expiring_lookup('Rome')
+
+        # assert
+        assert result == 2
+
+    async def test_evicts_the_least_recently_used_result(self) -> None:
+        # arrange
+        calls: list[str] = []
+
+        @cached_tool(ttl_seconds=60, max_entries=2)
+        async def bounded_lookup(location: str) -> str:
+            calls.append(location)
+            return location
+
+        for location in ('Oslo', 'Lima', 'Oslo', 'Kyiv'):
+            await bounded_lookup(location)
+
+        # act
+        await bounded_lookup('Lima')
+
+        # assert
+        assert calls == ['Oslo', 'Lima', 'Kyiv', 'Lima']
+
+    async def test_does_not_cache_errors(self) -> None:
+        # arrange
+        calls = 0
+
+        @cached_tool(ttl_seconds=60)
+        async def failing_lookup(location: str) -> str:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ValueError('Upstream unavailable')
+            return location
+
+        with pytest.raises(ValueError):
+            await failing_lookup('Cairo')
+
+        # act
+        result = await failing_lookup('Cairo')
+
+        # assert
+        assert result == 'Cairo'
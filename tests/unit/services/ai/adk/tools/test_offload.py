@@ -0,0 +1,108 @@
+import asyncio
+import inspect
+import os
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from ai_assistant.services.ai.adk.tools.offload import function_tool
+from ai_assistant.services.ai.adk.tools.offload import get_tool_pool_metrics
+from ai_assistant.services.ai.adk.tools.offload import offloaded_tool
+from ai_assistant.services.ai.adk.tools.offload import shutdown_tool_pools
+
+
+@offloaded_tool(cpu_bound=True, max_workers=1)
+def process_id(offset: int) -> int:
+    return os.getpid() + offset
+
+
+@pytest.fixture(autouse=True)
+def stop_tool_pools() -> Iterator[None]:
+    yield
+    shutdown_tool_pools()
+
+
+class TestOffloadedTool:
+    async def test_runs_sync_tools_off_the_event_loop(self) -> None:
+        # arrange
+        @offloaded_tool()
+        def blocking_lookup(location: str) -> dict[str, str]:
+            time.sleep(0.2)
+            return {'location': location, 'thread': threading.current_thread().name}
+
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+
+        # act
+        result = await blocking_lookup('London')
+
+        # assert
+        ticker.cancel()
+        assert result['location'] == 'London'
+        assert result['thread'].startswith('blocking_lookup')
+        assert ticks >= 10
+
+    async def test_queues_the_calls_beyond_the_workers_of_the_tool(self) -> None:
+        # arrange
+        @offloaded_tool(max_workers=1)
+        def single_worker_lookup(location: str) -> str:
+            time.sleep(0.05)
+            return location
+
+        # act
+        results = await asyncio.gather(*(single_worker_lookup(city) for city in ('Oslo', 'Lima')))
+
+        # assert
+        metrics = get_tool_pool_metrics()['single_worker_lookup']
+        assert results == ['Oslo', 'Lima']
+        assert metrics['executor'] == 'thread'
+        assert metrics['calls'] == 2
+        assert metrics['in_flight'] == 0
+        assert metrics['queue_seconds_max'] >= 0.04
+
+    async def test_runs_cpu_bound_tools_in_processes(self) -> None:
+        # act
+        result = await process_id(offset=0)
+
+        # assert
+        assert result != os.getpid()
+        assert get_tool_pool_metrics()['process_id']['executor'] == 'process'
+
+    def test_rejects_coroutine_functions(self) -> None:
+        # arrange
+        async def async_lookup(location: str) -> str:
+            return location
+
+        # act / assert
+        with pytest.raises(TypeError, match='is a coroutine function'):
+            offloaded_tool()(async_lookup)
+
+
+class TestFunctionTool:
+    def test_offloads_only_sync_functions(self) -> None:
+        # arrange
+        def sync_lookup(location: str) -> str:
+            """Look up a location."""
+            return location
+
+        async def async_lookup(location: str) -> str:
+            return location
+
+        # act
+        sync_tool = function_tool(sync_lookup)
+        async_tool = function_tool(async_lookup)
+
+        # assert
+        assert sync_tool.name == 'sync_lookup'
+        assert sync_tool.description == 'Look up a location.'
+        assert inspect.iscoroutinefunction(sync_tool.func)
+        assert async_tool.func is async_lookup
@@ -0,0 +1,156 @@
+import asyncio
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from ai_assistant.domain import ChatTurn
+from ai_assistant.domain import Content
+from ai_assistant.exceptions import TooManyRequestsException
+from ai_assistant.services.ai.jobs import ChatJobManager
+from ai_assistant.services.ai.service import AIService
+
+
+def _turn(message: str = 'Hi') -> ChatTurn:
+    return ChatTurn(session_id=uuid4(), user_id=uuid4(), message=message)
+
+
+@pytest.fixture
+def release() -> asyncio.Event:
+    event = asyncio.Event()
+    event.set()
+    return event
+
+
+@pytest.fixture
+def ai_service(release: asyncio.Event) -> AIService:
+    async def run(session_id, user_message, user_id) -> Content:
+        await release.wait()
+        if user_message == 'Fail':
+            raise ValueError('Model error')
+        return Content(id=uuid4(), type='message', data={'text': f'Re: {user_message}'})
+
+    ai_service = AsyncMock(spec=AIService)
+    ai_service.run = AsyncMock(side_effect=run)
+    return ai_service
+
+
+@pytest.fixture
+async def manager():
+    manager = ChatJobManager(concurrency=2, max_queued=2, retention=60)
+    yield manager
+    await manager.shutdown()
+
+
+class TestChatJobManager:
+    async def test_runs_submitted_jobs(
+        self, manager: ChatJobManager, ai_service: AIService
+    ) -> None:
+        # arrange
+        job = manager.submit(ai_service, _turn('Hello'))
+
+        # act
+        await job.wait(timeout=1)
+
+        # assert
+        assert job.status == 'succeeded'
+        assert job.result is not None
+        assert job.result.data == {'text': 'Re: Hello'}
+        assert job.finished_at is not None
+        assert manager.get(job.job_id) is job
+
+    async def test_records_failures(self, manager: ChatJobManager, ai_service: AIService) -> None:
+        # arrange
+        job = manager.submit(ai_service, _turn('Fail'))
+
+        # act
+        await job.wait(timeout=1)
+
+        # assert
+        assert job.status == 'failed'
+        assert job.error == 'Model error'
+
+    async def test_wait_times_out_on_running_jobs(
+        self,
+        manager: ChatJobManager,
+        ai_service: AIService,
+        release: asyncio.Event,
+    ) -> None:
+        # arrange
+        release.clear()
+        job = manager.submit(ai_service, _turn())
+
+        # act
+        await job.wait(timeout=0.01)
+
+        # assert
+        assert not job.done
+
+    async def test_watch_follows_status_changes(
+        self,
+        manager: ChatJobManager,
+        ai_service: AIService,
+        release: asyncio.Event,
+    ) -> None:
+        # arrange
+        release.clear()
+        job = manager.submit(ai_service, _turn())
+        statuses = []
+
+        # act
+        async for status in job.watch():
+            statuses.append(status)
+            release.set()
+
+        # assert
+        assert statuses[0] == 'queued'
+        assert statuses[-1] == 'succeeded'
+
+    async def test_rejects_jobs_beyond_the_queue_limit(
+        self,
+        manager: ChatJobManager,
+        ai_service: AIService,
+        release: asyncio.Event,
+    ) -> None:
+        # arrange
+        release.clear()
+        for _ in range(2):
+            manager.submit(ai_service, _turn())
+        await asyncio.sleep(0)
+        for _ in range(2):
+            manager.submit(ai_service, _turn())
+
+        # act & assert
+        with pytest.raises(TooManyRequestsException):
+            manager.submit(ai_service, _turn())
+
+    async def test_finished_jobs_expire(self, ai_service: AIService) -> None:
+        # arrange
+        manager = ChatJobManager(concurrency=1, max_queued=1, retention=0)
+        job = manager.submit(ai_service, _turn())
+        await job.wait(timeout=1)
+
+        # act
+        found = manager.get(job.job_id)
+        await manager.shutdown()
+
+        # assert
+        assert found is None
+
+    async def test_shutdown_fails_unfinished_jobs(
+        self,
+        manager: ChatJobManager,
+        ai_service: AIService,
+        release: asyncio.Event,
+    ) -> None:
+        # arrange
+        release.clear()
+        job = manager.submit(ai_service, _turn())
+        await asyncio.sleep(0)
+
+        # act
+        await manager.shutdown()
+
+        # assert
+        assert job.status == 'failed'
+        assert job.error is not None
@@ -0,0 +1,191 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from ai_assistant.domain import Content
+from ai_assistant.exceptions import NotFoundException
+from ai_assistant.services.ai.runs import StreamRunRegistry
+from ai_assistant.services.ai.runs import format_event_id
+from ai_assistant.services.ai.runs import parse_event_id
+
+
+def _content(text: str) -> Content:
+    return Content(id=uuid4(), type='message', data={'text': text})
+
+
+async def _stream(texts: list[str], gate: asyncio.Event | None = None) -> AsyncGenerator[Content]:
+    for i, text in enumerate(texts):
+        if gate is not None and i == 1:
+            await gate.wait()
+        yield _content(text)
+
+
+async def _texts(run_subscription: AsyncGenerator[tuple[int, Content]]) -> list[tuple[int, str]]:
+    return [(seq, content.data['text']) async for seq, content in run_subscription]
+
+
+@pytest.fixture
+async def make_registry() -> AsyncIterator[Callable[..., StreamRunRegistry]]:
+    registries: list[StreamRunRegistry] = []
+
+    def make(**kwargs: Any) -> StreamRunRegistry:
+        registries.append(StreamRunRegistry(**kwargs))
+        return registries[-1]
+
+    yield make
+
+    for registry in registries:
+        await registry.shutdown()
+
+
+@pytest.fixture
+def registry(make_registry: Callable[..., StreamRunRegistry]) -> StreamRunRegistry:
+    return make_registry(ttl=60, max_frames=100)
+
+
+class TestEventIds:
+    def test_round_trip(self) -> None:
+        # act
+        parsed = parse_event_id(format_event_id('abc123', 42))
+
+        # assert
+        assert parsed == ('abc123', 42)
+
+    @pytest.mark.parametrize('event_id', ['', 'abc', 'abc.', '.12', 'abc.x1'])
+    def test_rejects_malformed_ids(self, event_id: str) -> None:
+        # act & assert
+        assert parse_event_id(event_id) is None
+
+
+class TestStreamRun:
+    async def test_subscribe_replays_missing_frames_of_a_finished_run(
+        self,
+        registry: StreamRunRegistry,
+    ) -> None:
+        # arrange
+        run = registry.start(uuid4(), uuid4(), _stream(['The', ' weather', ' is sunny']))
+        await _texts(run.subscribe())
+
+        # act
+        frames = await _texts(run.subscribe(after=1))
+
+        # assert
+        assert frames == [(2, ' weather'), (3, ' is sunny')]
+
+    async def test_subscriber_reattaches_to_a_running_run(
+        self,
+        registry: StreamRunRegistry,
+    ) -> None:
+        # arrange
+        gate = asyncio.Event()
+        run = registry.start(uuid4(), uuid4(), _stream(['The', ' weather'], gate))
+        first_subscription = run.subscribe()
+        first_frame = await anext(first_subscription)
+        await first_subscription.aclose()
+
+        # act
+        resumed = asyncio.create_task(_texts(run.subscribe(after=first_frame[0])))
+        gate.set()
+
+        # assert
+        assert await resumed == [(2, ' weather')]
+        assert run.done
+
+    async def test_records_the_error_of_a_failed_run(self, registry: StreamRunRegistry) -> None:
+        # arrange
+        async def failing_stream() -> AsyncGenerator[Content]:
+            yield _content('The')
+            raise ValueError('Model error')
+
+        # act
+        run = registry.start(uuid4(), uuid4(), failing_stream())
+        frames = await _texts(run.subscribe())
+
+        # assert
+        assert frames == [(1, 'The')]
+        assert run.error == 'Model error'
+
+    async def test_frames_beyond_the_buffer_cannot_be_replayed(
+        self,
+        make_registry: Callable[..., StreamRunRegistry],
+    ) -> None:
+        # arrange
+        registry = make_registry(ttl=60, max_frames=2)
+        run = registry.start(uuid4(), uuid4(), _stream(['a', 'b', 'c']))
+        await _texts(run.subscribe(after=1))
+
+        # act
+        replayed = await _texts(run.subscribe(after=1))
+
+        # assert
+        assert replayed == [(2, 'b'), (3, 'c')]
+        with pytest.raises(NotFoundException):
+            await _texts(run.subscribe(after=0))
+
+
+class TestStreamRunRegistry:
+    async def test_finished_runs_expire(
+        self,
+        make_registry: Callable[..., StreamRunRegistry],
+    ) -> None:
+        # arrange
+        registry = make_registry(ttl=0, max_frames=10)
+        run = registry.start(uuid4(), uuid4(), _stream(['a']))
+        await _texts(run.subscribe())
+
+        # act
+        found = registry.get(run.run_id)
+
+        # assert
+        assert found is None
+
+    async def test_running_runs_do_not_expire(
+        self,
+        make_registry: Callable[..., StreamRunRegistry],
+    ) -> None:
+        # arrange
+        registry = make_registry(ttl=0, max_frames=10)
+        gate = asyncio.Event()
+        run = registry.start(uuid4(), uuid4(), _stream(['a', 'b'], gate))
+
+        # act
+        found = registry.get(run.run_id)
+        gate.set()
+        await _texts(run.subscribe())
+
+        # assert
+        assert found is run
+
+    async def test_evicts_expired_runs_without_requests(
+        self,
+        make_registry: Callable[..., StreamRunRegistry],
+    ) -> None:
+        # arrange
+        registry = make_registry(ttl=0, max_frames=10, eviction_interval=0.01)
+        run = registry.start(uuid4(), uuid4(), _stream(['a']))
+        await _texts(run.subscribe())
+
+        # act
+        await asyncio.sleep(0.05)
+
+        # assert
+        assert len(registry) == 0
+
+    async def test_shutdown_cancels_the_running_runs(self, registry: StreamRunRegistry) -> None:
+        # arrange
+        run = registry.start(uuid4(), uuid4(), _stream(['a', 'b'], asyncio.Event()))
+        subscription = asyncio.create_task(_texts(run.subscribe()))
+        await asyncio.sleep(0)
+
+        # act
+        await registry.shutdown()
+
+        # assert
+        assert await subscription == [(1, 'a')]
+        assert run.done
+        assert run.error == 'The server shut down before the run completed'
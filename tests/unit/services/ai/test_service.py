@@ -6,6 +6,7 @@ from uuid import uuid4
 
 import pytest
 
+from ai_assistant.domain import ChatTurn
 from ai_assistant.domain import Content
 from ai_assistant.services.ai.service import AIService
 
@@ -371,3 +372,39 @@ class TestRunStream:
 
         # assert
         assert len(results) == 0
+
+
+class TestRunBatch:
+    @pytest.mark.asyncio
+    @patch('ai_assistant.services.ai.service.get_langfuse_client')
+    async def test_runs_every_turn_and_isolates_errors(
+        self,
+        mock_langfuse_client: MagicMock,
+        ai_service: AIService,
+        agent_runner: MagicMock,
+    ) -> None:
+        # arrange
+        turns = [
+            ChatTurn(session_id=uuid4(), user_id=uuid4(), message=message)
+            for message in ['Hi', 'Fail', 'Hello']
+        ]
+
+        async def run(session_id, user_message, user_id) -> str:
+            if user_message == 'Fail':
+                raise ValueError('Model error')
+            return f'Re: {user_message}'
+
+        agent_runner.run.side_effect = run
+
+        # act
+        results = [result async for result in ai_service.run_batch(turns, concurrency=2)]
+
+        # assert
+        assert sorted(result.index for result in results) == [0, 1, 2]
+        by_index = {result.index: result for result in results}
+        assert by_index[0].value is not None
+        assert by_index[0].value.data == {'text': 'Re: Hi'}
+        assert by_index[0].value.metadata == {'session_id': str(turns[0].session_id)}
+        assert by_index[1].error == 'Model error'
+        assert by_index[2].value is not None
+        assert by_index[2].value.data == {'text': 'Re: Hello'}
@@ -0,0 +1,63 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from ai_assistant.services.recipes.corpus import RecipeCorpus
+from ai_assistant.services.recipes.corpus import pack_recipe_corpus
+
+_RECIPES = [
+    {'dish': 'Pasta Carbonara', 'servings': 4},
+    {'dish': 'Chocolate Chip Cookies', 'servings': 48},
+    {'dish': 'Chicken Tikka Masala', 'servings': 4},
+    {'dish': 'Chicken Noodle Soup', 'servings': 6},
+    {'dish': 'Crème Brûlée', 'servings': 6},
+]
+
+
+@pytest.fixture
+def corpus(tmp_path: Path) -> Iterator[RecipeCorpus]:
+    path = tmp_path / 'recipes.corpus'
+    pack_recipe_corpus(_RECIPES, path)
+    corpus = RecipeCorpus(path)
+    yield corpus
+    corpus.close()
+
+
+class TestRecipeCorpus:
+    def test_gets_a_recipe_by_its_normalized_name(self, corpus: RecipeCorpus) -> None:
+        # act
+        recipe = corpus.get('  pasta   CARBONARA! ')
+
+        # assert
+        assert len(corpus) == len(_RECIPES)
+        assert recipe == {'dish': 'Pasta Carbonara', 'servings': 4}
+        assert corpus.get('crème brûlée') == {'dish': 'Crème Brûlée', 'servings': 6}
+        assert corpus.get('Pasta') is None
+
+    def test_ranks_the_similar_names(self, corpus: RecipeCorpus) -> None:
+        # act
+        matches = corpus.search('chiken tika masala', min_similarity=0.1)
+
+        # assert
+        assert [match.dish for match in matches] == [
+            'Chicken Tikka Masala',
+            'Chicken Noodle Soup',
+        ]
+        assert matches[0].similarity > matches[1].similarity
+
+    def test_finds_no_match_for_an_unrelated_name(self, corpus: RecipeCorpus) -> None:
+        # act
+        matches = corpus.search('sushi')
+
+        # assert
+        assert matches == []
+
+    def test_rejects_other_files(self, tmp_path: Path) -> None:
+        # arrange
+        path = tmp_path / 'recipes.jsonl'
+        path.write_text('{"dish": "Pasta Carbonara"}\n' * 10)
+
+        # act / assert
+        with pytest.raises(ValueError, match='is not a recipe corpus'):
+            RecipeCorpus(path)
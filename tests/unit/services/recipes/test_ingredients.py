@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from ai_assistant.services.recipes.corpus import RecipeCorpus
+from ai_assistant.services.recipes.corpus import pack_recipe_corpus
+from ai_assistant.services.recipes.ingredients import IngredientIndex
+from ai_assistant.services.recipes.ingredients import IngredientMatch
+from ai_assistant.services.recipes.ingredients import ingredient_terms
+
+_INGREDIENTS = [
+    ['400g spaghetti', '200g pancetta', '4 large eggs', '100g Pecorino cheese', 'Salt'],
+    ['2 eggs', '1 cup butter', '2 cups flour', 'Salt'],
+    ['3 eggs', '50g Parmesan cheese', 'Salt'],
+    ['2 cloves of garlic', '2 tbsp olive oil'],
+]
+
+
+class TestIngredientTerms:
+    def test_keeps_the_ingredient_words_in_singular(self) -> None:
+        # act
+        terms = ingredient_terms('2 1/4 Cups of ripe Tomatoes')
+
+        # assert
+        assert terms == {'ripe', 'tomato'}
+
+
+class TestIngredientIndex:
+    def test_ranks_by_matched_then_missing_ingredients(self) -> None:
+        # arrange
+        index = IngredientIndex(_INGREDIENTS)
+
+        # act
+        matches = index.search(['Eggs', 'pancetta', 'cheese'])
+
+        # assert
+        assert matches == [
+            IngredientMatch(index=0, matched=('Eggs', 'pancetta', 'cheese'), missing=2),
+            IngredientMatch(index=2, matched=('Eggs', 'cheese'), missing=1),
+            IngredientMatch(index=1, matched=('Eggs',), missing=3),
+        ]
+
+    def test_matches_every_term_of_an_ingredient(self) -> None:
+        # arrange
+        index = IngredientIndex(_INGREDIENTS)
+
+        # act
+        matches = index.search(['parmesan cheese', 'saffron'])
+
+        # assert
+        assert matches == [IngredientMatch(index=2, matched=('parmesan cheese',), missing=2)]
+
+    def test_finds_the_recipes_of_rare_terms(self) -> None:
+        # arrange
+        ingredients = [['eggs', 'flour']] * 1000 + [['eggs', 'saffron', 'rice']]
+        index = IngredientIndex(ingredients)
+
+        # act
+        matches = index.search(['rice', 'saffron', 'eggs'], limit=2)
+
+        # assert
+        assert [(match.index, len(match.matched)) for match in matches] == [(1000, 3), (0, 1)]
+
+    def test_indexes_the_recipes_of_a_corpus(self, tmp_path: Path) -> None:
+        # arrange
+        path = tmp_path / 'recipes.corpus'
+        pack_recipe_corpus(
+            [{'dish': f'Dish {i}', 'ingredients': lines} for i, lines in enumerate(_INGREDIENTS)],
+            path,
+        )
+        corpus = RecipeCorpus(path)
+
+        # act
+        index = IngredientIndex.from_corpus(corpus)
+
+        # assert
+        assert len(index) == len(_INGREDIENTS)
+        assert [match.index for match in index.search(['garlic'])] == [3]
+        corpus.close()
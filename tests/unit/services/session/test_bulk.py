@@ -0,0 +1,172 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from google.adk.sessions import InMemorySessionService
+
+from ai_assistant.common.settings import settings
+from ai_assistant.services.session.bulk import BulkSessionService
+from ai_assistant.services.session.bulk import iter_bounded
+from ai_assistant.services.session.bulk import run_bounded
+
+
+@pytest.fixture
+def session_service() -> InMemorySessionService:
+    return InMemorySessionService()
+
+
+@pytest.fixture
+def bulk_session_service(session_service: InMemorySessionService) -> BulkSessionService:
+    return BulkSessionService(session_service, concurrency=4)
+
+
+class TestRunBounded:
+    async def test_respects_concurrency_limit(self) -> None:
+        # arrange
+        in_flight = 0
+        max_in_flight = 0
+
+        async def operation(item: int) -> int:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            return item * 2
+
+        # act
+        results = await run_bounded(list(range(20)), operation, concurrency=3)
+
+        # assert
+        assert max_in_flight == 3
+        assert [r.value for r in results] == [i * 2 for i in range(20)]
+
+    async def test_isolates_item_errors(self) -> None:
+        # arrange
+        async def operation(item: int) -> int:
+            if item == 1:
+                raise ValueError('bad item')
+            return item
+
+        # act
+        results = await run_bounded([0, 1, 2], operation, concurrency=2)
+
+        # assert
+        assert [r.ok for r in results] == [True, False, True]
+        assert results[1].error == 'bad item'
+        assert results[2].value == 2
+
+
+class TestIterBounded:
+    async def test_yields_in_completion_order(self) -> None:
+        # arrange
+        async def operation(item: int) -> int:
+            await asyncio.sleep(item / 1000)
+            return item
+
+        # act
+        results = [r async for r in iter_bounded([30, 0, 10], operation, concurrency=3)]
+
+        # assert
+        assert [r.index for r in results] == [1, 2, 0]
+        assert [r.value for r in results] == [0, 10, 30]
+
+    async def test_respects_concurrency_and_isolates_errors(self) -> None:
+        # arrange
+        in_flight = 0
+        max_in_flight = 0
+
+        async def operation(item: int) -> int:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            if item == 3:
+                raise ValueError('bad item')
+            return item
+
+        # act
+        results = [r async for r in iter_bounded(list(range(10)), operation, concurrency=2)]
+
+        # assert
+        assert max_in_flight == 2
+        assert sorted(r.index for r in results) == list(range(10))
+        assert [r.index for r in results if not r.ok] == [3]
+
+    async def test_closing_early_cancels_in_flight_operations(self) -> None:
+        # arrange
+        cancelled = 0
+
+        async def operation(item: int) -> int:
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(0 if item == 0 else 10)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            return item
+
+        # act
+        results = iter_bounded(list(range(5)), operation, concurrency=3)
+        first = await anext(results)
+        await results.aclose()
+
+        # assert
+        assert first.value == 0
+        assert cancelled == 3
+
+
+class TestBulkSessionService:
+    async def test_create_sessions(self, bulk_session_service: BulkSessionService) -> None:
+        # arrange
+        user_ids = [str(uuid4()) for _ in range(5)]
+
+        # act
+        results = await bulk_session_service.create_sessions(user_ids)
+
+        # assert
+        assert all(r.ok for r in results)
+        assert [r.value.user_id for r in results if r.value] == user_ids
+
+    async def test_get_sessions_reports_missing(
+        self,
+        session_service: InMemorySessionService,
+        bulk_session_service: BulkSessionService,
+    ) -> None:
+        # arrange
+        user_id = str(uuid4())
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id=user_id)
+
+        # act
+        results = await bulk_session_service.get_sessions(
+            [(user_id, session.id), (user_id, 'missing')]
+        )
+
+        # assert
+        assert results[0].value is not None
+        assert results[0].value.id == session.id
+        assert results[1].error is not None
+        assert 'not found' in results[1].error
+
+    async def test_delete_sessions(
+        self,
+        session_service: InMemorySessionService,
+        bulk_session_service: BulkSessionService,
+    ) -> None:
+        # arrange
+        user_id = str(uuid4())
+        sessions = [
+            await session_service.create_session(app_name=settings.APP_NAME, user_id=user_id)
+            for _ in range(3)
+        ]
+
+        # act
+        results = await bulk_session_service.delete_sessions([(user_id, s.id) for s in sessions])
+
+        # assert
+        assert all(r.ok for r in results)
+        remaining = await session_service.list_sessions(
+            app_name=settings.APP_NAME, user_id=user_id
+        )
+        assert remaining.sessions == []
@@ -0,0 +1,147 @@
+import json
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from google.adk.events import Event
+from google.adk.sessions import DatabaseSessionService
+from google.genai.types import Content
+from google.genai.types import FunctionResponse
+from google.genai.types import Part
+from sqlalchemy import text
+
+from ai_assistant.common.settings import settings
+from ai_assistant.services.session.compression import COMPRESSED_PART_MIME_TYPE
+from ai_assistant.services.session.compression import CompressedSessionService
+from ai_assistant.services.session.compression import PayloadCodec
+from ai_assistant.services.session.compression import is_compressed
+from ai_assistant.services.session.compression import train_dictionary
+
+_INSTRUCTIONS = [f'Step {step}: stir the sauce and season with black pepper' for step in range(50)]
+
+
+def _recipe_event() -> Event:
+    return Event(
+        author='recipe_assistant',
+        content=Content(
+            role='user',
+            parts=[
+                Part(
+                    function_response=FunctionResponse(
+                        name='get_recipe',
+                        response={'dish': 'Pasta Carbonara', 'instructions': _INSTRUCTIONS},
+                    )
+                ),
+                Part(text='Enjoy!'),
+            ],
+        ),
+    )
+
+
+class TestPayloadCodec:
+    def test_compresses_the_large_parts(self) -> None:
+        # arrange
+        codec = PayloadCodec(min_bytes=1024)
+        event = _recipe_event()
+
+        # act
+        stored = codec.compress_event(event)
+
+        # assert
+        assert stored.content and stored.content.parts
+        assert [is_compressed(part) for part in stored.content.parts] == [True, False]
+        assert codec.decompress_event(stored) == event
+
+    def test_keeps_the_events_without_large_parts(self) -> None:
+        # arrange
+        codec = PayloadCodec(min_bytes=1024)
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+
+        # act
+        stored = codec.compress_event(event)
+
+        # assert
+        assert stored is event
+
+    def test_decompresses_with_a_previous_dictionary(self) -> None:
+        # arrange
+        dictionary = b'stir the sauce and season with black pepper'
+        event = _recipe_event()
+        stored = PayloadCodec(min_bytes=1024, dictionary=dictionary).compress_event(event)
+
+        # act
+        decompressed = PayloadCodec(previous_dictionaries=[dictionary]).decompress_event(stored)
+
+        # assert
+        assert decompressed == event
+
+    def test_rejects_an_unknown_dictionary(self) -> None:
+        # arrange
+        dictionary = b'stir the sauce and season with black pepper'
+        stored = PayloadCodec(min_bytes=1024, dictionary=dictionary).compress_event(
+            _recipe_event()
+        )
+
+        # act / assert
+        with pytest.raises(ValueError, match='Unknown compression dictionary'):
+            PayloadCodec().decompress_event(stored)
+
+
+class TestTrainDictionary:
+    def test_keeps_the_strings_shared_by_samples(self) -> None:
+        # arrange
+        samples = [
+            b'{"dish": "Carbonara", "servings": 4}',
+            b'{"dish": "Cookies", "servings": 48}',
+        ]
+
+        # act
+        dictionary = train_dictionary(samples)
+
+        # assert
+        assert b'"servings": ' in dictionary
+        assert b'Carbonara' not in dictionary
+
+
+class TestCompressedSessionService:
+    @pytest.fixture
+    async def service(self, tmp_path: Path) -> AsyncIterator[CompressedSessionService]:
+        async with DatabaseSessionService(
+            f'sqlite+aiosqlite:///{tmp_path / "sessions.db"}'
+        ) as database:
+            yield CompressedSessionService(database, PayloadCodec(min_bytes=1024))
+
+    async def test_stores_the_large_parts_compressed(
+        self, service: CompressedSessionService
+    ) -> None:
+        # arrange
+        session = await service.create_session(app_name=settings.APP_NAME, user_id='user-1')
+        event = _recipe_event()
+
+        # act
+        appended = await service.append_event(session, event)
+
+        # assert
+        assert appended is event
+        assert session.events == [event]
+        database = service.session_service
+        assert isinstance(database, DatabaseSessionService)
+        async with database.db_engine.connect() as connection:
+            stored = json.loads(await connection.scalar(text('SELECT event_data FROM events')))
+        assert stored['content']['parts'][0]['inline_data']['mime_type'] == (
+            COMPRESSED_PART_MIME_TYPE
+        )
+
+    async def test_reads_the_original_events(self, service: CompressedSessionService) -> None:
+        # arrange
+        session = await service.create_session(app_name=settings.APP_NAME, user_id='user-1')
+        event = await service.append_event(session, _recipe_event())
+
+        # act
+        read = await service.get_session(
+            app_name=settings.APP_NAME, user_id='user-1', session_id=session.id
+        )
+
+        # assert
+        assert read is not None
+        assert read.events[0].content == event.content
@@ -0,0 +1,142 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import pytest
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content
+from google.genai.types import Part
+
+from ai_assistant.common.settings import settings
+from ai_assistant.exceptions import TooManyRequestsException
+from ai_assistant.services.session import export
+from ai_assistant.services.session.export import EXPORT_COLUMNS
+from ai_assistant.services.session.export import SessionExporter
+from ai_assistant.services.session.export import encode_ndjson
+from ai_assistant.services.session.export import ensure_export_capacity
+from ai_assistant.services.session.export import export_slot
+from ai_assistant.services.session.export import write_parquet
+
+
+async def _add_event(
+    session_service: InMemorySessionService,
+    user_id: str,
+    session_id: str,
+    text: str,
+    timestamp: float,
+) -> None:
+    session = await session_service.get_session(
+        app_name=settings.APP_NAME, user_id=user_id, session_id=session_id
+    )
+    assert session is not None
+    await session_service.append_event(
+        session,
+        Event(
+            author='user',
+            timestamp=timestamp,
+            content=Content(role='user', parts=[Part(text=text)]),
+        ),
+    )
+
+
+@pytest.fixture
+async def session_service() -> InMemorySessionService:
+    service = InMemorySessionService()
+    for user_id in ['alice', 'bob']:
+        session = await service.create_session(app_name=settings.APP_NAME, user_id=user_id)
+        await _add_event(service, user_id, session.id, f'{user_id} 1', timestamp=100.0)
+        await _add_event(service, user_id, session.id, f'{user_id} 2', timestamp=200.0)
+    return service
+
+
+@pytest.fixture(autouse=True)
+def reset_export_semaphore() -> None:
+    export._export_semaphore = None
+
+
+class TestSessionExporter:
+    async def test_exports_one_row_per_event_of_a_user(
+        self,
+        session_service: InMemorySessionService,
+    ) -> None:
+        # act
+        rows = [row async for row in SessionExporter(session_service).iter_rows('alice')]
+
+        # assert
+        assert [row['text'] for row in rows] == ['alice 1', 'alice 2']
+        assert all(list(row) == EXPORT_COLUMNS for row in rows)
+        assert rows[0]['content'] == {'parts': [{'text': 'alice 1'}], 'role': 'user'}
+
+    async def test_exports_time_range_across_users(
+        self,
+        session_service: InMemorySessionService,
+    ) -> None:
+        # arrange
+        start = datetime.fromtimestamp(150.0)
+        end = datetime.fromtimestamp(250.0)
+
+        # act
+        rows = [
+            row async for row in SessionExporter(session_service).iter_rows(start=start, end=end)
+        ]
+
+        # assert
+        assert sorted(row['text'] for row in rows) == ['alice 2', 'bob 2']
+
+    async def test_exports_sessions_without_events(self) -> None:
+        # arrange
+        session_service = InMemorySessionService()
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='eve')
+
+        # act
+        rows = [row async for row in SessionExporter(session_service).iter_rows('eve')]
+
+        # assert
+        assert len(rows) == 1
+        assert rows[0]['session_id'] == session.id
+        assert rows[0]['event_id'] is None
+
+
+class TestEncoders:
+    async def test_encode_ndjson(self, session_service: InMemorySessionService) -> None:
+        # act
+        lines = [
+            line async for line in encode_ndjson(SessionExporter(session_service).iter_rows('bob'))
+        ]
+
+        # assert
+        assert all(line.endswith(b'\n') for line in lines)
+        assert [json.loads(line)['text'] for line in lines] == ['bob 1', 'bob 2']
+
+    async def test_write_parquet(
+        self,
+        session_service: InMemorySessionService,
+        tmp_path: Path,
+    ) -> None:
+        # arrange
+        path = tmp_path / 'export.parquet'
+
+        # act
+        written = await write_parquet(
+            SessionExporter(session_service).iter_rows(), path, batch_size=1
+        )
+
+        # assert
+        table = pq.read_table(path)
+        assert written == 4
+        assert table.num_rows == 4
+        assert table.column_names == EXPORT_COLUMNS
+        assert json.loads(table.column('content')[0].as_py())['role'] == 'user'
+
+
+class TestExportCapacity:
+    async def test_rejects_exports_beyond_the_limit(self) -> None:
+        # arrange
+        async with export_slot(), export_slot():
+            # act & assert
+            with pytest.raises(TooManyRequestsException):
+                ensure_export_capacity()
+
+        ensure_export_capacity()
@@ -0,0 +1,193 @@
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import Session
+from google.genai import types
+
+from ai_assistant.common.settings import settings
+from ai_assistant.services.session.migration import SessionMigrator
+from ai_assistant.services.session.migration import SessionServiceSink
+from ai_assistant.services.session.migration import split_state
+
+
+@pytest.fixture
+def source() -> InMemorySessionService:
+    return InMemorySessionService()
+
+
+@pytest.fixture
+def target() -> InMemorySessionService:
+    return InMemorySessionService()
+
+
+async def _create_session(
+    service: InMemorySessionService,
+    user_id: str,
+    texts: list[str],
+    state: dict[str, Any] | None = None,
+) -> Session:
+    session = await service.create_session(
+        app_name=settings.APP_NAME, user_id=user_id, state=state
+    )
+    for text in texts:
+        await service.append_event(
+            session,
+            Event(
+                invocation_id=str(uuid4()),
+                author='user',
+                content=types.Content(role='user', parts=[types.Part(text=text)]),
+                actions=EventActions(state_delta={'last': text}),
+            ),
+        )
+    return session
+
+
+async def _get_texts(service: Any, user_id: str, session_id: str) -> list[str | None]:
+    session = await service.get_session(
+        app_name=settings.APP_NAME, user_id=user_id, session_id=session_id
+    )
+    assert session is not None
+    return [event.content.parts[0].text for event in session.events if event.content]
+
+
+class TestSplitState:
+    def test_splits_prefixed_keys_and_drops_temporary_ones(self) -> None:
+        # act
+        app_state, user_state, session_state = split_state(
+            {'app:theme': 'dark', 'user:name': 'Ada', 'temp:draft': 'x', 'topic': 'cooking'}
+        )
+
+        # assert
+        assert app_state == {'theme': 'dark'}
+        assert user_state == {'name': 'Ada'}
+        assert session_state == {'topic': 'cooking'}
+
+
+class TestSessionMigrator:
+    async def test_copies_sessions_events_and_state(
+        self, source: InMemorySessionService, target: InMemorySessionService
+    ) -> None:
+        # arrange
+        session = await _create_session(
+            source, 'user-1', ['hello', 'world'], state={'user:name': 'Ada'}
+        )
+        await _create_session(source, 'user-2', ['bonjour'])
+        migrator = SessionMigrator(source, SessionServiceSink(target), concurrency=2)
+
+        # act
+        report = await migrator.migrate()
+
+        # assert
+        assert report.ok
+        assert (report.users, report.sessions, report.events) == (2, 2, 3)
+        assert await _get_texts(target, 'user-1', session.id) == ['hello', 'world']
+        migrated = await target.get_session(
+            app_name=settings.APP_NAME, user_id='user-1', session_id=session.id
+        )
+        assert migrated is not None
+        assert migrated.state['last'] == 'world'
+        assert migrated.state['user:name'] == 'Ada'
+
+    async def test_only_migrates_the_given_users(
+        self, source: InMemorySessionService, target: InMemorySessionService
+    ) -> None:
+        # arrange
+        await _create_session(source, 'user-1', ['hello'])
+        await _create_session(source, 'user-2', ['bonjour'])
+        migrator = SessionMigrator(source, SessionServiceSink(target))
+
+        # act
+        report = await migrator.migrate(['user-2'])
+
+        # assert
+        assert report.users == 1
+        response = await target.list_sessions(app_name=settings.APP_NAME)
+        assert {session.user_id for session in response.sessions} == {'user-2'}
+
+    async def test_resumes_from_the_checkpoint(
+        self, source: InMemorySessionService, target: InMemorySessionService, tmp_path: Path
+    ) -> None:
+        # arrange
+        checkpoint = tmp_path / 'migrated.checkpoint'
+        await _create_session(source, 'user-1', ['hello'])
+        await SessionMigrator(source, SessionServiceSink(target), checkpoint=checkpoint).migrate()
+        await _create_session(source, 'user-2', ['bonjour'])
+        migrator = SessionMigrator(source, SessionServiceSink(target), checkpoint=checkpoint)
+
+        # act
+        report = await migrator.migrate()
+
+        # assert
+        assert (report.users, report.skipped_users) == (1, 1)
+        assert checkpoint.read_text().split() == ['user-1', 'user-2']
+
+    async def test_migrating_again_replaces_earlier_copies(
+        self, source: InMemorySessionService, target: InMemorySessionService
+    ) -> None:
+        # arrange
+        session = await _create_session(source, 'user-1', ['hello'])
+        migrator = SessionMigrator(source, SessionServiceSink(target))
+        await migrator.migrate()
+
+        # act
+        report = await migrator.migrate()
+
+        # assert
+        assert report.ok
+        assert await _get_texts(target, 'user-1', session.id) == ['hello']
+
+    async def test_reports_users_failing_verification_without_checkpointing_them(
+        self,
+        source: InMemorySessionService,
+        target: InMemorySessionService,
+        tmp_path: Path,
+    ) -> None:
+        # arrange
+        class LossySink(SessionServiceSink):
+            async def count(
+                self, app_name: str, user_id: str, session_ids: list[str]
+            ) -> tuple[int, int]:
+                sessions, events = await super().count(app_name, user_id, session_ids)
+                return sessions, events - 1
+
+        checkpoint = tmp_path / 'migrated.checkpoint'
+        await _create_session(source, 'user-1', ['hello'])
+        migrator = SessionMigrator(source, LossySink(target), checkpoint=checkpoint)
+
+        # act
+        report = await migrator.migrate()
+
+        # assert
+        assert not report.ok
+        assert 'Verification failed' in report.failed_users['user-1']
+        assert not checkpoint.exists()
+
+
+class TestDatabaseTarget:
+    @pytest.fixture
+    async def database_target(self, tmp_path: Path) -> AsyncIterator[DatabaseSessionService]:
+        async with DatabaseSessionService(
+            f'sqlite+aiosqlite:///{tmp_path / "sessions.db"}'
+        ) as service:
+            yield service
+
+    async def test_copies_sessions_into_a_database_session_service(
+        self, source: InMemorySessionService, database_target: DatabaseSessionService
+    ) -> None:
+        # arrange
+        session = await _create_session(source, 'user-1', ['hello', 'world'])
+        migrator = SessionMigrator(source, SessionServiceSink(database_target))
+
+        # act
+        report = await migrator.migrate()
+
+        # assert
+        assert (report.users, report.sessions, report.events) == (1, 1, 2)
+        assert await _get_texts(database_target, 'user-1', session.id) == ['hello', 'world']
@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+
+from ai_assistant.services.session.search import InvertedIndex
+from ai_assistant.services.session.search import tokenize
+
+
+@pytest.fixture
+def index() -> InvertedIndex:
+    return InvertedIndex()
+
+
+class TestTokenize:
+    def test_lowercases_and_splits_on_punctuation(self) -> None:
+        # act
+        tokens = tokenize("That Carbonara recipe, from last month's chat!")
+
+        # assert
+        assert tokens == ['that', 'carbonara', 'recipe', 'from', 'last', 'month', 's', 'chat']
+
+
+class TestInvertedIndex:
+    def test_requires_every_query_term(self, index: InvertedIndex) -> None:
+        # arrange
+        recipe, weather = uuid.uuid4(), uuid.uuid4()
+        index.add('app', 'user', recipe, 'Carbonara recipe with guanciale')
+        index.add('app', 'user', weather, 'Weather for the carbonara picnic')
+
+        # act
+        hits = index.search('app', 'user', 'carbonara RECIPE')
+
+        # assert
+        assert [message_id for message_id, _ in hits] == [recipe]
+
+    def test_ranks_rare_and_repeated_terms_higher(self, index: InvertedIndex) -> None:
+        # arrange
+        once, twice = uuid.uuid4(), uuid.uuid4()
+        index.add('app', 'user', once, 'pasta')
+        index.add('app', 'user', twice, 'pasta pasta')
+
+        # act
+        scores = dict(index.search('app', 'user', 'pasta'))
+
+        # assert
+        assert scores[twice] > scores[once]
+
+    def test_is_partitioned_per_user(self, index: InvertedIndex) -> None:
+        # arrange
+        index.add('app', 'alice', uuid.uuid4(), 'carbonara')
+
+        # act
+        hits = index.search('app', 'bob', 'carbonara')
+
+        # assert
+        assert hits == []
+
+    def test_removed_messages_are_not_found(self, index: InvertedIndex) -> None:
+        # arrange
+        message_id = uuid.uuid4()
+        index.add('app', 'user', message_id, 'carbonara')
+
+        # act
+        index.remove('app', 'user', [message_id])
+
+        # assert
+        assert index.search('app', 'user', 'carbonara') == []
+
+    def test_empty_query_matches_nothing(self, index: InvertedIndex) -> None:
+        # arrange
+        index.add('app', 'user', uuid.uuid4(), 'carbonara')
+
+        # act
+        hits = index.search('app', 'user', '  ?! ')
+
+        # assert
+        assert hits == []
@@ -0,0 +1,269 @@
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+from google.adk.apps.base_events_summarizer import BaseEventsSummarizer
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.events.event_actions import EventCompaction
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai.types import Content
+from google.genai.types import Part
+
+from ai_assistant.common.settings import settings
+from ai_assistant.services.ai.adk import session_factory
+from ai_assistant.services.session import snapshot as snapshot_module
+from ai_assistant.services.session.snapshot import InMemorySessionSnapshotStore
+from ai_assistant.services.session.snapshot import SnapshotSessionService
+from ai_assistant.services.session.snapshot import get_session_snapshot_store
+from ai_assistant.services.session.snapshot import shutdown_session_snapshots
+
+
+class _JoiningSummarizer(BaseEventsSummarizer):
+    """Summarizes events by joining their texts."""
+
+    def __init__(self) -> None:
+        self.calls: list[list[Event]] = []
+
+    async def maybe_summarize_events(self, *, events: list[Event]) -> Event | None:
+        self.calls.append(events)
+        text = ' '.join(
+            part.text
+            for event in events
+            if event.content and event.content.parts
+            for part in event.content.parts
+            if part.text
+        )
+        return Event(
+            author='user',
+            actions=EventActions(
+                compaction=EventCompaction(
+                    start_timestamp=events[0].timestamp,
+                    end_timestamp=events[-1].timestamp,
+                    compacted_content=Content(role='model', parts=[Part(text=text)]),
+                )
+            ),
+        )
+
+
+@pytest.fixture
+def summarizer() -> _JoiningSummarizer:
+    return _JoiningSummarizer()
+
+
+@pytest.fixture
+def session_service(summarizer: _JoiningSummarizer) -> SnapshotSessionService:
+    return SnapshotSessionService(
+        InMemorySessionService(),
+        InMemorySessionSnapshotStore(),
+        summarizer,
+        interval=4,
+        retained_events=2,
+    )
+
+
+async def _append_turns(service: SnapshotSessionService, session: Session, turns: range) -> None:
+    for turn in turns:
+        for author in ('user', 'recipe_assistant'):
+            await service.append_event(
+                session,
+                Event(
+                    author=author,
+                    invocation_id=f'turn-{turn}',
+                    timestamp=float(turn) + (0.5 if author == 'user' else 0.6),
+                    content=Content(role='user', parts=[Part(text=f'{author}-{turn}')]),
+                ),
+            )
+
+
+async def _snapshot(service: SnapshotSessionService, session: Session) -> Event | None:
+    return await service.snapshot(
+        app_name=session.app_name, user_id=session.user_id, session_id=session.id
+    )
+
+
+class TestSnapshotSessionService:
+    async def test_reads_the_snapshot_and_the_events_since(
+        self, session_service: SnapshotSessionService
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        await _append_turns(session_service, session, range(3))
+        snapshot = await _snapshot(session_service, session)
+
+        # act
+        read = await session_service.get_session(
+            app_name=settings.APP_NAME, user_id='u', session_id=session.id
+        )
+
+        # assert
+        assert snapshot is not None
+        assert read is not None
+        # The last summarized event is read too, and left out of the model request by ADK
+        assert [event.id for event in read.events] == [snapshot.id] + [
+            event.id for event in session.events[3:6]
+        ]
+
+    async def test_keeps_the_invocation_of_the_retained_events(
+        self, session_service: SnapshotSessionService, summarizer: _JoiningSummarizer
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        await _append_turns(session_service, session, range(3))
+        await session_service.append_event(
+            session, Event(author='user', invocation_id='turn-2', timestamp=2.7)
+        )
+
+        # act
+        snapshot = await _snapshot(session_service, session)
+
+        # assert
+        assert snapshot is not None
+        assert [event.invocation_id for event in summarizer.calls[0]] == ['turn-0'] * 2 + [
+            'turn-1'
+        ] * 2
+
+    async def test_summarizes_the_previous_snapshot(
+        self, session_service: SnapshotSessionService, summarizer: _JoiningSummarizer
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        await _append_turns(session_service, session, range(3))
+        await _snapshot(session_service, session)
+        await _append_turns(session_service, session, range(3, 5))
+
+        # act
+        snapshot = await _snapshot(session_service, session)
+
+        # assert
+        assert snapshot is not None
+        assert snapshot.actions.compaction is not None
+        assert snapshot.actions.compaction.start_timestamp == 0.5
+        assert snapshot.actions.compaction.compacted_content.parts == [
+            Part(
+                text='user-0 recipe_assistant-0 user-1 recipe_assistant-1 '
+                'user-2 recipe_assistant-2 user-3 recipe_assistant-3'
+            )
+        ]
+
+    async def test_skips_short_sessions(
+        self, session_service: SnapshotSessionService, summarizer: _JoiningSummarizer
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        await _append_turns(session_service, session, range(2))
+
+        # act
+        snapshot = await _snapshot(session_service, session)
+
+        # assert
+        assert snapshot is None
+        assert summarizer.calls == []
+
+    async def test_reads_all_the_events_with_a_config(
+        self, session_service: SnapshotSessionService
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        await _append_turns(session_service, session, range(3))
+        await _snapshot(session_service, session)
+
+        # act
+        read = await session_service.get_session(
+            app_name=settings.APP_NAME,
+            user_id='u',
+            session_id=session.id,
+            config=GetSessionConfig(),
+        )
+
+        # assert
+        assert read is not None
+        assert len(read.events) == 7
+
+    async def test_snapshots_the_loaded_session_in_the_background(
+        self, session_service: SnapshotSessionService, summarizer: _JoiningSummarizer
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        await _append_turns(session_service, session, range(3))
+
+        # act
+        task = session_service.schedule_snapshot(
+            app_name=settings.APP_NAME, user_id='u', session_id=session.id
+        )
+
+        # assert
+        assert task is not None
+        snapshot = await task
+        assert snapshot is not None
+        assert len(summarizer.calls) == 1
+        assert await session_service.store.get(settings.APP_NAME, 'u', session.id) == snapshot
+        # Due once per turn making the session long enough
+        assert (
+            session_service.schedule_snapshot(
+                app_name=settings.APP_NAME, user_id='u', session_id=session.id
+            )
+            is None
+        )
+
+    async def test_cancels_the_background_snapshots_at_shutdown(
+        self, session_service: SnapshotSessionService, summarizer: _JoiningSummarizer
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        await _append_turns(session_service, session, range(3))
+        summarizing = asyncio.Event()
+
+        async def summarize_slowly(*, events: list[Event]) -> Event | None:
+            summarizing.set()
+            await asyncio.sleep(60)
+            return None
+
+        summarizer.maybe_summarize_events = summarize_slowly  # type: ignore[method-assign]
+        task = session_service.schedule_snapshot(
+            app_name=settings.APP_NAME, user_id='u', session_id=session.id
+        )
+        await summarizing.wait()
+
+        # act
+        await shutdown_session_snapshots()
+
+        # assert
+        assert task is not None
+        assert task.cancelled()
+
+
+class TestSessionSnapshotCleanup:
+    @pytest.fixture(autouse=True)
+    def shared_session_service(self) -> Iterator[None]:
+        session_factory._session_service = None
+        snapshot_module._session_snapshot_store = None
+        session_factory.initialize_session_service()
+
+        yield
+
+        session_factory._session_service = None
+        snapshot_module._session_snapshot_store = None
+
+    async def test_deletes_the_snapshot_of_deleted_sessions(
+        self, summarizer: _JoiningSummarizer
+    ) -> None:
+        # arrange
+        session_service = session_factory.get_session_service()
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        snapshot = await summarizer.maybe_summarize_events(
+            events=[Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))]
+        )
+        assert snapshot is not None
+        store = get_session_snapshot_store()
+        await store.put(settings.APP_NAME, 'u', session.id, snapshot)
+
+        # act
+        await session_service.delete_session(
+            app_name=settings.APP_NAME, user_id='u', session_id=session.id
+        )
+
+        # assert
+        assert await store.get(settings.APP_NAME, 'u', session.id) is None
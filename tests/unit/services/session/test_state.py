@@ -0,0 +1,147 @@
+from typing import Any
+
+import pytest
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import Session
+
+from ai_assistant.common.settings import settings
+from ai_assistant.services.session.state import DeltaStateSessionService
+from ai_assistant.services.session.state import InMemorySessionStateStore
+from ai_assistant.services.session.state import requested_state_keys
+
+
+@pytest.fixture
+def backend() -> InMemorySessionService:
+    return InMemorySessionService()
+
+
+@pytest.fixture
+def session_service(backend: InMemorySessionService) -> DeltaStateSessionService:
+    return DeltaStateSessionService(backend, InMemorySessionStateStore(checkpoint_interval=2))
+
+
+async def _append(
+    service: DeltaStateSessionService, session: Session, state_delta: dict[str, Any]
+) -> Event:
+    return await service.append_event(
+        session,
+        Event(author='recipe_assistant', actions=EventActions(state_delta=state_delta)),
+    )
+
+
+class TestDeltaStateSessionService:
+    async def test_stores_the_session_state_as_deltas(
+        self, backend: InMemorySessionService, session_service: DeltaStateSessionService
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(
+            app_name=settings.APP_NAME, user_id='user-1', state={'diet': 'vegan'}
+        )
+
+        # act
+        event = await _append(session_service, session, {'dish': 'curry', 'user:name': 'Ada'})
+
+        # assert
+        assert session.state == {'diet': 'vegan', 'dish': 'curry', 'user:name': 'Ada'}
+        stored = await backend.get_session(
+            app_name=settings.APP_NAME, user_id='user-1', session_id=session.id
+        )
+        assert stored is not None
+        assert stored.state == {'diet': 'vegan', 'user:name': 'Ada'}
+        assert session.events[-1] is event
+
+    async def test_materializes_the_state_and_the_deltas_of_events(
+        self, session_service: DeltaStateSessionService
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        for step in range(5):
+            await _append(session_service, session, {'step': step, f'seen_{step}': True})
+
+        # act
+        read = await session_service.get_session(
+            app_name=settings.APP_NAME, user_id='u', session_id=session.id
+        )
+
+        # assert
+        assert read is not None
+        assert read.state == session.state
+        assert read.state['step'] == 4
+        assert [e.actions.state_delta['step'] for e in read.events] == [0, 1, 2, 3, 4]
+
+    async def test_reads_only_the_requested_keys(
+        self, session_service: DeltaStateSessionService
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        await _append(session_service, session, {'dish': 'curry', 'notes': 'x' * 100})
+
+        # act
+        with requested_state_keys(['dish']):
+            response = await session_service.list_sessions(app_name=settings.APP_NAME, user_id='u')
+
+        # assert
+        assert response.sessions[0].state == {'dish': 'curry'}
+
+    async def test_deletes_the_deltas_with_the_session(
+        self, session_service: DeltaStateSessionService
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        await _append(session_service, session, {'dish': 'curry'})
+
+        # act
+        await session_service.delete_session(
+            app_name=settings.APP_NAME, user_id='u', session_id=session.id
+        )
+
+        # assert
+        states = await session_service.store.get_states(settings.APP_NAME, 'u', [session.id])
+        assert states == {}
+
+    async def test_discards_the_delta_of_an_event_not_stored(
+        self,
+        backend: InMemorySessionService,
+        session_service: DeltaStateSessionService,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+
+        async def fail(*args: Any, **kwargs: Any) -> Event:
+            raise ConnectionError('Connection lost')
+
+        monkeypatch.setattr(backend, 'append_event', fail)
+
+        # act
+        with pytest.raises(ConnectionError):
+            await _append(session_service, session, {'dish': 'curry'})
+
+        # assert
+        store = session_service.store
+        assert await store.get_pending(settings.APP_NAME, 'u', session.id) == {}
+        assert await store.get_states(settings.APP_NAME, 'u', [session.id]) == {}
+
+    async def test_confirms_the_pending_deltas_of_stored_events(
+        self, backend: InMemorySessionService, session_service: DeltaStateSessionService
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name=settings.APP_NAME, user_id='u')
+        event = Event(author='recipe_assistant')
+        await session_service.store.append(
+            settings.APP_NAME, 'u', session.id, event.id, {'dish': 'curry'}
+        )
+        await session_service.store.append(settings.APP_NAME, 'u', session.id, 'lost', {'a': 1})
+        await backend.append_event(session, event)
+
+        # act
+        read = await session_service.get_session(
+            app_name=settings.APP_NAME, user_id='u', session_id=session.id
+        )
+
+        # assert
+        assert read is not None
+        assert read.state == {'dish': 'curry'}
+        assert read.events[0].actions.state_delta == {'dish': 'curry'}
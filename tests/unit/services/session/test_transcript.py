@@ -0,0 +1,285 @@
+import pytest
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content
+from google.genai.types import FunctionCall
+from google.genai.types import Part
+
+from ai_assistant.services.ai.adk.session_service import ObservedSessionService
+from ai_assistant.services.session.transcript import InMemoryTranscriptStore
+from ai_assistant.services.session.transcript import TranscriptProjection
+from ai_assistant.services.session.transcript import rebuild_transcript
+from ai_assistant.services.session.transcript import transcript_messages_from_event
+
+
+@pytest.fixture
+def store() -> InMemoryTranscriptStore:
+    return InMemoryTranscriptStore()
+
+
+@pytest.fixture
+def session_service(store: InMemoryTranscriptStore) -> ObservedSessionService:
+    return ObservedSessionService(
+        InMemorySessionService(),
+        listeners=[TranscriptProjection(store)],
+    )
+
+
+class TestTranscriptMessagesFromEvent:
+    def test_extracts_text_parts(self) -> None:
+        # arrange
+        event = Event(
+            author='weather_assistant',
+            content=Content(role='model', parts=[Part(text='Sunny'), Part(text=' and warm')]),
+        )
+
+        # act
+        messages = transcript_messages_from_event('session', event)
+
+        # assert
+        assert [m.text for m in messages] == ['Sunny', ' and warm']
+        assert [m.part_index for m in messages] == [0, 1]
+        assert all(m.role == 'model' and m.event_id == event.id for m in messages)
+
+    def test_skips_function_calls(self) -> None:
+        # arrange
+        event = Event(
+            author='weather_assistant',
+            content=Content(
+                role='model',
+                parts=[Part(function_call=FunctionCall(name='get_weather', args={}))],
+            ),
+        )
+
+        # act
+        messages = transcript_messages_from_event('session', event)
+
+        # assert
+        assert messages == []
+
+    def test_skips_partial_events(self) -> None:
+        # arrange
+        event = Event(
+            author='orchestrator',
+            partial=True,
+            content=Content(role='model', parts=[Part(text='Hel')]),
+        )
+
+        # act
+        messages = transcript_messages_from_event('session', event)
+
+        # assert
+        assert messages == []
+
+    def test_ids_are_deterministic(self) -> None:
+        # arrange
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+
+        # act
+        first = transcript_messages_from_event('session', event)
+        second = transcript_messages_from_event('session', event)
+
+        # assert
+        assert first[0].id == second[0].id
+
+
+class TestInMemoryTranscriptStore:
+    async def test_append_is_idempotent(self, store: InMemoryTranscriptStore) -> None:
+        # arrange
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+        messages = transcript_messages_from_event('session', event)
+
+        # act
+        await store.append('app', 'user', 'session', messages)
+        await store.append('app', 'user', 'session', messages)
+
+        # assert
+        assert len(await store.list_messages('app', 'user', 'session')) == 1
+
+    async def test_search_ranks_and_paginates_across_sessions(
+        self,
+        store: InMemoryTranscriptStore,
+    ) -> None:
+        # arrange
+        texts = {
+            'session-1': ['A carbonara recipe', 'Pasta for dinner'],
+            'session-2': ['Carbonara, carbonara and more carbonara'],
+            'session-3': ['Carbonara for my neighbour'],
+        }
+        for session_id, session_texts in texts.items():
+            for text in session_texts:
+                event = Event(author='user', content=Content(role='user', parts=[Part(text=text)]))
+                await store.append(
+                    'app', 'user', session_id, transcript_messages_from_event(session_id, event)
+                )
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='carbonara')]))
+        await store.append('app', 'other', 'session-4', transcript_messages_from_event('4', event))
+
+        # act
+        first_page = await store.search('app', 'user', 'carbonara', limit=2)
+        second_page = await store.search('app', 'user', 'carbonara', limit=2, offset=2)
+
+        # assert
+        assert first_page[0].session_id == 'session-2'
+        assert first_page[0].score > first_page[1].score
+        assert len(second_page) == 1
+        assert {hit.session_id for hit in first_page + second_page} == {
+            'session-1',
+            'session-2',
+            'session-3',
+        }
+
+    async def test_search_ignores_deleted_sessions(self, store: InMemoryTranscriptStore) -> None:
+        # arrange
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='Carbonara')]))
+        await store.append('app', 'user', 'session', transcript_messages_from_event('s', event))
+
+        # act
+        await store.delete('app', 'user', 'session')
+
+        # assert
+        assert await store.search('app', 'user', 'carbonara', limit=10) == []
+
+
+class TestTranscriptProjection:
+    async def test_projection_is_updated_on_append(
+        self,
+        session_service: ObservedSessionService,
+        store: InMemoryTranscriptStore,
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name='app', user_id='user')
+        events = [
+            Event(author='user', content=Content(role='user', parts=[Part(text='Weather?')])),
+            Event(
+                author='weather_assistant',
+                content=Content(
+                    role='model',
+                    parts=[Part(function_call=FunctionCall(name='get_weather', args={}))],
+                ),
+            ),
+            Event(
+                author='weather_assistant',
+                content=Content(role='model', parts=[Part(text='It is sunny.')]),
+            ),
+        ]
+
+        # act
+        for event in events:
+            await session_service.append_event(session, event)
+
+        # assert
+        messages = await store.list_messages('app', 'user', session.id)
+        assert [(m.role, m.text) for m in messages] == [
+            ('user', 'Weather?'),
+            ('model', 'It is sunny.'),
+        ]
+
+    async def test_projection_is_dropped_on_delete(
+        self,
+        session_service: ObservedSessionService,
+        store: InMemoryTranscriptStore,
+    ) -> None:
+        # arrange
+        session = await session_service.create_session(app_name='app', user_id='user')
+        event = Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+        await session_service.append_event(session, event)
+
+        # act
+        await session_service.delete_session(app_name='app', user_id='user', session_id=session.id)
+
+        # assert
+        assert await store.list_messages('app', 'user', session.id) == []
+
+
+class TestRebuildTranscript:
+    async def test_rebuilds_from_raw_events(self, store: InMemoryTranscriptStore) -> None:
+        # arrange
+        backend = InMemorySessionService()
+        session = await backend.create_session(app_name='app', user_id='user')
+        await backend.append_event(
+            session, Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+        )
+        await backend.append_event(
+            session,
+            Event(author='orchestrator', content=Content(role='model', parts=[Part(text='Hey')])),
+        )
+
+        # act
+        count = await rebuild_transcript(
+            backend, store, app_name='app', user_id='user', session_id=session.id
+        )
+
+        # assert
+        assert count == 2
+        messages = await store.list_messages('app', 'user', session.id)
+        assert [m.text for m in messages] == ['Hi', 'Hey']
+
+    async def test_raises_for_unknown_session(self, store: InMemoryTranscriptStore) -> None:
+        # act & assert
+        with pytest.raises(ValueError, match='not found'):
+            await rebuild_transcript(
+                InMemorySessionService(),
+                store,
+                app_name='app',
+                user_id='user',
+                session_id='missing',
+            )
+
+    async def test_clears_the_events_missing_from_the_transcript(
+        self, store: InMemoryTranscriptStore
+    ) -> None:
+        # arrange
+        backend = InMemorySessionService()
+        session = await backend.create_session(app_name='app', user_id='user')
+        event = await backend.append_event(
+            session, Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+        )
+        await TranscriptProjection(store).on_event_failed(session, event)
+        await store.record_missing_event('app', 'user', session.id, 'appended-since')
+
+        # act
+        await rebuild_transcript(
+            backend, store, app_name='app', user_id='user', session_id=session.id
+        )
+
+        # assert
+        assert await store.list_incomplete() == [('app', 'user', session.id)]
+        await store.clear_missing_events('app', 'user', session.id, ['appended-since'])
+        assert await store.list_incomplete() == []
+
+    async def test_keeps_the_messages_appended_since_the_session_was_read(
+        self, store: InMemoryTranscriptStore
+    ) -> None:
+        # arrange
+        backend = InMemorySessionService()
+        session = await backend.create_session(app_name='app', user_id='user')
+        event = await backend.append_event(
+            session, Event(author='user', content=Content(role='user', parts=[Part(text='Hi')]))
+        )
+        stale = Event(
+            author='user',
+            timestamp=event.timestamp - 1,
+            content=Content(role='user', parts=[Part(text='Removed')]),
+        )
+        appended_since = Event(
+            author='orchestrator',
+            timestamp=session.last_update_time + 1,
+            content=Content(role='model', parts=[Part(text='Hey')]),
+        )
+        for projected in (stale, event, appended_since):
+            await store.append(
+                'app', 'user', session.id, transcript_messages_from_event(session.id, projected)
+            )
+
+        # act
+        await rebuild_transcript(
+            backend, store, app_name='app', user_id='user', session_id=session.id
+        )
+
+        # assert
+        messages = await store.list_messages('app', 'user', session.id)
+        assert [m.text for m in messages] == ['Hi', 'Hey']
+        assert [
+            hit.message.text for hit in await store.search('app', 'user', 'removed', limit=10)
+        ] == []